@@ -130,7 +130,7 @@ import logging
 logger = logging.getLogger(__name__)
 logger.addHandler(logging.NullHandler())
 
-import os, sys, json, time, platform, ssl, traceback
+import os, sys, re, json, time, platform, ssl, traceback
 import errno
 import math
 import mmap
@@ -143,6 +143,9 @@ from collections import namedtuple
 from . import exceptions
 from .compat import USING_PYTHON2, BadStatusLine, StringIO, bytes, Repr
 from .utils.printing import BOLD, BLUE, YELLOW, GREEN, RED, WHITE
+from .utils import json_codec as _json_codec
+from .utils.throttle import Throttle as _Throttle
+from .utils.hedging import Hedger as _Hedger
 
 from random import randint
 from requests.auth import AuthBase
@@ -221,6 +224,10 @@ _expected_exceptions = (exceptions.network_exceptions, exceptions.DXAPIError, Ba
 _pool_mutex = Lock()
 _pool_manager = None
 
+# Shared by all requests to the API server, so that when the server asks
+# one of them to back off, they all do
+_api_throttle = _Throttle()
+
 def _get_proxy_info(url):
     proxy_info = {}
 
@@ -338,15 +345,12 @@ def _extract_msg_from_last_exception():
         return traceback.format_exc().splitlines()[-1].strip()
 
 
-def _calculate_retry_delay(response, num_attempts):
+def _get_retry_after(response):
     '''
-    Returns the time in seconds that we should wait.
-
-    :param num_attempts: number of attempts that have been made to the
-        resource, including the most recent failed one
-    :type num_attempts: int
+    Returns the number of seconds that a 503 response asks us to wait
+    for, or None if it doesn't say.
     '''
-    if response is not None and response.status == 503 and 'retry-after' in response.headers:
+    if response.status == 503 and 'retry-after' in response.headers:
         try:
             return int(response.headers['retry-after'])
         except ValueError:
@@ -354,6 +358,20 @@ def _calculate_retry_delay(response, num_attempts):
             # instead of seconds to wait. We don't bother to parse that,
             # but the apiserver doesn't generate such responses anyway.
             pass
+    return None
+
+
+def _calculate_retry_delay(response, num_attempts):
+    '''
+    Returns the time in seconds that we should wait.
+
+    :param num_attempts: number of attempts that have been made to the
+        resource, including the most recent failed one
+    :type num_attempts: int
+    '''
+    retry_after = _get_retry_after(response) if response is not None else None
+    if retry_after is not None:
+        return retry_after
     if num_attempts <= 1:
         return 1
     num_attempts = min(num_attempts, 7)
@@ -452,6 +470,70 @@ def _debug_print_response(debug_level, seq_num, time_started, req_id, response_s
               file=sys.stderr)
 
 
+class RequestInfo(namedtuple('RequestInfo', 'method url route status request_id bytes_sent bytes_received latency '
+                                               'retries error')):
+    '''
+    Describes a completed call to :func:`DXHTTPRequest`, as passed to the
+    hooks added with :func:`add_request_hook`. *route* is the API route,
+    with object IDs replaced by "xxxx" (e.g. "/file-xxxx/describe"), or
+    the host name for requests made to other servers (e.g. file uploads
+    and downloads). *status* and *request_id* are those of the last
+    response (None if there was none). *latency* is the time in seconds
+    that the call took, including *retries*. *error* is the exception that
+    the call raised, or None if it succeeded.
+    '''
+    __slots__ = ()
+
+
+_request_hooks = []
+
+def add_request_hook(hook):
+    '''
+    :param hook: Function called with a :class:`RequestInfo` after each HTTP request
+    :type hook: callable
+
+    Registers *hook* to be called (in the requesting thread) whenever
+    a call to :func:`DXHTTPRequest` completes, successfully or not.
+    '''
+    _request_hooks.append(hook)
+
+def remove_request_hook(hook):
+    '''
+    :param hook: Function previously passed to :func:`add_request_hook`
+    :type hook: callable
+    '''
+    _request_hooks.remove(hook)
+
+_ROUTE_ID_PATTERN = re.compile(r"/([a-z]+)-[^/]+")
+
+def _get_route(url, prepend_srv):
+    if not prepend_srv:
+        return urlsplit(url).netloc
+    return _ROUTE_ID_PATTERN.sub(r"/\1-xxxx", urlsplit(url).path)
+
+def _report_request(method, url, prepend_srv, data, time_started, retries, response, error=None):
+    if not _request_hooks or url is None:
+        return
+    bytes_received = 0
+    if response is not None and response.data is not None:
+        bytes_received = len(response.data)
+    info = RequestInfo(method=method,
+                       url=url,
+                       route=_get_route(url, prepend_srv),
+                       status=response.status if response is not None else None,
+                       request_id=response.headers.get('x-request-id') if response is not None else None,
+                       bytes_sent=len(data) if hasattr(data, '__len__') else 0,
+                       bytes_received=bytes_received,
+                       latency=time.time() - time_started,
+                       retries=retries,
+                       error=error)
+    for hook in list(_request_hooks):
+        try:
+            hook(info)
+        except Exception:
+            logger.warning("Request hook %r failed", hook, exc_info=True)
+
+
 def DXHTTPRequest(resource, data, method='POST', headers=None, auth=True,
                   timeout=DEFAULT_TIMEOUT,
                   use_compression=None, jsonify_data=True, want_full_response=False,
@@ -535,7 +617,7 @@ def DXHTTPRequest(resource, data, method='POST', headers=None, auth=True,
     # serialized_data is a sequence/buffer
 
     if jsonify_data:
-        serialized_data = json.dumps(data)
+        serialized_data = _json_codec.dumps(data)
         if 'Content-Type' not in headers and method == 'POST':
             headers['Content-Type'] = 'application/json'
     else:
@@ -549,6 +631,8 @@ def DXHTTPRequest(resource, data, method='POST', headers=None, auth=True,
     if hasattr(data, 'seek') and hasattr(data, 'tell'):
         rewind_input_buffer_offset = data.tell()
 
+    request_started = time.time()
+
     # Maintain two separate counters for the number of tries...
 
     try_index = 0  # excluding 503 errors. The number of tries as given here
@@ -584,8 +668,21 @@ def DXHTTPRequest(resource, data, method='POST', headers=None, auth=True,
                     return i
 
                 _headers = {ensure_ascii(k): ensure_ascii(v) for k, v in _headers.items()}
-                response = pool_manager.request(_method, _url, headers=_headers, body=body,
-                                                timeout=timeout, retries=False, **kwargs)
+                if prepend_srv:
+                    _api_throttle.acquire()
+                try:
+                    if _transport is not None:
+                        response = _transport.request(pool_manager, _method, _url, headers=_headers, body=body,
+                                                      timeout=timeout, retries=False, **kwargs)
+                    else:
+                        response = pool_manager.request(_method, _url, headers=_headers, body=body,
+                                                        timeout=timeout, retries=False, **kwargs)
+                except Exception:
+                    if prepend_srv:
+                        _api_throttle.record_error()
+                    raise
+                if prepend_srv:
+                    _api_throttle.record_response(response.status, _get_retry_after(response))
             except urllib3.exceptions.ClosedPoolError:
                 # If another thread closed the pool before the request was
                 # started, will throw ClosedPoolError
@@ -615,7 +712,7 @@ def DXHTTPRequest(resource, data, method='POST', headers=None, auth=True,
                     except AttributeError:
                         raise exceptions.UrllibInternalError("Content is none", response.status)
                     try:
-                        content = json.loads(content)
+                        content = _json_codec.loads(content)
                     except ValueError:
                         # The JSON is not parsable, but we should be able to retry.
                         raise exceptions.BadJSONInReply("Invalid JSON received from server", response.status)
@@ -636,6 +733,8 @@ def DXHTTPRequest(resource, data, method='POST', headers=None, auth=True,
                                                                                          content))
 
             if want_full_response:
+                _report_request(method, _url, prepend_srv, serialized_data, request_started, try_index_including_503,
+                                response)
                 return response
             else:
                 if 'content-length' in response.headers:
@@ -652,15 +751,17 @@ def DXHTTPRequest(resource, data, method='POST', headers=None, auth=True,
                 response_was_json = False
 
                 if decode_response_body:
-                    content = content.decode('utf-8')
                     if response.headers.get('content-type', '').startswith('application/json'):
+                        # Parse the raw bytes, which the faster JSON backends do without decoding them first
                         try:
-                            content = json.loads(content)
+                            content = _json_codec.loads(content)
                         except ValueError:
                             # The JSON is not parsable, but we should be able to retry.
                             raise exceptions.BadJSONInReply("Invalid JSON received from server", response.status)
                         else:
                             response_was_json = True
+                    else:
+                        content = content.decode('utf-8')
 
                 req_id = response.headers.get('x-request-id') or "--"
 
@@ -673,8 +774,12 @@ def DXHTTPRequest(resource, data, method='POST', headers=None, auth=True,
                         continue
                     else:
                         _set_retry_response(retried_responses[0])
+                        _report_request(method, _url, prepend_srv, serialized_data, request_started,
+                                        try_index_including_503, response)
                         return retried_responses[1]
 
+                _report_request(method, _url, prepend_srv, serialized_data, request_started, try_index_including_503,
+                                response)
                 return content
             raise AssertionError('Should never reach this line: expected a result to have been returned by now')
         except Exception as e:
@@ -740,6 +845,8 @@ def DXHTTPRequest(resource, data, method='POST', headers=None, auth=True,
             # retryable. Print the latest error and propagate it back to the caller.
             if not isinstance(e, exceptions.DXAPIError):
                 logger.error("[%s] %s %s: %s.", time.ctime(), method, _url, exception_msg)
+            _report_request(method, _url, prepend_srv, serialized_data, request_started, try_index_including_503,
+                            response, error=e)
 
             # Retries have been exhausted, and we are unable to get a full
             # buffer from the data source. Raise a special exception.
@@ -780,6 +887,15 @@ The smaller chunks are then concatenated to form the original range of data. If
 
 
 def _dxhttp_read_range(url, headers, start_pos, end_pos, timeout, sub_range=True):
+    if _download_hedger is not None:
+        # The request may be sent twice at once, so each copy gets its own headers
+        return _download_hedger.run(lambda: _dxhttp_read_range_once(url, dict(headers), start_pos, end_pos, timeout,
+                                                                    sub_range),
+                                    end_pos - start_pos + 1)
+    return _dxhttp_read_range_once(url, headers, start_pos, end_pos, timeout, sub_range)
+
+
+def _dxhttp_read_range_once(url, headers, start_pos, end_pos, timeout, sub_range):
     if sub_range:
         headers['Range'] = "bytes=" + str(start_pos) + "-" + str(end_pos)
     try:
@@ -810,6 +926,75 @@ def _dxhttp_read_range(url, headers, start_pos, end_pos, timeout, sub_range=True
         return concat_chunks
 
 
+def set_download_hedging(percentile=None, max_extra_load=0.05):
+    '''
+    :param percentile: Percentile of the latencies of recent chunk requests after which a duplicate request is sent, or None to turn hedging off
+    :type percentile: float
+    :param max_extra_load: Maximum number of duplicate requests, as a fraction of all chunk requests
+    :type max_extra_load: float
+    :returns: The :class:`dxpy.utils.hedging.Hedger` now in use (whose counters tell how many requests were hedged), or None
+
+    Turns hedging of file chunk downloads on or off. When it is on, a
+    chunk request that is slower than *percentile* of recent requests
+    is sent again, and the first response to arrive is used. It can
+    also be turned on by setting the ``DX_HEDGE_DOWNLOADS`` environment
+    variable to the percentile.
+    '''
+    global _download_hedger
+    _download_hedger = None if percentile is None else _Hedger(percentile=percentile, max_extra_load=max_extra_load)
+    return _download_hedger
+
+_download_hedger = None
+if os.environ.get("DX_HEDGE_DOWNLOADS"):
+    try:
+        _percentile = float(os.environ["DX_HEDGE_DOWNLOADS"])
+        if not 0 < _percentile <= 100:
+            raise ValueError()
+        set_download_hedging(_percentile)
+    except ValueError:
+        logger.warning("Ignoring DX_HEDGE_DOWNLOADS=%s, which is not a percentile", os.environ["DX_HEDGE_DOWNLOADS"])
+
+
+def set_transport(transport):
+    '''
+    :param transport: Object whose ``request(pool_manager, method, url, **kwargs)`` method sends each HTTP request instead of ``pool_manager.request(method, url, **kwargs)``, or None to send them directly
+    :returns: The transport previously in use, or None
+
+    Changes how :func:`DXHTTPRequest` sends requests, e.g. to record
+    them or replay recorded responses (see
+    :mod:`dxpy.utils.cassette`). Retries, throttling and request hooks
+    apply as usual.
+    '''
+    global _transport
+    previous, _transport = _transport, transport
+    return previous
+
+_transport = None
+
+
+def reset_after_fork():
+    '''
+    Discards the state that a process forked from a dxpy program
+    inherits but must not share with its parent: the pooled connections
+    to the API server, whose sockets the parent keeps using, and the
+    locks of the request throttle, of the download hedger and of the
+    metrics registry, which a thread of the parent may have held at the
+    time of the fork.
+
+    Call it in the child before it makes any requests, e.g. in the
+    initializer of a :class:`multiprocessing.Pool`.
+    '''
+    global _pool_mutex, _pool_manager, _api_throttle, sequence_number_mutex
+    _pool_mutex = Lock()
+    _pool_manager = None
+    _api_throttle = _Throttle()
+    sequence_number_mutex = threading.Lock()
+    if _download_hedger is not None:
+        set_download_hedging(_download_hedger.percentile, max_extra_load=_download_hedger.max_extra_load)
+    from .utils import metrics
+    metrics.reset_after_fork()
+
+
 def set_api_server_info(host=None, port=None, protocol=None):
     '''
     :param host: API server hostname
@@ -947,6 +1132,62 @@ def _get_retry_response():
 from .utils.config import DXConfig as _DXConfig
 config = _DXConfig()
 
-from .bindings import *
+from . import api
 from .dxlog import DXLogHandler
-from .utils.exec_utils import run, entry_point
+
+if os.environ.get("DX_METRICS_FILE"):
+    # Start collecting metrics (see dxpy.utils.metrics)
+    from .utils import metrics as _metrics
+    _metrics.enable(os.environ["DX_METRICS_FILE"])
+
+if os.environ.get("DX_PROFILE", "0") != "0":
+    # Start recording spans (see dxpy.utils.profiling)
+    from .utils import profiling as _profiling
+    _profiling.enable(trace_file=None if os.environ["DX_PROFILE"] == "1" else os.environ["DX_PROFILE"])
+
+if os.environ.get("DX_CASSETTE_RECORD") or os.environ.get("DX_CASSETTE_REPLAY"):
+    # Record or replay requests (see dxpy.utils.cassette)
+    from .utils import cassette as _cassette
+    _cassette.enable()
+
+if sys.version_info >= (3, 7):
+    # The object handlers and the app execution helpers are imported
+    # when they are first used (PEP 562) rather than here, because
+    # short-lived programs (e.g. job entry points, or scripts that only
+    # call dxpy.api.*) would otherwise spend much of their running time
+    # importing modules they never use.
+    def __getattr__(name):
+        from importlib import import_module
+        if name.startswith("_"):
+            raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+        if name in ("run", "entry_point"):
+            value = getattr(import_module(".utils.exec_utils", __name__), name)
+        else:
+            try:
+                value = getattr(import_module(".bindings", __name__), name)
+            except AttributeError:
+                # Submodules that used to be imported as a side effect of
+                # importing the bindings
+                try:
+                    value = import_module("." + name, __name__)
+                except ImportError as e:
+                    if getattr(e, "name", None) != __name__ + "." + name:
+                        raise
+                    raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+        globals()[name] = value
+        return value
+
+    def __dir__():
+        from .bindings import __dir__ as bindings_dir
+        return sorted(set(globals()) | set(name for name in bindings_dir() if not name.startswith("_")) |
+                      set(["run", "entry_point"]))
+
+    # Star imports only look up names (through __getattr__) that are
+    # listed in __all__
+    from .bindings import __all__ as _bindings_all
+    __all__ = ["api", "run", "entry_point"]
+    __all__ += sorted(set(_bindings_all) | set(["bindings", "cli"]) |
+                      set(name for name in globals() if not name.startswith("_")) - set(__all__))
+else:
+    from .bindings import *
+    from .utils.exec_utils import run, entry_point
@@ -22,7 +22,7 @@ base class for all remote data object handlers.
 
 from __future__ import print_function, unicode_literals, division, absolute_import
 
-import time, copy, re
+import sys, time, copy, re, importlib
 
 import dxpy.api
 from ..exceptions import (DXError, DXAPIError, DXFileError, DXGTableError, DXSearchError, DXAppletError,
@@ -275,6 +275,7 @@ class DXDataObject(DXObject):
         data container is used).
 
         '''
+        from .dxdataobject_functions import is_dxlink, get_dxlink_ids
         if is_dxlink(dxid):
             dxid, project_from_link = get_dxlink_ids(dxid)
             if project is None:
@@ -650,20 +651,55 @@ class DXDataObject(DXObject):
             time.sleep(2)
             elapsed += 2
 
-from .dxfile import DXFile, DXFILE_HTTP_THREADS, DEFAULT_BUFFER_SIZE
-from .download_all_inputs import download_all_inputs
-from .dxfile_functions import open_dxfile, new_dxfile, download_dxfile, upload_local_file, upload_string, list_subfolders, download_folder
-from .dxgtable import DXGTable, NULL, DXGTABLE_HTTP_THREADS
-from .dxgtable_functions import open_dxgtable, new_dxgtable
-from .dxrecord import DXRecord, new_dxrecord
-from .dxproject import DXContainer, DXProject
-from .dxjob import DXJob, new_dxjob
-from .dxanalysis import DXAnalysis
-from .dxapplet import DXExecutable, DXApplet
-from .dxapp import DXApp
-from .dxworkflow import DXWorkflow, new_dxworkflow
-from .auth import user_info, whoami
-from .dxdataobject_functions import dxlink, is_dxlink, get_dxlink_ids, get_handler, describe, get_details, remove
-from .search import (find_data_objects, find_executions, find_jobs, find_analyses, find_projects, find_apps,
-                     find_one_data_object, find_one_project, find_one_app, resolve_data_objects, find_orgs,
-                     org_find_members, org_find_projects, org_find_apps)
+# Names exported by each of the modules below, in the order in which
+# they used to be imported here
+_SUBMODULE_EXPORTS = [
+    ("dxfile", ("DXFile", "DXFILE_HTTP_THREADS", "DEFAULT_BUFFER_SIZE")),
+    ("download_all_inputs", ("download_all_inputs", )),
+    ("dxfile_functions", ("open_dxfile", "new_dxfile", "download_dxfile", "upload_local_file", "upload_string",
+                          "list_subfolders", "download_folder", "download_dxfiles",
+                          "prepare_folder_download")),
+    ("dxgtable", ("DXGTable", "NULL", "DXGTABLE_HTTP_THREADS")),
+    ("dxgtable_functions", ("open_dxgtable", "new_dxgtable")),
+    ("dxrecord", ("DXRecord", "new_dxrecord")),
+    ("dxproject", ("DXContainer", "DXProject")),
+    ("dxjob", ("DXJob", "new_dxjob")),
+    ("dxanalysis", ("DXAnalysis", )),
+    ("dxapplet", ("DXExecutable", "DXApplet")),
+    ("dxapp", ("DXApp", )),
+    ("dxworkflow", ("DXWorkflow", "new_dxworkflow")),
+    ("auth", ("user_info", "whoami")),
+    ("dxdataobject_functions", ("dxlink", "is_dxlink", "get_dxlink_ids", "get_handler", "describe", "get_details",
+                                "remove")),
+    ("search", ("find_data_objects", "find_executions", "find_jobs", "find_analyses", "find_projects", "find_apps",
+                "find_one_data_object", "find_one_project", "find_one_app", "resolve_data_objects", "find_orgs",
+                "org_find_members", "org_find_projects", "org_find_apps"))
+]
+
+def _import_submodule(submodule):
+    module = importlib.import_module("." + submodule, __name__)
+    for name in dict(_SUBMODULE_EXPORTS)[submodule]:
+        globals()[name] = getattr(module, name)
+    return module
+
+if sys.version_info >= (3, 7):
+    # Import each module only when one of its names is first used; see
+    # __getattr__ in dxpy
+    _submodule_of = {name: submodule for submodule, names in _SUBMODULE_EXPORTS for name in names}
+    _submodule_of.update((submodule, submodule) for submodule, _names in _SUBMODULE_EXPORTS)
+
+    def __getattr__(name):
+        if name not in _submodule_of:
+            raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+        module = _import_submodule(_submodule_of[name])
+        return module if name == _submodule_of[name] else globals()[name]
+
+    def __dir__():
+        return sorted(set(globals()) | set(_submodule_of))
+
+    # Star imports only look up names (through __getattr__) that are
+    # listed in __all__
+    __all__ = sorted(set(name for name in globals() if not name.startswith("_")) | set(_submodule_of))
+else:
+    for _submodule, _names in _SUBMODULE_EXPORTS:
+        _import_submodule(_submodule)
@@ -30,7 +30,6 @@ from __future__ import print_function, unicode_literals, division, absolute_impo
 
 import dxpy
 from . import DXDataObject
-from . import __dict__ as all_bindings
 from ..exceptions import DXError
 from ..compat import basestring
 
@@ -102,7 +101,7 @@ def _guess_link_target_type(link):
     class_name = 'DX'+class_name.capitalize()
     if class_name == 'DXGtable':
         class_name = 'DXGTable'
-    cls = all_bindings[class_name]
+    cls = getattr(dxpy.bindings, class_name)
     return cls
 
 def get_handler(id_or_link, project=None):
@@ -32,7 +32,7 @@ from multiprocessing import cpu_count
 import dxpy
 from . import DXDataObject
 from ..exceptions import DXFileError, DXIncompleteReadsError
-from ..utils import warn
+from ..utils import warn, metrics, profiling
 from ..utils.resolver import object_exists_in_project
 from ..compat import BytesIO, basestring
 
@@ -149,6 +149,17 @@ class DXFile(DXDataObject):
        String containing the Internet Media Type (also known as MIME type
        or Content-type) of the file.
 
+    .. note:: Memory use of a handler is bounded by its buffer sizes
+              and the number of HTTP threads (``_http_threadpool_size``),
+              not by the size of the file. :meth:`read` fetches chunks
+              of up to *read_buffer_size* bytes, at most one ahead per
+              thread, so reading uses at most about (threads + 2) x
+              *read_buffer_size* bytes, plus twice the length of the
+              data returned by each call. :meth:`write` uploads parts
+              of up to *write_buffer_size* bytes, at most one per
+              thread at a time, so writing uses at most about
+              (threads + 2) x the part size.
+
     .. automethod:: _new
 
     '''
@@ -497,20 +508,25 @@ class DXFile(DXDataObject):
             write_request(data)
             return
 
-        remaining_space = self._write_bufsize - self._write_buf.tell()
-
-        if len(data) <= remaining_space:
-            self._write_buf.write(data)
-        else:
-            self._write_buf.write(data[:remaining_space])
-
-            temp_data = self._write_buf.getvalue()
-            self._write_buf = BytesIO()
-            write_request(temp_data)
+        # Split data into parts in place, rather than splitting off one
+        # part and recursing on a copy of the rest, so that a large
+        # write is copied only once
+        start = 0
+        while len(data) - start > self._write_bufsize - self._write_buf.tell():
+            end = start + self._write_bufsize - self._write_buf.tell()
+            if self._write_buf.tell() == 0:
+                # A whole part; dispatch it without copying it into the
+                # write buffer first
+                write_request(data[start:end])
+            else:
+                self._write_buf.write(data[start:end])
+                temp_data = self._write_buf.getvalue()
+                self._write_buf = BytesIO()
+                write_request(temp_data)
+            start = end
 
-            # TODO: check if repeat string splitting is bad for
-            # performance when len(data) >> _write_bufsize
-            self.write(data[remaining_space:], **kwargs)
+        if start < len(data):
+            self._write_buf.write(data[start:] if start > 0 else data)
 
     def closed(self, **kwargs):
         '''
@@ -568,6 +584,7 @@ class DXFile(DXDataObject):
         '''
         self._wait_on_close(timeout, **kwargs)
 
+    @profiling.timed(category="transfer")
     def upload_part(self, data, index=None, display_progress=False, report_progress_fn=None, **kwargs):
         """
         :param data: Data to be uploaded in this part
@@ -625,6 +642,7 @@ class DXFile(DXDataObject):
         # The file upload API requires us to get a pre-authenticated upload URL (and headers for it) every time we
         # attempt an upload. Because DXHTTPRequest will retry requests under retryable conditions, we give it a callback
         # to ask us for a new upload URL every time it attempts a request (instead of giving them directly).
+        upload_started = time.time()
         dxpy.DXHTTPRequest(get_upload_url_and_headers,
                            data,
                            jsonify_data=False,
@@ -633,6 +651,7 @@ class DXFile(DXDataObject):
                            timeout=FILE_REQUEST_TIMEOUT,
                            auth=None,
                            method='PUT')
+        metrics.record_transfer(self._dxid, "upload", len(data), upload_started)
 
         self._num_uploaded_parts += 1
 
@@ -771,9 +790,12 @@ class DXFile(DXDataObject):
 
     def _next_response_content(self, get_first_chunk_sequentially=False):
         if self._response_iterator is None:
+            # Fetch at most one chunk ahead per thread, so that memory use
+            # doesn't grow with the number of CPUs
             self._response_iterator = dxpy.utils.response_iterator(
                 self._request_iterator,
                 self._http_threadpool,
+                max_active_tasks=self._http_threadpool_size,
                 do_first_task_sequentially=get_first_chunk_sequentially
             )
         try:
@@ -839,9 +861,12 @@ class DXFile(DXDataObject):
             self._pos += length
             return buf.read(length)
         else:
-            orig_buf_pos = buf.tell()
+            # Collect the pieces and join them once at the end, rather
+            # than appending them to the read buffer (which would keep
+            # the bytes already read, and be copied again as it grows)
+            pieces = [buf.read()]
+            self._read_buf = buf = BytesIO()
             orig_file_pos = self._pos
-            buf.seek(0, os.SEEK_END)
             self._pos += buf_remaining_bytes
             while self._pos < orig_file_pos + length:
                 remaining_len = orig_file_pos + length - self._pos
@@ -850,19 +875,19 @@ class DXFile(DXDataObject):
                     self._request_iterator = self._generate_read_requests(
                         start_pos=self._pos, project=project, **kwargs)
 
+                read_started = time.time()
                 content = self._next_response_content(get_first_chunk_sequentially=get_first_chunk_sequentially)
+                metrics.record_transfer(self._dxid, "download", len(content), read_started)
 
                 if len(content) < remaining_len:
-                    buf.write(content)
+                    pieces.append(content)
                     self._pos += len(content)
                 else: # response goes beyond requested length
-                    buf.write(content[:remaining_len])
+                    pieces.append(content[:remaining_len])
                     self._pos += remaining_len
-                    self._read_buf = BytesIO()
-                    self._read_buf.write(content[remaining_len:])
-                    self._read_buf.seek(0)
-            buf.seek(orig_buf_pos)
-            return buf.read()
+                    self._read_buf = BytesIO(content[remaining_len:])
+                del content
+            return b"".join(pieces)
 
         # Debug fallback
         # import urllib2
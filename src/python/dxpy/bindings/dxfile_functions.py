@@ -24,11 +24,11 @@ The following helper functions are useful shortcuts for interacting with File ob
 
 from __future__ import print_function, unicode_literals, division, absolute_import
 
-import os, sys, math, mmap, stat
+import os, sys, json, math, mmap, stat, time, threading
 import hashlib
 import traceback
 import warnings
-from collections import defaultdict
+from collections import defaultdict, OrderedDict
 
 import dxpy
 from .. import logger
@@ -36,7 +36,8 @@ from . import dxfile, DXFile
 from .dxfile import FILE_REQUEST_TIMEOUT
 from ..compat import open
 from ..exceptions import DXFileError, DXPartLengthMismatchError, DXChecksumMismatchError, DXIncompleteReadsError
-from ..utils import response_iterator
+from ..utils import response_iterator, get_futures_threadpool, wait_for_all_futures, metrics, profiling
+from ..utils.resolver import objects_exist_in_project
 
 def open_dxfile(dxid, project=None, read_buffer_size=dxfile.DEFAULT_BUFFER_SIZE):
     '''
@@ -92,8 +93,9 @@ def new_dxfile(mode=None, write_buffer_size=dxfile.DEFAULT_BUFFER_SIZE, expected
     return dx_file
 
 
+@profiling.timed()
 def download_dxfile(dxid, filename, chunksize=dxfile.DEFAULT_BUFFER_SIZE, append=False, show_progress=False,
-                    project=None, **kwargs):
+                    project=None, report_progress_fn=None, **kwargs):
     '''
     :param dxid: DNAnexus file ID or DXFile (file handler) object
     :type dxid: string or DXFile
@@ -105,10 +107,27 @@ def download_dxfile(dxid, filename, chunksize=dxfile.DEFAULT_BUFFER_SIZE, append
             which billing account is billed for this download). If None or
             DXFile.NO_PROJECT_HINT, no project hint is supplied to the API server.
     :type project: str or None
+    :param report_progress_fn: Optional: a function to call with the number of bytes of the file downloaded (or verified, when resuming) so far, each time that changes
+    :type report_progress_fn: function or None
 
 
     Downloads the remote file referenced by *dxid* and saves it to *filename*.
 
+    Chunks of up to *chunksize* bytes are downloaded in parallel, at
+    most one per HTTP thread (``DXFile._http_threadpool_size``) at a
+    time, and written out in order, so the download uses at most about
+    (threads + 1) x *chunksize* bytes of memory, whatever the size of
+    the file.
+
+    If *filename* already exists (and *append* is False), the download
+    is resumed after the parts of the file that have already been
+    downloaded. While a file with several parts is downloaded, the parts
+    written so far are recorded in a journal, ``<filename>.dxjournal``,
+    which is removed once the download is complete. If the local file
+    hasn't changed since, resuming only reads back the last part in the
+    journal to check it; otherwise, all the parts of the local file are
+    read to verify their checksums.
+
     Example::
 
         download_dxfile("file-xxxx", "localfilename.fastq")
@@ -120,12 +139,128 @@ def download_dxfile(dxid, filename, chunksize=dxfile.DEFAULT_BUFFER_SIZE, append
     while not success:
         success = _download_dxfile(dxid, filename, part_retry_counter,
                                    chunksize=chunksize, append=append,
-                                   show_progress=show_progress, project=project, **kwargs)
+                                   show_progress=show_progress, project=project,
+                                   report_progress_fn=report_progress_fn, **kwargs)
+
+
+class _DownloadJournal(object):
+    '''
+    Sidecar file, next to a file being downloaded by
+    :func:`download_dxfile`, that records which parts of the file have
+    been written and verified, so that an interrupted download can be
+    resumed without reading back all the data downloaded so far.
+
+    The first line identifies the remote file. Each following line
+    records either a verified part (its ID and md5, and the offset at
+    which it ends) or, when the download stops, how far it got. The last
+    line also has the size and mtime of the local file at the time. The
+    journal is only trusted if the local file still has them, i.e. if
+    nothing else has written to it since (and the download wasn't
+    killed before it could record where it stopped).
+    '''
+    SUFFIX = ".dxjournal"
+
+    def __init__(self, filename, dxid):
+        self.filename = filename
+        self.path = filename + self.SUFFIX
+        self.dxid = dxid
+        self._fh = None
+
+    def load(self, parts, part_ids):
+        '''
+        :param parts: Parts of the remote file, with their "md5" and "start" offset
+        :type parts: dict
+        :param part_ids: IDs of the parts, in order
+        :type part_ids: list
+        :returns: IDs of the parts at the start of *part_ids* that the journal shows to have been verified, or None if it is missing or stale
+        :rtype: list or None
+        '''
+        try:
+            with open(self.path, "rb") as fh:
+                records = [json.loads(line.decode("utf-8")) for line in fh if line.strip()]
+            local_stat = os.stat(self.filename)
+        except (IOError, OSError, ValueError) as e:
+            logger.debug("Ignoring download journal %s: %s", self.path, e)
+            return None
+        if len(records) < 2 or records[0].get("id") != self.dxid:
+            return None
+        last = records[-1]
+        if last.get("size") != local_stat.st_size or last.get("mtime") != local_stat.st_mtime:
+            logger.debug("Download journal %s is stale", self.path)
+            return None
+        verified = []
+        for record in records[1:]:
+            if "part" not in record:
+                continue
+            if len(verified) == len(part_ids):
+                return None
+            part_info = parts[part_ids[len(verified)]]
+            if record["part"] != part_ids[len(verified)] or record["md5"] != part_info.get("md5") or \
+               record["end"] != part_info["start"] + part_info["size"]:
+                return None
+            verified.append(record["part"])
+        return verified
+
+    def start(self, fh, parts, verified):
+        '''
+        :param fh: Local file, positioned after the verified parts
+        :param parts: Parts of the remote file
+        :type parts: dict
+        :param verified: IDs of the parts that have been verified
+        :type verified: list
+
+        Starts a new journal, recording the parts that have already
+        been verified.
+        '''
+        self._fh = open(self.path, "wb")
+        records = [{"id": self.dxid}]
+        for part_id in verified:
+            part_info = parts[part_id]
+            records.append({"part": part_id, "md5": part_info["md5"], "end": part_info["start"] + part_info["size"]})
+        if verified:
+            fh.flush()
+            os.fsync(fh.fileno())
+            self._write(records, fh)
+        else:
+            self._write(records)
+
+    def _write(self, records, fh=None):
+        # Stamps the last of the records with the size and mtime of the
+        # local file
+        if fh is not None:
+            fh.flush()
+            local_stat = os.fstat(fh.fileno())
+            records[-1]["size"], records[-1]["mtime"] = local_stat.st_size, local_stat.st_mtime
+        self._fh.write(b"".join((json.dumps(record) + "\n").encode("utf-8") for record in records))
+        self._fh.flush()
+
+    def record_part(self, fh, part_id, md5, end):
+        # Make sure the data of the part is on disk before the journal
+        # says so
+        fh.flush()
+        os.fsync(fh.fileno())
+        self._write([{"part": part_id, "md5": md5, "end": end}], fh)
+
+    def close(self, fh=None, remove=False):
+        '''
+        Closes the journal, first recording how far the local file *fh*
+        got (if given), or removing the journal (if *remove* is True).
+        '''
+        if self._fh is not None:
+            if fh is not None:
+                try:
+                    self._write([{"chunk": fh.tell()}], fh)
+                except (IOError, OSError, ValueError) as e:
+                    logger.debug("Could not record the end of %s in its journal: %s", self.filename, e)
+            self._fh.close()
+            self._fh = None
+        if remove and os.path.exists(self.path):
+            os.remove(self.path)
 
 
 def _download_dxfile(dxid, filename, part_retry_counter,
                      chunksize=dxfile.DEFAULT_BUFFER_SIZE, append=False, show_progress=False,
-                     project=None, **kwargs):
+                     project=None, report_progress_fn=None, **kwargs):
     '''
     Core of download logic. Download file-id *dxid* and store it in
     a local file *filename*.
@@ -189,14 +324,17 @@ def _download_dxfile(dxid, filename, part_retry_counter,
         print_progress(0, None)
 
     def get_chunk(part_id_to_get, start, end):
-        url, headers = dxfile.get_download_url(project=project, **kwargs)
-        # If we're fetching the whole object in one shot, avoid setting the Range header to take advantage of gzip
-        # transfer compression
-        sub_range = False
-        if len(parts) > 1 or (start > 0) or (end - start + 1 < parts[part_id_to_get]["size"]):
-            sub_range = True
-        data = dxpy._dxhttp_read_range(url, headers, start, end, FILE_REQUEST_TIMEOUT, sub_range)
-        return part_id_to_get, data
+        with profiling.span("download chunk", category="transfer", part=part_id_to_get, start=start):
+            url, headers = dxfile.get_download_url(project=project, **kwargs)
+            # If we're fetching the whole object in one shot, avoid setting the Range header to take advantage of gzip
+            # transfer compression
+            sub_range = False
+            if len(parts) > 1 or (start > 0) or (end - start + 1 < parts[part_id_to_get]["size"]):
+                sub_range = True
+            chunk_started = time.time()
+            data = dxpy._dxhttp_read_range(url, headers, start, end, FILE_REQUEST_TIMEOUT, sub_range)
+            metrics.record_transfer(dxfile.get_id(), "download", len(data), chunk_started)
+            return part_id_to_get, data
 
     def chunk_requests():
         for part_id_to_chunk in parts_to_get:
@@ -217,15 +355,36 @@ def _download_dxfile(dxid, filename, part_retry_counter,
             msg = msg.format(dxfile.get_id(), _part_id, parts[_part_id]["md5"], hasher.hexdigest())
             raise DXChecksumMismatchError(msg)
 
+    # A file with a single part is always downloaded again from the start
+    journal = None if append or len(parts) < 2 else _DownloadJournal(filename, dxfile.get_id())
+
+    def journal_part(_part_id, hasher):
+        # Records a part that has been verified and written out
+        if journal is not None and _part_id is not None and "md5" in parts[_part_id]:
+            journal.record_part(fh, _part_id, hasher.hexdigest(),
+                                parts[_part_id]["start"] + parts[_part_id]["size"])
+
     with fh:
         last_verified_pos = 0
 
         if fh.mode == "rb+":
             # We already downloaded the beginning of the file, verify that the
-            # chunk checksums match the metadata.
+            # chunk checksums match the metadata. If the journal of the
+            # previous download is up to date, only the last part it
+            # verified is checked again, in case it was not fully written
+            # out; otherwise all the parts are.
             last_verified_part, max_verify_chunk_size = None, 1024*1024
+            journaled_parts = journal.load(parts, parts_to_get) if journal is not None else None
+            first_part_to_verify = 0
+            if journaled_parts:
+                first_part_to_verify = len(journaled_parts) - 1
+                if first_part_to_verify > 0:
+                    last_verified_part = parts_to_get[first_part_to_verify - 1]
+                last_verified_pos = _bytes = parts[parts_to_get[first_part_to_verify]]["start"]
+                fh.seek(last_verified_pos)
+                logger.debug("Download journal of %s shows %d verified parts", filename, len(journaled_parts))
             try:
-                for part_id in parts_to_get:
+                for part_id in parts_to_get[first_part_to_verify:]:
                     part_info = parts[part_id]
                     if "md5" not in part_info:
                         raise DXFileError("File {} does not contain part md5 checksums".format(dxfile.get_id()))
@@ -242,9 +401,11 @@ def _download_dxfile(dxid, filename, part_retry_counter,
                     else:
                         last_verified_part = part_id
                         last_verified_pos = fh.tell()
+                        _bytes += part_info["size"]
                         if show_progress:
-                            _bytes += part_info["size"]
                             print_progress(_bytes, file_size, action="Verified")
+                        if report_progress_fn is not None:
+                            report_progress_fn(_bytes)
             except (IOError, DXFileError) as e:
                 logger.debug(e)
             fh.seek(last_verified_pos)
@@ -255,22 +416,40 @@ def _download_dxfile(dxid, filename, part_retry_counter,
                 print_progress(last_verified_pos, file_size, action="Resuming at")
             logger.debug("Verified %s/%d downloaded parts", last_verified_part, len(parts_to_get))
 
+        if journal is not None:
+            remaining_parts = set(parts_to_get)
+            journal.start(fh, parts, [part_id for part_id in sorted(parts, key=int) if part_id not in remaining_parts])
+
         try:
             # Main loop. In parallel: download chunks, verify them, and write them to disk.
             get_first_chunk_sequentially = (file_size > 128 * 1024 and last_verified_pos == 0 and dxpy.JOB_ID)
             cur_part, got_bytes, hasher = None, None, None
-            for chunk_part, chunk_data in response_iterator(chunk_requests(),
-                                                            dxfile._http_threadpool,
-                                                            do_first_task_sequentially=get_first_chunk_sequentially):
+            num_chunks = sum(int(math.ceil(parts[part_id]["size"] / chunksize)) for part_id in parts_to_get)
+            if num_chunks > 1:
+                chunks = response_iterator(chunk_requests(),
+                                           dxfile._http_threadpool,
+                                           max_active_tasks=dxfile._http_threadpool_size,
+                                           do_first_task_sequentially=get_first_chunk_sequentially)
+            else:
+                # Download a single chunk on this thread, so that
+                # download_dxfiles can download many small files at once
+                # without waiting for the HTTP threads
+                chunks = (get_chunk(*args) for _callable, args, _kwargs in chunk_requests())
+            for chunk_part, chunk_data in chunks:
                 if chunk_part != cur_part:
                     verify_part(cur_part, got_bytes, hasher)
+                    journal_part(cur_part, hasher)
                     cur_part, got_bytes, hasher = chunk_part, 0, hashlib.md5()
                 got_bytes += len(chunk_data)
-                hasher.update(chunk_data)
-                fh.write(chunk_data)
+                with profiling.span("checksum", category="io"):
+                    hasher.update(chunk_data)
+                with profiling.span("write local file", category="io"):
+                    fh.write(chunk_data)
+                _bytes += len(chunk_data)
                 if show_progress:
-                    _bytes += len(chunk_data)
                     print_progress(_bytes, file_size)
+                if report_progress_fn is not None:
+                    report_progress_fn(_bytes)
             verify_part(cur_part, got_bytes, hasher)
             if show_progress:
                 print_progress(_bytes, file_size, action="Completed")
@@ -282,12 +461,201 @@ def _download_dxfile(dxid, filename, part_retry_counter,
                       file=sys.stderr)
                 return False
             raise
+        finally:
+            if journal is not None:
+                journal.close(fh)
+
+        # The journal is only needed to resume the download
+        if journal is not None:
+            journal.close(remove=True)
 
         if show_progress:
             sys.stderr.write("\n")
 
         return True
 
+class _DownloadBudget(object):
+    '''
+    Limits the number of files that :func:`download_dxfiles` downloads
+    at once, and the memory that their downloads may use together.
+    '''
+    def __init__(self, max_files, max_bytes):
+        self.max_files = max_files
+        self.max_bytes = max_bytes
+        self._files = 0
+        self._bytes = 0
+        self._cond = threading.Condition()
+
+    def acquire(self, num_bytes):
+        with self._cond:
+            # A download that needs more than the whole budget may still
+            # run on its own
+            while self._files > 0 and (self._files >= self.max_files or self._bytes + num_bytes > self.max_bytes):
+                # Wait with a timeout, so that Ctrl-C is handled
+                self._cond.wait(1)
+            self._files += 1
+            self._bytes += num_bytes
+
+    def release(self, num_bytes):
+        with self._cond:
+            self._files -= 1
+            self._bytes -= num_bytes
+            self._cond.notify_all()
+
+
+class _DownloadProgress(object):
+    '''
+    Prints the progress of all the downloads of :func:`download_dxfiles`
+    on one line.
+    '''
+    num_ticks = 60
+
+    def __init__(self, num_files, num_bytes):
+        self.num_files = num_files
+        self.num_bytes = num_bytes
+        self.files_done = 0
+        self._bytes_by_file = {}
+        self._bytes_done = 0
+        self._last_shown = 0
+        self._lock = threading.Lock()
+
+    def update(self, filename, num_bytes):
+        with self._lock:
+            self._bytes_done += num_bytes - self._bytes_by_file.get(filename, 0)
+            self._bytes_by_file[filename] = num_bytes
+            # Many small files can finish in quick succession
+            if time.time() - self._last_shown >= 0.1:
+                self._show()
+
+    def finish_file(self):
+        with self._lock:
+            self.files_done += 1
+            self._show()
+
+    def _show(self, action="Downloaded"):
+        self._last_shown = time.time()
+        fraction = min(self._bytes_done / self.num_bytes, 1) if self.num_bytes else self.files_done / self.num_files
+        ticks = int(round(fraction * self.num_ticks))
+        fmt = "[{done}{pending}] {action} {done_bytes:,} of {total:,} bytes ({percent}%) in {files} of {num_files} files"
+        sys.stderr.write("\33[2K")
+        sys.stderr.write(fmt.format(done=("=" * (ticks - 1) + ">") if ticks > 0 else "",
+                                    pending=" " * (self.num_ticks - ticks),
+                                    action=action,
+                                    done_bytes=self._bytes_done,
+                                    total=self.num_bytes,
+                                    percent=int(math.floor(fraction * 100)),
+                                    files=self.files_done,
+                                    num_files=self.num_files))
+        sys.stderr.write("\r")
+        sys.stderr.flush()
+
+    def close(self):
+        with self._lock:
+            self._show(action="Completed" if self.files_done == self.num_files else "Downloaded")
+            sys.stderr.write("\n")
+
+
+def download_dxfiles(files, chunksize=dxfile.DEFAULT_BUFFER_SIZE, show_progress=False, project=None,
+                     max_num_parallel_downloads=16, max_bytes_in_flight=None, **kwargs):
+    '''
+    :param files: Files to download, as (file ID, local filename, size in bytes) tuples; the size may be None if it isn't known
+    :type files: list of tuples
+    :param show_progress: If True, prints the progress of all the downloads together to stderr
+    :type show_progress: boolean
+    :param project: project to use as context for the downloads (see :func:`download_dxfile`)
+    :type project: str or None
+    :param max_num_parallel_downloads: Maximum number of files to download at once
+    :type max_num_parallel_downloads: int
+    :param max_bytes_in_flight: Maximum amount of memory (in bytes) that the downloads in progress may use together (default: enough for two large files; see :func:`download_dxfile`)
+    :type max_bytes_in_flight: int
+
+    Downloads several files at once, each with :func:`download_dxfile`.
+
+    Downloading a small file takes a few round trips to the API server
+    and storage, and little bandwidth, so up to
+    *max_num_parallel_downloads* files that fit in one chunk are
+    downloaded at the same time. A larger file is downloaded in chunks,
+    by the HTTP threads (``DXFile._http_threadpool_size`` of them) that
+    all such files share, and takes up a share of the memory budget
+    *max_bytes_in_flight* of up to (threads + 1) x *chunksize* bytes,
+    so that only a few of them are downloaded at the same time. The
+    largest files are started first.
+
+    The local filenames must be distinct. If a download fails, no more
+    are started, and the error is raised once those in progress have
+    finished.
+
+    Example::
+
+        download_dxfiles([("file-xxxx", "reads_1.fastq", 1024), ("file-yyyy", "reads_2.fastq", 2048)])
+
+    '''
+    if len(set(f[1] for f in files)) < len(files):
+        raise DXFileError("Cannot download several files to the same local filename")
+    if len(files) == 0:
+        return
+
+    max_file_bytes = (DXFile._http_threadpool_size + 1) * chunksize
+    if max_bytes_in_flight is None:
+        max_bytes_in_flight = 2 * max_file_bytes
+
+    def get_budget(size):
+        return max_file_bytes if size is None else min(size, max_file_bytes)
+
+    # Without a project, each download checks whether its file is in the
+    # workspace before using it as a hint (see DXFile.get_download_url);
+    # check all the files at once instead
+    if project is None and dxpy.WORKSPACE_ID and 'DX_JOB_ID' not in os.environ:
+        objects_exist_in_project([f[0] for f in files], dxpy.WORKSPACE_ID)
+
+    # Files of unknown size count as the largest
+    files = sorted(files, key=lambda f: -float("inf") if f[2] is None else -f[2])
+    budget = _DownloadBudget(max_num_parallel_downloads, max_bytes_in_flight)
+    progress = None
+    if show_progress:
+        progress = _DownloadProgress(len(files), sum(f[2] or 0 for f in files))
+    failed = threading.Event()
+
+    def download_one_file(dxid, filename):
+        report_progress_fn = None
+        if progress is not None:
+            report_progress_fn = lambda num_bytes: progress.update(filename, num_bytes)
+        download_dxfile(dxid, filename, chunksize=chunksize, project=project,
+                        report_progress_fn=report_progress_fn, **kwargs)
+        if progress is not None:
+            progress.finish_file()
+
+    def on_done(future, num_bytes):
+        if future.exception() is not None:
+            failed.set()
+        budget.release(num_bytes)
+
+    executor = get_futures_threadpool(max_workers=max_num_parallel_downloads)
+    futures = []
+    try:
+        for dxid, filename, size in files:
+            budget.acquire(get_budget(size))
+            if failed.is_set():
+                budget.release(get_budget(size))
+                break
+            logger.debug("Downloading '%s' to '%s'", dxid, filename)
+            future = executor.submit(download_one_file, dxid, filename)
+            future.add_done_callback(lambda future, num_bytes=get_budget(size): on_done(future, num_bytes))
+            futures.append(future)
+    except KeyboardInterrupt:
+        # See dxpy.utils.wait_for_all_futures
+        print('')
+        os._exit(os.EX_IOERR)
+    wait_for_all_futures(futures)
+    executor.shutdown()
+    if progress is not None:
+        progress.close()
+    for future in futures:
+        # Raises the error of the first download that failed, if any
+        future.result()
+
+
+@profiling.timed()
 def upload_local_file(filename=None, file=None, media_type=None, keep_open=False,
                       wait_on_close=False, use_existing_dxfile=None, show_progress=False,
                       write_buffer_size=None, **kwargs):
@@ -320,6 +688,11 @@ def upload_local_file(filename=None, file=None, media_type=None, keep_open=False
     is set to the basename of *filename* or to *file.name* (if it
     exists).
 
+    The file is uploaded in parts of about *write_buffer_size* bytes,
+    at most one per HTTP thread (``DXFile._http_threadpool_size``) at a
+    time, so the upload uses at most about (threads + 2) x the part
+    size of memory, whatever the size of the file.
+
     Examples::
 
       # Upload from a path
@@ -419,7 +792,8 @@ def upload_local_file(filename=None, file=None, media_type=None, keep_open=False
         report_progress(handler, 0)
 
     while True:
-        buf = read(handler._write_bufsize)
+        with profiling.span("read local file", category="io"):
+            buf = read(handler._write_bufsize)
         offset += len(buf)
 
         if len(buf) == 0:
@@ -502,8 +876,7 @@ def list_subfolders(project, path, recurse=True):
     else:
         return (f for f in project_folders if f.startswith(path) and '/' not in f[len(path)+1:])
 
-def download_folder(project, destdir, folder="/", overwrite=False, chunksize=dxfile.DEFAULT_BUFFER_SIZE,
-                    show_progress=False, **kwargs):
+def prepare_folder_download(project, destdir, folder="/", overwrite=False):
     '''
     :param project: Project ID to use as context for this download.
     :type project: string
@@ -513,19 +886,26 @@ def download_folder(project, destdir, folder="/", overwrite=False, chunksize=dxf
     :type folder: string
     :param overwrite: Overwrite existing files
     :type overwrite: boolean
-
-    Downloads the contents of the remote *folder* of the *project* into the local directory specified by *destdir*.
-
-    Example::
-
-        download_folder("project-xxxx", "/home/jsmith/input", folder="/input")
-
+    :returns: (file ID, local filename, size) of each file to download
+    :rtype: list of tuples
+    :raises: :exc:`~dxpy.exceptions.DXFileError` if a local file is in the way and *overwrite* is False
+
+    Creates the local directories that the contents of the remote
+    *folder* of the *project* will be downloaded to (see
+    :func:`download_folder`), and returns the files to download, for
+    :func:`download_dxfiles`.
     '''
-
-    def ensure_local_dir(d):
-        if not os.path.isdir(d):
-            if os.path.exists(d):
-                raise DXFileError("Destination location '{}' already exists and is not a directory".format(d))
+    def ensure_local_dirs(dirs):
+        # Check all of them before creating any, and only create those
+        # that aren't the parent of another (os.makedirs creates the
+        # parents)
+        to_create = set()
+        for d in dirs:
+            if not os.path.isdir(d):
+                if os.path.exists(d):
+                    raise DXFileError("Destination location '{}' already exists and is not a directory".format(d))
+                to_create.add(d)
+        for d in sorted(to_create - set(os.path.dirname(d) for d in to_create)):
             logger.debug("Creating destination directory: '%s'", d)
             os.makedirs(d)
 
@@ -547,19 +927,19 @@ def download_folder(project, destdir, folder="/", overwrite=False, chunksize=dxf
     remote_folders = list(list_subfolders(project, normalized_folder, recurse=True))
     if len(remote_folders) <= 0:
         raise DXFileError("Remote folder '{}' not found".format(normalized_folder))
-    remote_folders.sort()
-    for remote_subfolder in remote_folders:
-        ensure_local_dir(compose_local_dir(normalized_dest_dir, normalized_folder, remote_subfolder))
+    ensure_local_dirs(compose_local_dir(normalized_dest_dir, normalized_folder, remote_subfolder)
+                      for remote_subfolder in remote_folders)
 
-    # Downloading files
-    describe_input = dict(fields=dict(folder=True, name=True, id=True))
+    # Listing files
+    files = OrderedDict()
+    describe_input = dict(fields=dict(folder=True, name=True, id=True, size=True))
     for remote_file in dxpy.search.find_data_objects(classname='file', state='closed', project=project,
                                                      folder=normalized_folder, recurse=True, describe=describe_input):
         local_filename = os.path.join(compose_local_dir(normalized_dest_dir,
                                                         normalized_folder,
                                                         remote_file['describe']['folder']),
                                       remote_file['describe']['name'])
-        if os.path.exists(local_filename) and not overwrite:
+        if (os.path.exists(local_filename) or local_filename in files) and not overwrite:
             raise DXFileError(
                 "Destination file '{}' already exists but no overwrite option is provided".format(local_filename)
             )
@@ -567,5 +947,33 @@ def download_folder(project, destdir, folder="/", overwrite=False, chunksize=dxf
                      ("" if remote_file['describe']['folder'] == "/" else remote_file['describe']['folder']),
                      remote_file['describe']['name'],
                      local_filename)
-        download_dxfile(remote_file['describe']['id'], local_filename, chunksize=chunksize, project=project,
-                        show_progress=show_progress, **kwargs)
+        # Of several files with the same name, the last one wins
+        files.pop(local_filename, None)
+        files[local_filename] = (remote_file['describe']['id'], local_filename, remote_file['describe'].get('size'))
+    return list(files.values())
+
+
+def download_folder(project, destdir, folder="/", overwrite=False, chunksize=dxfile.DEFAULT_BUFFER_SIZE,
+                    show_progress=False, **kwargs):
+    '''
+    :param project: Project ID to use as context for this download.
+    :type project: string
+    :param destdir: Local destination location
+    :type destdir: string
+    :param folder: Path to the remote folder to download
+    :type folder: string
+    :param overwrite: Overwrite existing files
+    :type overwrite: boolean
+
+    Downloads the contents of the remote *folder* of the *project* into the local directory specified by *destdir*.
+
+    The local directories are all created first, and the files are then
+    downloaded several at a time (see :func:`download_dxfiles`).
+
+    Example::
+
+        download_folder("project-xxxx", "/home/jsmith/input", folder="/input")
+
+    '''
+    files = prepare_folder_download(project, destdir, folder=folder, overwrite=overwrite)
+    download_dxfiles(files, chunksize=chunksize, show_progress=show_progress, project=project, **kwargs)
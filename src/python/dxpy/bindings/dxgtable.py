@@ -21,23 +21,180 @@ DXGTable Handler
 
 from __future__ import print_function, unicode_literals, division, absolute_import
 
+import threading, collections
+from collections import OrderedDict
+
 import dxpy
 from . import DXDataObject
 from ..compat import basestring
-from ..utils import warn
+from ..exceptions import DXGTableError
+from ..utils import warn, gtable_cache
 
 DXGTABLE_HTTP_THREADS = 1
 
+# Number of parts of rows that a DXGTable sends to the API server at
+# once when writing. Rows are buffered until there is a whole part to
+# send, and adding rows blocks while this many parts are being sent, so
+# that a writer holds at most one more part than this in memory.
+DXGTABLE_WRITE_THREADS = 4
+
 # Number of rows to request at a time when reading.
 #
 # TODO: adaptive buffer size. Start with small requests to improve interactivity and make
 # progressively larger requests?
 DEFAULT_TABLE_READ_ROW_BUFFER_SIZE = 40000
 
+# Number of rows to send in each request when writing (unless a
+# request_size is given to DXGTable).
+DEFAULT_TABLE_WRITE_ROW_BUFFER_SIZE = 40000
+
 # Use this value for creating 'null' values in gtables.  Will be interpreted as null downstream.
 # Available in apps as dxpy.NULL
 NULL = - (1 << 31)
 
+# NumPy dtype of the values of each type of column (see
+# DXGTable.iterate_batches)
+NUMPY_DTYPES = {
+    "boolean": "bool",
+    "uint8": "uint8",
+    "int16": "int16",
+    "uint16": "uint16",
+    "int32": "int32",
+    "uint32": "uint32",
+    "int64": "int64",
+    "float": "float32",
+    "double": "float64",
+    "string": "object"
+}
+
+# NumPy dtype kinds of the arrays whose values are all valid in each
+# type of column, without checking them one at a time (see
+# DXGTable.add_batch)
+_NUMPY_VALID_KINDS = {
+    "boolean": "b",
+    "float": "fiu",
+    "double": "fiu",
+    "string": "U"
+}
+
+
+def _check_value_is_valid(index, value, column_type):
+    if column_type == 'string':
+        if not isinstance(value, basestring):
+            raise ValueError("Expected value in column %d to be a string, got %r instead" % (index, value))
+    elif column_type == 'boolean':
+        if value != True and value != False:
+            raise ValueError("Expected value in column %d to be a boolean, got %r instead" % (index, value))
+    elif column_type == 'float' or column_type == 'double':
+        if type(value) is not int and type(value) is not float:
+            raise ValueError("Expected value in column %d to be a number (int or float), got %r instead" % (index, value))
+    elif column_type.startswith('int') or column_type.startswith('uint'):
+        if type(value) is not int:
+            raise ValueError("Expected value in column %d to be an int, got %r instead" % (index, value))
+
+
+def _type_is_valid(value_type, column_type):
+    # Whether all values of this Python type are valid in the column
+    if column_type == 'string':
+        return issubclass(value_type, basestring)
+    elif column_type == 'boolean':
+        return value_type is bool
+    elif column_type == 'float' or column_type == 'double':
+        return value_type is int or value_type is float
+    elif column_type.startswith('int') or column_type.startswith('uint'):
+        return value_type is int
+    return True
+
+
+def _check_column_is_valid(index, values, column_type):
+    '''
+    Checks all the values of a column at once: only the types of the
+    values are compared with the type of the column, and the values are
+    checked one at a time only if some are of other types.
+    '''
+    if hasattr(values, 'dtype'):
+        # NumPy array
+        kind = values.dtype.kind
+        if kind in _NUMPY_VALID_KINDS.get(column_type, "iu"):
+            return
+        values = values.tolist()
+    if all(_type_is_valid(value_type, column_type) for value_type in set(map(type, values))):
+        return
+    for value in values:
+        _check_value_is_valid(index, value, column_type)
+
+
+def _slice_rows(columnar, data, start, end):
+    if columnar:
+        return [column[start:end] for column in data]
+    return data[start:end]
+
+
+class _QueryPages(object):
+    '''
+    Iterates over the pages of rows that match a query, requesting them
+    in the background (on *executor*), up to *max_pages* ahead of the
+    page being consumed.
+    '''
+    def __init__(self, executor, get_page, limit, max_pages=2):
+        self._executor = executor
+        self._get_page = get_page
+        self._limit = limit
+        self._max_pages = max_pages
+        self._pages = collections.deque()
+        self._next_request = None
+        self._done = False
+        self._error = None
+        self._cond = threading.Condition()
+        self._request(0, 0)
+
+    def _request(self, cursor, returned):
+        try:
+            self._executor.submit(self._fetch, cursor, returned)
+        except RuntimeError:
+            # The executor was shut down, because the rows are no longer
+            # wanted
+            self._done = True
+
+    def _fetch(self, cursor, returned):
+        try:
+            resp = self._get_page(cursor, returned)
+        except BaseException as e:
+            with self._cond:
+                self._error, self._done = e, True
+                self._cond.notify_all()
+            return
+        with self._cond:
+            data = resp['data']
+            returned += len(data)
+            if len(data) > 0:
+                self._pages.append(data)
+            if len(data) < 1 or resp['next'] is None or (self._limit is not None and returned >= self._limit):
+                self._done = True
+            elif len(self._pages) < self._max_pages:
+                self._request(resp['next'], returned)
+            else:
+                self._next_request = (resp['next'], returned)
+            self._cond.notify_all()
+
+    def __iter__(self):
+        while True:
+            with self._cond:
+                while not self._pages and not self._done:
+                    # Wait with a timeout, so that KeyboardInterrupt is
+                    # raised on Python 2
+                    self._cond.wait(1)
+                if self._pages:
+                    page = self._pages.popleft()
+                    if self._next_request is not None:
+                        self._request(*self._next_request)
+                        self._next_request = None
+                elif self._error is not None:
+                    raise self._error
+                else:
+                    return
+            yield page
+
 
 class DXGTable(DXDataObject):
     '''
@@ -88,6 +245,13 @@ class DXGTable(DXDataObject):
         if cls._http_threadpool is None:
             cls._http_threadpool = dxpy.utils.get_futures_threadpool(max_workers=cls._http_threadpool_size)
 
+    _write_threadpool = None
+
+    @classmethod
+    def _ensure_write_threadpool(cls):
+        if cls._write_threadpool is None:
+            cls._write_threadpool = dxpy.utils.get_futures_threadpool(max_workers=DXGTABLE_WRITE_THREADS)
+
     def __init__(self, dxid=None, project=None, mode=None, request_size=None):
         DXDataObject.__init__(self, dxid=dxid, project=project)
         if mode is None:
@@ -97,17 +261,27 @@ class DXGTable(DXDataObject):
                 raise ValueError("mode must be one of 'r', 'w', or 'a'")
             self._close_on_exit = (mode == 'w')
 
-        self._write_request_size = request_size
+        self._write_request_size = request_size or DEFAULT_TABLE_WRITE_ROW_BUFFER_SIZE
+        # Rows added but not sent yet: a list of (columnar, data)
+        # pairs, where data is a list of rows, or a list of columns if
+        # columnar is True
         self._row_buf = []
+        self._row_buf_len = 0
         self._read_row_buffer_size = DEFAULT_TABLE_READ_ROW_BUFFER_SIZE
         self._http_threadpool_futures = set()
         self._columns, self._col_names = None, None
+        # The ID of the next part to write, if this handler created the
+        # table (otherwise unused part IDs are requested with nextPart)
+        self._cur_part = None
+        self._written = False
 
     def __enter__(self):
         return self
 
     def __exit__(self, type, value, traceback):
-        pass
+        self.flush()
+        if self._close_on_exit and self._written and self._get_state() == "open":
+            self.close()
 
     def _check_row_is_valid(self, row):
         # TODO: if the user is using initFrom, we don't know what the schema looks like
@@ -118,18 +292,18 @@ class DXGTable(DXDataObject):
         if len(row) != len(self._columns):
             raise ValueError("Row has wrong number of columns (expected %d, got %d)" % (len(self._columns), len(row)))
         for index, (value, column) in enumerate(zip(row, self._columns)):
-            if column['type'] == 'string':
-                if not isinstance(value, basestring):
-                    raise ValueError("Expected value in column %d to be a string, got %r instead" % (index, value))
-            elif column['type'] == 'boolean':
-                if value != True and value != False:
-                    raise ValueError("Expected value in column %d to be a boolean, got %r instead" % (index, value))
-            elif column['type'] == 'float' or column['type'] == 'double':
-                if type(value) is not int and type(value) is not float:
-                    raise ValueError("Expected value in column %d to be a number (int or float), got %r instead" % (index, value))
-            elif column['type'].startswith('int') or column['type'].startswith('uint'):
-                if type(value) is not int:
-                    raise ValueError("Expected value in column %d to be an int, got %r instead" % (index, value))
+            _check_value_is_valid(index, value, column['type'])
+
+    def _check_rows_are_valid(self, rows):
+        # Like _check_row_is_valid, for all the rows at once, a column
+        # at a time
+        if self._columns is None or len(rows) == 0:
+            return
+        for num_values in set(map(len, rows)):
+            if num_values != len(self._columns):
+                raise ValueError("Row has wrong number of columns (expected %d, got %d)" % (len(self._columns), num_values))
+        for index, (values, column) in enumerate(zip(zip(*rows), self._columns)):
+            _check_column_is_valid(index, values, column['type'])
 
     def set_ids(self, dxid, project=None):
         '''
@@ -147,6 +321,242 @@ class DXGTable(DXDataObject):
 
         DXDataObject.set_ids(self, dxid, project)
 
+    def _new(self, dx_hash, **kwargs):
+        """
+        :param dx_hash: Standard hash populated in :func:`dxpy.bindings.DXDataObject.new()` containing attributes common to all data object classes.
+        :type dx_hash: dict
+        :param columns: List of column descriptors (required if *init_from* is not provided)
+        :type columns: list of column descriptors
+        :param indices: List of index descriptors
+        :type indices: list of index descriptors
+        :param init_from: GTable from which to initialize the metadata including column and index specs
+        :type init_from: :class:`~dxpy.bindings.dxgtable.DXGTable`
+
+        Creates a new remote GTable with the given columns. If indices are
+        given, the GTable will be indexed by the requested indices at the
+        time that the table is closed.
+
+        """
+
+        columns = kwargs.pop("columns", None)
+        indices = kwargs.pop("indices", None)
+        init_from = kwargs.pop("init_from", None)
+        if columns is not None:
+            dx_hash["columns"] = columns
+        if indices is not None:
+            dx_hash["indices"] = indices
+        if init_from is not None:
+            if not isinstance(init_from, DXGTable):
+                raise DXGTableError("Expected instance of DXGTable to init_from")
+            dx_hash["initializeFrom"] = {"id": init_from.get_id(), "project": init_from.get_proj_id()}
+
+        resp = dxpy.api.gtable_new(dx_hash, **kwargs)
+        self.set_ids(resp["id"], dx_hash["project"])
+        self._columns = columns
+        self._cur_part = 1
+        self._written = True
+
+    def add_row(self, row, validate=True, **kwargs):
+        '''
+        :param row: Row to add, a list of values in the order of the columns, or a dict mapping column names to values
+        :type row: list or dict
+        :param validate: If True, checks the values against the columns of the GTable
+        :type validate: boolean
+
+        Adds a row to the GTable. The row is buffered, and sent later
+        (see :meth:`add_rows`).
+        '''
+        self.add_rows([row], validate=validate, **kwargs)
+
+    def add_rows(self, data, part=None, validate=True, **kwargs):
+        '''
+        :param data: Rows to add, each a list of values in the order of the columns, or a dict mapping column names to values
+        :type data: list of lists or dicts
+        :param part: If given, the rows are sent right away as the part with this ID (see :meth:`get_unused_part_id`), instead of being buffered
+        :type part: integer
+        :param validate: If True, checks the values against the columns of the GTable
+        :type validate: boolean
+        :raises: :exc:`ValueError` if *validate* is True and a row has the wrong number of values, or a value of the wrong type
+
+        Adds rows to the GTable. The rows are buffered, and sent in
+        parts of *request_size* rows (as given to the constructor, by
+        default 40000) in background threads, up to
+        :data:`DXGTABLE_WRITE_THREADS` parts at a time; when that many
+        parts are being sent, this method blocks until one of them has
+        been. Call :meth:`flush` or :meth:`close` (or use the handler as
+        a context manager) to send the rows that are still buffered.
+
+        The rows are checked a column at a time, rather than a value at
+        a time, so that adding many rows at once is faster than adding
+        them one by one. To add columns of values (for example NumPy
+        arrays), use :meth:`add_batch`.
+
+        Example::
+
+            with new_dxgtable(columns=[DXGTable.make_column_desc("name", "string"),
+                                       DXGTable.make_column_desc("count", "int32")], mode='w') as dxgtable:
+                dxgtable.add_rows([["foo", 23], {"name": "bar", "count": 7}])
+
+        '''
+        if not isinstance(data, list):
+            data = list(data)
+        if any(isinstance(row, dict) for row in data):
+            col_names = self.get_col_names(**kwargs)
+            data = [[row[name] for name in col_names] if isinstance(row, dict) else row for row in data]
+        if validate:
+            self._check_rows_are_valid(data)
+        self._written = True
+
+        if part is not None:
+            dxpy.api.gtable_add_rows(self._dxid, {"data": data, "part": part}, **kwargs)
+        else:
+            self._add_to_row_buf(False, data, len(data), **kwargs)
+
+    def add_batch(self, batch, validate=True, **kwargs):
+        '''
+        :param batch: Mapping of the name of each column of the GTable to its values (a list, tuple or NumPy array), all of the same length
+        :type batch: dict
+        :param validate: If True, checks the values against the columns of the GTable
+        :type validate: boolean
+        :raises: :exc:`ValueError` if a column is missing, the columns have different lengths, or *validate* is True and a value has the wrong type
+
+        Adds the rows of a batch of columns to the GTable, buffered and
+        sent like those given to :meth:`add_rows`. The rows are only
+        assembled, from the values of the columns, in the threads that
+        send them.
+
+        The values of a NumPy array are checked by its dtype: integer
+        arrays are valid in integer and floating-point columns, float
+        arrays in floating-point columns, bool arrays in boolean columns
+        and unicode arrays in string columns; otherwise, the values are
+        checked one at a time. Other keys in *batch* (such as
+        ``__id__``, in the batches yielded by :meth:`iterate_batches`)
+        are ignored.
+
+        Example::
+
+            for batch in source.iterate_batches(columns=["chr", "lo", "hi"], as_numpy=True):
+                keep = (batch["hi"] - batch["lo"]) > 1000
+                dxgtable.add_batch({name: values[keep] for name, values in batch.items()})
+
+        '''
+        columns = self.get_columns(**kwargs)
+        data = []
+        for column in columns:
+            if column["name"] not in batch:
+                raise ValueError("Batch has no values for column %r" % (column["name"],))
+            data.append(batch[column["name"]])
+        num_rows = len(data[0]) if data else 0
+        for column, values in zip(columns, data):
+            if len(values) != num_rows:
+                raise ValueError("Column %r has %d values, but column %r has %d" % (column["name"], len(values), columns[0]["name"], num_rows))
+        if validate:
+            for index, (values, column) in enumerate(zip(data, columns)):
+                _check_column_is_valid(index, values, column['type'])
+        self._written = True
+
+        if num_rows > 0:
+            self._add_to_row_buf(True, data, num_rows, **kwargs)
+
+    def _add_to_row_buf(self, columnar, data, num_rows, **kwargs):
+        # Sends each whole part that the rows complete, and keeps the
+        # rest in the buffer. Splits the rows with one slice per part,
+        # so that adding many rows at once doesn't copy them repeatedly.
+        start = 0
+        while num_rows - start >= self._write_request_size - self._row_buf_len:
+            end = start + self._write_request_size - self._row_buf_len
+            part_data = data if start == 0 and end == num_rows else _slice_rows(columnar, data, start, end)
+            segments = self._row_buf + [(columnar, part_data)]
+            self._row_buf, self._row_buf_len = [], 0
+            self._async_add_rows_request(segments, **kwargs)
+            start = end
+
+        if start < num_rows:
+            self._row_buf.append((columnar, _slice_rows(columnar, data, start, num_rows) if start > 0 else data))
+            self._row_buf_len += num_rows - start
+
+    def _async_add_rows_request(self, segments, **kwargs):
+        DXGTable._ensure_write_threadpool()
+        while len(self._http_threadpool_futures) >= DXGTABLE_WRITE_THREADS:
+            future = dxpy.utils.wait_for_a_future(self._http_threadpool_futures)
+            if future.exception() != None:
+                raise future.exception()
+            self._http_threadpool_futures.remove(future)
+
+        part = self._cur_part
+        if part is not None:
+            self._cur_part += 1
+        future = self._write_threadpool.submit(self._add_rows_part, segments, part, **kwargs)
+        self._http_threadpool_futures.add(future)
+
+    def _add_rows_part(self, segments, part, **kwargs):
+        # Runs in a background thread: assembles the rows of the part,
+        # and sends them (serializing them to JSON along the way)
+        rows = []
+        for columnar, data in segments:
+            if columnar:
+                rows.extend(zip(*[values.tolist() if hasattr(values, 'tolist') else values for values in data]))
+            else:
+                rows.extend(data)
+        if part is None:
+            part = self.get_unused_part_id(**kwargs)
+        dxpy.api.gtable_add_rows(self._dxid, {"data": rows, "part": part}, **kwargs)
+
+    def get_unused_part_id(self, **kwargs):
+        '''
+        :returns: A part ID that hasn't been used yet
+        :rtype: integer
+
+        Requests a part ID that hasn't been used yet in the GTable, for
+        use with :meth:`add_rows`.
+        '''
+        return dxpy.api.gtable_next_part(self._dxid, **kwargs)['part']
+
+    def flush(self, **kwargs):
+        '''
+        Sends the rows that are still buffered, and waits until all the
+        rows added so far have been sent.
+        '''
+        if self._row_buf_len > 0:
+            segments = self._row_buf
+            self._row_buf, self._row_buf_len = [], 0
+            self._async_add_rows_request(segments, **kwargs)
+
+        if len(self._http_threadpool_futures) > 0:
+            dxpy.utils.wait_for_all_futures(self._http_threadpool_futures)
+            try:
+                for future in self._http_threadpool_futures:
+                    if future.exception() != None:
+                        raise future.exception()
+            finally:
+                self._http_threadpool_futures = set()
+
+    def close(self, block=False, **kwargs):
+        '''
+        :param block: If True, this function blocks until the remote GTable has closed.
+        :type block: boolean
+
+        Sends the rows that are still buffered, and closes the GTable.
+        The GTable is indexed (by the indices given when it was
+        created) as it closes.
+        '''
+        self.flush(**kwargs)
+
+        dxpy.api.gtable_close(self._dxid, **kwargs)
+
+        if block:
+            self._wait_on_close(**kwargs)
+
+    def wait_on_close(self, timeout=3600*24*7, **kwargs):
+        '''
+        :param timeout: Maximum amount of time to wait (in seconds) until the GTable is closed.
+        :type timeout: integer
+        :raises: :exc:`dxpy.exceptions.DXError` if the timeout is reached before the remote GTable has been closed
+
+        Waits until the remote GTable is closed.
+        '''
+        self._wait_on_close(timeout, **kwargs)
+
     def get_rows(self, query=None, columns=None, starting=None, limit=None, **kwargs):
         '''
         :param query: Query with which to filter the rows. See :meth:`genomic_range_query()` and :meth:`lexicographic_query()`.
@@ -234,26 +644,244 @@ class DXGTable(DXDataObject):
         Returns a generator that yields rows with IDs in the interval
         [*start*, *end*).
 
+        If the local GTable cache is on (see
+        :mod:`dxpy.utils.gtable_cache`), the columns read by a scan of
+        the whole table are stored in it if the table is closed, and
+        later scans of those columns read them from there.
+
         """
+        cached = self._get_cached(columns)
         if want_dict:
             if columns is None:
-                col_names = ['__id__'] + self.get_col_names(**kwargs)
+                col_names = ['__id__'] + (cached.get_col_names() if cached is not None else self.get_col_names(**kwargs))
             else:
                 col_names = columns
 
-        DXGTable._ensure_http_threadpool()
-
-        request_iterator = self._generate_read_requests(start_row=start, end_row=end, columns=columns, **kwargs)
-
-        for response in dxpy.utils.response_iterator(request_iterator, self._http_threadpool, max_active_tasks=self._http_threadpool_size):
+        for page in self._iterate_pages(start, end, columns, cached, **kwargs):
             if want_dict:
-                for row in response['data']:
+                for row in page:
                     yield dict(zip(col_names, row))
             else:
-                for row in response['data']:
+                for row in page:
                     yield row
 
-    def iterate_query_rows(self, query=None, columns=None, limit=None, want_dict=False, **kwargs):
+    def _get_cached(self, columns):
+        # The table in the local cache, if all of *columns* (or all the
+        # columns, if None) are there
+        cached = gtable_cache.open_cached(self._dxid)
+        if cached is None or not cached.has_columns(columns or cached.get_col_names()):
+            return None
+        return cached
+
+    def _start_cache_fill(self, start, end, columns, **kwargs):
+        # Describes the table if the cache is on, and returns the end of
+        # the scan and, if it reads the whole table, a GTableCacheFill
+        # to pass the pages read to
+        if not gtable_cache.is_enabled():
+            return end, None
+        desc = self.describe(**kwargs)
+        self._columns = desc.get("columns")
+        length = int(desc['length'])
+        end = length if end is None else end
+        if start > 0 or end < length:
+            return end, None
+        col_names = ['__id__'] + self.get_col_names(**kwargs) if columns is None else columns
+        return end, gtable_cache.start_fill(self._dxid, desc, col_names)
+
+    def _iterate_cached_pages(self, cached, col_names, start=0, end=None, row_ids=None):
+        # Yields the rows in [start, end) (or with the IDs given) from
+        # the cache, a page at a time
+        if row_ids is not None:
+            start, end = 0, len(row_ids)
+        elif end is None or end > cached.length:
+            end = cached.length
+        for page_start in range(start, end, self._read_row_buffer_size):
+            page_end = min(page_start + self._read_row_buffer_size, end)
+            if row_ids is None:
+                values = [cached.get_values(name, page_start, page_end).tolist() for name in col_names]
+            else:
+                values = [cached.get_values(name, row_ids=row_ids[page_start:page_end]).tolist() for name in col_names]
+            yield [list(row) for row in zip(*values)]
+
+    def _iterate_pages(self, start, end, columns, cached, **kwargs):
+        if cached is not None:
+            col_names = ['__id__'] + cached.get_col_names() if columns is None else columns
+            for page in self._iterate_cached_pages(cached, col_names, start, end):
+                yield page
+            return
+
+        end, fill = self._start_cache_fill(start, end, columns, **kwargs)
+        if fill is not None:
+            col_names = ['__id__'] + self.get_col_names(**kwargs) if columns is None else columns
+
+        DXGTable._ensure_http_threadpool()
+
+        request_iterator = self._generate_read_requests(start_row=start, end_row=end, columns=columns, **kwargs)
+
+        try:
+            for response in dxpy.utils.response_iterator(request_iterator, self._http_threadpool, max_active_tasks=self._http_threadpool_size):
+                if fill is not None:
+                    fill.add_rows(col_names, response['data'])
+                yield response['data']
+            if fill is not None:
+                fill.finish()
+        finally:
+            if fill is not None:
+                fill.abort()
+
+    def iterate_batches(self, start=0, end=None, columns=None, as_numpy=False, **kwargs):
+        """
+        :param start: The row ID of the first row to return
+        :type start: integer
+        :param end: Return all rows before this row (return all rows until the end if None)
+        :type end: integer or None
+        :param columns: List of column names to be included in the output. If not specified, the row ID (column ``__id__``) and all the columns are included.
+        :type columns: list of strings
+        :param as_numpy: If True, return the values of each column as a NumPy array, typed after the column (requires NumPy)
+        :type as_numpy: boolean
+        :rtype: generator
+
+        Returns a generator that yields the rows with IDs in the
+        interval [*start*, *end*) a page at a time (as they are
+        returned by the API server), each page as an ordered mapping of
+        column names to the values of that column, without building an
+        object for each row.
+
+        If *as_numpy* is True, the values of a column are a NumPy array
+        with the dtype of the column (see
+        :data:`~dxpy.bindings.dxgtable.NUMPY_DTYPES`):
+        integer and floating-point columns have the NumPy type of the
+        same size, boolean columns have dtype bool, and string columns
+        are arrays of objects. Otherwise they are tuples.
+
+        Like :meth:`iterate_rows`, this reads the columns from the local
+        GTable cache, or stores them in it, if the cache is on.
+
+        Example::
+
+            dxgtable = DXGTable("gtable-xxxx")
+            num_long_spans = 0
+            for batch in dxgtable.iterate_batches(columns=["chr", "lo", "hi"], as_numpy=True):
+                lengths = batch["hi"] - batch["lo"]
+                num_long_spans += (lengths > 1000).sum()
+
+        """
+        cached = self._get_cached(columns)
+        fill = None
+        if cached is not None:
+            self._columns = cached.columns
+            end = cached.length if end is None else min(end, cached.length)
+        elif gtable_cache.is_enabled():
+            end, fill = self._start_cache_fill(start, end, columns, **kwargs)
+        elif end is None or ((columns is None or as_numpy) and self._columns is None):
+            # Get the columns and the length of the table at once
+            desc = self.describe(**kwargs)
+            self._columns = desc.get("columns")
+            if end is None:
+                end = int(desc['length'])
+
+        if columns is None:
+            col_names = ['__id__'] + self.get_col_names(**kwargs)
+        else:
+            col_names = columns
+
+        if as_numpy:
+            import numpy
+            col_types = dict((col["name"], col["type"]) for col in self.get_columns(**kwargs))
+            col_types['__id__'] = 'int64'
+            dtypes = [NUMPY_DTYPES[col_types[name]] for name in col_names]
+
+        if cached is not None:
+            for page_start in range(start, end, self._read_row_buffer_size):
+                page_end = min(page_start + self._read_row_buffer_size, end)
+                values = [cached.get_values(name, page_start, page_end) for name in col_names]
+                if as_numpy:
+                    values = [numpy.asarray(column, dtype=dtype) for column, dtype in zip(values, dtypes)]
+                else:
+                    values = [tuple(column.tolist()) for column in values]
+                yield OrderedDict(zip(col_names, values))
+            return
+
+        DXGTable._ensure_http_threadpool()
+
+        request_iterator = self._generate_read_requests(start_row=start, end_row=end, columns=columns, **kwargs)
+
+        try:
+            for response in dxpy.utils.response_iterator(request_iterator, self._http_threadpool, max_active_tasks=self._http_threadpool_size):
+                rows = response['data']
+                if len(rows) == 0:
+                    values = [()] * len(col_names)
+                else:
+                    values = list(zip(*rows))
+                if fill is not None:
+                    fill.add_columns(dict(zip(col_names, values)))
+                if as_numpy:
+                    values = [numpy.array(column, dtype=dtype) for column, dtype in zip(values, dtypes)]
+                yield OrderedDict(zip(col_names, values))
+            if fill is not None:
+                fill.finish()
+        finally:
+            if fill is not None:
+                fill.abort()
+
+    def _get_query_page_fn(self, query, columns, limit, **kwargs):
+        # Returns a function that gets the page of rows matching *query*
+        # that starts at a cursor, given the number of rows returned so far
+        page_size = self._read_row_buffer_size if limit is None else min(limit, self._read_row_buffer_size)
+
+        def get_page(cursor, returned):
+            return self.get_rows(query=query, columns=columns, starting=cursor,
+                                 limit=page_size if limit is None else min(limit - returned, page_size), **kwargs)
+        return get_page
+
+    def _split_genomic_range_query(self, query, columns, num_ranges, **kwargs):
+        # Returns the queries for *num_ranges* consecutive parts of the
+        # interval of an "overlap" genomic range query, each with the
+        # bounds of its part (None for the start of the first and the end
+        # of the last) and the positions of the "lo" and "hi" columns in
+        # the rows, or None if the query can't be split.
+        #
+        # A row of zero length that starts where a part ends overlaps
+        # neither that part nor the next, so the query of each part but
+        # the last extends 1 past its end
+        if num_ranges < 2 or query is None or not isinstance(query.get("parameters"), dict):
+            return None
+        parameters = query["parameters"]
+        if parameters.get("mode") != "overlap" or len(parameters.get("coords") or []) != 3:
+            return None
+        chromosome, lo, hi = parameters["coords"]
+        if hi - lo < num_ranges:
+            return None
+        desc = self.describe(**kwargs)
+        self._columns = desc.get("columns")
+        lo_col, hi_col = None, None
+        for index in desc.get("indices") or []:
+            if index["name"] == query.get("index") and index["type"] == "genomic":
+                lo_col, hi_col = index["lo"], index["hi"]
+        col_names = ['__id__'] + self.get_col_names() if columns is None else columns
+        if lo_col not in col_names or hi_col not in col_names:
+            return None
+        sub_ranges = []
+        for i in range(num_ranges):
+            sub_lo, sub_hi = lo + (hi - lo) * i // num_ranges, lo + (hi - lo) * (i + 1) // num_ranges
+            last = i == num_ranges - 1
+            sub_query = self.genomic_range_query(chromosome, sub_lo, sub_hi if last else sub_hi + 1,
+                                                 mode="overlap", index=query["index"])
+            sub_ranges.append((sub_query, None if i == 0 else sub_lo, None if last else sub_hi,
+                               col_names.index(lo_col), col_names.index(hi_col)))
+        return sub_ranges
+
+    @staticmethod
+    def _starts_in_sub_range(row, sub_lo, sub_hi, lo_pos, hi_pos):
+        # Whether a row returned by the query of a part of a split genomic
+        # range query is kept in that part: a row overlapping several
+        # parts is kept in the one where it starts, except that a row of
+        # zero length that starts where the part ends is kept in it, as
+        # only its query returns the row
+        return ((sub_lo is None or row[lo_pos] >= sub_lo) and
+                (sub_hi is None or row[lo_pos] < sub_hi or row[lo_pos] == row[hi_pos] == sub_hi))
+
+    def iterate_query_rows(self, query=None, columns=None, limit=None, want_dict=False, num_ranges=4, **kwargs):
         """
         :param query: Query with which to filter the rows. See :meth:`genomic_range_query()` and :meth:`lexicographic_query()`.
         :type query: dict
@@ -263,12 +891,28 @@ class DXGTable(DXDataObject):
         :type limit: int
         :param want_dict: If True, return a mapping of column names to values, instead of an array of values
         :type want_dict: boolean
+        :param num_ranges: Number of parts that the interval of a genomic range query is split into, to query them in parallel
+        :type num_ranges: int
         :rtype: generator
 
         Returns a generator that yields the rows of the table that match
         the given query parameters. If *query* is not given, all rows
         are returned in order of the row ID.
 
+        The next page of rows is requested in the background while the
+        rows of the current one are being yielded. An "overlap"
+        :meth:`genomic_range_query()` is also split into *num_ranges*
+        consecutive intervals, which are queried at the same time, and
+        whose rows are yielded in order (this requires the "lo" and
+        "hi" columns of the index to be among the *columns*; otherwise
+        the query is not split).
+
+        If the columns of the table are in the local GTable cache (see
+        :meth:`iterate_rows`), a query of all the rows or an "overlap"
+        or "enclose" :meth:`genomic_range_query()` is answered from the
+        cache, with the matching rows in order of their "lo" coordinate
+        (and then of their row ID).
+
         Example::
 
             dxgtable = open_dxgtable(dxid)
@@ -281,26 +925,67 @@ class DXGTable(DXDataObject):
                 col_names = ['__id__'] + self.get_col_names(**kwargs)
             else:
                 col_names = columns
-        cursor = 0
-        returned = 0
-        while cursor is not None:
-            if limit is not None and returned == limit:
-                return
-            resp = self.get_rows(query=query, columns=columns,
-                                 starting=cursor,
-                                 limit=(self._read_row_buffer_size if limit is None else min(limit - returned, self._read_row_buffer_size)),
-                                 **kwargs)
-            _buffer = resp['data']
-            cursor = resp['next']
-            if len(_buffer) < 1: break
-            if want_dict:
-                for row in _buffer:
-                    returned += 1
-                    yield dict(zip(col_names, row))
-            else:
-                for row in _buffer:
-                    returned += 1
-                    yield row
+        if limit is not None and limit <= 0:
+            return
+
+        pages = self._iterate_cached_query_pages(query, columns)
+        executor = None
+        try:
+            if pages is None:
+                sub_ranges = self._split_genomic_range_query(query, columns, num_ranges, **kwargs)
+                executor = dxpy.utils.get_futures_threadpool(max_workers=len(sub_ranges) if sub_ranges else 1)
+                if sub_ranges is None:
+                    pages = _QueryPages(executor, self._get_query_page_fn(query, columns, limit, **kwargs), limit)
+                else:
+                    # A row is returned for each part of the interval that
+                    # it overlaps; keep it only in the part where it starts
+                    # (or the first part, if it starts before the interval)
+                    # Each part runs ahead while the previous ones are
+                    # consumed, so that they are all queried at the same
+                    # time
+                    sub_range_pages = [(_QueryPages(executor,
+                                                    self._get_query_page_fn(sub_query, columns, limit, **kwargs),
+                                                    limit, max_pages=4),
+                                        (sub_lo, sub_hi, lo_pos, hi_pos))
+                                       for sub_query, sub_lo, sub_hi, lo_pos, hi_pos in sub_ranges]
+                    pages = ([row for row in page if self._starts_in_sub_range(row, *bounds)]
+                             for sub_pages, bounds in sub_range_pages
+                             for page in sub_pages)
+
+            returned = 0
+            for page in pages:
+                if limit is not None and returned + len(page) > limit:
+                    page = page[:limit - returned]
+                returned += len(page)
+                if want_dict:
+                    for row in page:
+                        yield dict(zip(col_names, row))
+                else:
+                    for row in page:
+                        yield row
+                if limit is not None and returned == limit:
+                    return
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=False)
+
+    def _iterate_cached_query_pages(self, query, columns):
+        # Returns the pages of rows that match *query* from the local
+        # cache, or None if it can't answer the query
+        cached = self._get_cached(columns)
+        if cached is None:
+            return None
+        col_names = ['__id__'] + cached.get_col_names() if columns is None else columns
+        if query is None:
+            return self._iterate_cached_pages(cached, col_names)
+        index = cached.get_index(query.get("index"))
+        parameters = query.get("parameters") or {}
+        if (index is None or index.get("type") != "genomic" or parameters.get("mode") not in ("overlap", "enclose")
+                or not cached.has_columns([index["chr"], index["lo"], index["hi"]])):
+            return None
+        chr, lo, hi = parameters["coords"]
+        row_ids = cached.find_genomic_range(index, parameters["mode"], chr, lo, hi)
+        return self._iterate_cached_pages(cached, col_names, row_ids=row_ids)
 
     def __iter__(self):
         return self.iterate_rows()
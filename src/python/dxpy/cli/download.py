@@ -24,30 +24,43 @@ import sys
 import collections
 import dxpy
 from ..utils.resolver import (resolve_existing_path, get_first_pos_of_char, is_project_explicit,
-                              object_exists_in_project, is_jbor_str)
+                              objects_exist_in_project, is_jbor_str)
 from ..exceptions import err_exit
 from . import try_call
 from dxpy.utils.printing import (fill)
 from dxpy.utils import pathmatch
 
 
-def download_one_file(project, file_desc, dest_filename, args):
+def _check_download(file_desc, dest_filename, args, dest_filenames=()):
+    # Returns whether the file should be downloaded; *dest_filenames*
+    # are those already chosen for other files
     if not args.overwrite:
-        if os.path.exists(dest_filename):
+        if os.path.exists(dest_filename) or dest_filename in dest_filenames:
             err_exit(fill('Error: path "' + dest_filename + '" already exists but -f/--overwrite was not set'))
 
     if file_desc['class'] != 'file':
         print("Skipping non-file data object {name} ({id})".format(**file_desc), file=sys.stderr)
-        return
+        return False
 
     if file_desc['state'] != 'closed':
         print("Skipping file {name} ({id}) because it is not closed".format(**file_desc), file=sys.stderr)
-        return
+        return False
+
+    return True
 
+
+def _get_show_progress(args):
     try:
-        show_progress = args.show_progress
+        return args.show_progress
     except AttributeError:
-        show_progress = False
+        return False
+
+
+def download_one_file(project, file_desc, dest_filename, args):
+    if not _check_download(file_desc, dest_filename, args):
+        return
+
+    show_progress = _get_show_progress(args)
 
     try:
         dxpy.download_dxfile(file_desc['id'], dest_filename, show_progress=show_progress, project=project)
@@ -77,19 +90,24 @@ def _rel2abs(path, project):
     return abs_path, strip_prefix
 
 
-def _download_files(files, destdir, args, dest_filename=None):
+def _get_file_downloads(files, destdir, args, downloads, dest_filename=None):
+    # Adds the files to *downloads*, a dict of (project, (file ID, local
+    # filename, size)) by local filename
     for project in files:
         for f in files[project]:
             file_desc = f['describe']
-            dest = dest_filename or os.path.join(destdir, file_desc['name'].replace('/', '%2F'))
-            download_one_file(project, file_desc, dest, args)
-
-
-def _download_folders(folders, destdir, args):
-    try:
-        show_progress = args.show_progress
-    except AttributeError:
-        show_progress = False
+            # Normalized, like the paths of the files in folders, so
+            # that the same local path is always spelled the same way
+            dest = os.path.normpath(dest_filename or os.path.join(destdir, file_desc['name'].replace('/', '%2F')))
+            if _check_download(file_desc, dest, args, dest_filenames=downloads):
+                # Of several files with the same name, the last one wins
+                downloads.pop(dest, None)
+                downloads[dest] = (project, (file_desc['id'], dest, file_desc.get('size')))
+
+
+def _get_folder_downloads(folders, destdir, args, downloads):
+    # Creates the local directories, and adds the files in the folders
+    # to *downloads*
     for project in folders:
         for folder, strip_prefix in folders[project]:
             if not args.recursive:
@@ -97,10 +115,30 @@ def _download_folders(folders, destdir, args):
             assert(folder.startswith(strip_prefix))
             folder_destdir = os.path.join(destdir, folder[len(strip_prefix):].lstrip('/'))
             try:
-                dxpy.download_folder(project, folder_destdir, folder=folder, overwrite=args.overwrite,
-                                     show_progress=show_progress)
+                folder_downloads = dxpy.prepare_folder_download(project, folder_destdir, folder=folder,
+                                                                overwrite=args.overwrite)
             except:
                 err_exit()
+            for file_id, dest, size in folder_downloads:
+                # The folder listing only has closed files
+                file_desc = {'class': 'file', 'state': 'closed', 'id': file_id, 'name': os.path.basename(dest)}
+                if _check_download(file_desc, dest, args, dest_filenames=downloads):
+                    downloads.pop(dest, None)
+                    downloads[dest] = (project, (file_id, dest, size))
+
+
+def _download(downloads, args):
+    # Downloads the files from each project together, so that small
+    # ones are downloaded in parallel, and progress is shown for all of
+    # them at once
+    files_by_project = collections.OrderedDict()
+    for project, download in downloads.values():
+        files_by_project.setdefault(project, []).append(download)
+    for project, files in files_by_project.items():
+        try:
+            dxpy.download_dxfiles(files, show_progress=_get_show_progress(args), project=project)
+        except:
+            err_exit()
 
 
 # Main entry point.
@@ -157,7 +195,7 @@ def download(args):
         # If length of matching_files is 0 then we're only downloading folders
         # so skip this logic since the files will be verified in the API call.
         if len(matching_files) > 0 and path_has_explicit_proj and not \
-                any(object_exists_in_project(f['describe']['id'], project) for f in matching_files):
+                any(objects_exist_in_project([f['describe']['id'] for f in matching_files], project).values()):
             err_exit(fill('Error: specified project does not contain specified file object'))
 
         files_to_get[project].extend(matching_files)
@@ -188,5 +226,7 @@ def download(args):
     else:
         destdir, dest_filename = os.getcwd(), args.output
 
-    _download_folders(folders_to_get, destdir, args)
-    _download_files(files_to_get, destdir, args, dest_filename=dest_filename)
+    downloads = collections.OrderedDict()
+    _get_folder_downloads(folders_to_get, destdir, args, downloads)
+    _get_file_downloads(files_to_get, destdir, args, downloads, dest_filename=dest_filename)
+    _download(downloads, args)
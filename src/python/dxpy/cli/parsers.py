@@ -182,6 +182,10 @@ env_args.add_argument('--workspace-id', help=argparse.SUPPRESS)
 env_args.add_argument('--security-context', help=argparse.SUPPRESS)
 env_args.add_argument('--auth-token', help=argparse.SUPPRESS)
 env_args.add_argument('--env-help', help=fill('Display help message for overriding environment variables', width_adjustment=-24), action=EnvHelpAction, nargs=0)
+# These default to SUPPRESS so that the defaults of a subcommand's
+# parser don't override them if they were given before the subcommand
+env_args.add_argument('--profile', help=fill('When the command exits, print a breakdown of the time it spent resolving paths, making API calls, transferring data, etc.', width_adjustment=-24), action='store_true', default=argparse.SUPPRESS)
+env_args.add_argument('--profile-trace', metavar='TRACE_FILE', help=fill('Like --profile, but write a trace that can be opened in chrome://tracing or https://ui.perfetto.dev to this file', width_adjustment=-24), default=argparse.SUPPRESS)
 
 def set_env_from_args(args):
     ''' Sets the environment variables for this process from arguments (argparse.Namespace)
@@ -207,6 +211,15 @@ def set_env_from_args(args):
         config['DX_SECURITY_CONTEXT'] = json.dumps({"auth_token": args['auth_token'],
                                                     "auth_token_type": "Bearer"})
 
+def set_profiling_from_args(args):
+    ''' Starts recording the time spent in each phase of the command (see
+    dxpy.utils.profiling) if --profile or --profile-trace was given.
+    '''
+    args = vars(args)
+    if args.get('profile') or args.get('profile_trace'):
+        from ..utils import profiling
+        profiling.enable(trace_file=args.get('profile_trace'))
+
 extra_args = argparse.ArgumentParser(add_help=False)
 extra_args.add_argument('--extra-args', help=fill("Arguments (in JSON format) to pass to the underlying API method, overriding the default settings", width_adjustment=-24))
 
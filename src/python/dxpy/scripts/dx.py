@@ -33,28 +33,21 @@ wrap_stdio_in_codecs()
 decode_command_line_args()
 
 import dxpy
-from dxpy.scripts import dx_build_app
-from dxpy import workflow_builder
 
 from ..cli import try_call, prompt_for_yn, INTERACTIVE_CLI
-from ..cli import workflow as workflow_cli
-from ..cli.cp import cp
-from ..cli.download import (download_one_file, download)
 from ..cli.parsers import (no_color_arg, delim_arg, env_args, stdout_args, all_arg, json_arg, parser_dataobject_args,
                            parser_single_dataobject_output_args, process_properties_args,
                            find_by_properties_and_tags_args, process_find_by_property_args, process_dataobject_args,
                            process_single_dataobject_output_args, find_executions_args, add_find_executions_search_gp,
-                           set_env_from_args, extra_args, process_extra_args, DXParserError, exec_input_args,
+                           set_env_from_args, set_profiling_from_args, extra_args, process_extra_args, DXParserError, exec_input_args,
                            instance_type_arg, process_instance_type_arg, get_update_project_args,
                            property_args, tag_args, contains_phi, process_phi_param)
-from ..cli.exec_io import (ExecutableInputs, format_choices_or_suggestions)
-from ..cli.org import (get_org_invite_args, add_membership, remove_membership, update_membership, new_org, update_org,
-                       find_orgs, org_find_members, org_find_projects, org_find_apps)
 from ..exceptions import (err_exit, DXError, DXCLIError, DXAPIError, network_exceptions, default_expected_exceptions,
                           format_exception)
-from ..utils import warn, group_array_by_field, normalize_timedelta, normalize_time_input
+from ..utils import warn, group_array_by_field, normalize_timedelta, normalize_time_input, profiling
 
 from ..app_categories import APP_CATEGORIES
+from . import dx_daemon
 from ..utils.printing import (CYAN, BLUE, YELLOW, GREEN, RED, WHITE, UNDERLINE, BOLD, ENDC, DNANEXUS_LOGO,
                               DNANEXUS_X, set_colors, set_delimiter, get_delimiter, DELIMITER, fill,
                               tty_rows, tty_cols, pager, format_find_results)
@@ -1275,6 +1268,7 @@ def _get_user_new_args(args):
 
 
 def new_user(args):
+    from ..cli.org import get_org_invite_args
     _validate_new_user_input(args)
 
     # Create user account.
@@ -1304,7 +1298,7 @@ def new_project(args):
         if INTERACTIVE_CLI:
             args.name = input("Enter name for new project: ")
         else:
-            err_exit(parser_new_project.format_help() + fill("No project name supplied, and input is not interactive"), 3)
+            err_exit(get_parser('new project').format_help() + fill("No project name supplied, and input is not interactive"), 3)
     inputs = {"name": args.name}
     if args.bill_to:
         inputs["billTo"] = args.bill_to
@@ -1780,6 +1774,7 @@ def get_workflow(entity_result, args):
 
 
 def get(args):
+    from ..cli.download import download_one_file
     # Decide what to do based on entity's class
     if not is_hashid(args.path) and ':' not in args.path and args.path.startswith('app-'):
         desc = dxpy.api.app_describe(args.path)
@@ -1848,6 +1843,7 @@ def cat(args):
 
 
 def download_or_cat(args):
+    from ..cli.download import download
     if args.output == '-':
         cat(parser.parse_args(['cat'] + args.paths))
         return
@@ -2425,7 +2421,11 @@ def wait(args):
         err_exit('', 3)
 
 def build(args):
+    from dxpy.scripts import dx_build_app
+    from dxpy import workflow_builder
+
     sys.argv = ['dx build'] + sys.argv[2:]
+    build_parser = get_parser('build')
 
     def get_mode(src_dir):
         """
@@ -2605,9 +2605,11 @@ def uninstall(args):
 
 def run_one(args, executable, dest_proj, dest_path, preset_inputs=None, input_name_prefix=None,
             is_the_only_job=True):
+    from ..cli.exec_io import ExecutableInputs
     # following may throw if the executable is a workflow with no
     # input spec available (because a stage is inaccessible)
-    exec_inputs = try_call(ExecutableInputs, executable, input_name_prefix=input_name_prefix)
+    with profiling.span("get input spec"):
+        exec_inputs = try_call(ExecutableInputs, executable, input_name_prefix=input_name_prefix)
 
     if args.input_json is None and args.filename is None:
         # --input-json and --input-json-file completely override input
@@ -2621,7 +2623,8 @@ def run_one(args, executable, dest_proj, dest_path, preset_inputs=None, input_na
     if preset_inputs is not None:
         exec_inputs.update(preset_inputs, strip_prefix=False)
 
-    try_call(exec_inputs.update_from_args, args)
+    with profiling.span("parse inputs"):
+        try_call(exec_inputs.update_from_args, args)
 
     input_json = exec_inputs.inputs
 
@@ -2754,8 +2757,9 @@ def run_one(args, executable, dest_proj, dest_path, preset_inputs=None, input_na
     return dxexecution
 
 def print_run_help(executable="", alias=None):
+    from ..cli.exec_io import format_choices_or_suggestions
     if executable == "":
-        parser_map['run'].print_help()
+        get_parser('run').print_help()
     else:
         exec_help = 'usage: dx run ' + executable + ('' if alias is None else ' --alias ' + alias)
         handler = try_call(get_exec_handler, executable, alias)
@@ -2902,7 +2906,7 @@ def run(args):
     try_call(process_properties_args, args)
 
     if args.clone is None and args.executable == "":
-        err_exit(parser_map['run'].format_help() +
+        err_exit(get_parser('run').format_help() +
                  fill("Error: Either the executable must be specified, or --clone must be used to indicate a job or analysis to clone"), 2)
 
     args.input_from_clone, args.sys_reqs_from_clone = {}, {}
@@ -3407,13 +3411,14 @@ def upgrade(args):
 
 def print_help(args):
     if args.command_or_category is None:
-        parser_help.print_help()
+        get_parser('help').print_help()
     elif args.command_or_category in parser_categories:
+        build_all_parsers()
         print('dx ' + args.command_or_category + ': ' + parser_categories[args.command_or_category]['desc'].lstrip())
         print('\nCommands:\n')
         for cmd in parser_categories[args.command_or_category]['cmds']:
             print('  ' + cmd[0] + ' '*(18-len(cmd[0])) + fill(cmd[1], width_adjustment=-20, subsequent_indent=' '*20))
-    elif args.command_or_category not in parser_map:
+    elif get_parser(args.command_or_category) is None:
         err_exit('Unrecognized command: ' + args.command_or_category, 3)
     elif args.command_or_category == 'export' and args.subcommand is not None:
         if args.subcommand not in exporters:
@@ -3423,15 +3428,15 @@ def print_help(args):
         exporters[args.subcommand](new_args)
     elif args.command_or_category == 'run':
         if args.subcommand is None:
-            parser_map[args.command_or_category].print_help()
+            get_parser(args.command_or_category).print_help()
         else:
             print_run_help(args.subcommand)
     elif args.subcommand is None:
-        parser_map[args.command_or_category].print_help()
-    elif (args.command_or_category + ' ' + args.subcommand) not in parser_map:
+        get_parser(args.command_or_category).print_help()
+    elif get_parser(args.command_or_category + ' ' + args.subcommand) is None:
         err_exit('Unrecognized command and subcommand combination: ' + args.command_or_category + ' ' + args.subcommand, 3)
     else:
-        parser_map[args.command_or_category + ' ' + args.subcommand].print_help()
+        get_parser(args.command_or_category + ' ' + args.subcommand).print_help()
 
 def exit_shell(args):
     if state['interactive']:
@@ -3570,6 +3575,82 @@ def register_parser(parser, subparsers_action=None, categories=('other', ), add_
             parser_categories[category]['cmds'].append((name, _help))
 
 
+class LazyParserMap(collections.MutableMapping):
+    """Stands in for the name -> parser map of the top-level subparsers
+    action. The parser for each command is only built (by the function
+    registered with :func:`lazy_parser`) when it is first looked up, so
+    that a single ``dx`` invocation doesn't pay for building the
+    parsers of all other commands.
+    """
+    def __init__(self):
+        self._parsers = collections.OrderedDict()
+        self._builders = {}
+
+    def add_builder(self, name, builder):
+        self._parsers[name] = None
+        self._builders[name] = builder
+
+    def __getitem__(self, name):
+        if name in self._builders:
+            self._builders.pop(name)()
+        return self._parsers[name]
+
+    def __setitem__(self, name, parser):
+        self._parsers[name] = parser
+
+    def __delitem__(self, name):
+        self._builders.pop(name, None)
+        del self._parsers[name]
+
+    def __contains__(self, name):
+        return name in self._parsers
+
+    def __iter__(self):
+        return iter(self._parsers)
+
+    def __len__(self):
+        return len(self._parsers)
+
+    def values(self):
+        # argcomplete looks through these for the active subparser, which
+        # has necessarily been built already
+        return [parser for parser in self._parsers.values() if parser is not None]
+
+    def build_all(self):
+        for name in list(self._builders):
+            self[name]
+
+
+def lazy_parser(name):
+    """Registers the decorated function as the builder of the parser for
+    the command `name`. The function must add the parser to
+    ``subparsers`` and call :func:`register_parser` on it.
+    """
+    def register(builder):
+        subparsers.choices.add_builder(name, builder)
+        return builder
+    return register
+
+
+def get_parser(name):
+    """Returns the parser for `name` (e.g. "run" or "add users"), building
+    it if necessary, or None if there is no such command.
+    """
+    subparsers.choices.get(name.split(' ')[0])
+    return parser_map.get(name)
+
+
+def build_all_parsers():
+    """Builds the parsers of all commands, e.g. so that ``dx help``
+    can list them.
+    """
+    subparsers.choices.build_all()
+    order = list(subparsers.choices)
+    for category in parser_categories.values():
+        category['cmds'].sort(key=lambda cmd: order.index(cmd[0].split(' ')[0]))
+    parser_categories['all']['cmds'].sort()
+
+
 parser = DXArgumentParser(description=DNANEXUS_LOGO() + ' Command-Line Client, API v%s, client v%s' % (dxpy.API_VERSION, dxpy.TOOLKIT_VERSION) + '\n\n' + fill('dx is a command-line client for interacting with the DNAnexus platform.  You can log in, navigate, upload, organize and share your data, launch analyses, and more.  For a quick tour of what the tool can do, see') + '\n\n  https://wiki.dnanexus.com/Command-Line-Client/Quickstart\n\n' + fill('For a breakdown of dx commands by category, run "dx help".') + '\n\n' + fill('dx exits with exit code 3 if invalid input is provided or an invalid operation is requested, and exit code 1 if an internal error is encountered.  The latter usually indicate bugs in dx; please report them at') + "\n\n  https://github.com/dnanexus/dx-toolkit/issues",
                           formatter_class=argparse.RawTextHelpFormatter,
                           parents=[env_args],
@@ -3578,221 +3659,255 @@ parser.add_argument('--version', action=PrintDXVersion, nargs=0, help="show prog
 
 subparsers = parser.add_subparsers(help=argparse.SUPPRESS, dest='command')
 subparsers.metavar = 'command'
+subparsers._name_parser_map = subparsers.choices = LazyParserMap()
 
 #####################################
 # login
 #####################################
-parser_login = subparsers.add_parser('login', help='Log in (interactively or with an existing API token)',
-                                     description='Log in interactively and acquire credentials.  Use "--token" to log in with an existing API token.',
-                                     prog='dx login', parents=[env_args])
-parser_login.add_argument('--token', help='Authentication token to use')
-host_action = parser_login.add_argument('--host', help='Log into the given auth server host (port must also be given)')
-port_action = parser_login.add_argument('--port', type=int, help='Log into the given auth server port (host must also be given)')
-protocol_action = parser_login.add_argument('--protocol', help='Used in conjunction with host and port arguments, gives the protocol to use when contacting auth server', default='https')
-host_action.help = port_action.help = protocol_action.help = argparse.SUPPRESS
-parser_login.add_argument('--noprojects', dest='projects', help='Do not print available projects', action='store_false')
-parser_login.add_argument('--save', help='Save token and other environment variables for future sessions',
-                          action='store_true')
-parser_login.add_argument('--timeout', default='30d',
-                          help='Timeout for this login token (in seconds, or use suffix s, m, h, d, w, M, y)')
-parser_login.add_argument('--staging', nargs=0, help=argparse.SUPPRESS, action=SetStagingEnv)
-parser_login.set_defaults(staging=False, func=login)
-register_parser(parser_login, categories='session')
+@lazy_parser('login')
+def _build_login_parser():
+    parser_login = subparsers.add_parser('login', help='Log in (interactively or with an existing API token)',
+                                         description='Log in interactively and acquire credentials.  Use "--token" to log in with an existing API token.',
+                                         prog='dx login', parents=[env_args])
+    parser_login.add_argument('--token', help='Authentication token to use')
+    host_action = parser_login.add_argument('--host', help='Log into the given auth server host (port must also be given)')
+    port_action = parser_login.add_argument('--port', type=int, help='Log into the given auth server port (host must also be given)')
+    protocol_action = parser_login.add_argument('--protocol', help='Used in conjunction with host and port arguments, gives the protocol to use when contacting auth server', default='https')
+    host_action.help = port_action.help = protocol_action.help = argparse.SUPPRESS
+    parser_login.add_argument('--noprojects', dest='projects', help='Do not print available projects', action='store_false')
+    parser_login.add_argument('--save', help='Save token and other environment variables for future sessions',
+                              action='store_true')
+    parser_login.add_argument('--timeout', default='30d',
+                              help='Timeout for this login token (in seconds, or use suffix s, m, h, d, w, M, y)')
+    parser_login.add_argument('--staging', nargs=0, help=argparse.SUPPRESS, action=SetStagingEnv)
+    parser_login.set_defaults(staging=False, func=login)
+    register_parser(parser_login, categories='session')
 
 #####################################
 # logout
 #####################################
-parser_logout = subparsers.add_parser('logout',
-                                      help='Log out and remove credentials',
-                                      description='Log out and remove credentials',
-                                      prog='dx logout',
-                                      parents=[env_args])
-parser_logout.add_argument('--host', help='Log out of the given auth server host (port must also be given)')
-parser_logout.add_argument('--port', type=int, help='Log out of the given auth server port (host must also be given)')
-parser_logout.add_argument('--protocol', help='Used in conjunction with host and port arguments, gives the protocol to use when contacting auth server', default='https')
-parser_logout.set_defaults(func=logout)
-register_parser(parser_logout, categories='session')
+@lazy_parser('logout')
+def _build_logout_parser():
+    parser_logout = subparsers.add_parser('logout',
+                                          help='Log out and remove credentials',
+                                          description='Log out and remove credentials',
+                                          prog='dx logout',
+                                          parents=[env_args])
+    parser_logout.add_argument('--host', help='Log out of the given auth server host (port must also be given)')
+    parser_logout.add_argument('--port', type=int, help='Log out of the given auth server port (host must also be given)')
+    parser_logout.add_argument('--protocol', help='Used in conjunction with host and port arguments, gives the protocol to use when contacting auth server', default='https')
+    parser_logout.set_defaults(func=logout)
+    register_parser(parser_logout, categories='session')
 
 #####################################
 # sh
 #####################################
-parser_shell = subparsers.add_parser('sh', help='dx shell interpreter',
-                                     description='When run with no arguments, this command launches an interactive shell.  Otherwise, it will load the filename provided and interpret each nonempty line as a command to execute.  In both cases, the "dx" is expected to be omitted from the command or line.',
-                                     prog='dx sh',
-                                     parents=[env_args])
-parser_shell.add_argument('filename', help='File of dx commands to execute', nargs='?', default=None)
-parser_shell.set_defaults(func=shell)
-register_parser(parser_shell, categories='session')
+@lazy_parser('sh')
+def _build_sh_parser():
+    parser_shell = subparsers.add_parser('sh', help='dx shell interpreter',
+                                         description='When run with no arguments, this command launches an interactive shell.  Otherwise, it will load the filename provided and interpret each nonempty line as a command to execute.  In both cases, the "dx" is expected to be omitted from the command or line.',
+                                         prog='dx sh',
+                                         parents=[env_args])
+    parser_shell.add_argument('filename', help='File of dx commands to execute', nargs='?', default=None)
+    parser_shell.set_defaults(func=shell)
+    register_parser(parser_shell, categories='session')
 
 #####################################
 # exit
 #####################################
-parser_exit = subparsers.add_parser('exit', help='Exit out of the interactive shell',
-                                    description='Exit out of the interactive shell', prog='dx exit')
-parser_exit.set_defaults(func=exit_shell)
-register_parser(parser_exit, categories='session')
+@lazy_parser('exit')
+def _build_exit_parser():
+    parser_exit = subparsers.add_parser('exit', help='Exit out of the interactive shell',
+                                        description='Exit out of the interactive shell', prog='dx exit')
+    parser_exit.set_defaults(func=exit_shell)
+    register_parser(parser_exit, categories='session')
 
 #####################################
 # whoami
 #####################################
-parser_whoami = subparsers.add_parser('whoami', help='Print the username of the current user',
-                                      description='Print the username of the current user, ' +
-                                                  'in the form "user-USERNAME"',
-                                      prog='dx whoami',
-                                      parents=[env_args])
-parser_whoami.add_argument('--id', help='Print user ID instead of username', action='store_true', dest='user_id')
-parser_whoami.set_defaults(func=whoami)
-register_parser(parser_whoami, categories='session')
+@lazy_parser('whoami')
+def _build_whoami_parser():
+    parser_whoami = subparsers.add_parser('whoami', help='Print the username of the current user',
+                                          description='Print the username of the current user, ' +
+                                                      'in the form "user-USERNAME"',
+                                          prog='dx whoami',
+                                          parents=[env_args])
+    parser_whoami.add_argument('--id', help='Print user ID instead of username', action='store_true', dest='user_id')
+    parser_whoami.set_defaults(func=whoami)
+    register_parser(parser_whoami, categories='session')
 
 #####################################
 # env
 #####################################
-parser_env = subparsers.add_parser('env', help='Print all environment variables in use',
-                                   description=fill('Prints all environment variables in use as they have been resolved from environment variables and configuration files.  For more details, see') + '\n\nhttps://wiki.dnanexus.com/Command-Line-Client/Environment-Variables',
-                                   formatter_class=argparse.RawTextHelpFormatter, prog='dx env',
-                                   parents=[env_args])
-parser_env.add_argument('--bash', help=fill('Prints a list of bash commands to export the environment variables', width_adjustment=-14),
-                        action='store_true')
-parser_env.add_argument('--dx-flags', help=fill('Prints the dx options to override the environment variables', width_adjustment=-14),
-                        action='store_true')
-parser_env.set_defaults(func=env)
-register_parser(parser_env, categories='session')
+@lazy_parser('env')
+def _build_env_parser():
+    parser_env = subparsers.add_parser('env', help='Print all environment variables in use',
+                                       description=fill('Prints all environment variables in use as they have been resolved from environment variables and configuration files.  For more details, see') + '\n\nhttps://wiki.dnanexus.com/Command-Line-Client/Environment-Variables',
+                                       formatter_class=argparse.RawTextHelpFormatter, prog='dx env',
+                                       parents=[env_args])
+    parser_env.add_argument('--bash', help=fill('Prints a list of bash commands to export the environment variables', width_adjustment=-14),
+                            action='store_true')
+    parser_env.add_argument('--dx-flags', help=fill('Prints the dx options to override the environment variables', width_adjustment=-14),
+                            action='store_true')
+    parser_env.set_defaults(func=env)
+    register_parser(parser_env, categories='session')
 
 #####################################
 # setenv
 #####################################
-parser_setenv = subparsers.add_parser('setenv',
-                                      help='Sets environment variables for the session',
-                                      description='Sets environment variables for communication with the API server',
-                                      prog='dx setenv')
-parser_setenv.add_argument('--noprojects', dest='projects', help='Do not print available projects', action='store_false')
-parser_setenv.add_argument('--save', help='Save settings for future sessions.  Only one set of settings can be saved at a time.  Always set to true if login is run in a non-interactive session',
-                           action='store_true')
-parser_setenv.add_argument('--current', help='Do not prompt for new values and just save current settings for future sessions.  Overrides --save to be true.',
-                           action='store_true')
-parser_setenv.set_defaults(func=setenv)
-register_parser(parser_setenv, categories='other')
+@lazy_parser('setenv')
+def _build_setenv_parser():
+    parser_setenv = subparsers.add_parser('setenv',
+                                          help='Sets environment variables for the session',
+                                          description='Sets environment variables for communication with the API server',
+                                          prog='dx setenv')
+    parser_setenv.add_argument('--noprojects', dest='projects', help='Do not print available projects', action='store_false')
+    parser_setenv.add_argument('--save', help='Save settings for future sessions.  Only one set of settings can be saved at a time.  Always set to true if login is run in a non-interactive session',
+                               action='store_true')
+    parser_setenv.add_argument('--current', help='Do not prompt for new values and just save current settings for future sessions.  Overrides --save to be true.',
+                               action='store_true')
+    parser_setenv.set_defaults(func=setenv)
+    register_parser(parser_setenv, categories='other')
 
 #####################################
 # clearenv
 #####################################
-parser_clearenv = subparsers.add_parser('clearenv', help='Clears all environment variables set by dx',
-                                        description='Clears all environment variables set by dx.  More specifically, it removes local state stored in ~/.dnanexus_config/environment.  Does not affect the environment variables currently set in your shell.', prog='dx clearenv')
-parser_clearenv.add_argument('--reset', help='Reset dx environment variables to empty values. Use this to avoid interference between multiple dx sessions when using shell environment variables.',
-                             action='store_true')
-parser_clearenv.set_defaults(func=clearenv, interactive=False)
-register_parser(parser_clearenv, categories='session')
+@lazy_parser('clearenv')
+def _build_clearenv_parser():
+    parser_clearenv = subparsers.add_parser('clearenv', help='Clears all environment variables set by dx',
+                                            description='Clears all environment variables set by dx.  More specifically, it removes local state stored in ~/.dnanexus_config/environment.  Does not affect the environment variables currently set in your shell.', prog='dx clearenv')
+    parser_clearenv.add_argument('--reset', help='Reset dx environment variables to empty values. Use this to avoid interference between multiple dx sessions when using shell environment variables.',
+                                 action='store_true')
+    parser_clearenv.set_defaults(func=clearenv, interactive=False)
+    register_parser(parser_clearenv, categories='session')
 
 #####################################
 # invite
 #####################################
-parser_invite = subparsers.add_parser('invite',
-                                      help='Invite another user to a project or make it public',
-                                      description='Invite a DNAnexus entity to a project. If the invitee is not recognized as a DNAnexus ID, it will be treated as a username, i.e. "dx invite alice : VIEW" is equivalent to inviting the user with user ID "user-alice" to view your current default project.',
-                                      prog='dx invite',
-                                      parents=[env_args])
-parser_invite.add_argument('invitee', help='Entity to invite')
-parser_invite.add_argument('project', help='Project to invite the invitee to', default=':', nargs='?')
-parser_invite.add_argument('level', help='Permissions level the new member should have',
-                           choices=['VIEW', 'UPLOAD', 'CONTRIBUTE', 'ADMINISTER'], default='VIEW', nargs='?')
-parser_invite.add_argument('--no-email', dest='send_email', action='store_false', help='Disable email notifications to invitee')
-parser_invite.set_defaults(func=invite)
-# parser_invite.completer = TODO
-register_parser(parser_invite, categories='other')
+@lazy_parser('invite')
+def _build_invite_parser():
+    parser_invite = subparsers.add_parser('invite',
+                                          help='Invite another user to a project or make it public',
+                                          description='Invite a DNAnexus entity to a project. If the invitee is not recognized as a DNAnexus ID, it will be treated as a username, i.e. "dx invite alice : VIEW" is equivalent to inviting the user with user ID "user-alice" to view your current default project.',
+                                          prog='dx invite',
+                                          parents=[env_args])
+    parser_invite.add_argument('invitee', help='Entity to invite')
+    parser_invite.add_argument('project', help='Project to invite the invitee to', default=':', nargs='?')
+    parser_invite.add_argument('level', help='Permissions level the new member should have',
+                               choices=['VIEW', 'UPLOAD', 'CONTRIBUTE', 'ADMINISTER'], default='VIEW', nargs='?')
+    parser_invite.add_argument('--no-email', dest='send_email', action='store_false', help='Disable email notifications to invitee')
+    parser_invite.set_defaults(func=invite)
+    # parser_invite.completer = TODO
+    register_parser(parser_invite, categories='other')
 
 #####################################
 # uninvite
 #####################################
-parser_uninvite = subparsers.add_parser('uninvite',
-                                        help='Revoke others\' permissions on a project you administer',
-                                        description='Revoke others\' permissions on a project you administer. If the entity is not recognized as a DNAnexus ID, it will be treated as a username, i.e. "dx uninvite alice :" is equivalent to revoking the permissions of the user with user ID "user-alice" to your current default project.',
-                                        prog='dx uninvite',
-                                        parents=[env_args])
-parser_uninvite.add_argument('entity', help='Entity to uninvite')
-parser_uninvite.add_argument('project', help='Project to revoke permissions from', default=':', nargs='?')
-parser_uninvite.set_defaults(func=uninvite)
-register_parser(parser_uninvite, categories='other')
+@lazy_parser('uninvite')
+def _build_uninvite_parser():
+    parser_uninvite = subparsers.add_parser('uninvite',
+                                            help='Revoke others\' permissions on a project you administer',
+                                            description='Revoke others\' permissions on a project you administer. If the entity is not recognized as a DNAnexus ID, it will be treated as a username, i.e. "dx uninvite alice :" is equivalent to revoking the permissions of the user with user ID "user-alice" to your current default project.',
+                                            prog='dx uninvite',
+                                            parents=[env_args])
+    parser_uninvite.add_argument('entity', help='Entity to uninvite')
+    parser_uninvite.add_argument('project', help='Project to revoke permissions from', default=':', nargs='?')
+    parser_uninvite.set_defaults(func=uninvite)
+    register_parser(parser_uninvite, categories='other')
 
 #####################################
 # ls
 #####################################
-parser_ls = subparsers.add_parser('ls', help='List folders and/or objects in a folder',
-                                  description='List folders and/or objects in a folder',
-                                  parents=[no_color_arg, delim_arg, env_args, stdout_args],
-                                  prog='dx ls')
-parser_ls.add_argument('-a', '--all', help='show hidden files', action='store_true')
-ls_output_args = parser_ls.add_mutually_exclusive_group()
-ls_output_args.add_argument('-l', '--long', dest='verbose', help='Alias for "verbose"', action='store_true')
-parser_ls.add_argument('--obj', help='show only objects', action='store_true')
-parser_ls.add_argument('--folders', help='show only folders', action='store_true')
-parser_ls.add_argument('--full', help='show full paths of folders', action='store_true')
-ls_path_action = parser_ls.add_argument('path', help='Folder (possibly in another project) to list the contents of, default is the current directory in the current project.  Syntax: projectID:/folder/path',
-                                        nargs='?', default='.')
-ls_path_action.completer = DXPathCompleter()
-parser_ls.set_defaults(func=ls)
-register_parser(parser_ls, categories='fs')
+@lazy_parser('ls')
+def _build_ls_parser():
+    parser_ls = subparsers.add_parser('ls', help='List folders and/or objects in a folder',
+                                      description='List folders and/or objects in a folder',
+                                      parents=[no_color_arg, delim_arg, env_args, stdout_args],
+                                      prog='dx ls')
+    parser_ls.add_argument('-a', '--all', help='show hidden files', action='store_true')
+    ls_output_args = parser_ls.add_mutually_exclusive_group()
+    ls_output_args.add_argument('-l', '--long', dest='verbose', help='Alias for "verbose"', action='store_true')
+    parser_ls.add_argument('--obj', help='show only objects', action='store_true')
+    parser_ls.add_argument('--folders', help='show only folders', action='store_true')
+    parser_ls.add_argument('--full', help='show full paths of folders', action='store_true')
+    ls_path_action = parser_ls.add_argument('path', help='Folder (possibly in another project) to list the contents of, default is the current directory in the current project.  Syntax: projectID:/folder/path',
+                                            nargs='?', default='.')
+    ls_path_action.completer = DXPathCompleter()
+    parser_ls.set_defaults(func=ls)
+    register_parser(parser_ls, categories='fs')
 
 #####################################
 # tree
 #####################################
-parser_tree = subparsers.add_parser('tree', help='List folders and objects in a tree',
-                                    description='List folders and objects in a tree',
-                                    parents=[no_color_arg, env_args],
-                                    prog='dx tree')
-parser_tree.add_argument('-a', '--all', help='show hidden files', action='store_true')
-parser_tree.add_argument('-l', '--long', help='use a long listing format', action='store_true')
-tree_path_action = parser_tree.add_argument('path', help='Folder (possibly in another project) to list the contents of, default is the current directory in the current project.  Syntax: projectID:/folder/path',
-                                            nargs='?', default='.')
-tree_path_action.completer = DXPathCompleter(expected='folder')
-parser_tree.set_defaults(func=tree)
-register_parser(parser_tree, categories='fs')
+@lazy_parser('tree')
+def _build_tree_parser():
+    parser_tree = subparsers.add_parser('tree', help='List folders and objects in a tree',
+                                        description='List folders and objects in a tree',
+                                        parents=[no_color_arg, env_args],
+                                        prog='dx tree')
+    parser_tree.add_argument('-a', '--all', help='show hidden files', action='store_true')
+    parser_tree.add_argument('-l', '--long', help='use a long listing format', action='store_true')
+    tree_path_action = parser_tree.add_argument('path', help='Folder (possibly in another project) to list the contents of, default is the current directory in the current project.  Syntax: projectID:/folder/path',
+                                                nargs='?', default='.')
+    tree_path_action.completer = DXPathCompleter(expected='folder')
+    parser_tree.set_defaults(func=tree)
+    register_parser(parser_tree, categories='fs')
 
 #####################################
 # pwd
 #####################################
-parser_pwd = subparsers.add_parser('pwd', help='Print current working directory',
-                                   description='Print current working directory',
-                                   prog='dx pwd',
-                                   parents=[env_args])
-parser_pwd.set_defaults(func=pwd)
-register_parser(parser_pwd, categories='fs')
+@lazy_parser('pwd')
+def _build_pwd_parser():
+    parser_pwd = subparsers.add_parser('pwd', help='Print current working directory',
+                                       description='Print current working directory',
+                                       prog='dx pwd',
+                                       parents=[env_args])
+    parser_pwd.set_defaults(func=pwd)
+    register_parser(parser_pwd, categories='fs')
 
 #####################################
 # select
 #####################################
-parser_select = subparsers.add_parser('select', help='List and select a project to switch to',
-                                      description='Interactively list and select a project to switch to.  By default, only lists projects for which you have at least CONTRIBUTE permissions.  Use --public to see the list of public projects.',
-                                      prog='dx select',
-                                      parents=[env_args])
-select_project_action = parser_select.add_argument('project', help='Name or ID of a project to switch to; if not provided a list will be provided for you',
-                                                   nargs='?', default=None)
-select_project_action.completer = DXPathCompleter(expected='project', include_current_proj=False)
-parser_select.add_argument('--name', help='Name of the project (wildcard patterns supported)')
-parser_select.add_argument('--level', choices=['VIEW', 'UPLOAD', 'CONTRIBUTE', 'ADMINISTER'],
-                           help='Minimum level of permissions expected', default='CONTRIBUTE')
-parser_select.add_argument('--public', help='Include ONLY public projects (will automatically set --level to VIEW)',
-                           action='store_true')
-parser_select.set_defaults(func=select, save=False)
-register_parser(parser_select, categories='fs')
+@lazy_parser('select')
+def _build_select_parser():
+    parser_select = subparsers.add_parser('select', help='List and select a project to switch to',
+                                          description='Interactively list and select a project to switch to.  By default, only lists projects for which you have at least CONTRIBUTE permissions.  Use --public to see the list of public projects.',
+                                          prog='dx select',
+                                          parents=[env_args])
+    select_project_action = parser_select.add_argument('project', help='Name or ID of a project to switch to; if not provided a list will be provided for you',
+                                                       nargs='?', default=None)
+    select_project_action.completer = DXPathCompleter(expected='project', include_current_proj=False)
+    parser_select.add_argument('--name', help='Name of the project (wildcard patterns supported)')
+    parser_select.add_argument('--level', choices=['VIEW', 'UPLOAD', 'CONTRIBUTE', 'ADMINISTER'],
+                               help='Minimum level of permissions expected', default='CONTRIBUTE')
+    parser_select.add_argument('--public', help='Include ONLY public projects (will automatically set --level to VIEW)',
+                               action='store_true')
+    parser_select.set_defaults(func=select, save=False)
+    register_parser(parser_select, categories='fs')
 
 #####################################
 # cd
 #####################################
-parser_cd = subparsers.add_parser('cd', help='Change the current working directory',
-                                  description='Change the current working directory', prog='dx cd',
-                                  parents=[env_args])
-cd_path_action = parser_cd.add_argument('path', nargs='?', default='/',
-                                        help='Folder (possibly in another project) to which to change the current working directory, default is "/" in the current project')
-cd_path_action.completer = DXPathCompleter(expected='folder')
-parser_cd.set_defaults(func=cd)
-register_parser(parser_cd, categories='fs')
+@lazy_parser('cd')
+def _build_cd_parser():
+    parser_cd = subparsers.add_parser('cd', help='Change the current working directory',
+                                      description='Change the current working directory', prog='dx cd',
+                                      parents=[env_args])
+    cd_path_action = parser_cd.add_argument('path', nargs='?', default='/',
+                                            help='Folder (possibly in another project) to which to change the current working directory, default is "/" in the current project')
+    cd_path_action.completer = DXPathCompleter(expected='folder')
+    parser_cd.set_defaults(func=cd)
+    register_parser(parser_cd, categories='fs')
 
 #####################################
 # cp
 #####################################
-parser_cp = subparsers.add_parser('cp', help='Copy objects and/or folders between different projects',
-                                  formatter_class=argparse.RawTextHelpFormatter,
-                                  description=fill('Copy objects and/or folders between different projects.  Folders will automatically be copied recursively.  To specify which project to use as a source or destination, prepend the path or ID of the object/folder with the project ID or name and a colon.') + '''
+@lazy_parser('cp')
+def _build_cp_parser():
+    from ..cli.cp import cp
+    parser_cp = subparsers.add_parser('cp', help='Copy objects and/or folders between different projects',
+                                      formatter_class=argparse.RawTextHelpFormatter,
+                                      description=fill('Copy objects and/or folders between different projects.  Folders will automatically be copied recursively.  To specify which project to use as a source or destination, prepend the path or ID of the object/folder with the project ID or name and a colon.') + '''
 
 EXAMPLES
 
@@ -3801,1257 +3916,1349 @@ EXAMPLES
   $ dx cp FirstProj:file-B0XBQFygpqGK8ZPjbk0Q000q .
   $ dx cp reads.fq.gz project-B0VK6F6gpqG6z7JGkbqQ000Q:/folder/path/newname.fq.gz
 ''',
-                                  prog='dx cp',
-                                  parents=[env_args, all_arg])
-cp_sources_action = parser_cp.add_argument('sources', help='Objects and/or folder names to copy', metavar='source',
-                                           nargs='+')
-cp_sources_action.completer = DXPathCompleter()
-parser_cp.add_argument('destination', help=fill('Folder into which to copy the sources or new pathname (if only one source is provided).  Must be in a different project/container than all source paths.', width_adjustment=-15))
-parser_cp.set_defaults(func=cp)
-register_parser(parser_cp, categories='fs')
+                                      prog='dx cp',
+                                      parents=[env_args, all_arg])
+    cp_sources_action = parser_cp.add_argument('sources', help='Objects and/or folder names to copy', metavar='source',
+                                               nargs='+')
+    cp_sources_action.completer = DXPathCompleter()
+    parser_cp.add_argument('destination', help=fill('Folder into which to copy the sources or new pathname (if only one source is provided).  Must be in a different project/container than all source paths.', width_adjustment=-15))
+    parser_cp.set_defaults(func=cp)
+    register_parser(parser_cp, categories='fs')
 
 #####################################
 # mv
 #####################################
-parser_mv = subparsers.add_parser('mv', help='Move or rename objects and/or folders inside a project',
-                                  formatter_class=argparse.RawTextHelpFormatter,
-                                  description=fill('Move or rename data objects and/or folders inside a single project.  To copy data between different projects, use \'dx cp\' instead.'),
-                                  prog='dx mv',
-                                  parents=[env_args, all_arg])
-mv_sources_action = parser_mv.add_argument('sources', help='Objects and/or folder names to move', metavar='source',
-                                           nargs='+')
-mv_sources_action.completer = DXPathCompleter()
-parser_mv.add_argument('destination', help=fill('Folder into which to move the sources or new pathname (if only one source is provided).  Must be in the same project/container as all source paths.', width_adjustment=-15))
-parser_mv.set_defaults(func=mv)
-register_parser(parser_mv, categories='fs')
+@lazy_parser('mv')
+def _build_mv_parser():
+    parser_mv = subparsers.add_parser('mv', help='Move or rename objects and/or folders inside a project',
+                                      formatter_class=argparse.RawTextHelpFormatter,
+                                      description=fill('Move or rename data objects and/or folders inside a single project.  To copy data between different projects, use \'dx cp\' instead.'),
+                                      prog='dx mv',
+                                      parents=[env_args, all_arg])
+    mv_sources_action = parser_mv.add_argument('sources', help='Objects and/or folder names to move', metavar='source',
+                                               nargs='+')
+    mv_sources_action.completer = DXPathCompleter()
+    parser_mv.add_argument('destination', help=fill('Folder into which to move the sources or new pathname (if only one source is provided).  Must be in the same project/container as all source paths.', width_adjustment=-15))
+    parser_mv.set_defaults(func=mv)
+    register_parser(parser_mv, categories='fs')
 
 #####################################
 # mkdir
 #####################################
-parser_mkdir = subparsers.add_parser('mkdir', help='Create a new folder',
-                                     description='Create a new folder', prog='dx mkdir',
-                                     parents=[env_args])
-parser_mkdir.add_argument('-p', '--parents', help='no error if existing, create parent directories as needed',
-                          action='store_true')
-mkdir_paths_action = parser_mkdir.add_argument('paths', help='Paths to folders to create', metavar='path', nargs='+')
-mkdir_paths_action.completer = DXPathCompleter(expected='folder')
-parser_mkdir.set_defaults(func=mkdir)
-register_parser(parser_mkdir, categories='fs')
+@lazy_parser('mkdir')
+def _build_mkdir_parser():
+    parser_mkdir = subparsers.add_parser('mkdir', help='Create a new folder',
+                                         description='Create a new folder', prog='dx mkdir',
+                                         parents=[env_args])
+    parser_mkdir.add_argument('-p', '--parents', help='no error if existing, create parent directories as needed',
+                              action='store_true')
+    mkdir_paths_action = parser_mkdir.add_argument('paths', help='Paths to folders to create', metavar='path', nargs='+')
+    mkdir_paths_action.completer = DXPathCompleter(expected='folder')
+    parser_mkdir.set_defaults(func=mkdir)
+    register_parser(parser_mkdir, categories='fs')
 
 #####################################
 # rmdir
 #####################################
-parser_rmdir = subparsers.add_parser('rmdir', help='Remove a folder',
-                                     description='Remove a folder', prog='dx rmdir',
-                                     parents=[env_args])
-rmdir_paths_action = parser_rmdir.add_argument('paths', help='Paths to folders to remove', metavar='path', nargs='+')
-rmdir_paths_action.completer = DXPathCompleter(expected='folder')
-parser_rmdir.set_defaults(func=rmdir)
-register_parser(parser_rmdir, categories='fs')
+@lazy_parser('rmdir')
+def _build_rmdir_parser():
+    parser_rmdir = subparsers.add_parser('rmdir', help='Remove a folder',
+                                         description='Remove a folder', prog='dx rmdir',
+                                         parents=[env_args])
+    rmdir_paths_action = parser_rmdir.add_argument('paths', help='Paths to folders to remove', metavar='path', nargs='+')
+    rmdir_paths_action.completer = DXPathCompleter(expected='folder')
+    parser_rmdir.set_defaults(func=rmdir)
+    register_parser(parser_rmdir, categories='fs')
 
 #####################################
 # rm
 #####################################
-parser_rm = subparsers.add_parser('rm', help='Remove data objects and folders',
-                                  description='Remove data objects and folders.', prog='dx rm',
-                                  parents=[env_args, all_arg])
-rm_paths_action = parser_rm.add_argument('paths', help='Paths to remove', metavar='path', nargs='+')
-rm_paths_action.completer = DXPathCompleter()
-parser_rm.add_argument('-r', '--recursive', help='Recurse into a directory', action='store_true')
-parser_rm.set_defaults(func=rm)
-register_parser(parser_rm, categories='fs')
+@lazy_parser('rm')
+def _build_rm_parser():
+    parser_rm = subparsers.add_parser('rm', help='Remove data objects and folders',
+                                      description='Remove data objects and folders.', prog='dx rm',
+                                      parents=[env_args, all_arg])
+    rm_paths_action = parser_rm.add_argument('paths', help='Paths to remove', metavar='path', nargs='+')
+    rm_paths_action.completer = DXPathCompleter()
+    parser_rm.add_argument('-r', '--recursive', help='Recurse into a directory', action='store_true')
+    parser_rm.set_defaults(func=rm)
+    register_parser(parser_rm, categories='fs')
 
-# data
+    # data
 
 #####################################
 # describe
 #####################################
-parser_describe = subparsers.add_parser('describe', help='Describe a remote object',
-                                        description=fill('Describe a DNAnexus entity.  Use this command to describe data objects by name or ID, jobs, apps, users, organizations, etc.  If using the "--json" flag, it will thrown an error if more than one match is found (but if you would like a JSON array of the describe hashes of all matches, then provide the "--multi" flag).  Otherwise, it will always display all results it finds.') + '\n\nNOTES:\n\n- ' + fill('The project found in the path is used as a HINT when you are using an object ID; you may still get a result if you have access to a copy of the object in some other project, but if it exists in the specified project, its description will be returned.') + '\n\n- ' + fill('When describing apps or applets, options marked as advanced inputs will be hidden unless --verbose is provided'),
-                                        formatter_class=argparse.RawTextHelpFormatter,
-                                        parents=[json_arg, no_color_arg, delim_arg, env_args],
-                                        prog='dx describe')
-parser_describe.add_argument('--details', help='Include details of data objects', action='store_true')
-parser_describe.add_argument('--verbose', help='Include all possible metadata', action='store_true')
-parser_describe.add_argument('--name', help='Only print the matching names, one per line', action='store_true')
-parser_describe.add_argument('--multi', help=fill('If the flag --json is also provided, then returns a JSON array of describe hashes of all matching results', width_adjustment=-24),
-                             action='store_true')
-describe_path_action = parser_describe.add_argument('path', help=fill('Object ID or path to an object (possibly in another project) to describe.', width_adjustment=-24))
-describe_path_action.completer = DXPathCompleter()
-parser_describe.set_defaults(func=describe)
-register_parser(parser_describe, categories=('data', 'metadata'))
+@lazy_parser('describe')
+def _build_describe_parser():
+    parser_describe = subparsers.add_parser('describe', help='Describe a remote object',
+                                            description=fill('Describe a DNAnexus entity.  Use this command to describe data objects by name or ID, jobs, apps, users, organizations, etc.  If using the "--json" flag, it will thrown an error if more than one match is found (but if you would like a JSON array of the describe hashes of all matches, then provide the "--multi" flag).  Otherwise, it will always display all results it finds.') + '\n\nNOTES:\n\n- ' + fill('The project found in the path is used as a HINT when you are using an object ID; you may still get a result if you have access to a copy of the object in some other project, but if it exists in the specified project, its description will be returned.') + '\n\n- ' + fill('When describing apps or applets, options marked as advanced inputs will be hidden unless --verbose is provided'),
+                                            formatter_class=argparse.RawTextHelpFormatter,
+                                            parents=[json_arg, no_color_arg, delim_arg, env_args],
+                                            prog='dx describe')
+    parser_describe.add_argument('--details', help='Include details of data objects', action='store_true')
+    parser_describe.add_argument('--verbose', help='Include all possible metadata', action='store_true')
+    parser_describe.add_argument('--name', help='Only print the matching names, one per line', action='store_true')
+    parser_describe.add_argument('--multi', help=fill('If the flag --json is also provided, then returns a JSON array of describe hashes of all matching results', width_adjustment=-24),
+                                 action='store_true')
+    describe_path_action = parser_describe.add_argument('path', help=fill('Object ID or path to an object (possibly in another project) to describe.', width_adjustment=-24))
+    describe_path_action.completer = DXPathCompleter()
+    parser_describe.set_defaults(func=describe)
+    register_parser(parser_describe, categories=('data', 'metadata'))
 
 #####################################
 # upload
 #####################################
-parser_upload = subparsers.add_parser('upload', help='Upload file(s) or directory',
-                                      description='Upload local file(s) or directory.  If "-" is provided, stdin will be used instead.  By default, the filename will be used as its new name.  If --path/--destination is provided with a path ending in a slash, the filename will be used, and the folder path will be used as a destination.  If it does not end in a slash, then it will be used as the final name.',
-                                      parents=[parser_dataobject_args, stdout_args, env_args],
-                                      prog="dx upload")
-upload_filename_action = parser_upload.add_argument('filename', nargs='+',
-                                                    help='Local file or directory to upload ("-" indicates stdin input); provide multiple times to upload multiple files or directories')
-upload_filename_action.completer = LocalCompleter()
-parser_upload.add_argument('-o', '--output', help=argparse.SUPPRESS) # deprecated; equivalent to --path/--destination
-parser_upload.add_argument('--path', '--destination',
-                           help=fill('DNAnexus path to upload file(s) to (default uses current project and folder if not provided)', width_adjustment=-24),
-                           nargs='?')
-parser_upload.add_argument('-r', '--recursive', help='Upload directories recursively', action='store_true')
-parser_upload.add_argument('--wait', help='Wait until the file has finished closing', action='store_true')
-parser_upload.add_argument('--no-progress', help='Do not show a progress bar', dest='show_progress',
-                           action='store_false', default=sys.stderr.isatty())
-parser_upload.add_argument('--buffer-size', help='Set the write buffer size (in bytes)', dest='write_buffer_size')
-parser_upload.set_defaults(func=upload, mute=False)
-register_parser(parser_upload, categories='data')
+@lazy_parser('upload')
+def _build_upload_parser():
+    parser_upload = subparsers.add_parser('upload', help='Upload file(s) or directory',
+                                          description='Upload local file(s) or directory.  If "-" is provided, stdin will be used instead.  By default, the filename will be used as its new name.  If --path/--destination is provided with a path ending in a slash, the filename will be used, and the folder path will be used as a destination.  If it does not end in a slash, then it will be used as the final name.',
+                                          parents=[parser_dataobject_args, stdout_args, env_args],
+                                          prog="dx upload")
+    upload_filename_action = parser_upload.add_argument('filename', nargs='+',
+                                                        help='Local file or directory to upload ("-" indicates stdin input); provide multiple times to upload multiple files or directories')
+    upload_filename_action.completer = LocalCompleter()
+    parser_upload.add_argument('-o', '--output', help=argparse.SUPPRESS) # deprecated; equivalent to --path/--destination
+    parser_upload.add_argument('--path', '--destination',
+                               help=fill('DNAnexus path to upload file(s) to (default uses current project and folder if not provided)', width_adjustment=-24),
+                               nargs='?')
+    parser_upload.add_argument('-r', '--recursive', help='Upload directories recursively', action='store_true')
+    parser_upload.add_argument('--wait', help='Wait until the file has finished closing', action='store_true')
+    parser_upload.add_argument('--no-progress', help='Do not show a progress bar', dest='show_progress',
+                               action='store_false', default=sys.stderr.isatty())
+    parser_upload.add_argument('--buffer-size', help='Set the write buffer size (in bytes)', dest='write_buffer_size')
+    parser_upload.set_defaults(func=upload, mute=False)
+    register_parser(parser_upload, categories='data')
 
 #####################################
 # download
 #####################################
-parser_download = subparsers.add_parser('download', help='Download file(s)',
-                                        description='Download the contents of a file object or multiple objects.  Use "-o -" to direct the output to stdout.',
-                                        prog='dx download',
-                                        parents=[env_args])
-parser_download_paths_arg = parser_download.add_argument('paths', help='Data object ID or name, or folder to download',
-                                                         nargs='+', metavar='path')
-parser_download_paths_arg.completer = DXPathCompleter(classes=['file'])
-parser_download.add_argument('-o', '--output', help='Local filename or directory to be used ("-" indicates stdout output); if not supplied or a directory is given, the object\'s name on the platform will be used, along with any applicable extensions')
-parser_download.add_argument('-f', '--overwrite', help='Resume an interupted download if the local and remote file signatures match.  If the signatures do not match the local file will be overwritten.', action='store_true')
-parser_download.add_argument('-r', '--recursive', help='Download folders recursively', action='store_true')
-parser_download.add_argument('-a', '--all', help='If multiple objects match the input, download all of them',
-                             action='store_true')
-parser_download.add_argument('--no-progress', help='Do not show a progress bar', dest='show_progress',
-                             action='store_false', default=sys.stderr.isatty())
-parser_download.set_defaults(func=download_or_cat)
-register_parser(parser_download, categories='data')
+@lazy_parser('download')
+def _build_download_parser():
+    parser_download = subparsers.add_parser('download', help='Download file(s)',
+                                            description='Download the contents of a file object or multiple objects.  Use "-o -" to direct the output to stdout.',
+                                            prog='dx download',
+                                            parents=[env_args])
+    parser_download_paths_arg = parser_download.add_argument('paths', help='Data object ID or name, or folder to download',
+                                                             nargs='+', metavar='path')
+    parser_download_paths_arg.completer = DXPathCompleter(classes=['file'])
+    parser_download.add_argument('-o', '--output', help='Local filename or directory to be used ("-" indicates stdout output); if not supplied or a directory is given, the object\'s name on the platform will be used, along with any applicable extensions')
+    parser_download.add_argument('-f', '--overwrite', help='Resume an interupted download if the local and remote file signatures match.  If the signatures do not match the local file will be overwritten.', action='store_true')
+    parser_download.add_argument('-r', '--recursive', help='Download folders recursively', action='store_true')
+    parser_download.add_argument('-a', '--all', help='If multiple objects match the input, download all of them',
+                                 action='store_true')
+    parser_download.add_argument('--no-progress', help='Do not show a progress bar', dest='show_progress',
+                                 action='store_false', default=sys.stderr.isatty())
+    parser_download.set_defaults(func=download_or_cat)
+    register_parser(parser_download, categories='data')
 
 #####################################
 # make_download_url
 #####################################
-parser_make_download_url = subparsers.add_parser('make_download_url', help='Create a file download link for sharing',
-                                                 description='Creates a pre-authenticated link that can be used to download a file without logging in.',
-                                                 prog='dx make_download_url')
-path_action = parser_make_download_url.add_argument('path', help='Data object ID or name to access')
-path_action.completer = DXPathCompleter(classes=['file'])
-parser_make_download_url.add_argument('--duration', help='Time for which the URL will remain valid (in seconds, or use suffix s, m, h, d, w, M, y). Default: 1 day')
-parser_make_download_url.add_argument('--filename', help='Name that the server will instruct the client to save the file as (default is the filename)')
-parser_make_download_url.set_defaults(func=make_download_url)
-register_parser(parser_make_download_url, categories='data')
+@lazy_parser('make_download_url')
+def _build_make_download_url_parser():
+    parser_make_download_url = subparsers.add_parser('make_download_url', help='Create a file download link for sharing',
+                                                     description='Creates a pre-authenticated link that can be used to download a file without logging in.',
+                                                     prog='dx make_download_url')
+    path_action = parser_make_download_url.add_argument('path', help='Data object ID or name to access')
+    path_action.completer = DXPathCompleter(classes=['file'])
+    parser_make_download_url.add_argument('--duration', help='Time for which the URL will remain valid (in seconds, or use suffix s, m, h, d, w, M, y). Default: 1 day')
+    parser_make_download_url.add_argument('--filename', help='Name that the server will instruct the client to save the file as (default is the filename)')
+    parser_make_download_url.set_defaults(func=make_download_url)
+    register_parser(parser_make_download_url, categories='data')
 
 #####################################
 # cat
 #####################################
-parser_cat = subparsers.add_parser('cat', help='Print file(s) to stdout', prog='dx cat',
-                                   parents=[env_args])
-cat_path_action = parser_cat.add_argument('path', help='File ID or name(s) to print to stdout', nargs='+')
-cat_path_action.completer = DXPathCompleter(classes=['file'])
-parser_cat.set_defaults(func=cat)
-register_parser(parser_cat, categories='data')
+@lazy_parser('cat')
+def _build_cat_parser():
+    parser_cat = subparsers.add_parser('cat', help='Print file(s) to stdout', prog='dx cat',
+                                       parents=[env_args])
+    cat_path_action = parser_cat.add_argument('path', help='File ID or name(s) to print to stdout', nargs='+')
+    cat_path_action.completer = DXPathCompleter(classes=['file'])
+    parser_cat.set_defaults(func=cat)
+    register_parser(parser_cat, categories='data')
 
 #####################################
 # head
 #####################################
-parser_head = subparsers.add_parser('head',
-                                    help='Print part of a file',
-                                    description='Print the first part of a file.  By default, prints the first 10 lines.',
-                                    parents=[no_color_arg, env_args],
-                                    prog='dx head')
-parser_head.add_argument('-n', '--lines', type=int, metavar='N', help='Print the first N lines (default 10)',
-                         default=10)
-head_gtable_args = parser_head.add_argument_group(title='GTable-specific options')
-head_gtable_args.add_argument('-w', '--max-col-width', type=int, help=argparse.SUPPRESS,
-                              #help='Maximum width of each column to display',
-                              default=32)
-head_gtable_args.add_argument('--starting', type=int, help=argparse.SUPPRESS,
-                              #help='Specify starting row ID',
-                              default=0)
-head_gtable_args.add_argument('--gri', nargs=3, metavar=('CHR', 'LO', 'HI'), help=argparse.SUPPRESS)
-                              #help='Specify chromosome name, low coordinate, and high coordinate for Genomic Range Index')
-head_gtable_args.add_argument('--gri-mode', help=argparse.SUPPRESS,
-                              #help='Specify the mode of the GRI query (\'overlap\' or \'enclose\'; default \'overlap\')',
-                              default="overlap")
-head_gtable_args.add_argument('--gri-name', help=argparse.SUPPRESS,
-                              #help='Override the default name of the Genomic Range Index (default: "gri"))',
-                              default="gri")
-head_path_action = parser_head.add_argument('path', help='File ID or name to access')
-head_path_action.completer = DXPathCompleter(classes=['file'])
-parser_head.set_defaults(func=head)
-register_parser(parser_head, categories='data')
+@lazy_parser('head')
+def _build_head_parser():
+    parser_head = subparsers.add_parser('head',
+                                        help='Print part of a file',
+                                        description='Print the first part of a file.  By default, prints the first 10 lines.',
+                                        parents=[no_color_arg, env_args],
+                                        prog='dx head')
+    parser_head.add_argument('-n', '--lines', type=int, metavar='N', help='Print the first N lines (default 10)',
+                             default=10)
+    head_gtable_args = parser_head.add_argument_group(title='GTable-specific options')
+    head_gtable_args.add_argument('-w', '--max-col-width', type=int, help=argparse.SUPPRESS,
+                                  #help='Maximum width of each column to display',
+                                  default=32)
+    head_gtable_args.add_argument('--starting', type=int, help=argparse.SUPPRESS,
+                                  #help='Specify starting row ID',
+                                  default=0)
+    head_gtable_args.add_argument('--gri', nargs=3, metavar=('CHR', 'LO', 'HI'), help=argparse.SUPPRESS)
+                                  #help='Specify chromosome name, low coordinate, and high coordinate for Genomic Range Index')
+    head_gtable_args.add_argument('--gri-mode', help=argparse.SUPPRESS,
+                                  #help='Specify the mode of the GRI query (\'overlap\' or \'enclose\'; default \'overlap\')',
+                                  default="overlap")
+    head_gtable_args.add_argument('--gri-name', help=argparse.SUPPRESS,
+                                  #help='Override the default name of the Genomic Range Index (default: "gri"))',
+                                  default="gri")
+    head_path_action = parser_head.add_argument('path', help='File ID or name to access')
+    head_path_action.completer = DXPathCompleter(classes=['file'])
+    parser_head.set_defaults(func=head)
+    register_parser(parser_head, categories='data')
 
 #####################################
 # export
 #####################################
-parser_export = subparsers.add_parser('export',
-                                      help='Export (download and convert) a gtable into a local file',
-                                      description=fill('Export a GenomicTable into a local file with a particular file format.') + '\n\n' + fill('For more details on how to convert into a particular format, run ') + '\n  $ dx help export <format>' + '\n\nSupported formats:\n\n  ' + '\n  '.join(sorted(exporters)),
-                                      formatter_class=argparse.RawTextHelpFormatter,
-                                      prog='dx export',
-                                      parents=[env_args])
-parser_export.add_argument('format', help='Format to export to')
-parser_export.add_argument('exporter_args', help=fill('Arguments passed to the exporter', width_adjustment=-24),
-                           nargs=argparse.REMAINDER)
-parser_export.set_defaults(func=export)
-register_parser(parser_export, categories='data')
+@lazy_parser('export')
+def _build_export_parser():
+    parser_export = subparsers.add_parser('export',
+                                          help='Export (download and convert) a gtable into a local file',
+                                          description=fill('Export a GenomicTable into a local file with a particular file format.') + '\n\n' + fill('For more details on how to convert into a particular format, run ') + '\n  $ dx help export <format>' + '\n\nSupported formats:\n\n  ' + '\n  '.join(sorted(exporters)),
+                                          formatter_class=argparse.RawTextHelpFormatter,
+                                          prog='dx export',
+                                          parents=[env_args])
+    parser_export.add_argument('format', help='Format to export to')
+    parser_export.add_argument('exporter_args', help=fill('Arguments passed to the exporter', width_adjustment=-24),
+                               nargs=argparse.REMAINDER)
+    parser_export.set_defaults(func=export)
+    register_parser(parser_export, categories='data')
 
 #####################################
 # build
 #####################################
-build_parser = subparsers.add_parser('build', help='Upload and build a new applet/app, or a workflow',
-                                     description='Build an applet, app, or workflow object from a local source directory.  You can use ' + BOLD("dx-app-wizard") + ' to generate a skeleton directory of an app/applet with the necessary files.',
-                                     prog='dx build',
-                                     parents=[env_args])
-
-app_options = build_parser.add_argument_group('options for creating apps', '(Only valid when --app/--create-app is specified)')
-applet_and_workflow_options = build_parser.add_argument_group('options for creating applets or workflows', '(Only valid when --app/--create-app is NOT specified)')
-
-# COMMON OPTIONS
-build_parser.add_argument("--ensure-upload", help="If specified, will bypass computing checksum of " +
-                                            "resources directory and upload it unconditionally; " +
-                                            "by default, will compute checksum and upload only if " +
-                                            "it differs from a previously uploaded resources bundle.",
-                    action="store_true")
-build_parser.add_argument("--force-symlinks", help="If specified, will not attempt to dereference "+
-                                            "symbolic links pointing outside of the resource " +
-                                            "directory.  By default, any symlinks within the resource " +
-                                            "directory are kept as links while links to files " +
-                                            "outside the resource directory are dereferenced (note "+
-                                            "that links to directories outside of the resource directory " +
-                                            "will cause an error).",
-                    action="store_true")
-
-src_dir_action = build_parser.add_argument("src_dir", help="App, applet, or workflow source directory (default: current directory)", nargs='?')
-src_dir_action.completer = LocalCompleter()
-
-build_parser.add_argument("--app", "--create-app", help="Create an app.", action="store_const", dest="mode", const="app")
-build_parser.add_argument("--create-applet", help=argparse.SUPPRESS, action="store_const", dest="mode", const="applet")
-build_parser.add_argument("--workflow", "--create-workflow", help="Create a workflow.", action="store_const", dest="mode", const="workflow")
-
-applet_and_workflow_options.add_argument("-d", "--destination", help="Specifies the destination project, destination folder, and/or name for the applet, in the form [PROJECT_NAME_OR_ID:][/[FOLDER/][NAME]]. Overrides the project, folder, and name fields of the dxapp.json or dxworkflow.json, if they were supplied.", default='.')
-
-# --[no-]dry-run
-#
-# The --dry-run flag can be used to see the applet spec that would be
-# provided to /applet/new, for debugging purposes. However, the output
-# would deviate from that of a real run in the following ways:
-#
-# * Any bundled resources are NOT uploaded and are not reflected in the
-#   app(let) spec.
-# * No temporary project is created (if building an app) and the
-#   "project" field is not set in the app spec.
-build_parser.set_defaults(dry_run=False)
-build_parser.add_argument("--dry-run", "-n", help="Do not create an app(let): only perform local checks and compilation steps, and show the spec of the app(let) that would have been created.", action="store_true", dest="dry_run")
-build_parser.add_argument("--no-dry-run", help=argparse.SUPPRESS, action="store_false", dest="dry_run")
-
-# --[no-]publish
-app_options.set_defaults(publish=False)
-app_options.add_argument("--publish", help="Publish the resulting app and make it the default.", action="store_true",
-                         dest="publish")
-app_options.add_argument("--no-publish", help=argparse.SUPPRESS, action="store_false", dest="publish")
-
-
-# --[no-]remote
-build_parser.set_defaults(remote=False)
-build_parser.add_argument("--remote", help="Build the app remotely by uploading the source directory to the DNAnexus Platform and building it there. This option is useful if you would otherwise need to cross-compile the app(let) to target the Execution Environment.", action="store_true", dest="remote")
-build_parser.add_argument("--no-watch", help="Don't watch the real-time logs of the remote builder. (This option only applicable if --remote was specified).", action="store_false", dest="watch")
-build_parser.add_argument("--no-remote", help=argparse.SUPPRESS, action="store_false", dest="remote")
-
-applet_and_workflow_options.add_argument("-f", "--overwrite", help="Remove existing applet(s) of the same name in the destination folder. This option is not yet supported for workflows.",
-                            action="store_true", default=False)
-applet_and_workflow_options.add_argument("-a", "--archive", help="Archive existing applet(s) of the same name in the destination folder. This option is not yet supported for workflows.",
-                            action="store_true", default=False)
-build_parser.add_argument("-v", "--version", help="Override the version number supplied in the manifest.", default=None,
-                    dest="version_override", metavar='VERSION')
-app_options.add_argument("-b", "--bill-to", help="Entity (of the form user-NAME or org-ORGNAME) to bill for the app.",
-                         default=None, dest="bill_to", metavar='USER_OR_ORG')
-
-# --[no-]check-syntax
-build_parser.set_defaults(check_syntax=True)
-build_parser.add_argument("--check-syntax", help=argparse.SUPPRESS, action="store_true", dest="check_syntax")
-build_parser.add_argument("--no-check-syntax", help="Warn but do not fail when syntax problems are found (default is to fail on such errors)", action="store_false", dest="check_syntax")
-
-# --[no-]version-autonumbering
-app_options.set_defaults(version_autonumbering=True)
-app_options.add_argument("--version-autonumbering", help=argparse.SUPPRESS, action="store_true", dest="version_autonumbering")
-app_options.add_argument("--no-version-autonumbering", help="Only attempt to create the version number supplied in the manifest (that is, do not try to create an autonumbered version such as 1.2.3+git.ab1b1c1d if 1.2.3 already exists and is published).", action="store_false", dest="version_autonumbering")
-# --[no-]update
-app_options.set_defaults(update=True)
-app_options.add_argument("--update", help=argparse.SUPPRESS, action="store_true", dest="update")
-app_options.add_argument("--no-update", help="Never update an existing unpublished app in place.", action="store_false", dest="update")
-# --[no-]dx-toolkit-autodep
-build_parser.set_defaults(dx_toolkit_autodep="stable")
-build_parser.add_argument("--dx-toolkit-legacy-git-autodep", help=argparse.SUPPRESS, action="store_const", dest="dx_toolkit_autodep", const="git")
-build_parser.add_argument("--dx-toolkit-stable-autodep", help=argparse.SUPPRESS, action="store_const", dest="dx_toolkit_autodep", const="stable")
-build_parser.add_argument("--dx-toolkit-autodep", help=argparse.SUPPRESS, action="store_const", dest="dx_toolkit_autodep", const="stable")
-build_parser.add_argument("--no-dx-toolkit-autodep", help="Do not auto-insert the dx-toolkit dependency (default is to add it if it would otherwise be absent from the runSpec)", action="store_false", dest="dx_toolkit_autodep")
-
-# --[no-]parallel-build
-build_parser.set_defaults(parallel_build=True)
-build_parser.add_argument("--parallel-build", help=argparse.SUPPRESS, action="store_true", dest="parallel_build")
-build_parser.add_argument("--no-parallel-build", help="Build with " + BOLD("make") + " instead of " + BOLD("make -jN") + ".", action="store_false",
-                    dest="parallel_build")
-
-app_options.set_defaults(use_temp_build_project=True)
-# Original help: "When building an app, build its applet in the current project instead of a temporary project".
-app_options.add_argument("--no-temp-build-project", help=argparse.SUPPRESS, action="store_false", dest="use_temp_build_project")
-
-# --yes
-app_options.add_argument('-y', '--yes', dest='confirm', help='Do not ask for confirmation for potentially dangerous operations', action='store_false')
-
-# --[no-]json (undocumented): dumps the JSON describe of the app or
-# applet that was created. Useful for tests.
-build_parser.set_defaults(json=False)
-build_parser.add_argument("--json", help=argparse.SUPPRESS, action="store_true", dest="json")
-build_parser.add_argument("--no-json", help=argparse.SUPPRESS, action="store_false", dest="json")
-
-build_parser.add_argument("--extra-args", help="Arguments (in JSON format) to pass to the /applet/new API method, overriding all other settings")
-build_parser.add_argument("--run", help="Run the app or applet after building it (options following this are passed to "+BOLD("dx run")+"; run at high priority by default)", nargs=argparse.REMAINDER)
-
-# --region
-app_options.add_argument("--region", action="append", help="Enable the app in this region. This flag can be specified multiple times to enable the app in multiple regions. If --region is not specified, then the enabled region(s) will be determined by 'regionalOptions' in dxapp.json, or the project context.")
-
-build_parser.set_defaults(func=build)
-register_parser(build_parser, categories='exec')
+@lazy_parser('build')
+def _build_build_parser():
+    build_parser = subparsers.add_parser('build', help='Upload and build a new applet/app, or a workflow',
+                                         description='Build an applet, app, or workflow object from a local source directory.  You can use ' + BOLD("dx-app-wizard") + ' to generate a skeleton directory of an app/applet with the necessary files.',
+                                         prog='dx build',
+                                         parents=[env_args])
+
+    app_options = build_parser.add_argument_group('options for creating apps', '(Only valid when --app/--create-app is specified)')
+    applet_and_workflow_options = build_parser.add_argument_group('options for creating applets or workflows', '(Only valid when --app/--create-app is NOT specified)')
+
+    # COMMON OPTIONS
+    build_parser.add_argument("--ensure-upload", help="If specified, will bypass computing checksum of " +
+                                                "resources directory and upload it unconditionally; " +
+                                                "by default, will compute checksum and upload only if " +
+                                                "it differs from a previously uploaded resources bundle.",
+                        action="store_true")
+    build_parser.add_argument("--force-symlinks", help="If specified, will not attempt to dereference "+
+                                                "symbolic links pointing outside of the resource " +
+                                                "directory.  By default, any symlinks within the resource " +
+                                                "directory are kept as links while links to files " +
+                                                "outside the resource directory are dereferenced (note "+
+                                                "that links to directories outside of the resource directory " +
+                                                "will cause an error).",
+                        action="store_true")
+
+    src_dir_action = build_parser.add_argument("src_dir", help="App, applet, or workflow source directory (default: current directory)", nargs='?')
+    src_dir_action.completer = LocalCompleter()
+
+    build_parser.add_argument("--app", "--create-app", help="Create an app.", action="store_const", dest="mode", const="app")
+    build_parser.add_argument("--create-applet", help=argparse.SUPPRESS, action="store_const", dest="mode", const="applet")
+    build_parser.add_argument("--workflow", "--create-workflow", help="Create a workflow.", action="store_const", dest="mode", const="workflow")
+
+    applet_and_workflow_options.add_argument("-d", "--destination", help="Specifies the destination project, destination folder, and/or name for the applet, in the form [PROJECT_NAME_OR_ID:][/[FOLDER/][NAME]]. Overrides the project, folder, and name fields of the dxapp.json or dxworkflow.json, if they were supplied.", default='.')
+
+    # --[no-]dry-run
+    #
+    # The --dry-run flag can be used to see the applet spec that would be
+    # provided to /applet/new, for debugging purposes. However, the output
+    # would deviate from that of a real run in the following ways:
+    #
+    # * Any bundled resources are NOT uploaded and are not reflected in the
+    #   app(let) spec.
+    # * No temporary project is created (if building an app) and the
+    #   "project" field is not set in the app spec.
+    build_parser.set_defaults(dry_run=False)
+    build_parser.add_argument("--dry-run", "-n", help="Do not create an app(let): only perform local checks and compilation steps, and show the spec of the app(let) that would have been created.", action="store_true", dest="dry_run")
+    build_parser.add_argument("--no-dry-run", help=argparse.SUPPRESS, action="store_false", dest="dry_run")
+
+    # --[no-]publish
+    app_options.set_defaults(publish=False)
+    app_options.add_argument("--publish", help="Publish the resulting app and make it the default.", action="store_true",
+                             dest="publish")
+    app_options.add_argument("--no-publish", help=argparse.SUPPRESS, action="store_false", dest="publish")
+
+
+    # --[no-]remote
+    build_parser.set_defaults(remote=False)
+    build_parser.add_argument("--remote", help="Build the app remotely by uploading the source directory to the DNAnexus Platform and building it there. This option is useful if you would otherwise need to cross-compile the app(let) to target the Execution Environment.", action="store_true", dest="remote")
+    build_parser.add_argument("--no-watch", help="Don't watch the real-time logs of the remote builder. (This option only applicable if --remote was specified).", action="store_false", dest="watch")
+    build_parser.add_argument("--no-remote", help=argparse.SUPPRESS, action="store_false", dest="remote")
+
+    applet_and_workflow_options.add_argument("-f", "--overwrite", help="Remove existing applet(s) of the same name in the destination folder. This option is not yet supported for workflows.",
+                                action="store_true", default=False)
+    applet_and_workflow_options.add_argument("-a", "--archive", help="Archive existing applet(s) of the same name in the destination folder. This option is not yet supported for workflows.",
+                                action="store_true", default=False)
+    build_parser.add_argument("-v", "--version", help="Override the version number supplied in the manifest.", default=None,
+                        dest="version_override", metavar='VERSION')
+    app_options.add_argument("-b", "--bill-to", help="Entity (of the form user-NAME or org-ORGNAME) to bill for the app.",
+                             default=None, dest="bill_to", metavar='USER_OR_ORG')
+
+    # --[no-]check-syntax
+    build_parser.set_defaults(check_syntax=True)
+    build_parser.add_argument("--check-syntax", help=argparse.SUPPRESS, action="store_true", dest="check_syntax")
+    build_parser.add_argument("--no-check-syntax", help="Warn but do not fail when syntax problems are found (default is to fail on such errors)", action="store_false", dest="check_syntax")
+
+    # --[no-]version-autonumbering
+    app_options.set_defaults(version_autonumbering=True)
+    app_options.add_argument("--version-autonumbering", help=argparse.SUPPRESS, action="store_true", dest="version_autonumbering")
+    app_options.add_argument("--no-version-autonumbering", help="Only attempt to create the version number supplied in the manifest (that is, do not try to create an autonumbered version such as 1.2.3+git.ab1b1c1d if 1.2.3 already exists and is published).", action="store_false", dest="version_autonumbering")
+    # --[no-]update
+    app_options.set_defaults(update=True)
+    app_options.add_argument("--update", help=argparse.SUPPRESS, action="store_true", dest="update")
+    app_options.add_argument("--no-update", help="Never update an existing unpublished app in place.", action="store_false", dest="update")
+    # --[no-]dx-toolkit-autodep
+    build_parser.set_defaults(dx_toolkit_autodep="stable")
+    build_parser.add_argument("--dx-toolkit-legacy-git-autodep", help=argparse.SUPPRESS, action="store_const", dest="dx_toolkit_autodep", const="git")
+    build_parser.add_argument("--dx-toolkit-stable-autodep", help=argparse.SUPPRESS, action="store_const", dest="dx_toolkit_autodep", const="stable")
+    build_parser.add_argument("--dx-toolkit-autodep", help=argparse.SUPPRESS, action="store_const", dest="dx_toolkit_autodep", const="stable")
+    build_parser.add_argument("--no-dx-toolkit-autodep", help="Do not auto-insert the dx-toolkit dependency (default is to add it if it would otherwise be absent from the runSpec)", action="store_false", dest="dx_toolkit_autodep")
+
+    # --[no-]parallel-build
+    build_parser.set_defaults(parallel_build=True)
+    build_parser.add_argument("--parallel-build", help=argparse.SUPPRESS, action="store_true", dest="parallel_build")
+    build_parser.add_argument("--no-parallel-build", help="Build with " + BOLD("make") + " instead of " + BOLD("make -jN") + ".", action="store_false",
+                        dest="parallel_build")
+
+    app_options.set_defaults(use_temp_build_project=True)
+    # Original help: "When building an app, build its applet in the current project instead of a temporary project".
+    app_options.add_argument("--no-temp-build-project", help=argparse.SUPPRESS, action="store_false", dest="use_temp_build_project")
+
+    # --yes
+    app_options.add_argument('-y', '--yes', dest='confirm', help='Do not ask for confirmation for potentially dangerous operations', action='store_false')
+
+    # --[no-]json (undocumented): dumps the JSON describe of the app or
+    # applet that was created. Useful for tests.
+    build_parser.set_defaults(json=False)
+    build_parser.add_argument("--json", help=argparse.SUPPRESS, action="store_true", dest="json")
+    build_parser.add_argument("--no-json", help=argparse.SUPPRESS, action="store_false", dest="json")
+
+    build_parser.add_argument("--extra-args", help="Arguments (in JSON format) to pass to the /applet/new API method, overriding all other settings")
+    build_parser.add_argument("--run", help="Run the app or applet after building it (options following this are passed to "+BOLD("dx run")+"; run at high priority by default)", nargs=argparse.REMAINDER)
+
+    # --region
+    app_options.add_argument("--region", action="append", help="Enable the app in this region. This flag can be specified multiple times to enable the app in multiple regions. If --region is not specified, then the enabled region(s) will be determined by 'regionalOptions' in dxapp.json, or the project context.")
+
+    build_parser.set_defaults(func=build)
+    register_parser(build_parser, categories='exec')
 
 #####################################
 # build_asset
 #####################################
-from ..asset_builder import build_asset
-parser_build_asset = subparsers.add_parser(
-    "build_asset",
-    help='Build an asset bundle',
-    formatter_class=argparse.RawTextHelpFormatter,
-    description=fill('Build an asset from a local source directory. The directory must have a file called '
-         '"dxasset.json" containing valid JSON. For more details, see '
-         '\n\nhttps://wiki.dnanexus.com/Developer-Tutorials/Asset-Build-Process'),
-    prog="dx build_asset")
-parser_build_asset.add_argument("src_dir", help="Asset source directory (default: current directory)", nargs='?')
-parser_build_asset.add_argument("-d", "--destination",
-                                help=fill("Specifies the destination project and destination folder for the asset,"
-                                          " in the form [PROJECT_NAME_OR_ID:][/[FOLDER/][NAME]]"),
-                                default='.')
-parser_build_asset.add_argument("--json", help=fill("Show ID of resulting asset bundle in JSON format"),
-                                action="store_true", dest="json")
-parser_build_asset.add_argument("--no-watch", help=fill("Don't watch the real-time logs of the asset-builder job."),
-                                action="store_false", dest="watch")
-parser_build_asset.set_defaults(func=build_asset)
-register_parser(parser_build_asset)
+@lazy_parser('build_asset')
+def _build_build_asset_parser():
+    from ..asset_builder import build_asset
+    parser_build_asset = subparsers.add_parser(
+        "build_asset",
+        help='Build an asset bundle',
+        formatter_class=argparse.RawTextHelpFormatter,
+        description=fill('Build an asset from a local source directory. The directory must have a file called '
+             '"dxasset.json" containing valid JSON. For more details, see '
+             '\n\nhttps://wiki.dnanexus.com/Developer-Tutorials/Asset-Build-Process'),
+        prog="dx build_asset")
+    parser_build_asset.add_argument("src_dir", help="Asset source directory (default: current directory)", nargs='?')
+    parser_build_asset.add_argument("-d", "--destination",
+                                    help=fill("Specifies the destination project and destination folder for the asset,"
+                                              " in the form [PROJECT_NAME_OR_ID:][/[FOLDER/][NAME]]"),
+                                    default='.')
+    parser_build_asset.add_argument("--json", help=fill("Show ID of resulting asset bundle in JSON format"),
+                                    action="store_true", dest="json")
+    parser_build_asset.add_argument("--no-watch", help=fill("Don't watch the real-time logs of the asset-builder job."),
+                                    action="store_false", dest="watch")
+    parser_build_asset.set_defaults(func=build_asset)
+    register_parser(parser_build_asset)
 
 #####################################
 # add
 #####################################
-parser_add = subparsers.add_parser('add', help='Add one or more items to a list',
-                                   description='Use this command with one of the availabile subcommands to perform various actions such as adding other users to the list of developers or authorized users of an app',
-                                   prog='dx add')
-subparsers_add = parser_add.add_subparsers(parser_class=DXArgumentParser)
-subparsers_add.metavar = 'list_type'
-register_parser(parser_add, categories=())
-
-parser_add_users = subparsers_add.add_parser('users', help='Add authorized users for an app',
-                                             description='Add users or orgs to the list of authorized users of an app.  Published versions of the app will only be accessible to users represented by this list and to developers of the app.  Unpublished versions are restricted to the developers.',
-                                             prog='dx add users', parents=[env_args])
-parser_add_users.add_argument('app', help='Name or ID of an app').completer = DXAppCompleter(installed=True)
-parser_add_users.add_argument('users', metavar='authorizedUser',
-                              help='One or more users or orgs to add',
-                              nargs='+')
-parser_add_users.set_defaults(func=add_users)
-register_parser(parser_add_users, subparsers_action=subparsers_add, categories='exec')
-
-parser_add_developers = subparsers_add.add_parser('developers', help='Add developers for an app',
-                                                  description='Add users to the list of developers for an app.  Developers are able to build and publish new versions of the app, and add or remove others from the list of developers and authorized users.',
-                                                  prog='dx add developers', parents=[env_args])
-parser_add_developers.add_argument('app', help='Name or ID of an app').completer = DXAppCompleter(installed=True)
-parser_add_developers.add_argument('developers', metavar='developer', help='One or more users to add',
-                              nargs='+')
-parser_add_developers.set_defaults(func=add_developers)
-register_parser(parser_add_developers, subparsers_action=subparsers_add, categories='exec')
-
-parser_add_stage = subparsers_add.add_parser('stage', help='Add a stage to a workflow',
-                                             description='Add a stage to a workflow.  Default inputs for the stage can also be set at the same time.',
-                                             parents=[exec_input_args, stdout_args, env_args,
-                                                      instance_type_arg],
-                                             prog='dx add stage')
-parser_add_stage.add_argument('workflow', help='Name or ID of a workflow').completer = DXPathCompleter(classes=['workflow'])
-parser_add_stage.add_argument('executable', help='Name or ID of an executable to add as a stage in the workflow').completer = MultiCompleter([DXAppCompleter(),
-                                                                                                                                              DXPathCompleter(classes=['applet'])])
-parser_add_stage.add_argument('--alias', '--version', '--tag', dest='alias',
-                              help='Tag or version of the app to add if the executable is an app (default: "default" if an app)')
-parser_add_stage.add_argument('--name', help='Stage name')
-parser_add_stage.add_argument('--id',  dest='stage_id', help='Stage ID')
-add_stage_folder_args = parser_add_stage.add_mutually_exclusive_group()
-add_stage_folder_args.add_argument('--output-folder', help='Path to the output folder for the stage (interpreted as an absolute path)')
-add_stage_folder_args.add_argument('--relative-output-folder', help='A relative folder path for the stage (interpreted as relative to the workflow\'s output folder)')
-parser_add_stage.set_defaults(func=workflow_cli.add_stage)
-register_parser(parser_add_stage, subparsers_action=subparsers_add, categories='workflow')
-
-parser_add_member = subparsers_add.add_parser("member", help="Grant a user membership to an org", description="Grant a user membership to an org", prog="dx add member", parents=[stdout_args, env_args])
-parser_add_member.add_argument("org_id", help="ID of the org")
-parser_add_member.add_argument("username_or_user_id", help="Username or ID of user")
-parser_add_member.add_argument("--level", required=True, choices=["ADMIN", "MEMBER"], help="Org membership level that will be granted to the specified user")
-parser_add_member.add_argument("--allow-billable-activities", default=False, action="store_true", help='Grant the specified user "allowBillableActivities" in the org')
-parser_add_member.add_argument("--no-app-access", default=True, action="store_false", dest="app_access", help='Disable "appAccess" for the specified user in the org')
-parser_add_member.add_argument("--project-access", choices=["ADMINISTER", "CONTRIBUTE", "UPLOAD", "VIEW", "NONE"], default="CONTRIBUTE", help='The default implicit maximum permission the specified user will receive to projects explicitly shared with the org; default CONTRIBUTE')
-parser_add_member.add_argument("--no-email", default=False, action="store_true", help="Disable org invitation email notification to the specified user")
-parser_add_member.set_defaults(func=add_membership)
-register_parser(parser_add_member, subparsers_action=subparsers_add, categories="org")
+@lazy_parser('add')
+def _build_add_parser():
+    from ..cli import workflow as workflow_cli
+    from ..cli.org import add_membership
+    parser_add = subparsers.add_parser('add', help='Add one or more items to a list',
+                                       description='Use this command with one of the availabile subcommands to perform various actions such as adding other users to the list of developers or authorized users of an app',
+                                       prog='dx add')
+    subparsers_add = parser_add.add_subparsers(parser_class=DXArgumentParser)
+    subparsers_add.metavar = 'list_type'
+    register_parser(parser_add, categories=())
+
+    parser_add_users = subparsers_add.add_parser('users', help='Add authorized users for an app',
+                                                 description='Add users or orgs to the list of authorized users of an app.  Published versions of the app will only be accessible to users represented by this list and to developers of the app.  Unpublished versions are restricted to the developers.',
+                                                 prog='dx add users', parents=[env_args])
+    parser_add_users.add_argument('app', help='Name or ID of an app').completer = DXAppCompleter(installed=True)
+    parser_add_users.add_argument('users', metavar='authorizedUser',
+                                  help='One or more users or orgs to add',
+                                  nargs='+')
+    parser_add_users.set_defaults(func=add_users)
+    register_parser(parser_add_users, subparsers_action=subparsers_add, categories='exec')
+
+    parser_add_developers = subparsers_add.add_parser('developers', help='Add developers for an app',
+                                                      description='Add users to the list of developers for an app.  Developers are able to build and publish new versions of the app, and add or remove others from the list of developers and authorized users.',
+                                                      prog='dx add developers', parents=[env_args])
+    parser_add_developers.add_argument('app', help='Name or ID of an app').completer = DXAppCompleter(installed=True)
+    parser_add_developers.add_argument('developers', metavar='developer', help='One or more users to add',
+                                  nargs='+')
+    parser_add_developers.set_defaults(func=add_developers)
+    register_parser(parser_add_developers, subparsers_action=subparsers_add, categories='exec')
+
+    parser_add_stage = subparsers_add.add_parser('stage', help='Add a stage to a workflow',
+                                                 description='Add a stage to a workflow.  Default inputs for the stage can also be set at the same time.',
+                                                 parents=[exec_input_args, stdout_args, env_args,
+                                                          instance_type_arg],
+                                                 prog='dx add stage')
+    parser_add_stage.add_argument('workflow', help='Name or ID of a workflow').completer = DXPathCompleter(classes=['workflow'])
+    parser_add_stage.add_argument('executable', help='Name or ID of an executable to add as a stage in the workflow').completer = MultiCompleter([DXAppCompleter(),
+                                                                                                                                                  DXPathCompleter(classes=['applet'])])
+    parser_add_stage.add_argument('--alias', '--version', '--tag', dest='alias',
+                                  help='Tag or version of the app to add if the executable is an app (default: "default" if an app)')
+    parser_add_stage.add_argument('--name', help='Stage name')
+    parser_add_stage.add_argument('--id',  dest='stage_id', help='Stage ID')
+    add_stage_folder_args = parser_add_stage.add_mutually_exclusive_group()
+    add_stage_folder_args.add_argument('--output-folder', help='Path to the output folder for the stage (interpreted as an absolute path)')
+    add_stage_folder_args.add_argument('--relative-output-folder', help='A relative folder path for the stage (interpreted as relative to the workflow\'s output folder)')
+    parser_add_stage.set_defaults(func=workflow_cli.add_stage)
+    register_parser(parser_add_stage, subparsers_action=subparsers_add, categories='workflow')
+
+    parser_add_member = subparsers_add.add_parser("member", help="Grant a user membership to an org", description="Grant a user membership to an org", prog="dx add member", parents=[stdout_args, env_args])
+    parser_add_member.add_argument("org_id", help="ID of the org")
+    parser_add_member.add_argument("username_or_user_id", help="Username or ID of user")
+    parser_add_member.add_argument("--level", required=True, choices=["ADMIN", "MEMBER"], help="Org membership level that will be granted to the specified user")
+    parser_add_member.add_argument("--allow-billable-activities", default=False, action="store_true", help='Grant the specified user "allowBillableActivities" in the org')
+    parser_add_member.add_argument("--no-app-access", default=True, action="store_false", dest="app_access", help='Disable "appAccess" for the specified user in the org')
+    parser_add_member.add_argument("--project-access", choices=["ADMINISTER", "CONTRIBUTE", "UPLOAD", "VIEW", "NONE"], default="CONTRIBUTE", help='The default implicit maximum permission the specified user will receive to projects explicitly shared with the org; default CONTRIBUTE')
+    parser_add_member.add_argument("--no-email", default=False, action="store_true", help="Disable org invitation email notification to the specified user")
+    parser_add_member.set_defaults(func=add_membership)
+    register_parser(parser_add_member, subparsers_action=subparsers_add, categories="org")
 
 #####################################
 # list
 #####################################
-parser_list = subparsers.add_parser('list', help='Print the members of a list',
-                                   description='Use this command with one of the availabile subcommands to perform various actions such as printing the list of developers or authorized users of an app.',
-                                   prog='dx list')
-subparsers_list = parser_list.add_subparsers(parser_class=DXArgumentParser)
-subparsers_list.metavar = 'list_type'
-register_parser(parser_list, categories=())
-
-parser_list_users = subparsers_list.add_parser('users', help='List authorized users for an app',
-                                               description='List the authorized users of an app.  Published versions of the app will only be accessible to users represented by this list and to developers of the app.  Unpublished versions are restricted to the developers',
-                                               prog='dx list users', parents=[env_args])
-parser_list_users.add_argument('app', help='Name or ID of an app').completer = DXAppCompleter(installed=True)
-parser_list_users.set_defaults(func=list_users)
-register_parser(parser_list_users, subparsers_action=subparsers_list, categories='exec')
-
-parser_list_developers = subparsers_list.add_parser('developers', help='List developers for an app',
-                                                    description='List the developers for an app.  Developers are able to build and publish new versions of the app, and add or remove others from the list of developers and authorized users.',
-                                                    prog='dx list developers', parents=[env_args])
-parser_list_developers.add_argument('app', help='Name or ID of an app').completer = DXAppCompleter(installed=True)
-parser_list_developers.set_defaults(func=list_developers)
-register_parser(parser_list_developers, subparsers_action=subparsers_list, categories='exec')
-
-parser_list_stages = subparsers_list.add_parser('stages', help='List the stages in a workflow',
-                                                description='List the stages in a workflow.',
-                                                parents=[env_args],
-                                                prog='dx list stages')
-parser_list_stages.add_argument('workflow', help='Name or ID of a workflow').completer = DXPathCompleter(classes=['workflow'])
-parser_list_stages.set_defaults(func=workflow_cli.list_stages)
-register_parser(parser_list_stages, subparsers_action=subparsers_list, categories='workflow')
+@lazy_parser('list')
+def _build_list_parser():
+    from ..cli import workflow as workflow_cli
+    parser_list = subparsers.add_parser('list', help='Print the members of a list',
+                                       description='Use this command with one of the availabile subcommands to perform various actions such as printing the list of developers or authorized users of an app.',
+                                       prog='dx list')
+    subparsers_list = parser_list.add_subparsers(parser_class=DXArgumentParser)
+    subparsers_list.metavar = 'list_type'
+    register_parser(parser_list, categories=())
+
+    parser_list_users = subparsers_list.add_parser('users', help='List authorized users for an app',
+                                                   description='List the authorized users of an app.  Published versions of the app will only be accessible to users represented by this list and to developers of the app.  Unpublished versions are restricted to the developers',
+                                                   prog='dx list users', parents=[env_args])
+    parser_list_users.add_argument('app', help='Name or ID of an app').completer = DXAppCompleter(installed=True)
+    parser_list_users.set_defaults(func=list_users)
+    register_parser(parser_list_users, subparsers_action=subparsers_list, categories='exec')
+
+    parser_list_developers = subparsers_list.add_parser('developers', help='List developers for an app',
+                                                        description='List the developers for an app.  Developers are able to build and publish new versions of the app, and add or remove others from the list of developers and authorized users.',
+                                                        prog='dx list developers', parents=[env_args])
+    parser_list_developers.add_argument('app', help='Name or ID of an app').completer = DXAppCompleter(installed=True)
+    parser_list_developers.set_defaults(func=list_developers)
+    register_parser(parser_list_developers, subparsers_action=subparsers_list, categories='exec')
+
+    parser_list_stages = subparsers_list.add_parser('stages', help='List the stages in a workflow',
+                                                    description='List the stages in a workflow.',
+                                                    parents=[env_args],
+                                                    prog='dx list stages')
+    parser_list_stages.add_argument('workflow', help='Name or ID of a workflow').completer = DXPathCompleter(classes=['workflow'])
+    parser_list_stages.set_defaults(func=workflow_cli.list_stages)
+    register_parser(parser_list_stages, subparsers_action=subparsers_list, categories='workflow')
 
 #####################################
 # remove
 #####################################
-parser_remove = subparsers.add_parser('remove', help='Remove one or more items to a list',
-                                      description='Use this command with one of the available subcommands to perform various actions such as removing other users from the list of developers or authorized users of an app.',
-                                      prog='dx remove')
-subparsers_remove = parser_remove.add_subparsers(parser_class=DXArgumentParser)
-subparsers_remove.metavar = 'list_type'
-register_parser(parser_remove, categories=())
-
-parser_remove_users = subparsers_remove.add_parser('users', help='Remove authorized users for an app',
-                                                   description='Remove users or orgs from the list of authorized users of an app.  Published versions of the app will only be accessible to users represented by this list and to developers of the app.  Unpublished versions are restricted to the developers',
-                                                   prog='dx remove users', parents=[env_args])
-parser_remove_users.add_argument('app', help='Name or ID of an app').completer = DXAppCompleter(installed=True)
-parser_remove_users.add_argument('users', metavar='authorizedUser',
-                                 help='One or more users or orgs to remove',
-                                 nargs='+')
-parser_remove_users.set_defaults(func=remove_users)
-register_parser(parser_remove_users, subparsers_action=subparsers_remove, categories='exec')
-
-parser_remove_developers = subparsers_remove.add_parser('developers', help='Remove developers for an app',
-                                                        description='Remove users from the list of developers for an app.  Developers are able to build and publish new versions of the app, and add or remove others from the list of developers and authorized users.',
-                                                        prog='dx remove developers', parents=[env_args])
-parser_remove_developers.add_argument('app', help='Name or ID of an app').completer = DXAppCompleter(installed=True)
-parser_remove_developers.add_argument('developers', metavar='developer', help='One or more users to remove',
-                                      nargs='+')
-parser_remove_developers.set_defaults(func=remove_developers)
-register_parser(parser_remove_developers, subparsers_action=subparsers_remove, categories='exec')
-
-parser_remove_stage = subparsers_remove.add_parser('stage', help='Remove a stage from a workflow',
-                                                   description='Remove a stage from a workflow.  The stage should be indicated either by an integer (0-indexed, i.e. "0" for the first stage), or a stage ID.',
-                                                   parents=[stdout_args, env_args],
-                                                   prog='dx remove stage')
-parser_remove_stage.add_argument('workflow', help='Name or ID of a workflow').completer = DXPathCompleter(classes=['workflow'])
-parser_remove_stage.add_argument('stage', help='Stage (index or ID) of the workflow to remove')
-parser_remove_stage.set_defaults(func=workflow_cli.remove_stage)
-register_parser(parser_remove_stage, subparsers_action=subparsers_remove, categories='workflow')
-
-parser_remove_member = subparsers_remove.add_parser("member", help="Revoke the org membership of a user", description="Revoke the org membership of a user", prog="dx remove member", parents=[stdout_args, env_args])
-parser_remove_member.add_argument("org_id", help="ID of the org")
-parser_remove_member.add_argument("username_or_user_id", help="Username or ID of user")
-parser_remove_member.add_argument("--keep-explicit-project-permissions", default=True, action="store_false", dest="revoke_project_permissions", help="Disable revocation of explicit project permissions of the specified user to projects billed to the org; implicit project permissions (i.e. those granted to the specified user via his membership in this org) will always be revoked")
-parser_remove_member.add_argument("--keep-explicit-app-permissions", default=True, action="store_false", dest="revoke_app_permissions", help="Disable revocation of explicit app developer and user permissions of the specified user to apps billed to the org; implicit app permissions (i.e. those granted to the specified user via his membership in this org) will always be revoked")
-parser_remove_member.add_argument("-y", "--yes", action="store_false", dest="confirm", help="Do not ask for confirmation")
-parser_remove_member.set_defaults(func=remove_membership)
-register_parser(parser_remove_member, subparsers_action=subparsers_remove, categories="org")
+@lazy_parser('remove')
+def _build_remove_parser():
+    from ..cli import workflow as workflow_cli
+    from ..cli.org import remove_membership
+    parser_remove = subparsers.add_parser('remove', help='Remove one or more items to a list',
+                                          description='Use this command with one of the available subcommands to perform various actions such as removing other users from the list of developers or authorized users of an app.',
+                                          prog='dx remove')
+    subparsers_remove = parser_remove.add_subparsers(parser_class=DXArgumentParser)
+    subparsers_remove.metavar = 'list_type'
+    register_parser(parser_remove, categories=())
+
+    parser_remove_users = subparsers_remove.add_parser('users', help='Remove authorized users for an app',
+                                                       description='Remove users or orgs from the list of authorized users of an app.  Published versions of the app will only be accessible to users represented by this list and to developers of the app.  Unpublished versions are restricted to the developers',
+                                                       prog='dx remove users', parents=[env_args])
+    parser_remove_users.add_argument('app', help='Name or ID of an app').completer = DXAppCompleter(installed=True)
+    parser_remove_users.add_argument('users', metavar='authorizedUser',
+                                     help='One or more users or orgs to remove',
+                                     nargs='+')
+    parser_remove_users.set_defaults(func=remove_users)
+    register_parser(parser_remove_users, subparsers_action=subparsers_remove, categories='exec')
+
+    parser_remove_developers = subparsers_remove.add_parser('developers', help='Remove developers for an app',
+                                                            description='Remove users from the list of developers for an app.  Developers are able to build and publish new versions of the app, and add or remove others from the list of developers and authorized users.',
+                                                            prog='dx remove developers', parents=[env_args])
+    parser_remove_developers.add_argument('app', help='Name or ID of an app').completer = DXAppCompleter(installed=True)
+    parser_remove_developers.add_argument('developers', metavar='developer', help='One or more users to remove',
+                                          nargs='+')
+    parser_remove_developers.set_defaults(func=remove_developers)
+    register_parser(parser_remove_developers, subparsers_action=subparsers_remove, categories='exec')
+
+    parser_remove_stage = subparsers_remove.add_parser('stage', help='Remove a stage from a workflow',
+                                                       description='Remove a stage from a workflow.  The stage should be indicated either by an integer (0-indexed, i.e. "0" for the first stage), or a stage ID.',
+                                                       parents=[stdout_args, env_args],
+                                                       prog='dx remove stage')
+    parser_remove_stage.add_argument('workflow', help='Name or ID of a workflow').completer = DXPathCompleter(classes=['workflow'])
+    parser_remove_stage.add_argument('stage', help='Stage (index or ID) of the workflow to remove')
+    parser_remove_stage.set_defaults(func=workflow_cli.remove_stage)
+    register_parser(parser_remove_stage, subparsers_action=subparsers_remove, categories='workflow')
+
+    parser_remove_member = subparsers_remove.add_parser("member", help="Revoke the org membership of a user", description="Revoke the org membership of a user", prog="dx remove member", parents=[stdout_args, env_args])
+    parser_remove_member.add_argument("org_id", help="ID of the org")
+    parser_remove_member.add_argument("username_or_user_id", help="Username or ID of user")
+    parser_remove_member.add_argument("--keep-explicit-project-permissions", default=True, action="store_false", dest="revoke_project_permissions", help="Disable revocation of explicit project permissions of the specified user to projects billed to the org; implicit project permissions (i.e. those granted to the specified user via his membership in this org) will always be revoked")
+    parser_remove_member.add_argument("--keep-explicit-app-permissions", default=True, action="store_false", dest="revoke_app_permissions", help="Disable revocation of explicit app developer and user permissions of the specified user to apps billed to the org; implicit app permissions (i.e. those granted to the specified user via his membership in this org) will always be revoked")
+    parser_remove_member.add_argument("-y", "--yes", action="store_false", dest="confirm", help="Do not ask for confirmation")
+    parser_remove_member.set_defaults(func=remove_membership)
+    register_parser(parser_remove_member, subparsers_action=subparsers_remove, categories="org")
 
 #####################################
 # update
 #####################################
-parser_update = subparsers.add_parser('update', help='Update certain types of metadata',
-                                      description='''
+@lazy_parser('update')
+def _build_update_parser():
+    from ..cli import workflow as workflow_cli
+    from ..cli.org import update_org, update_membership
+    parser_update = subparsers.add_parser('update', help='Update certain types of metadata',
+                                          description='''
 Use this command with one of the available targets listed below to update
 their metadata that are not covered by the other
 subcommands.''',
-                                      prog='dx update')
-subparsers_update = parser_update.add_subparsers(parser_class=DXArgumentParser)
-subparsers_update.metavar = 'target'
-register_parser(parser_update, categories=())
-
-parser_update_org = subparsers_update.add_parser('org',
-                                                 help='Update information about an org',
-                                                 description='Update information about an org',
-                                                 parents=[stdout_args, env_args],
-                                                 prog='dx update org')
-parser_update_org.add_argument('org_id', help='ID of the org')
-parser_update_org.add_argument('--name', help='New name of the org')
-parser_update_org.add_argument('--member-list-visibility', help='New org membership level that is required to be able to view the membership level and/or permissions of any other member in the specified org (corresponds to the memberListVisibility org policy)', choices=['ADMIN', 'MEMBER', 'PUBLIC'])
-parser_update_org.add_argument('--project-transfer-ability', help='New org membership level that is required to be able to change the billing account of a project that is billed to the specified org, to some other entity (corresponds to the restrictProjectTransfer org policy)', choices=['ADMIN', 'MEMBER'])
-parser_update_org.set_defaults(func=update_org)
-register_parser(parser_update_org, subparsers_action=subparsers_update, categories='org')
-
-
-parser_update_workflow = subparsers_update.add_parser('workflow', help='Update the metadata for a workflow',
-                                                      description='Update the metadata for an existing workflow',
-                                                      parents=[stdout_args, env_args],
-                                                      prog='dx update workflow')
-parser_update_workflow.add_argument('workflow', help='Name or ID of a workflow').completer = DXPathCompleter(classes=['workflow'])
-update_workflow_title_args = parser_update_workflow.add_mutually_exclusive_group()
-update_workflow_title_args.add_argument('--title', help='Workflow title')
-update_workflow_title_args.add_argument('--no-title', help='Unset the workflow title', action='store_true')
-parser_update_workflow.add_argument('--summary', help='Workflow summary')
-parser_update_workflow.add_argument('--description', help='Workflow description')
-update_workflow_output_folder_args = parser_update_workflow.add_mutually_exclusive_group()
-update_workflow_output_folder_args.add_argument('--output-folder', help='Default output folder for the workflow')
-update_workflow_output_folder_args.add_argument('--no-output-folder', help='Unset the default output folder for the workflow', action='store_true')
-parser_update_workflow.set_defaults(func=workflow_cli.update_workflow)
-register_parser(parser_update_workflow, subparsers_action=subparsers_update, categories='workflow')
-
-parser_update_stage = subparsers_update.add_parser('stage', help='Update the metadata for a stage in a workflow',
-                                                   description='Update the metadata for a stage in a workflow',
-                                                   parents=[exec_input_args, stdout_args, env_args,
-                                                            instance_type_arg],
-                                                   prog='dx update stage')
-parser_update_stage.add_argument('workflow', help='Name or ID of a workflow').completer = DXPathCompleter(classes=['workflow'])
-parser_update_stage.add_argument('stage', help='Stage (index or ID) of the workflow to update')
-parser_update_stage.add_argument('--executable', help='Name or ID of an executable to replace in the stage').completer = MultiCompleter([DXAppCompleter(),
-                                                                                                                                         DXPathCompleter(classes=['applet'])])
-parser_update_stage.add_argument('--alias', '--version', '--tag', dest='alias',
-                                 help='Tag or version of the app to use if replacing the stage executable with an app (default: "default" if an app)')
-parser_update_stage.add_argument('--force',
-                                 help='Whether to replace the executable even if it the new one cannot be verified as compatible with the previous version',
-                                 action='store_true')
-update_stage_name_args = parser_update_stage.add_mutually_exclusive_group()
-update_stage_name_args.add_argument('--name', help='Stage name')
-update_stage_name_args.add_argument('--no-name', help='Unset the stage name', action='store_true')
-update_stage_folder_args = parser_update_stage.add_mutually_exclusive_group()
-update_stage_folder_args.add_argument('--output-folder', help='Path to the output folder for the stage (interpreted as an absolute path)')
-update_stage_folder_args.add_argument('--relative-output-folder', help='A relative folder path for the stage (interpreted as relative to the workflow\'s output folder)')
-parser_update_stage.set_defaults(func=workflow_cli.update_stage)
-register_parser(parser_update_stage, subparsers_action=subparsers_update, categories='workflow')
-
-parser_update_member = subparsers_update.add_parser("member", help="Update the membership of a user in an org", description="Update the membership of a user in an org", prog="dx update member", parents=[stdout_args, env_args])
-parser_update_member.add_argument("org_id", help="ID of the org")
-parser_update_member.add_argument("username_or_user_id", help="Username or ID of user")
-parser_update_member.add_argument("--level", choices=["ADMIN", "MEMBER"], help="The new org membership level of the specified user")
-parser_update_member.add_argument("--allow-billable-activities", choices=["true", "false"], help='The new "allowBillableActivities" membership permission of the specified user in the org; default false if demoting the specified user from ADMIN to MEMBER')
-parser_update_member.add_argument("--app-access", choices=["true", "false"], help='The new "appAccess" membership permission of the specified user in the org; default true if demoting the specified user from ADMIN to MEMBER')
-parser_update_member.add_argument("--project-access", choices=["ADMINISTER", "CONTRIBUTE", "UPLOAD", "VIEW", "NONE"], help='The new default implicit maximum permission the specified user will receive to projects explicitly shared with the org; default CONTRIBUTE if demoting the specified user from ADMIN to MEMBER')
-parser_update_member.set_defaults(func=update_membership)
-register_parser(parser_update_member, subparsers_action=subparsers_update, categories="org")
-
-parser_update_project = subparsers_update.add_parser("project",
-                                                     help="Updates a specified project with the specified options",
-                                                     description="", prog="dx update project",
-                                                     parents=[stdout_args, env_args])
-parser_update_project.add_argument('project_id', help="Project ID or project name")
-parser_update_project.add_argument('--name', help="New project name")
-parser_update_project.add_argument('--summary', help="Project summary")
-parser_update_project.add_argument('--description', help="Project description")
-parser_update_project.add_argument('--protected', choices=["true", "false"],
-                                   help="Whether the project should be PROTECTED")
-parser_update_project.add_argument('--restricted', choices=["true", "false"],
-                                   help="Whether the project should be RESTRICTED")
-parser_update_project.add_argument('--containsPHI', choices=["true"],
-                                   help="Flag to tell if project contains PHI")
-parser_update_project.add_argument('--bill-to', help="Update the user or org ID of the billing account", type=str)
-parser_update_project.set_defaults(func=update_project)
-register_parser(parser_update_project, subparsers_action=subparsers_update, categories="metadata")
+                                          prog='dx update')
+    subparsers_update = parser_update.add_subparsers(parser_class=DXArgumentParser)
+    subparsers_update.metavar = 'target'
+    register_parser(parser_update, categories=())
+
+    parser_update_org = subparsers_update.add_parser('org',
+                                                     help='Update information about an org',
+                                                     description='Update information about an org',
+                                                     parents=[stdout_args, env_args],
+                                                     prog='dx update org')
+    parser_update_org.add_argument('org_id', help='ID of the org')
+    parser_update_org.add_argument('--name', help='New name of the org')
+    parser_update_org.add_argument('--member-list-visibility', help='New org membership level that is required to be able to view the membership level and/or permissions of any other member in the specified org (corresponds to the memberListVisibility org policy)', choices=['ADMIN', 'MEMBER', 'PUBLIC'])
+    parser_update_org.add_argument('--project-transfer-ability', help='New org membership level that is required to be able to change the billing account of a project that is billed to the specified org, to some other entity (corresponds to the restrictProjectTransfer org policy)', choices=['ADMIN', 'MEMBER'])
+    parser_update_org.set_defaults(func=update_org)
+    register_parser(parser_update_org, subparsers_action=subparsers_update, categories='org')
+
+
+    parser_update_workflow = subparsers_update.add_parser('workflow', help='Update the metadata for a workflow',
+                                                          description='Update the metadata for an existing workflow',
+                                                          parents=[stdout_args, env_args],
+                                                          prog='dx update workflow')
+    parser_update_workflow.add_argument('workflow', help='Name or ID of a workflow').completer = DXPathCompleter(classes=['workflow'])
+    update_workflow_title_args = parser_update_workflow.add_mutually_exclusive_group()
+    update_workflow_title_args.add_argument('--title', help='Workflow title')
+    update_workflow_title_args.add_argument('--no-title', help='Unset the workflow title', action='store_true')
+    parser_update_workflow.add_argument('--summary', help='Workflow summary')
+    parser_update_workflow.add_argument('--description', help='Workflow description')
+    update_workflow_output_folder_args = parser_update_workflow.add_mutually_exclusive_group()
+    update_workflow_output_folder_args.add_argument('--output-folder', help='Default output folder for the workflow')
+    update_workflow_output_folder_args.add_argument('--no-output-folder', help='Unset the default output folder for the workflow', action='store_true')
+    parser_update_workflow.set_defaults(func=workflow_cli.update_workflow)
+    register_parser(parser_update_workflow, subparsers_action=subparsers_update, categories='workflow')
+
+    parser_update_stage = subparsers_update.add_parser('stage', help='Update the metadata for a stage in a workflow',
+                                                       description='Update the metadata for a stage in a workflow',
+                                                       parents=[exec_input_args, stdout_args, env_args,
+                                                                instance_type_arg],
+                                                       prog='dx update stage')
+    parser_update_stage.add_argument('workflow', help='Name or ID of a workflow').completer = DXPathCompleter(classes=['workflow'])
+    parser_update_stage.add_argument('stage', help='Stage (index or ID) of the workflow to update')
+    parser_update_stage.add_argument('--executable', help='Name or ID of an executable to replace in the stage').completer = MultiCompleter([DXAppCompleter(),
+                                                                                                                                             DXPathCompleter(classes=['applet'])])
+    parser_update_stage.add_argument('--alias', '--version', '--tag', dest='alias',
+                                     help='Tag or version of the app to use if replacing the stage executable with an app (default: "default" if an app)')
+    parser_update_stage.add_argument('--force',
+                                     help='Whether to replace the executable even if it the new one cannot be verified as compatible with the previous version',
+                                     action='store_true')
+    update_stage_name_args = parser_update_stage.add_mutually_exclusive_group()
+    update_stage_name_args.add_argument('--name', help='Stage name')
+    update_stage_name_args.add_argument('--no-name', help='Unset the stage name', action='store_true')
+    update_stage_folder_args = parser_update_stage.add_mutually_exclusive_group()
+    update_stage_folder_args.add_argument('--output-folder', help='Path to the output folder for the stage (interpreted as an absolute path)')
+    update_stage_folder_args.add_argument('--relative-output-folder', help='A relative folder path for the stage (interpreted as relative to the workflow\'s output folder)')
+    parser_update_stage.set_defaults(func=workflow_cli.update_stage)
+    register_parser(parser_update_stage, subparsers_action=subparsers_update, categories='workflow')
+
+    parser_update_member = subparsers_update.add_parser("member", help="Update the membership of a user in an org", description="Update the membership of a user in an org", prog="dx update member", parents=[stdout_args, env_args])
+    parser_update_member.add_argument("org_id", help="ID of the org")
+    parser_update_member.add_argument("username_or_user_id", help="Username or ID of user")
+    parser_update_member.add_argument("--level", choices=["ADMIN", "MEMBER"], help="The new org membership level of the specified user")
+    parser_update_member.add_argument("--allow-billable-activities", choices=["true", "false"], help='The new "allowBillableActivities" membership permission of the specified user in the org; default false if demoting the specified user from ADMIN to MEMBER')
+    parser_update_member.add_argument("--app-access", choices=["true", "false"], help='The new "appAccess" membership permission of the specified user in the org; default true if demoting the specified user from ADMIN to MEMBER')
+    parser_update_member.add_argument("--project-access", choices=["ADMINISTER", "CONTRIBUTE", "UPLOAD", "VIEW", "NONE"], help='The new default implicit maximum permission the specified user will receive to projects explicitly shared with the org; default CONTRIBUTE if demoting the specified user from ADMIN to MEMBER')
+    parser_update_member.set_defaults(func=update_membership)
+    register_parser(parser_update_member, subparsers_action=subparsers_update, categories="org")
+
+    parser_update_project = subparsers_update.add_parser("project",
+                                                         help="Updates a specified project with the specified options",
+                                                         description="", prog="dx update project",
+                                                         parents=[stdout_args, env_args])
+    parser_update_project.add_argument('project_id', help="Project ID or project name")
+    parser_update_project.add_argument('--name', help="New project name")
+    parser_update_project.add_argument('--summary', help="Project summary")
+    parser_update_project.add_argument('--description', help="Project description")
+    parser_update_project.add_argument('--protected', choices=["true", "false"],
+                                       help="Whether the project should be PROTECTED")
+    parser_update_project.add_argument('--restricted', choices=["true", "false"],
+                                       help="Whether the project should be RESTRICTED")
+    parser_update_project.add_argument('--containsPHI', choices=["true"],
+                                       help="Flag to tell if project contains PHI")
+    parser_update_project.add_argument('--bill-to', help="Update the user or org ID of the billing account", type=str)
+    parser_update_project.set_defaults(func=update_project)
+    register_parser(parser_update_project, subparsers_action=subparsers_update, categories="metadata")
 
 #####################################
 # install
 #####################################
-parser_install = subparsers.add_parser('install', help='Install an app',
-                                       description='Install an app by name.  To see a list of apps you can install, hit <TAB> twice after "dx install" or run "' + BOLD('dx find apps') + '" to see a list of available apps.', prog='dx install',
-                                       parents=[env_args])
-install_app_action = parser_install.add_argument('app', help='ID or name of app to install')
-install_app_action.completer = DXAppCompleter(installed=False)
-parser_install.set_defaults(func=install)
-register_parser(parser_install, categories='exec')
+@lazy_parser('install')
+def _build_install_parser():
+    parser_install = subparsers.add_parser('install', help='Install an app',
+                                           description='Install an app by name.  To see a list of apps you can install, hit <TAB> twice after "dx install" or run "' + BOLD('dx find apps') + '" to see a list of available apps.', prog='dx install',
+                                           parents=[env_args])
+    install_app_action = parser_install.add_argument('app', help='ID or name of app to install')
+    install_app_action.completer = DXAppCompleter(installed=False)
+    parser_install.set_defaults(func=install)
+    register_parser(parser_install, categories='exec')
 
 #####################################
 # uninstall
 #####################################
-parser_uninstall = subparsers.add_parser('uninstall', help='Uninstall an app',
-                                         description='Uninstall an app by name.', prog='dx uninstall',
-                                         parents=[env_args])
-uninstall_app_action = parser_uninstall.add_argument('app', help='ID or name of app to uninstall')
-uninstall_app_action.completer = DXAppCompleter(installed=True)
-parser_uninstall.set_defaults(func=uninstall)
-register_parser(parser_uninstall, categories='exec')
+@lazy_parser('uninstall')
+def _build_uninstall_parser():
+    parser_uninstall = subparsers.add_parser('uninstall', help='Uninstall an app',
+                                             description='Uninstall an app by name.', prog='dx uninstall',
+                                             parents=[env_args])
+    uninstall_app_action = parser_uninstall.add_argument('app', help='ID or name of app to uninstall')
+    uninstall_app_action.completer = DXAppCompleter(installed=True)
+    parser_uninstall.set_defaults(func=uninstall)
+    register_parser(parser_uninstall, categories='exec')
 
 #####################################
 # run
 #####################################
-parser_run = subparsers.add_parser('run', help='Run an applet, app, or workflow', add_help=False,
-                                   description=(fill('Run an applet, app, or workflow.  To see a list of executables you can run, hit <TAB> twice after "dx run" or run "' + BOLD('dx find apps') + '" to see a list of available apps.') + '\n\n' + fill('If any inputs are required but not specified, an interactive mode for selecting inputs will be launched.  Inputs can be set in multiple ways.  Run "' + BOLD('dx run --input-help') + '" for more details.') + '\n\n' + fill('Run "' + BOLD('dx run --instance-type-help') + '" to see a list of specifications for computers available to run executables.')),
-                                   prog='dx run',
-                                   formatter_class=argparse.RawTextHelpFormatter,
-                                   parents=[exec_input_args, stdout_args, env_args, extra_args,
-                                            instance_type_arg, property_args, tag_args])
-run_executable_action = parser_run.add_argument('executable',
-                                                help=fill('Name or ID of an applet, app, or workflow to run; must be provided if --clone is not set', width_adjustment=-24),
-                                                nargs="?", default="")
-run_executable_action.completer = MultiCompleter([DXAppCompleter(),
-                                                  DXPathCompleter(classes=['applet', 'workflow'], visibility="visible")])
-
-parser_run.add_argument('-d', '--depends-on',
-                        help=fill('ID of job, analysis, or data object that must be in the "done" or ' +
-                                  '"closed" state, as appropriate, before this executable can be run; ' +
-                                  'repeat as necessary (e.g. "--depends-on id1 ... --depends-on idN"). ' +
-                                  'Cannot be supplied when running workflows',
-                                  width_adjustment=-24),
-                        action='append', type=str)
-
-parser_run.add_argument('-h', '--help', help='show this help message and exit', nargs=0, action=runHelp)
-parser_run.add_argument('--clone', help=fill('Job or analysis ID or name from which to use as default options (will use the exact same executable ID, destination project and folder, job input, instance type requests, and a similar name unless explicitly overridden by command-line arguments)', width_adjustment=-24))
-parser_run.add_argument('--alias', '--version', dest='alias',
-                        help=fill('Alias (tag) or version of the app to run (default: "default" if an app)', width_adjustment=-24))
-parser_run.add_argument('--destination', '--folder', metavar='PATH', dest='folder', help=fill('The full project:folder path in which to output the results.  By default, the current working directory will be used.', width_adjustment=-24))
-parser_run.add_argument('--project', metavar='PROJECT',
-                        help=fill('Project name or ID in which to run the executable. This can also ' +
-                                  'be specified together with the output folder in --destination.',
-                                  width_adjustment=-24))
-parser_run.add_argument('--stage-output-folder', metavar=('STAGE_ID', 'FOLDER'),
-                        help=fill('A stage identifier (ID, name, or index), and a folder path to ' +
-                                  'use as its output folder',
-                                  width_adjustment=-24),
-                        nargs=2,
-                        action='append',
-                        default=[])
-parser_run.add_argument('--stage-relative-output-folder', metavar=('STAGE_ID', 'FOLDER'),
-                        help=fill('A stage identifier (ID, name, or index), and a relative folder ' +
-                                  'path to the workflow output folder to use as the output folder',
-                                  width_adjustment=-24),
-                        nargs=2,
-                        action='append',
-                        default=[])
-parser_run.add_argument('--rerun-stage', metavar='STAGE_ID', dest='rerun_stages',
-                        help=fill('A stage (using its ID, name, or index) to rerun, or "*" to ' +
-                                  'indicate all stages should be rerun; repeat as necessary',
-                                  width_adjustment=-24),
-                        action='append')
-parser_run.add_argument('--name', help=fill('Name for the job (default is the app or applet name)', width_adjustment=-24))
-parser_run.add_argument('--delay-workspace-destruction',
-                        help=fill('Whether to keep the job\'s temporary workspace around for debugging purposes for 3 days after it succeeds or fails', width_adjustment=-24),
-                        action='store_true')
-parser_run.add_argument('--priority',
-                        choices=['normal', 'high'],
-                        help='Request a scheduling priority for all resulting jobs')
-parser_run.add_argument('-y', '--yes', dest='confirm', help='Do not ask for confirmation', action='store_false')
-parser_run.add_argument('--wait', help='Wait until the job is done before returning', action='store_true')
-parser_run.add_argument('--watch', help="Watch the job after launching it; sets --priority high", action='store_true')
-parser_run.add_argument('--allow-ssh', action='append', nargs='?', metavar='ADDRESS',
-                        help=fill('Configure the job to allow SSH access; sets --priority high. If an argument is ' +
-                                  'supplied, it is interpreted as an IP or hostname mask to allow connections from, ' +
-                                  'e.g. "--allow-ssh 1.2.3.4 --allow-ssh berkeley.edu"',
-                                  width_adjustment=-24))
-parser_run.add_argument('--ssh',
-                        help=fill("Configure the job to allow SSH access and connect to it after launching; " +
-                                  "sets --priority high",
-                                  width_adjustment=-24),
-                        action='store_true')
-parser_run.add_argument('--ssh-proxy', metavar=('<address>:<port>'),
-                        help=fill('SSH connect via proxy, argument supplied is used as the proxy address and port',
-                                  width_adjustment=-24))
-parser_run.add_argument('--debug-on', action='append', choices=['AppError', 'AppInternalError', 'ExecutionError', 'All'],
-                        help=fill("Configure the job to hold for debugging when any of the listed errors occur",
-                                  width_adjustment=-24))
-parser_run.add_argument('--input-help',
-                        help=fill('Print help and examples for how to specify inputs',
-                                  width_adjustment=-24),
-                        action=runInputHelp, nargs=0)
-parser_run.set_defaults(func=run, verbose=False, help=False, details=None,
-                        stage_instance_types=None, stage_folders=None)
-register_parser(parser_run, categories='exec')
+@lazy_parser('run')
+def _build_run_parser():
+    parser_run = subparsers.add_parser('run', help='Run an applet, app, or workflow', add_help=False,
+                                       description=(fill('Run an applet, app, or workflow.  To see a list of executables you can run, hit <TAB> twice after "dx run" or run "' + BOLD('dx find apps') + '" to see a list of available apps.') + '\n\n' + fill('If any inputs are required but not specified, an interactive mode for selecting inputs will be launched.  Inputs can be set in multiple ways.  Run "' + BOLD('dx run --input-help') + '" for more details.') + '\n\n' + fill('Run "' + BOLD('dx run --instance-type-help') + '" to see a list of specifications for computers available to run executables.')),
+                                       prog='dx run',
+                                       formatter_class=argparse.RawTextHelpFormatter,
+                                       parents=[exec_input_args, stdout_args, env_args, extra_args,
+                                                instance_type_arg, property_args, tag_args])
+    run_executable_action = parser_run.add_argument('executable',
+                                                    help=fill('Name or ID of an applet, app, or workflow to run; must be provided if --clone is not set', width_adjustment=-24),
+                                                    nargs="?", default="")
+    run_executable_action.completer = MultiCompleter([DXAppCompleter(),
+                                                      DXPathCompleter(classes=['applet', 'workflow'], visibility="visible")])
+
+    parser_run.add_argument('-d', '--depends-on',
+                            help=fill('ID of job, analysis, or data object that must be in the "done" or ' +
+                                      '"closed" state, as appropriate, before this executable can be run; ' +
+                                      'repeat as necessary (e.g. "--depends-on id1 ... --depends-on idN"). ' +
+                                      'Cannot be supplied when running workflows',
+                                      width_adjustment=-24),
+                            action='append', type=str)
+
+    parser_run.add_argument('-h', '--help', help='show this help message and exit', nargs=0, action=runHelp)
+    parser_run.add_argument('--clone', help=fill('Job or analysis ID or name from which to use as default options (will use the exact same executable ID, destination project and folder, job input, instance type requests, and a similar name unless explicitly overridden by command-line arguments)', width_adjustment=-24))
+    parser_run.add_argument('--alias', '--version', dest='alias',
+                            help=fill('Alias (tag) or version of the app to run (default: "default" if an app)', width_adjustment=-24))
+    parser_run.add_argument('--destination', '--folder', metavar='PATH', dest='folder', help=fill('The full project:folder path in which to output the results.  By default, the current working directory will be used.', width_adjustment=-24))
+    parser_run.add_argument('--project', metavar='PROJECT',
+                            help=fill('Project name or ID in which to run the executable. This can also ' +
+                                      'be specified together with the output folder in --destination.',
+                                      width_adjustment=-24))
+    parser_run.add_argument('--stage-output-folder', metavar=('STAGE_ID', 'FOLDER'),
+                            help=fill('A stage identifier (ID, name, or index), and a folder path to ' +
+                                      'use as its output folder',
+                                      width_adjustment=-24),
+                            nargs=2,
+                            action='append',
+                            default=[])
+    parser_run.add_argument('--stage-relative-output-folder', metavar=('STAGE_ID', 'FOLDER'),
+                            help=fill('A stage identifier (ID, name, or index), and a relative folder ' +
+                                      'path to the workflow output folder to use as the output folder',
+                                      width_adjustment=-24),
+                            nargs=2,
+                            action='append',
+                            default=[])
+    parser_run.add_argument('--rerun-stage', metavar='STAGE_ID', dest='rerun_stages',
+                            help=fill('A stage (using its ID, name, or index) to rerun, or "*" to ' +
+                                      'indicate all stages should be rerun; repeat as necessary',
+                                      width_adjustment=-24),
+                            action='append')
+    parser_run.add_argument('--name', help=fill('Name for the job (default is the app or applet name)', width_adjustment=-24))
+    parser_run.add_argument('--delay-workspace-destruction',
+                            help=fill('Whether to keep the job\'s temporary workspace around for debugging purposes for 3 days after it succeeds or fails', width_adjustment=-24),
+                            action='store_true')
+    parser_run.add_argument('--priority',
+                            choices=['normal', 'high'],
+                            help='Request a scheduling priority for all resulting jobs')
+    parser_run.add_argument('-y', '--yes', dest='confirm', help='Do not ask for confirmation', action='store_false')
+    parser_run.add_argument('--wait', help='Wait until the job is done before returning', action='store_true')
+    parser_run.add_argument('--watch', help="Watch the job after launching it; sets --priority high", action='store_true')
+    parser_run.add_argument('--allow-ssh', action='append', nargs='?', metavar='ADDRESS',
+                            help=fill('Configure the job to allow SSH access; sets --priority high. If an argument is ' +
+                                      'supplied, it is interpreted as an IP or hostname mask to allow connections from, ' +
+                                      'e.g. "--allow-ssh 1.2.3.4 --allow-ssh berkeley.edu"',
+                                      width_adjustment=-24))
+    parser_run.add_argument('--ssh',
+                            help=fill("Configure the job to allow SSH access and connect to it after launching; " +
+                                      "sets --priority high",
+                                      width_adjustment=-24),
+                            action='store_true')
+    parser_run.add_argument('--ssh-proxy', metavar=('<address>:<port>'),
+                            help=fill('SSH connect via proxy, argument supplied is used as the proxy address and port',
+                                      width_adjustment=-24))
+    parser_run.add_argument('--debug-on', action='append', choices=['AppError', 'AppInternalError', 'ExecutionError', 'All'],
+                            help=fill("Configure the job to hold for debugging when any of the listed errors occur",
+                                      width_adjustment=-24))
+    parser_run.add_argument('--input-help',
+                            help=fill('Print help and examples for how to specify inputs',
+                                      width_adjustment=-24),
+                            action=runInputHelp, nargs=0)
+    parser_run.set_defaults(func=run, verbose=False, help=False, details=None,
+                            stage_instance_types=None, stage_folders=None)
+    register_parser(parser_run, categories='exec')
 
 #####################################
 # watch
 #####################################
-parser_watch = subparsers.add_parser('watch', help='Watch logs of a job and its subjobs', prog='dx watch',
-                                     description='Monitors logging output from a running job',
-                                     parents=[env_args, no_color_arg])
-parser_watch.add_argument('jobid', help='ID of the job to watch')
-# .completer = TODO
-parser_watch.add_argument('-n', '--num-recent-messages', help='Number of recent messages to get',
-                          type=int, default=1024*256)
-parser_watch.add_argument('--tree', help='Include the entire job tree', action='store_true')
-parser_watch.add_argument('-l', '--levels', action='append', choices=["EMERG", "ALERT", "CRITICAL", "ERROR", "WARNING",
-                                                                      "NOTICE", "INFO", "DEBUG", "STDERR", "STDOUT"])
-parser_watch.add_argument('--get-stdout', help='Extract stdout only from this job', action='store_true')
-parser_watch.add_argument('--get-stderr', help='Extract stderr only from this job', action='store_true')
-parser_watch.add_argument('--get-streams', help='Extract only stdout and stderr from this job', action='store_true')
-parser_watch.add_argument('--no-timestamps', help='Omit timestamps from messages', action='store_false',
-                          dest='timestamps')
-parser_watch.add_argument('--job-ids', help='Print job ID in each message', action='store_true')
-parser_watch.add_argument('--no-job-info', help='Omit job info and status updates', action='store_false',
-                          dest='job_info')
-parser_watch.add_argument('-q', '--quiet', help='Do not print extra info messages', action='store_true')
-parser_watch.add_argument('-f', '--format', help='Message format. Available fields: job, level, msg, date')
-parser_watch.add_argument('--no-wait', '--no-follow', action='store_false', dest='tail',
-                          help='Exit after the first new message is received, instead of waiting for all logs')
-parser_watch.set_defaults(func=watch)
-register_parser(parser_watch, categories='exec')
+@lazy_parser('watch')
+def _build_watch_parser():
+    parser_watch = subparsers.add_parser('watch', help='Watch logs of a job and its subjobs', prog='dx watch',
+                                         description='Monitors logging output from a running job',
+                                         parents=[env_args, no_color_arg])
+    parser_watch.add_argument('jobid', help='ID of the job to watch')
+    # .completer = TODO
+    parser_watch.add_argument('-n', '--num-recent-messages', help='Number of recent messages to get',
+                              type=int, default=1024*256)
+    parser_watch.add_argument('--tree', help='Include the entire job tree', action='store_true')
+    parser_watch.add_argument('-l', '--levels', action='append', choices=["EMERG", "ALERT", "CRITICAL", "ERROR", "WARNING",
+                                                                          "NOTICE", "INFO", "DEBUG", "STDERR", "STDOUT"])
+    parser_watch.add_argument('--get-stdout', help='Extract stdout only from this job', action='store_true')
+    parser_watch.add_argument('--get-stderr', help='Extract stderr only from this job', action='store_true')
+    parser_watch.add_argument('--get-streams', help='Extract only stdout and stderr from this job', action='store_true')
+    parser_watch.add_argument('--no-timestamps', help='Omit timestamps from messages', action='store_false',
+                              dest='timestamps')
+    parser_watch.add_argument('--job-ids', help='Print job ID in each message', action='store_true')
+    parser_watch.add_argument('--no-job-info', help='Omit job info and status updates', action='store_false',
+                              dest='job_info')
+    parser_watch.add_argument('-q', '--quiet', help='Do not print extra info messages', action='store_true')
+    parser_watch.add_argument('-f', '--format', help='Message format. Available fields: job, level, msg, date')
+    parser_watch.add_argument('--no-wait', '--no-follow', action='store_false', dest='tail',
+                              help='Exit after the first new message is received, instead of waiting for all logs')
+    parser_watch.set_defaults(func=watch)
+    register_parser(parser_watch, categories='exec')
 
 #####################################
 # shh_config
 #####################################
-parser_ssh_config = subparsers.add_parser('ssh_config', help='Configure SSH keys for your DNAnexus account',
-                                   description='Configure SSH access credentials for your DNAnexus account',
-                                   prog='dx ssh_config',
-                                   parents=[env_args])
-parser_ssh_config.add_argument('ssh_keygen_args', help='Command-line arguments to pass to ssh-keygen',
-                               nargs=argparse.REMAINDER)
-parser_ssh_config.add_argument('--revoke', help='Revoke SSH public key associated with your DNAnexus account; you will no longer be able to SSH into any jobs.', action='store_true')
-parser_ssh_config.set_defaults(func=ssh_config)
-register_parser(parser_ssh_config, categories='exec')
+@lazy_parser('ssh_config')
+def _build_ssh_config_parser():
+    parser_ssh_config = subparsers.add_parser('ssh_config', help='Configure SSH keys for your DNAnexus account',
+                                       description='Configure SSH access credentials for your DNAnexus account',
+                                       prog='dx ssh_config',
+                                       parents=[env_args])
+    parser_ssh_config.add_argument('ssh_keygen_args', help='Command-line arguments to pass to ssh-keygen',
+                                   nargs=argparse.REMAINDER)
+    parser_ssh_config.add_argument('--revoke', help='Revoke SSH public key associated with your DNAnexus account; you will no longer be able to SSH into any jobs.', action='store_true')
+    parser_ssh_config.set_defaults(func=ssh_config)
+    register_parser(parser_ssh_config, categories='exec')
 
 #####################################
 # ssh
 #####################################
-parser_ssh = subparsers.add_parser('ssh', help='Connect to a running job via SSH',
-                                   description='Use an SSH client to connect to a job being executed on the DNAnexus ' +
-                                               'platform. The job must be launched using "dx run --allow-ssh" or ' +
-                                               'equivalent API options. Use "dx ssh_config" or the Profile page on ' +
-                                               'the DNAnexus website to configure SSH for your DNAnexus account.',
-                                   prog='dx ssh',
-                                   parents=[env_args])
-parser_ssh.add_argument('job_id', help='Name of job to connect to')
-parser_ssh.add_argument('ssh_args', help='Command-line arguments to pass to the SSH client', nargs=argparse.REMAINDER)
-parser_ssh.add_argument('--ssh-proxy', metavar=('<address>:<port>'),
-                        help='SSH connect via proxy, argument supplied is used as the proxy address and port')
-# If ssh is run with the  supress-running-check flag, then dx won't prompt
-# the user whether they would like to terminate the currently running job
-# after they exit ssh.  Among other things, this will allow users to setup
-# ssh tunnels using dx ssh, and exit the ssh command with the tunnel still
-# in place, and not be prompted to terminate the instance (which would close
-# the tunnel).
-parser_ssh.add_argument('--suppress-running-check', action='store_false', help=argparse.SUPPRESS, dest='check_running')
-parser_ssh.set_defaults(func=ssh)
-register_parser(parser_ssh, categories='exec')
+@lazy_parser('ssh')
+def _build_ssh_parser():
+    parser_ssh = subparsers.add_parser('ssh', help='Connect to a running job via SSH',
+                                       description='Use an SSH client to connect to a job being executed on the DNAnexus ' +
+                                                   'platform. The job must be launched using "dx run --allow-ssh" or ' +
+                                                   'equivalent API options. Use "dx ssh_config" or the Profile page on ' +
+                                                   'the DNAnexus website to configure SSH for your DNAnexus account.',
+                                       prog='dx ssh',
+                                       parents=[env_args])
+    parser_ssh.add_argument('job_id', help='Name of job to connect to')
+    parser_ssh.add_argument('ssh_args', help='Command-line arguments to pass to the SSH client', nargs=argparse.REMAINDER)
+    parser_ssh.add_argument('--ssh-proxy', metavar=('<address>:<port>'),
+                            help='SSH connect via proxy, argument supplied is used as the proxy address and port')
+    # If ssh is run with the  supress-running-check flag, then dx won't prompt
+    # the user whether they would like to terminate the currently running job
+    # after they exit ssh.  Among other things, this will allow users to setup
+    # ssh tunnels using dx ssh, and exit the ssh command with the tunnel still
+    # in place, and not be prompted to terminate the instance (which would close
+    # the tunnel).
+    parser_ssh.add_argument('--suppress-running-check', action='store_false', help=argparse.SUPPRESS, dest='check_running')
+    parser_ssh.set_defaults(func=ssh)
+    register_parser(parser_ssh, categories='exec')
 
 #####################################
 # terminate
 #####################################
-parser_terminate = subparsers.add_parser('terminate', help='Terminate jobs or analyses',
-                                         description='Terminate one or more jobs or analyses',
-                                         prog='dx terminate',
-                                         parents=[env_args])
-parser_terminate.add_argument('jobid', help='ID of a job or analysis to terminate', nargs='+')
-parser_terminate.set_defaults(func=terminate)
-parser_map['terminate'] = parser_terminate
-parser_categories['all']['cmds'].append((subparsers._choices_actions[-1].dest, subparsers._choices_actions[-1].help))
-parser_categories['exec']['cmds'].append((subparsers._choices_actions[-1].dest, subparsers._choices_actions[-1].help))
+@lazy_parser('terminate')
+def _build_terminate_parser():
+    parser_terminate = subparsers.add_parser('terminate', help='Terminate jobs or analyses',
+                                             description='Terminate one or more jobs or analyses',
+                                             prog='dx terminate',
+                                             parents=[env_args])
+    parser_terminate.add_argument('jobid', help='ID of a job or analysis to terminate', nargs='+')
+    parser_terminate.set_defaults(func=terminate)
+    parser_map['terminate'] = parser_terminate
+    parser_categories['all']['cmds'].append((subparsers._choices_actions[-1].dest, subparsers._choices_actions[-1].help))
+    parser_categories['exec']['cmds'].append((subparsers._choices_actions[-1].dest, subparsers._choices_actions[-1].help))
 
 #####################################
 # rmproject
 #####################################
-parser_rmproject = subparsers.add_parser('rmproject', help='Delete a project',
-                                         description='Delete projects and all their associated data',
-                                         prog='dx rmproject',
-                                         parents=[env_args])
-projects_action = parser_rmproject.add_argument('projects', help='Projects to remove', metavar='project', nargs='+')
-projects_action.completer = DXPathCompleter(expected='project', include_current_proj=True)
-parser_rmproject.add_argument('-y', '--yes', dest='confirm', help='Do not ask for confirmation', action='store_false')
-parser_rmproject.add_argument('-q', '--quiet', help='Do not print purely informational messages', action='store_true')
-parser_rmproject.set_defaults(func=rmproject)
-register_parser(parser_rmproject, categories='fs')
+@lazy_parser('rmproject')
+def _build_rmproject_parser():
+    parser_rmproject = subparsers.add_parser('rmproject', help='Delete a project',
+                                             description='Delete projects and all their associated data',
+                                             prog='dx rmproject',
+                                             parents=[env_args])
+    projects_action = parser_rmproject.add_argument('projects', help='Projects to remove', metavar='project', nargs='+')
+    projects_action.completer = DXPathCompleter(expected='project', include_current_proj=True)
+    parser_rmproject.add_argument('-y', '--yes', dest='confirm', help='Do not ask for confirmation', action='store_false')
+    parser_rmproject.add_argument('-q', '--quiet', help='Do not print purely informational messages', action='store_true')
+    parser_rmproject.set_defaults(func=rmproject)
+    register_parser(parser_rmproject, categories='fs')
 
 #####################################
 # new
 #####################################
-parser_new = subparsers.add_parser('new', help='Create a new project or data object',
-                                   description='Use this command with one of the available subcommands (classes) to create a new project or data object from scratch.  Not all data types are supported.  See \'dx upload\' for files and \'dx build\' for applets.',
-                                   prog="dx new")
-subparsers_new = parser_new.add_subparsers(parser_class=DXArgumentParser)
-subparsers_new.metavar = 'class'
-register_parser(parser_new, categories='data')
-
-parser_new_user = subparsers_new.add_parser("user", help="Create a new user account", description="Create a new user account", parents=[stdout_args, env_args], prog="dx new user")
-parser_new_user_user_opts = parser_new_user.add_argument_group("User options")
-parser_new_user_user_opts.add_argument("-u", "--username", required=True, help="Username")
-parser_new_user_user_opts.add_argument("--email", required=True, help="Email address")
-parser_new_user_user_opts.add_argument("--first", help="First name")
-parser_new_user_user_opts.add_argument("--middle", help="Middle name")
-parser_new_user_user_opts.add_argument("--last", help="Last name")
-parser_new_user_user_opts.add_argument("--token-duration", help='Time duration for which the newly generated auth token for the new user will be valid (default 30 days; max 30 days). An integer will be interpreted as seconds; you can append a suffix (s, m, h, d) to indicate different units (e.g. "--token-duration 10m" to indicate 10 minutes).')
-parser_new_user_user_opts.add_argument("--occupation", help="Occupation")
-parser_new_user_org_opts = parser_new_user.add_argument_group("Org options", "Optionally invite the new user to an org with the specified parameters")
-parser_new_user_org_opts.add_argument("--org", help="ID of the org")
-parser_new_user_org_opts.add_argument("--level", choices=["ADMIN", "MEMBER"], default="MEMBER", action=DXNewUserOrgArgsAction, help="Org membership level that will be granted to the new user; default MEMBER")
-parser_new_user_org_opts.add_argument("--set-bill-to", default=False, action=DXNewUserOrgArgsAction, help='Set the default "billTo" field of the new user to the org; implies --allow-billable-activities')
-parser_new_user_org_opts.add_argument("--allow-billable-activities", default=False, action=DXNewUserOrgArgsAction, help='Grant the new user "allowBillableActivities" in the org')
-parser_new_user_org_opts.add_argument("--no-app-access", default=True, action=DXNewUserOrgArgsAction, dest="app_access", help='Disable "appAccess" for the new user in the org')
-parser_new_user_org_opts.add_argument("--project-access", choices=["ADMINISTER", "CONTRIBUTE", "UPLOAD", "VIEW", "NONE"], default="CONTRIBUTE", action=DXNewUserOrgArgsAction, help='The "projectAccess" to grant the new user in the org; default CONTRIBUTE')
-parser_new_user_org_opts.add_argument("--no-email", default=False, action=DXNewUserOrgArgsAction, help="Disable org invitation email notification to the new user")
-parser_new_user.set_defaults(func=new_user)
-register_parser(parser_new_user, subparsers_action=subparsers_new,
-                   categories="other")
-
-parser_new_org = subparsers_new.add_parser('org', help='Create new org',
-                                           description='Create a new org',
-                                           parents=[stdout_args, env_args],
-                                           prog='dx new org')
-parser_new_org.add_argument('name', help='Descriptive name of the org', nargs='?')
-parser_new_org.add_argument('--handle', required=True, help='Unique handle for the org. The specified handle will be converted to lowercase and appended to "org-" to form the org ID')
-parser_new_org.add_argument('--member-list-visibility', default="ADMIN", help='Org membership level required to be able to list the members of the org, or to view the membership level or permissions of any other member of the org; default ADMIN', choices=["ADMIN", "MEMBER", "PUBLIC"])
-parser_new_org.add_argument('--project-transfer-ability', default="ADMIN", help='Org membership level required to be able to change the billing account of an org-billed project to any other entity; default ADMIN', choices=["ADMIN", "MEMBER"])
-parser_new_org.set_defaults(func=new_org)
-register_parser(parser_new_org, subparsers_action=subparsers_new, categories='org')
-
-parser_new_project = subparsers_new.add_parser('project', help='Create a new project',
-                                               description='Create a new project',
+@lazy_parser('new')
+def _build_new_parser():
+    from ..cli import workflow as workflow_cli
+    from ..cli.org import new_org
+    parser_new = subparsers.add_parser('new', help='Create a new project or data object',
+                                       description='Use this command with one of the available subcommands (classes) to create a new project or data object from scratch.  Not all data types are supported.  See \'dx upload\' for files and \'dx build\' for applets.',
+                                       prog="dx new")
+    subparsers_new = parser_new.add_subparsers(parser_class=DXArgumentParser)
+    subparsers_new.metavar = 'class'
+    register_parser(parser_new, categories='data')
+
+    parser_new_user = subparsers_new.add_parser("user", help="Create a new user account", description="Create a new user account", parents=[stdout_args, env_args], prog="dx new user")
+    parser_new_user_user_opts = parser_new_user.add_argument_group("User options")
+    parser_new_user_user_opts.add_argument("-u", "--username", required=True, help="Username")
+    parser_new_user_user_opts.add_argument("--email", required=True, help="Email address")
+    parser_new_user_user_opts.add_argument("--first", help="First name")
+    parser_new_user_user_opts.add_argument("--middle", help="Middle name")
+    parser_new_user_user_opts.add_argument("--last", help="Last name")
+    parser_new_user_user_opts.add_argument("--token-duration", help='Time duration for which the newly generated auth token for the new user will be valid (default 30 days; max 30 days). An integer will be interpreted as seconds; you can append a suffix (s, m, h, d) to indicate different units (e.g. "--token-duration 10m" to indicate 10 minutes).')
+    parser_new_user_user_opts.add_argument("--occupation", help="Occupation")
+    parser_new_user_org_opts = parser_new_user.add_argument_group("Org options", "Optionally invite the new user to an org with the specified parameters")
+    parser_new_user_org_opts.add_argument("--org", help="ID of the org")
+    parser_new_user_org_opts.add_argument("--level", choices=["ADMIN", "MEMBER"], default="MEMBER", action=DXNewUserOrgArgsAction, help="Org membership level that will be granted to the new user; default MEMBER")
+    parser_new_user_org_opts.add_argument("--set-bill-to", default=False, action=DXNewUserOrgArgsAction, help='Set the default "billTo" field of the new user to the org; implies --allow-billable-activities')
+    parser_new_user_org_opts.add_argument("--allow-billable-activities", default=False, action=DXNewUserOrgArgsAction, help='Grant the new user "allowBillableActivities" in the org')
+    parser_new_user_org_opts.add_argument("--no-app-access", default=True, action=DXNewUserOrgArgsAction, dest="app_access", help='Disable "appAccess" for the new user in the org')
+    parser_new_user_org_opts.add_argument("--project-access", choices=["ADMINISTER", "CONTRIBUTE", "UPLOAD", "VIEW", "NONE"], default="CONTRIBUTE", action=DXNewUserOrgArgsAction, help='The "projectAccess" to grant the new user in the org; default CONTRIBUTE')
+    parser_new_user_org_opts.add_argument("--no-email", default=False, action=DXNewUserOrgArgsAction, help="Disable org invitation email notification to the new user")
+    parser_new_user.set_defaults(func=new_user)
+    register_parser(parser_new_user, subparsers_action=subparsers_new,
+                       categories="other")
+
+    parser_new_org = subparsers_new.add_parser('org', help='Create new org',
+                                               description='Create a new org',
                                                parents=[stdout_args, env_args],
-                                               prog='dx new project')
-parser_new_project.add_argument('name', help='Name of the new project', nargs='?')
-parser_new_project.add_argument('--region', help='Region affinity of the new project')
-parser_new_project.add_argument('-s', '--select', help='Select the new project as current after creating',
-                                action='store_true')
-parser_new_project.add_argument('--bill-to', help='ID of the user or org to which the project will be billed. The default value is the billTo of the requesting user.')
-parser_new_project.set_defaults(func=new_project)
-register_parser(parser_new_project, subparsers_action=subparsers_new, categories='fs')
-
-parser_new_record = subparsers_new.add_parser('record', help='Create a new record',
-                                              description='Create a new record',
-                                              parents=[parser_dataobject_args, parser_single_dataobject_output_args,
-                                                       stdout_args, env_args],
-                                              formatter_class=argparse.RawTextHelpFormatter,
-                                              prog='dx new record')
-init_action = parser_new_record.add_argument('--init', help='Path to record from which to initialize all metadata')
-parser_new_record.add_argument('--close', help='Close the record immediately after creating it', action='store_true')
-init_action.completer = DXPathCompleter(classes=['record'])
-parser_new_record.set_defaults(func=new_record)
-register_parser(parser_new_record, subparsers_action=subparsers_new, categories='fs')
-
-parser_new_workflow = subparsers_new.add_parser('workflow', help='Create a new workflow',
-                                                description='Create a new workflow',
-                                                parents=[parser_dataobject_args, parser_single_dataobject_output_args,
-                                                         stdout_args, env_args],
-                                                formatter_class=argparse.RawTextHelpFormatter,
-                                                prog='dx new workflow')
-parser_new_workflow.add_argument('--title', help='Workflow title')
-parser_new_workflow.add_argument('--summary', help='Workflow summary')
-parser_new_workflow.add_argument('--description', help='Workflow description')
-parser_new_workflow.add_argument('--output-folder', help='Default output folder for the workflow')
-init_action = parser_new_workflow.add_argument('--init', help=fill('Path to workflow or an analysis ID from which to initialize all metadata', width_adjustment=-24))
-init_action.completer = DXPathCompleter(classes=['workflow'])
-parser_new_workflow.set_defaults(func=workflow_cli.new_workflow)
-register_parser(parser_new_workflow, subparsers_action=subparsers_new, categories='workflow')
-
-parser_new_gtable = subparsers_new.add_parser('gtable', add_help=False, #help='Create a new gtable',
-                                              description='Create a new gtable from scratch.',
-                                              parents=[parser_dataobject_args, parser_single_dataobject_output_args,
-                                                       stdout_args, env_args],
-                                              formatter_class=argparse.RawTextHelpFormatter,
-                                              prog='dx new gtable')
-parser_new_gtable.add_argument('--columns',
-                               help=fill('Comma-separated list of column names to use, e.g. "col1,col2,col3"; columns with non-string types can be specified using "name:type" syntax, e.g. "col1:int,col2:boolean".  If not given, the first line of the file will be used to infer column names.', width_adjustment=-24),
-                               required=True)
-new_gtable_indices_args = parser_new_gtable.add_mutually_exclusive_group()
-new_gtable_indices_args.add_argument('--gri', nargs=3, metavar=('CHR', 'LO', 'HI'),
-                                     help=fill('Specify column names to be used as chromosome, lo, and hi columns for a genomic range index (name will be set to "gri"); will also add the type "gri"', width_adjustment=-24))
-new_gtable_indices_args.add_argument('--indices', help='JSON for specifying any other indices')
-parser_new_gtable.set_defaults(func=new_gtable)
-#parser_new_gtable.completer = DXPathCompleter(classes=['gtable'])
-register_parser(parser_new_gtable, subparsers_action=subparsers_new, categories='fs', add_help=False)
+                                               prog='dx new org')
+    parser_new_org.add_argument('name', help='Descriptive name of the org', nargs='?')
+    parser_new_org.add_argument('--handle', required=True, help='Unique handle for the org. The specified handle will be converted to lowercase and appended to "org-" to form the org ID')
+    parser_new_org.add_argument('--member-list-visibility', default="ADMIN", help='Org membership level required to be able to list the members of the org, or to view the membership level or permissions of any other member of the org; default ADMIN', choices=["ADMIN", "MEMBER", "PUBLIC"])
+    parser_new_org.add_argument('--project-transfer-ability', default="ADMIN", help='Org membership level required to be able to change the billing account of an org-billed project to any other entity; default ADMIN', choices=["ADMIN", "MEMBER"])
+    parser_new_org.set_defaults(func=new_org)
+    register_parser(parser_new_org, subparsers_action=subparsers_new, categories='org')
+
+    parser_new_project = subparsers_new.add_parser('project', help='Create a new project',
+                                                   description='Create a new project',
+                                                   parents=[stdout_args, env_args],
+                                                   prog='dx new project')
+    parser_new_project.add_argument('name', help='Name of the new project', nargs='?')
+    parser_new_project.add_argument('--region', help='Region affinity of the new project')
+    parser_new_project.add_argument('-s', '--select', help='Select the new project as current after creating',
+                                    action='store_true')
+    parser_new_project.add_argument('--bill-to', help='ID of the user or org to which the project will be billed. The default value is the billTo of the requesting user.')
+    parser_new_project.set_defaults(func=new_project)
+    register_parser(parser_new_project, subparsers_action=subparsers_new, categories='fs')
+
+    parser_new_record = subparsers_new.add_parser('record', help='Create a new record',
+                                                  description='Create a new record',
+                                                  parents=[parser_dataobject_args, parser_single_dataobject_output_args,
+                                                           stdout_args, env_args],
+                                                  formatter_class=argparse.RawTextHelpFormatter,
+                                                  prog='dx new record')
+    init_action = parser_new_record.add_argument('--init', help='Path to record from which to initialize all metadata')
+    parser_new_record.add_argument('--close', help='Close the record immediately after creating it', action='store_true')
+    init_action.completer = DXPathCompleter(classes=['record'])
+    parser_new_record.set_defaults(func=new_record)
+    register_parser(parser_new_record, subparsers_action=subparsers_new, categories='fs')
+
+    parser_new_workflow = subparsers_new.add_parser('workflow', help='Create a new workflow',
+                                                    description='Create a new workflow',
+                                                    parents=[parser_dataobject_args, parser_single_dataobject_output_args,
+                                                             stdout_args, env_args],
+                                                    formatter_class=argparse.RawTextHelpFormatter,
+                                                    prog='dx new workflow')
+    parser_new_workflow.add_argument('--title', help='Workflow title')
+    parser_new_workflow.add_argument('--summary', help='Workflow summary')
+    parser_new_workflow.add_argument('--description', help='Workflow description')
+    parser_new_workflow.add_argument('--output-folder', help='Default output folder for the workflow')
+    init_action = parser_new_workflow.add_argument('--init', help=fill('Path to workflow or an analysis ID from which to initialize all metadata', width_adjustment=-24))
+    init_action.completer = DXPathCompleter(classes=['workflow'])
+    parser_new_workflow.set_defaults(func=workflow_cli.new_workflow)
+    register_parser(parser_new_workflow, subparsers_action=subparsers_new, categories='workflow')
+
+    parser_new_gtable = subparsers_new.add_parser('gtable', add_help=False, #help='Create a new gtable',
+                                                  description='Create a new gtable from scratch.',
+                                                  parents=[parser_dataobject_args, parser_single_dataobject_output_args,
+                                                           stdout_args, env_args],
+                                                  formatter_class=argparse.RawTextHelpFormatter,
+                                                  prog='dx new gtable')
+    parser_new_gtable.add_argument('--columns',
+                                   help=fill('Comma-separated list of column names to use, e.g. "col1,col2,col3"; columns with non-string types can be specified using "name:type" syntax, e.g. "col1:int,col2:boolean".  If not given, the first line of the file will be used to infer column names.', width_adjustment=-24),
+                                   required=True)
+    new_gtable_indices_args = parser_new_gtable.add_mutually_exclusive_group()
+    new_gtable_indices_args.add_argument('--gri', nargs=3, metavar=('CHR', 'LO', 'HI'),
+                                         help=fill('Specify column names to be used as chromosome, lo, and hi columns for a genomic range index (name will be set to "gri"); will also add the type "gri"', width_adjustment=-24))
+    new_gtable_indices_args.add_argument('--indices', help='JSON for specifying any other indices')
+    parser_new_gtable.set_defaults(func=new_gtable)
+    #parser_new_gtable.completer = DXPathCompleter(classes=['gtable'])
+    register_parser(parser_new_gtable, subparsers_action=subparsers_new, categories='fs', add_help=False)
 
 #####################################
 # get_details
 #####################################
-parser_get_details = subparsers.add_parser('get_details', help='Get details of a data object',
-                                           description='Get the JSON details of a data object.', prog="dx get_details",
-                                           parents=[env_args])
-parser_get_details.add_argument('path', help='ID or path to data object to get details for').completer = DXPathCompleter()
-parser_get_details.set_defaults(func=get_details)
-register_parser(parser_get_details, categories='metadata')
+@lazy_parser('get_details')
+def _build_get_details_parser():
+    parser_get_details = subparsers.add_parser('get_details', help='Get details of a data object',
+                                               description='Get the JSON details of a data object.', prog="dx get_details",
+                                               parents=[env_args])
+    parser_get_details.add_argument('path', help='ID or path to data object to get details for').completer = DXPathCompleter()
+    parser_get_details.set_defaults(func=get_details)
+    register_parser(parser_get_details, categories='metadata')
 
 #####################################
 # set_details
 #####################################
-parser_set_details = subparsers.add_parser('set_details', help='Set details on a data object',
-                                           description='Set the JSON details of a data object.', prog="dx set_details",
-                                           parents=[env_args, all_arg])
-parser_set_details.add_argument('path', help='ID or path to data object to modify').completer = DXPathCompleter()
-parser_set_details.add_argument('details', help='JSON to store as details', nargs='?')
-parser_set_details.add_argument('-f', '--details-file', help='Path to local file containing JSON to store as details')
-parser_set_details.set_defaults(func=set_details)
-register_parser(parser_set_details, categories='metadata')
+@lazy_parser('set_details')
+def _build_set_details_parser():
+    parser_set_details = subparsers.add_parser('set_details', help='Set details on a data object',
+                                               description='Set the JSON details of a data object.', prog="dx set_details",
+                                               parents=[env_args, all_arg])
+    parser_set_details.add_argument('path', help='ID or path to data object to modify').completer = DXPathCompleter()
+    parser_set_details.add_argument('details', help='JSON to store as details', nargs='?')
+    parser_set_details.add_argument('-f', '--details-file', help='Path to local file containing JSON to store as details')
+    parser_set_details.set_defaults(func=set_details)
+    register_parser(parser_set_details, categories='metadata')
 
 #####################################
 # set_visibility
 #####################################
-parser_set_visibility = subparsers.add_parser('set_visibility', help='Set visibility on a data object',
-                                              description='Set visibility on a data object.', prog='dx set_visibility',
-                                              parents=[env_args, all_arg])
-parser_set_visibility.add_argument('path', help='ID or path to data object to modify').completer = DXPathCompleter()
-parser_set_visibility.add_argument('visibility', choices=['hidden', 'visible'],
-                                   help='Visibility that the object should have')
-parser_set_visibility.set_defaults(func=set_visibility)
-register_parser(parser_set_visibility, categories='metadata')
+@lazy_parser('set_visibility')
+def _build_set_visibility_parser():
+    parser_set_visibility = subparsers.add_parser('set_visibility', help='Set visibility on a data object',
+                                                  description='Set visibility on a data object.', prog='dx set_visibility',
+                                                  parents=[env_args, all_arg])
+    parser_set_visibility.add_argument('path', help='ID or path to data object to modify').completer = DXPathCompleter()
+    parser_set_visibility.add_argument('visibility', choices=['hidden', 'visible'],
+                                       help='Visibility that the object should have')
+    parser_set_visibility.set_defaults(func=set_visibility)
+    register_parser(parser_set_visibility, categories='metadata')
 
 #####################################
 # add_types
 #####################################
-parser_add_types = subparsers.add_parser('add_types', help='Add types to a data object',
-                                         description='Add types to a data object.  See https://wiki.dnanexus.com/pages/Types/ for a list of DNAnexus types.',
-                                         prog='dx add_types',
-                                         parents=[env_args, all_arg])
-parser_add_types.add_argument('path', help='ID or path to data object to modify').completer = DXPathCompleter()
-parser_add_types.add_argument('types', nargs='+', metavar='type', help='Types to add')
-parser_add_types.set_defaults(func=add_types)
-register_parser(parser_add_types, categories='metadata')
+@lazy_parser('add_types')
+def _build_add_types_parser():
+    parser_add_types = subparsers.add_parser('add_types', help='Add types to a data object',
+                                             description='Add types to a data object.  See https://wiki.dnanexus.com/pages/Types/ for a list of DNAnexus types.',
+                                             prog='dx add_types',
+                                             parents=[env_args, all_arg])
+    parser_add_types.add_argument('path', help='ID or path to data object to modify').completer = DXPathCompleter()
+    parser_add_types.add_argument('types', nargs='+', metavar='type', help='Types to add')
+    parser_add_types.set_defaults(func=add_types)
+    register_parser(parser_add_types, categories='metadata')
 
 #####################################
 # remove_types
 #####################################
-parser_remove_types = subparsers.add_parser('remove_types', help='Remove types from a data object',
-                                            description='Remove types from a data object.  See https://wiki.dnanexus.com/pages/Types/ for a list of DNAnexus types.',
-                                            prog='dx remove_types',
-                                            parents=[env_args, all_arg])
-parser_remove_types.add_argument('path', help='ID or path to data object to modify').completer = DXPathCompleter()
-parser_remove_types.add_argument('types', nargs='+', metavar='type', help='Types to remove')
-parser_remove_types.set_defaults(func=remove_types)
-register_parser(parser_remove_types, categories='metadata')
+@lazy_parser('remove_types')
+def _build_remove_types_parser():
+    parser_remove_types = subparsers.add_parser('remove_types', help='Remove types from a data object',
+                                                description='Remove types from a data object.  See https://wiki.dnanexus.com/pages/Types/ for a list of DNAnexus types.',
+                                                prog='dx remove_types',
+                                                parents=[env_args, all_arg])
+    parser_remove_types.add_argument('path', help='ID or path to data object to modify').completer = DXPathCompleter()
+    parser_remove_types.add_argument('types', nargs='+', metavar='type', help='Types to remove')
+    parser_remove_types.set_defaults(func=remove_types)
+    register_parser(parser_remove_types, categories='metadata')
 
 #####################################
 # tag
 #####################################
-parser_tag = subparsers.add_parser('tag', help='Tag a project, data object, or execution', prog='dx tag',
-                                   description='Tag a project, data object, or execution.  Note that a project context must be either set or specified for data object IDs or paths.',
-                                   parents=[env_args, all_arg])
-parser_tag.add_argument('path', help='ID or path to project, data object, or execution to modify').completer = DXPathCompleter()
-parser_tag.add_argument('tags', nargs='+', metavar='tag', help='Tags to add')
-parser_tag.set_defaults(func=add_tags)
-register_parser(parser_tag, categories='metadata')
+@lazy_parser('tag')
+def _build_tag_parser():
+    parser_tag = subparsers.add_parser('tag', help='Tag a project, data object, or execution', prog='dx tag',
+                                       description='Tag a project, data object, or execution.  Note that a project context must be either set or specified for data object IDs or paths.',
+                                       parents=[env_args, all_arg])
+    parser_tag.add_argument('path', help='ID or path to project, data object, or execution to modify').completer = DXPathCompleter()
+    parser_tag.add_argument('tags', nargs='+', metavar='tag', help='Tags to add')
+    parser_tag.set_defaults(func=add_tags)
+    register_parser(parser_tag, categories='metadata')
 
 #####################################
 # untag
 #####################################
-parser_untag = subparsers.add_parser('untag', help='Untag a project, data object, or execution', prog='dx untag',
-                                     description='Untag a project, data object, or execution.  Note that a project context must be either set or specified for data object IDs or paths.',
-                                     parents=[env_args, all_arg])
-parser_untag.add_argument('path', help='ID or path to project, data object, or execution to modify').completer = DXPathCompleter()
-parser_untag.add_argument('tags', nargs='+', metavar='tag', help='Tags to remove')
-parser_untag.set_defaults(func=remove_tags)
-register_parser(parser_untag, categories='metadata')
+@lazy_parser('untag')
+def _build_untag_parser():
+    parser_untag = subparsers.add_parser('untag', help='Untag a project, data object, or execution', prog='dx untag',
+                                         description='Untag a project, data object, or execution.  Note that a project context must be either set or specified for data object IDs or paths.',
+                                         parents=[env_args, all_arg])
+    parser_untag.add_argument('path', help='ID or path to project, data object, or execution to modify').completer = DXPathCompleter()
+    parser_untag.add_argument('tags', nargs='+', metavar='tag', help='Tags to remove')
+    parser_untag.set_defaults(func=remove_tags)
+    register_parser(parser_untag, categories='metadata')
 
 #####################################
 # rename
 #####################################
-parser_rename = subparsers.add_parser('rename',
-                                      help='Rename a project or data object',
-                                      description='Rename a project or data object.  To rename folders, use \'dx mv\' instead.  Note that a project context must be either set or specified to rename a data object.  To specify a project or a project context, append a colon character ":" after the project ID or name.',
-                                      prog='dx rename',
-                                      parents=[env_args, all_arg])
-path_action = parser_rename.add_argument('path', help='Path to project or data object to rename')
-path_action.completer = DXPathCompleter(include_current_proj=True)
-parser_rename.add_argument('name', help='New name')
-parser_rename.set_defaults(func=rename)
-register_parser(parser_rename, categories='metadata')
+@lazy_parser('rename')
+def _build_rename_parser():
+    parser_rename = subparsers.add_parser('rename',
+                                          help='Rename a project or data object',
+                                          description='Rename a project or data object.  To rename folders, use \'dx mv\' instead.  Note that a project context must be either set or specified to rename a data object.  To specify a project or a project context, append a colon character ":" after the project ID or name.',
+                                          prog='dx rename',
+                                          parents=[env_args, all_arg])
+    path_action = parser_rename.add_argument('path', help='Path to project or data object to rename')
+    path_action.completer = DXPathCompleter(include_current_proj=True)
+    parser_rename.add_argument('name', help='New name')
+    parser_rename.set_defaults(func=rename)
+    register_parser(parser_rename, categories='metadata')
 
 #####################################
 # set_properties
 #####################################
-parser_set_properties = subparsers.add_parser('set_properties', help='Set properties of a project, data object, or execution',
-                                              description='Set properties of a project, data object, or execution.  Note that a project context must be either set or specified for data object IDs or paths.', prog='dx set_properties',
-                                              parents=[env_args, all_arg])
-parser_set_properties.add_argument('path', help='ID or path to project, data object, or execution to modify').completer = DXPathCompleter()
-parser_set_properties.add_argument('properties', nargs='+', metavar='propertyname=value',
-                                   help='Key-value pairs of property names and their new values')
-parser_set_properties.set_defaults(func=set_properties)
-register_parser(parser_set_properties, categories='metadata')
+@lazy_parser('set_properties')
+def _build_set_properties_parser():
+    parser_set_properties = subparsers.add_parser('set_properties', help='Set properties of a project, data object, or execution',
+                                                  description='Set properties of a project, data object, or execution.  Note that a project context must be either set or specified for data object IDs or paths.', prog='dx set_properties',
+                                                  parents=[env_args, all_arg])
+    parser_set_properties.add_argument('path', help='ID or path to project, data object, or execution to modify').completer = DXPathCompleter()
+    parser_set_properties.add_argument('properties', nargs='+', metavar='propertyname=value',
+                                       help='Key-value pairs of property names and their new values')
+    parser_set_properties.set_defaults(func=set_properties)
+    register_parser(parser_set_properties, categories='metadata')
 
 #####################################
 # unset_properties
 #####################################
-parser_unset_properties = subparsers.add_parser('unset_properties', help='Unset properties of a project, data object, or execution',
-                                                description='Unset properties of a project, data object, or execution.  Note that a project context must be either set or specified for data object IDs or paths.',
-                                                prog='dx unset_properties',
-                                                parents=[env_args, all_arg])
-path_action = parser_unset_properties.add_argument('path', help='ID or path to project, data object, or execution to modify')
-path_action.completer = DXPathCompleter()
-parser_unset_properties.add_argument('properties', nargs='+', metavar='propertyname', help='Property names to unset')
-parser_unset_properties.set_defaults(func=unset_properties)
-register_parser(parser_unset_properties, categories='metadata')
+@lazy_parser('unset_properties')
+def _build_unset_properties_parser():
+    parser_unset_properties = subparsers.add_parser('unset_properties', help='Unset properties of a project, data object, or execution',
+                                                    description='Unset properties of a project, data object, or execution.  Note that a project context must be either set or specified for data object IDs or paths.',
+                                                    prog='dx unset_properties',
+                                                    parents=[env_args, all_arg])
+    path_action = parser_unset_properties.add_argument('path', help='ID or path to project, data object, or execution to modify')
+    path_action.completer = DXPathCompleter()
+    parser_unset_properties.add_argument('properties', nargs='+', metavar='propertyname', help='Property names to unset')
+    parser_unset_properties.set_defaults(func=unset_properties)
+    register_parser(parser_unset_properties, categories='metadata')
 
 #####################################
 # close
 #####################################
-parser_close = subparsers.add_parser('close', help='Close data object(s)',
-                                     description='Close a remote data object or set of objects.',
-                                     prog='dx close',
-                                     parents=[env_args, all_arg])
-parser_close.add_argument('path', help='Path to a data object to close', nargs='+').completer = DXPathCompleter()
-parser_close.add_argument('--wait', help='Wait for the object(s) to close', action='store_true')
-parser_close.set_defaults(func=close)
-register_parser(parser_close, categories=('data', 'metadata'))
+@lazy_parser('close')
+def _build_close_parser():
+    parser_close = subparsers.add_parser('close', help='Close data object(s)',
+                                         description='Close a remote data object or set of objects.',
+                                         prog='dx close',
+                                         parents=[env_args, all_arg])
+    parser_close.add_argument('path', help='Path to a data object to close', nargs='+').completer = DXPathCompleter()
+    parser_close.add_argument('--wait', help='Wait for the object(s) to close', action='store_true')
+    parser_close.set_defaults(func=close)
+    register_parser(parser_close, categories=('data', 'metadata'))
 
 #####################################
 # wait
 #####################################
-parser_wait = subparsers.add_parser('wait', help='Wait for data object(s) to close or job(s) to finish',
-                                    description='Polls the state of specified data object(s) or job(s) until they are all in the desired state.  Waits until the "closed" state for a data object, and for any terminal state for a job ("terminated", "failed", or "done").  Exits with a non-zero code if a job reaches a terminal state that is not "done".',
-                                    prog='dx wait',
-                                    parents=[env_args])
-path_action = parser_wait.add_argument('path', help='Path to a data object or job ID to wait for', nargs='+')
-path_action.completer = DXPathCompleter()
-parser_wait.set_defaults(func=wait)
-register_parser(parser_wait, categories=('data', 'metadata', 'exec'))
+@lazy_parser('wait')
+def _build_wait_parser():
+    parser_wait = subparsers.add_parser('wait', help='Wait for data object(s) to close or job(s) to finish',
+                                        description='Polls the state of specified data object(s) or job(s) until they are all in the desired state.  Waits until the "closed" state for a data object, and for any terminal state for a job ("terminated", "failed", or "done").  Exits with a non-zero code if a job reaches a terminal state that is not "done".',
+                                        prog='dx wait',
+                                        parents=[env_args])
+    path_action = parser_wait.add_argument('path', help='Path to a data object or job ID to wait for', nargs='+')
+    path_action.completer = DXPathCompleter()
+    parser_wait.set_defaults(func=wait)
+    register_parser(parser_wait, categories=('data', 'metadata', 'exec'))
 
 #####################################
 # get
 #####################################
-parser_get = subparsers.add_parser('get', help='Download records, apps, applets, workflows, and files',
-                                   description='Download the contents of some types of data (records, apps, applets, workflows, and files).  Downloading an app, applet or a workflow will attempt to reconstruct a source directory that can be used to rebuild it with "dx build".  Use "-o -" to direct the output to stdout.',
-                                   prog='dx get',
-                                   parents=[env_args])
-parser_get.add_argument('path', help='Data object ID or name to access').completer = DXPathCompleter(classes=['file', 'record', 'applet', 'app', 'workflow'])
-parser_get.add_argument('-o', '--output', help='local file path where the data is to be saved ("-" indicates stdout output for objects of class file and record). If not supplied, the object\'s name on the platform will be used, along with any applicable extensions. For app(let) and workflow objects, if OUTPUT does not exist, the object\'s source directory will be created there; if OUTPUT is an existing directory, a new directory with the object\'s name will be created inside it.')
-parser_get.add_argument('--no-ext', help='If -o is not provided, do not add an extension to the filename', action='store_true')
-parser_get.add_argument('--omit-resources', help='When downloading an app(let), omit fetching the resources associated with the app(let).', action='store_true')
-parser_get.add_argument('-f', '--overwrite', help='Overwrite the local file if necessary', action='store_true')
-parser_get.set_defaults(func=get)
-register_parser(parser_get, categories='data')
+@lazy_parser('get')
+def _build_get_parser():
+    parser_get = subparsers.add_parser('get', help='Download records, apps, applets, workflows, and files',
+                                       description='Download the contents of some types of data (records, apps, applets, workflows, and files).  Downloading an app, applet or a workflow will attempt to reconstruct a source directory that can be used to rebuild it with "dx build".  Use "-o -" to direct the output to stdout.',
+                                       prog='dx get',
+                                       parents=[env_args])
+    parser_get.add_argument('path', help='Data object ID or name to access').completer = DXPathCompleter(classes=['file', 'record', 'applet', 'app', 'workflow'])
+    parser_get.add_argument('-o', '--output', help='local file path where the data is to be saved ("-" indicates stdout output for objects of class file and record). If not supplied, the object\'s name on the platform will be used, along with any applicable extensions. For app(let) and workflow objects, if OUTPUT does not exist, the object\'s source directory will be created there; if OUTPUT is an existing directory, a new directory with the object\'s name will be created inside it.')
+    parser_get.add_argument('--no-ext', help='If -o is not provided, do not add an extension to the filename', action='store_true')
+    parser_get.add_argument('--omit-resources', help='When downloading an app(let), omit fetching the resources associated with the app(let).', action='store_true')
+    parser_get.add_argument('-f', '--overwrite', help='Overwrite the local file if necessary', action='store_true')
+    parser_get.set_defaults(func=get)
+    register_parser(parser_get, categories='data')
 
 #####################################
 # find
 #####################################
-parser_find = subparsers.add_parser('find', help='Search functionality over various DNAnexus entities',
-                                    description='Search functionality over various DNAnexus entities.',
-                                    formatter_class=argparse.RawTextHelpFormatter,
-                                    prog='dx find')
-subparsers_find = parser_find.add_subparsers(parser_class=DXArgumentParser)
-subparsers_find.metavar = 'category'
-register_parser(parser_find, categories=())
-
-parser_find_apps = subparsers_find.add_parser(
-    'apps',
-    help=fill('List available apps'),
-    description=fill('Finds apps subject to the given search parameters. Use --category to restrict by a category; '
-                     'common categories are available as tab completions and can be listed with --category-help.'),
-    parents=[stdout_args, json_arg, delim_arg, env_args],
-    prog='dx find apps'
-)
-parser_find_apps.add_argument('--name', help='Name of the app')
-parser_find_apps.add_argument('--category', help='Category of the app').completer = ListCompleter(APP_CATEGORIES)
-parser_find_apps.add_argument('--category-help',
-                              help='Print a list of common app categories',
-                              nargs=0,
-                              action=PrintCategoryHelp)
-parser_find_apps.add_argument('-a', '--all', help='Return all versions of each app', action='store_true')
-parser_find_apps.add_argument('--unpublished', help='Return only unpublished apps (if omitted, returns only published apps)', action='store_true')
-parser_find_apps.add_argument('--installed', help='Return only installed apps', action='store_true')
-parser_find_apps.add_argument('--billed-to', help='User or organization responsible for the app')
-parser_find_apps.add_argument('--creator', help='Creator of the app version')
-parser_find_apps.add_argument('--developer', help='Developer of the app')
-parser_find_apps.add_argument('--created-after', help='Date (e.g. 2012-01-01) or integer timestamp after which the app version was created (negative number means ms in the past, or use suffix s, m, h, d, w, M, y)')
-parser_find_apps.add_argument('--created-before', help='Date (e.g. 2012-01-01) or integer timestamp before which the app version was created (negative number means ms in the past, or use suffix s, m, h, d, w, M, y)')
-parser_find_apps.add_argument('--mod-after', help='Date (e.g. 2012-01-01) or integer timestamp after which the app was last modified (negative number means ms in the past, or use suffix s, m, h, d, w, M, y)')
-parser_find_apps.add_argument('--mod-before', help='Date (e.g. 2012-01-01) or integer timestamp before which the app was last modified (negative number means ms in the past, or use suffix s, m, h, d, w, M, y)')
-parser_find_apps.set_defaults(func=find_apps)
-register_parser(parser_find_apps, subparsers_action=subparsers_find, categories='exec')
-
-parser_find_jobs = subparsers_find.add_parser(
-    'jobs',
-    help=fill('List jobs in the current project'),
-    description=fill('Finds jobs subject to the given search parameters. By default, output is formatted to show the '
-                     'last several job trees that you\'ve run in the current project.'),
-    parents=[find_executions_args, stdout_args, json_arg, no_color_arg, delim_arg, env_args,
-             find_by_properties_and_tags_args],
-    formatter_class=argparse.RawTextHelpFormatter,
-    conflict_handler='resolve',
-    prog='dx find jobs'
-)
-add_find_executions_search_gp(parser_find_jobs)
-parser_find_jobs.set_defaults(func=find_executions, classname='job')
-parser_find_jobs.completer = DXPathCompleter(expected='project')
-register_parser(parser_find_jobs, subparsers_action=subparsers_find, categories='exec')
-
-parser_find_analyses = subparsers_find.add_parser(
-    'analyses',
-    help=fill('List analyses in the current project'),
-    description=fill('Finds analyses subject to the given search parameters. By default, output is formatted to show '
-                     'the last several job trees that you\'ve run in the current project.'),
-    parents=[find_executions_args, stdout_args, json_arg, no_color_arg, delim_arg, env_args,
-             find_by_properties_and_tags_args],
-    formatter_class=argparse.RawTextHelpFormatter,
-    conflict_handler='resolve',
-    prog='dx find analyses'
-)
-add_find_executions_search_gp(parser_find_analyses)
-parser_find_analyses.set_defaults(func=find_executions, classname='analysis')
-parser_find_analyses.completer = DXPathCompleter(expected='project')
-register_parser(parser_find_analyses, subparsers_action=subparsers_find, categories='exec')
-
-parser_find_executions = subparsers_find.add_parser(
-    'executions',
-    help=fill('List executions (jobs and analyses) in the current project'),
-    description=fill('Finds executions (jobs and analyses) subject to the given search parameters. By default, output '
-                     'is formatted to show the last several job trees that you\'ve run in the current project.'),
-    parents=[find_executions_args, stdout_args, json_arg, no_color_arg, delim_arg, env_args,
-             find_by_properties_and_tags_args],
-    formatter_class=argparse.RawTextHelpFormatter,
-    conflict_handler='resolve',
-    prog='dx find executions'
-)
-add_find_executions_search_gp(parser_find_executions)
-parser_find_executions.set_defaults(func=find_executions, classname=None)
-parser_find_executions.completer = DXPathCompleter(expected='project')
-register_parser(parser_find_executions, subparsers_action=subparsers_find, categories='exec')
-
-parser_find_data = subparsers_find.add_parser(
-    'data',
-    help=fill('List data objects in the current project'),
-    description=fill('Finds data objects subject to the given search parameters. By default, restricts the search to '
-                     'the current project if set. To search over all projects (excluding public projects), use '
-                     '--all-projects (overrides --path and --norecurse).'),
-    parents=[stdout_args, json_arg, no_color_arg, delim_arg, env_args, find_by_properties_and_tags_args],
-    prog='dx find data'
-)
-parser_find_data.add_argument('--class', dest='classname', choices=['record', 'file', 'gtable', 'applet', 'workflow'], help='Data object class', metavar='{record,file,applet,workflow}')
-parser_find_data.add_argument('--state', choices=['open', 'closing', 'closed', 'any'], help='State of the object')
-parser_find_data.add_argument('--visibility', choices=['hidden', 'visible', 'either'], default='visible', help='Whether the object is hidden or not')
-parser_find_data.add_argument('--name', help='Name of the object')
-parser_find_data.add_argument('--type', help='Type of the data object')
-parser_find_data.add_argument('--link', help='Object ID that the data object links to')
-parser_find_data.add_argument('--all-projects', '--allprojects', help='Extend search to all projects (excluding public projects)', action='store_true')
-parser_find_data.add_argument('--project', help=argparse.SUPPRESS)
-parser_find_data.add_argument('--folder', help=argparse.SUPPRESS).completer = DXPathCompleter(expected='folder')
-parser_find_data.add_argument('--path', help='Project and/or folder in which to restrict the results',
-                              metavar='PROJECT:FOLDER').completer = DXPathCompleter(expected='folder')
-parser_find_data.add_argument('--norecurse', dest='recurse', help='Do not recurse into subfolders', action='store_false')
-parser_find_data.add_argument('--mod-after', help='Date (e.g. 2012-01-01) or integer timestamp after which the object was last modified (negative number means ms in the past, or use suffix s, m, h, d, w, M, y)')
-parser_find_data.add_argument('--mod-before', help='Date (e.g. 2012-01-01) or integer timestamp before which the object was last modified (negative number means ms in the past, or use suffix s, m, h, d, w, M, y)')
-parser_find_data.add_argument('--created-after', help='Date (e.g. 2012-01-01) or integer timestamp after which the object was created (negative number means ms in the past, or use suffix s, m, h, d, w, M, y)')
-parser_find_data.add_argument('--created-before', help='Date (e.g. 2012-01-01) or integer timestamp before which the object was created (negative number means ms in the past, or use suffix s, m, h, d, w, M, y)')
-parser_find_data.set_defaults(func=find_data)
-register_parser(parser_find_data, subparsers_action=subparsers_find, categories=('data', 'metadata'))
-
-parser_find_projects = subparsers_find.add_parser(
-    'projects',
-    help=fill('List projects'),
-    description=fill('Finds projects subject to the given search parameters. Use the --public flag to list all public '
-                     'projects.'),
-    parents=[stdout_args, json_arg, delim_arg, env_args, find_by_properties_and_tags_args, contains_phi],
-    prog='dx find projects'
-)
-parser_find_projects.add_argument('--name', help='Name of the project')
-parser_find_projects.add_argument('--level', choices=['VIEW', 'UPLOAD', 'CONTRIBUTE', 'ADMINISTER'],
-                                  help='Minimum level of permissions expected')
-parser_find_projects.add_argument('--public',
-                                  help='Include ONLY public projects (will automatically set --level to VIEW)',
-                                  action='store_true')
-parser_find_projects.add_argument('--created-after',
-                                  help='Date (e.g. 2012-01-01) or integer timestamp after which the project was ' +
-                                  'created (negative number means ms in the past, or use suffix s, m, h, d, w, M, y)')
-parser_find_projects.add_argument('--created-before',
-                                  help='Date (e.g. 2012-01-01) or integer timestamp after which the project was ' +
-                                  'created (negative number means ms in the past, or use suffix s, m, h, d, w, M, y)')
-parser_find_projects.set_defaults(func=find_projects)
-register_parser(parser_find_projects, subparsers_action=subparsers_find, categories='data')
-
-parser_find_org = subparsers_find.add_parser(
-    "org",
-    help=fill("List entities within a specific org.") + "\n\n\t" +
-         fill('"dx find org members" lists members in the specified org') + "\n\n\t" +
-         fill('"dx find org projects" lists projects billed to the specified org') + "\n\n\t" +
-         fill('"dx find org apps" lists apps billed to the specified org') + "\n\n" +
-         fill('Please execute "dx find org -h" for more information.'),
-    description=fill("List entities within a specific org."),
-    prog="dx find org",
-)
-register_parser(parser_find_org, subparsers_action=subparsers_find)
-
-subparsers_find_org = parser_find_org.add_subparsers(parser_class=DXArgumentParser)
-subparsers_find_org.metavar = "entities"
-
-parser_find_org_members = subparsers_find_org.add_parser(
-    'members',
-    help='List members in the specified org',
-    description=fill('Finds members in the specified org subject to the given search parameters'),
-    parents=[stdout_args, json_arg, delim_arg, env_args],
-    prog='dx find org members'
-)
-parser_find_org_members.add_argument('org_id', help='Org ID')
-parser_find_org_members.add_argument('--level', choices=["ADMIN", "MEMBER"], help='Restrict the result set to contain only members at the specified membership level.')
-parser_find_org_members.set_defaults(func=org_find_members)
-register_parser(parser_find_org_members, subparsers_action=subparsers_find_org, categories='org')
-
-parser_find_org_projects = subparsers_find_org.add_parser(
-    'projects',
-    help='List projects billed to the specified org',
-    description=fill('Finds projects billed to the specified org subject to the given search parameters. You must '
-                     'be an ADMIN of the specified org to use this command. It allows you to identify projects billed '
-                     'to the org that have not been shared with you explicitly.'),
-    parents=[stdout_args, json_arg, delim_arg, env_args, find_by_properties_and_tags_args, contains_phi],
-    prog='dx find org projects'
-)
-parser_find_org_projects.add_argument('org_id', help='Org ID')
-parser_find_org_projects.add_argument('--name', help='Name of the projects')
-parser_find_org_projects.add_argument('--ids', nargs='+', help='Possible project IDs. May be specified like "--ids project-1 project-2"')
-find_org_projects_public = parser_find_org_projects.add_mutually_exclusive_group()
-find_org_projects_public.add_argument('--public-only', dest='public', help='Include only public projects', action='store_true', default=None)
-find_org_projects_public.add_argument('--private-only', dest='public', help='Include only private projects', action='store_false', default=None)
-parser_find_org_projects.add_argument('--created-after', help='Date (e.g. 2012-01-31) or integer timestamp after which the project was created (negative number means ms in the past, or use suffix s, m, h, d, w, M, y). Integer timestamps will be parsed as milliseconds since epoch.')
-parser_find_org_projects.add_argument('--created-before', help='Date (e.g. 2012-01-31) or integer timestamp before which the project was created (negative number means ms in the past, or use suffix s, m, h, d, w, M, y). Integer timestamps will be parsed as milliseconds since epoch.')
-parser_find_org_projects.set_defaults(func=org_find_projects)
-register_parser(parser_find_org_projects, subparsers_action=subparsers_find_org, categories=('data', 'org'))
-
-parser_find_org_apps = subparsers_find_org.add_parser(
-    'apps',
-    help='List apps billed to the specified org',
-    description=fill('Finds apps billed to the specified org subject to the given search parameters. You must '
-                     'be an ADMIN of the specified org to use this command. It allows you to identify apps billed '
-                     'to the org that have not been shared with you explicitly.'),
-    parents=[stdout_args, json_arg, delim_arg, env_args],
-    prog='dx find org apps'
-)
-parser_find_org_apps.add_argument('org_id', help='Org ID')
-parser_find_org_apps.add_argument('--name', help='Name of the apps')
-parser_find_org_apps.add_argument('--category', help='Category of the app').completer = ListCompleter(APP_CATEGORIES)
-parser_find_org_apps.add_argument('--category-help',
+@lazy_parser('find')
+def _build_find_parser():
+    from ..cli.org import find_orgs, org_find_members, org_find_projects, org_find_apps
+    parser_find = subparsers.add_parser('find', help='Search functionality over various DNAnexus entities',
+                                        description='Search functionality over various DNAnexus entities.',
+                                        formatter_class=argparse.RawTextHelpFormatter,
+                                        prog='dx find')
+    subparsers_find = parser_find.add_subparsers(parser_class=DXArgumentParser)
+    subparsers_find.metavar = 'category'
+    register_parser(parser_find, categories=())
+
+    parser_find_apps = subparsers_find.add_parser(
+        'apps',
+        help=fill('List available apps'),
+        description=fill('Finds apps subject to the given search parameters. Use --category to restrict by a category; '
+                         'common categories are available as tab completions and can be listed with --category-help.'),
+        parents=[stdout_args, json_arg, delim_arg, env_args],
+        prog='dx find apps'
+    )
+    parser_find_apps.add_argument('--name', help='Name of the app')
+    parser_find_apps.add_argument('--category', help='Category of the app').completer = ListCompleter(APP_CATEGORIES)
+    parser_find_apps.add_argument('--category-help',
                                   help='Print a list of common app categories',
                                   nargs=0,
                                   action=PrintCategoryHelp)
-
-parser_find_org_apps.add_argument('-a', '--all', help='Return all versions of each app', action='store_true')
-parser_find_org_apps.add_argument('--unpublished', help='Return only unpublished apps (if omitted, returns all apps)', action='store_true')
-parser_find_org_apps.add_argument('--installed', help='Return only installed apps', action='store_true')
-parser_find_org_apps.add_argument('--creator', help='Creator of the app version')
-parser_find_org_apps.add_argument('--developer', help='Developer of the app')
-parser_find_org_apps.add_argument('--created-after', help='Date (e.g. 2012-01-31) or integer timestamp after which the project was created (negative number means ms in the past, or use suffix s, m, h, d, w, M, y). Integer timestamps will be parsed as milliseconds since epoch.')
-parser_find_org_apps.add_argument('--created-before', help='Date (e.g. 2012-01-31) or integer timestamp before which the project was created (negative number means ms in the past, or use suffix s, m, h, d, w, M, y). Integer timestamps will be parsed as milliseconds since epoch.')
-parser_find_org_apps.add_argument('--mod-after', help='Date (e.g. 2012-01-01) or integer timestamp after which the app was last modified (negative number means ms in the past, or use suffix s, m, h, d, w, M, y)')
-parser_find_org_apps.add_argument('--mod-before', help='Date (e.g. 2012-01-01) or integer timestamp before which the app was last modified (negative number means ms in the past, or use suffix s, m, h, d, w, M, y)')
-parser_find_org_apps.set_defaults(func=org_find_apps)
-register_parser(parser_find_org_apps, subparsers_action=subparsers_find_org, categories=('exec', 'org'))
-
-parser_find_orgs = subparsers_find.add_parser(
-    "orgs",
-    help=fill("List orgs"),
-    description="Finds orgs subject to the given search parameters.",
-    parents=[stdout_args, env_args, delim_arg, json_arg],
-    prog="dx find orgs"
-)
-parser_find_orgs.add_argument("--level", choices=["ADMIN", "MEMBER"], required=True, help="Restrict the result set to contain only orgs in which the requesting user has at least the specified membership level")
-parser_find_orgs_with_billable_activities = parser_find_orgs.add_mutually_exclusive_group()
-parser_find_orgs_with_billable_activities.add_argument("--with-billable-activities", action="store_true", help="Restrict the result set to contain only orgs in which the requesting user can perform billable activities; mutually exclusive with --without-billable-activities")
-parser_find_orgs_with_billable_activities.add_argument("--without-billable-activities", dest="with_billable_activities", action="store_false", help="Restrict the result set to contain only orgs in which the requesting user **cannot** perform billable activities; mutually exclusive with --with-billable-activities")
-parser_find_orgs.set_defaults(func=find_orgs, with_billable_activities=None)
-register_parser(parser_find_orgs, subparsers_action=subparsers_find, categories="org")
+    parser_find_apps.add_argument('-a', '--all', help='Return all versions of each app', action='store_true')
+    parser_find_apps.add_argument('--unpublished', help='Return only unpublished apps (if omitted, returns only published apps)', action='store_true')
+    parser_find_apps.add_argument('--installed', help='Return only installed apps', action='store_true')
+    parser_find_apps.add_argument('--billed-to', help='User or organization responsible for the app')
+    parser_find_apps.add_argument('--creator', help='Creator of the app version')
+    parser_find_apps.add_argument('--developer', help='Developer of the app')
+    parser_find_apps.add_argument('--created-after', help='Date (e.g. 2012-01-01) or integer timestamp after which the app version was created (negative number means ms in the past, or use suffix s, m, h, d, w, M, y)')
+    parser_find_apps.add_argument('--created-before', help='Date (e.g. 2012-01-01) or integer timestamp before which the app version was created (negative number means ms in the past, or use suffix s, m, h, d, w, M, y)')
+    parser_find_apps.add_argument('--mod-after', help='Date (e.g. 2012-01-01) or integer timestamp after which the app was last modified (negative number means ms in the past, or use suffix s, m, h, d, w, M, y)')
+    parser_find_apps.add_argument('--mod-before', help='Date (e.g. 2012-01-01) or integer timestamp before which the app was last modified (negative number means ms in the past, or use suffix s, m, h, d, w, M, y)')
+    parser_find_apps.set_defaults(func=find_apps)
+    register_parser(parser_find_apps, subparsers_action=subparsers_find, categories='exec')
+
+    parser_find_jobs = subparsers_find.add_parser(
+        'jobs',
+        help=fill('List jobs in the current project'),
+        description=fill('Finds jobs subject to the given search parameters. By default, output is formatted to show the '
+                         'last several job trees that you\'ve run in the current project.'),
+        parents=[find_executions_args, stdout_args, json_arg, no_color_arg, delim_arg, env_args,
+                 find_by_properties_and_tags_args],
+        formatter_class=argparse.RawTextHelpFormatter,
+        conflict_handler='resolve',
+        prog='dx find jobs'
+    )
+    add_find_executions_search_gp(parser_find_jobs)
+    parser_find_jobs.set_defaults(func=find_executions, classname='job')
+    parser_find_jobs.completer = DXPathCompleter(expected='project')
+    register_parser(parser_find_jobs, subparsers_action=subparsers_find, categories='exec')
+
+    parser_find_analyses = subparsers_find.add_parser(
+        'analyses',
+        help=fill('List analyses in the current project'),
+        description=fill('Finds analyses subject to the given search parameters. By default, output is formatted to show '
+                         'the last several job trees that you\'ve run in the current project.'),
+        parents=[find_executions_args, stdout_args, json_arg, no_color_arg, delim_arg, env_args,
+                 find_by_properties_and_tags_args],
+        formatter_class=argparse.RawTextHelpFormatter,
+        conflict_handler='resolve',
+        prog='dx find analyses'
+    )
+    add_find_executions_search_gp(parser_find_analyses)
+    parser_find_analyses.set_defaults(func=find_executions, classname='analysis')
+    parser_find_analyses.completer = DXPathCompleter(expected='project')
+    register_parser(parser_find_analyses, subparsers_action=subparsers_find, categories='exec')
+
+    parser_find_executions = subparsers_find.add_parser(
+        'executions',
+        help=fill('List executions (jobs and analyses) in the current project'),
+        description=fill('Finds executions (jobs and analyses) subject to the given search parameters. By default, output '
+                         'is formatted to show the last several job trees that you\'ve run in the current project.'),
+        parents=[find_executions_args, stdout_args, json_arg, no_color_arg, delim_arg, env_args,
+                 find_by_properties_and_tags_args],
+        formatter_class=argparse.RawTextHelpFormatter,
+        conflict_handler='resolve',
+        prog='dx find executions'
+    )
+    add_find_executions_search_gp(parser_find_executions)
+    parser_find_executions.set_defaults(func=find_executions, classname=None)
+    parser_find_executions.completer = DXPathCompleter(expected='project')
+    register_parser(parser_find_executions, subparsers_action=subparsers_find, categories='exec')
+
+    parser_find_data = subparsers_find.add_parser(
+        'data',
+        help=fill('List data objects in the current project'),
+        description=fill('Finds data objects subject to the given search parameters. By default, restricts the search to '
+                         'the current project if set. To search over all projects (excluding public projects), use '
+                         '--all-projects (overrides --path and --norecurse).'),
+        parents=[stdout_args, json_arg, no_color_arg, delim_arg, env_args, find_by_properties_and_tags_args],
+        prog='dx find data'
+    )
+    parser_find_data.add_argument('--class', dest='classname', choices=['record', 'file', 'gtable', 'applet', 'workflow'], help='Data object class', metavar='{record,file,applet,workflow}')
+    parser_find_data.add_argument('--state', choices=['open', 'closing', 'closed', 'any'], help='State of the object')
+    parser_find_data.add_argument('--visibility', choices=['hidden', 'visible', 'either'], default='visible', help='Whether the object is hidden or not')
+    parser_find_data.add_argument('--name', help='Name of the object')
+    parser_find_data.add_argument('--type', help='Type of the data object')
+    parser_find_data.add_argument('--link', help='Object ID that the data object links to')
+    parser_find_data.add_argument('--all-projects', '--allprojects', help='Extend search to all projects (excluding public projects)', action='store_true')
+    parser_find_data.add_argument('--project', help=argparse.SUPPRESS)
+    parser_find_data.add_argument('--folder', help=argparse.SUPPRESS).completer = DXPathCompleter(expected='folder')
+    parser_find_data.add_argument('--path', help='Project and/or folder in which to restrict the results',
+                                  metavar='PROJECT:FOLDER').completer = DXPathCompleter(expected='folder')
+    parser_find_data.add_argument('--norecurse', dest='recurse', help='Do not recurse into subfolders', action='store_false')
+    parser_find_data.add_argument('--mod-after', help='Date (e.g. 2012-01-01) or integer timestamp after which the object was last modified (negative number means ms in the past, or use suffix s, m, h, d, w, M, y)')
+    parser_find_data.add_argument('--mod-before', help='Date (e.g. 2012-01-01) or integer timestamp before which the object was last modified (negative number means ms in the past, or use suffix s, m, h, d, w, M, y)')
+    parser_find_data.add_argument('--created-after', help='Date (e.g. 2012-01-01) or integer timestamp after which the object was created (negative number means ms in the past, or use suffix s, m, h, d, w, M, y)')
+    parser_find_data.add_argument('--created-before', help='Date (e.g. 2012-01-01) or integer timestamp before which the object was created (negative number means ms in the past, or use suffix s, m, h, d, w, M, y)')
+    parser_find_data.set_defaults(func=find_data)
+    register_parser(parser_find_data, subparsers_action=subparsers_find, categories=('data', 'metadata'))
+
+    parser_find_projects = subparsers_find.add_parser(
+        'projects',
+        help=fill('List projects'),
+        description=fill('Finds projects subject to the given search parameters. Use the --public flag to list all public '
+                         'projects.'),
+        parents=[stdout_args, json_arg, delim_arg, env_args, find_by_properties_and_tags_args, contains_phi],
+        prog='dx find projects'
+    )
+    parser_find_projects.add_argument('--name', help='Name of the project')
+    parser_find_projects.add_argument('--level', choices=['VIEW', 'UPLOAD', 'CONTRIBUTE', 'ADMINISTER'],
+                                      help='Minimum level of permissions expected')
+    parser_find_projects.add_argument('--public',
+                                      help='Include ONLY public projects (will automatically set --level to VIEW)',
+                                      action='store_true')
+    parser_find_projects.add_argument('--created-after',
+                                      help='Date (e.g. 2012-01-01) or integer timestamp after which the project was ' +
+                                      'created (negative number means ms in the past, or use suffix s, m, h, d, w, M, y)')
+    parser_find_projects.add_argument('--created-before',
+                                      help='Date (e.g. 2012-01-01) or integer timestamp after which the project was ' +
+                                      'created (negative number means ms in the past, or use suffix s, m, h, d, w, M, y)')
+    parser_find_projects.set_defaults(func=find_projects)
+    register_parser(parser_find_projects, subparsers_action=subparsers_find, categories='data')
+
+    parser_find_org = subparsers_find.add_parser(
+        "org",
+        help=fill("List entities within a specific org.") + "\n\n\t" +
+             fill('"dx find org members" lists members in the specified org') + "\n\n\t" +
+             fill('"dx find org projects" lists projects billed to the specified org') + "\n\n\t" +
+             fill('"dx find org apps" lists apps billed to the specified org') + "\n\n" +
+             fill('Please execute "dx find org -h" for more information.'),
+        description=fill("List entities within a specific org."),
+        prog="dx find org",
+    )
+    register_parser(parser_find_org, subparsers_action=subparsers_find)
+
+    subparsers_find_org = parser_find_org.add_subparsers(parser_class=DXArgumentParser)
+    subparsers_find_org.metavar = "entities"
+
+    parser_find_org_members = subparsers_find_org.add_parser(
+        'members',
+        help='List members in the specified org',
+        description=fill('Finds members in the specified org subject to the given search parameters'),
+        parents=[stdout_args, json_arg, delim_arg, env_args],
+        prog='dx find org members'
+    )
+    parser_find_org_members.add_argument('org_id', help='Org ID')
+    parser_find_org_members.add_argument('--level', choices=["ADMIN", "MEMBER"], help='Restrict the result set to contain only members at the specified membership level.')
+    parser_find_org_members.set_defaults(func=org_find_members)
+    register_parser(parser_find_org_members, subparsers_action=subparsers_find_org, categories='org')
+
+    parser_find_org_projects = subparsers_find_org.add_parser(
+        'projects',
+        help='List projects billed to the specified org',
+        description=fill('Finds projects billed to the specified org subject to the given search parameters. You must '
+                         'be an ADMIN of the specified org to use this command. It allows you to identify projects billed '
+                         'to the org that have not been shared with you explicitly.'),
+        parents=[stdout_args, json_arg, delim_arg, env_args, find_by_properties_and_tags_args, contains_phi],
+        prog='dx find org projects'
+    )
+    parser_find_org_projects.add_argument('org_id', help='Org ID')
+    parser_find_org_projects.add_argument('--name', help='Name of the projects')
+    parser_find_org_projects.add_argument('--ids', nargs='+', help='Possible project IDs. May be specified like "--ids project-1 project-2"')
+    find_org_projects_public = parser_find_org_projects.add_mutually_exclusive_group()
+    find_org_projects_public.add_argument('--public-only', dest='public', help='Include only public projects', action='store_true', default=None)
+    find_org_projects_public.add_argument('--private-only', dest='public', help='Include only private projects', action='store_false', default=None)
+    parser_find_org_projects.add_argument('--created-after', help='Date (e.g. 2012-01-31) or integer timestamp after which the project was created (negative number means ms in the past, or use suffix s, m, h, d, w, M, y). Integer timestamps will be parsed as milliseconds since epoch.')
+    parser_find_org_projects.add_argument('--created-before', help='Date (e.g. 2012-01-31) or integer timestamp before which the project was created (negative number means ms in the past, or use suffix s, m, h, d, w, M, y). Integer timestamps will be parsed as milliseconds since epoch.')
+    parser_find_org_projects.set_defaults(func=org_find_projects)
+    register_parser(parser_find_org_projects, subparsers_action=subparsers_find_org, categories=('data', 'org'))
+
+    parser_find_org_apps = subparsers_find_org.add_parser(
+        'apps',
+        help='List apps billed to the specified org',
+        description=fill('Finds apps billed to the specified org subject to the given search parameters. You must '
+                         'be an ADMIN of the specified org to use this command. It allows you to identify apps billed '
+                         'to the org that have not been shared with you explicitly.'),
+        parents=[stdout_args, json_arg, delim_arg, env_args],
+        prog='dx find org apps'
+    )
+    parser_find_org_apps.add_argument('org_id', help='Org ID')
+    parser_find_org_apps.add_argument('--name', help='Name of the apps')
+    parser_find_org_apps.add_argument('--category', help='Category of the app').completer = ListCompleter(APP_CATEGORIES)
+    parser_find_org_apps.add_argument('--category-help',
+                                      help='Print a list of common app categories',
+                                      nargs=0,
+                                      action=PrintCategoryHelp)
+
+    parser_find_org_apps.add_argument('-a', '--all', help='Return all versions of each app', action='store_true')
+    parser_find_org_apps.add_argument('--unpublished', help='Return only unpublished apps (if omitted, returns all apps)', action='store_true')
+    parser_find_org_apps.add_argument('--installed', help='Return only installed apps', action='store_true')
+    parser_find_org_apps.add_argument('--creator', help='Creator of the app version')
+    parser_find_org_apps.add_argument('--developer', help='Developer of the app')
+    parser_find_org_apps.add_argument('--created-after', help='Date (e.g. 2012-01-31) or integer timestamp after which the project was created (negative number means ms in the past, or use suffix s, m, h, d, w, M, y). Integer timestamps will be parsed as milliseconds since epoch.')
+    parser_find_org_apps.add_argument('--created-before', help='Date (e.g. 2012-01-31) or integer timestamp before which the project was created (negative number means ms in the past, or use suffix s, m, h, d, w, M, y). Integer timestamps will be parsed as milliseconds since epoch.')
+    parser_find_org_apps.add_argument('--mod-after', help='Date (e.g. 2012-01-01) or integer timestamp after which the app was last modified (negative number means ms in the past, or use suffix s, m, h, d, w, M, y)')
+    parser_find_org_apps.add_argument('--mod-before', help='Date (e.g. 2012-01-01) or integer timestamp before which the app was last modified (negative number means ms in the past, or use suffix s, m, h, d, w, M, y)')
+    parser_find_org_apps.set_defaults(func=org_find_apps)
+    register_parser(parser_find_org_apps, subparsers_action=subparsers_find_org, categories=('exec', 'org'))
+
+    parser_find_orgs = subparsers_find.add_parser(
+        "orgs",
+        help=fill("List orgs"),
+        description="Finds orgs subject to the given search parameters.",
+        parents=[stdout_args, env_args, delim_arg, json_arg],
+        prog="dx find orgs"
+    )
+    parser_find_orgs.add_argument("--level", choices=["ADMIN", "MEMBER"], required=True, help="Restrict the result set to contain only orgs in which the requesting user has at least the specified membership level")
+    parser_find_orgs_with_billable_activities = parser_find_orgs.add_mutually_exclusive_group()
+    parser_find_orgs_with_billable_activities.add_argument("--with-billable-activities", action="store_true", help="Restrict the result set to contain only orgs in which the requesting user can perform billable activities; mutually exclusive with --without-billable-activities")
+    parser_find_orgs_with_billable_activities.add_argument("--without-billable-activities", dest="with_billable_activities", action="store_false", help="Restrict the result set to contain only orgs in which the requesting user **cannot** perform billable activities; mutually exclusive with --with-billable-activities")
+    parser_find_orgs.set_defaults(func=find_orgs, with_billable_activities=None)
+    register_parser(parser_find_orgs, subparsers_action=subparsers_find, categories="org")
 
 #####################################
 # api
 #####################################
-parser_api = subparsers.add_parser('api', help='Call an API method',
-                                   formatter_class=argparse.RawTextHelpFormatter,
-                                   description=fill('Call an API method directly.  The JSON response from the API server will be returned if successful.  No name resolution is performed; DNAnexus IDs must always be provided.  The API specification can be found at') + '''
+@lazy_parser('api')
+def _build_api_parser():
+    parser_api = subparsers.add_parser('api', help='Call an API method',
+                                       formatter_class=argparse.RawTextHelpFormatter,
+                                       description=fill('Call an API method directly.  The JSON response from the API server will be returned if successful.  No name resolution is performed; DNAnexus IDs must always be provided.  The API specification can be found at') + '''
 
 https://wiki.dnanexus.com/API-Specification-v1.0.0/Introduction
 
@@ -5065,32 +5272,36 @@ EXAMPLE
   }
 
 ''',
-                                   prog='dx api',
-                                   parents=[env_args])
-parser_api.add_argument('resource', help=fill('One of "system", a class name (e.g. "record"), or an entity ID such as "record-xxxx".  Use "app-name/1.0.0" to refer to version "1.0.0" of the app named "name".', width_adjustment=-17))
-parser_api.add_argument('method', help=fill('Method name for the resource as documented by the API specification', width_adjustment=-17))
-parser_api.add_argument('input_json', nargs='?', default="{}", help='JSON input for the method (if not given, "{}" is used)')
-parser_api.add_argument('--input', help=fill('Load JSON input from FILENAME ("-" to use stdin)', width_adjustment=-17))
-parser_api.set_defaults(func=api)
-# parser_api.completer = TODO
-register_parser(parser_api)
+                                       prog='dx api',
+                                       parents=[env_args])
+    parser_api.add_argument('resource', help=fill('One of "system", a class name (e.g. "record"), or an entity ID such as "record-xxxx".  Use "app-name/1.0.0" to refer to version "1.0.0" of the app named "name".', width_adjustment=-17))
+    parser_api.add_argument('method', help=fill('Method name for the resource as documented by the API specification', width_adjustment=-17))
+    parser_api.add_argument('input_json', nargs='?', default="{}", help='JSON input for the method (if not given, "{}" is used)')
+    parser_api.add_argument('--input', help=fill('Load JSON input from FILENAME ("-" to use stdin)', width_adjustment=-17))
+    parser_api.set_defaults(func=api)
+    # parser_api.completer = TODO
+    register_parser(parser_api)
 
 #####################################
 # upgrade
 #####################################
-parser_upgrade = subparsers.add_parser('upgrade', help='Upgrade dx-toolkit (the DNAnexus SDK and this program)',
-                                       description='Upgrades dx-toolkit (the DNAnexus SDK and this program) to the latest recommended version, or to a specified version and platform.',
-                                       prog='dx upgrade')
-parser_upgrade.add_argument('args', nargs='*')
-parser_upgrade.set_defaults(func=upgrade)
-register_parser(parser_upgrade)
+@lazy_parser('upgrade')
+def _build_upgrade_parser():
+    parser_upgrade = subparsers.add_parser('upgrade', help='Upgrade dx-toolkit (the DNAnexus SDK and this program)',
+                                           description='Upgrades dx-toolkit (the DNAnexus SDK and this program) to the latest recommended version, or to a specified version and platform.',
+                                           prog='dx upgrade')
+    parser_upgrade.add_argument('args', nargs='*')
+    parser_upgrade.set_defaults(func=upgrade)
+    register_parser(parser_upgrade)
 
 #####################################
 # help
 #####################################
-category_list = '\n  '.join([category + parser_categories[category]['desc'] for category in parser_categories_sorted])
-parser_help = subparsers.add_parser('help', help='Display help messages and dx commands by category',
-                                    description=fill('Displays the help message for the given command (and subcommand if given), or displays the list of all commands in the given category.') + '\n\nCATEGORIES\n\n  ' + category_list + '''
+@lazy_parser('help')
+def _build_help_parser():
+    category_list = '\n  '.join([category + parser_categories[category]['desc'] for category in parser_categories_sorted])
+    parser_help = subparsers.add_parser('help', help='Display help messages and dx commands by category',
+                                        description=fill('Displays the help message for the given command (and subcommand if given), or displays the list of all commands in the given category.') + '\n\nCATEGORIES\n\n  ' + category_list + '''
 
 EXAMPLE
 
@@ -5101,20 +5312,24 @@ EXAMPLE
   $ dx help run
     <help message for dx run>
 ''', formatter_class=argparse.RawTextHelpFormatter, prog='dx help')
-parser_help.add_argument('command_or_category', help=fill('Display the help message for the given command, or the list of all available commands for the given category', width_adjustment=-24), nargs='?', default=None)
-parser_help.add_argument('subcommand', help=fill('Display the help message for the given subcommand of the command', width_adjustment=-23), nargs='?', default=None)
-parser_help.set_defaults(func=print_help)
-# TODO: make this completer conditional on whether "help run" is in args
-# parser_help.completer = MultiCompleter([DXAppCompleter(),
-#                                         DXPathCompleter(classes=['applet'])])
-parser_map['help'] = parser_help # TODO: a special help completer
-parser_map['help run'] = parser_help
-for category in parser_categories:
-    parser_categories[category]['cmds'].append(('help', subparsers._choices_actions[-1].help))
-parser_categories['all']['cmds'].sort()
+    parser_help.add_argument('command_or_category', help=fill('Display the help message for the given command, or the list of all available commands for the given category', width_adjustment=-24), nargs='?', default=None)
+    parser_help.add_argument('subcommand', help=fill('Display the help message for the given subcommand of the command', width_adjustment=-23), nargs='?', default=None)
+    parser_help.set_defaults(func=print_help)
+    # TODO: make this completer conditional on whether "help run" is in args
+    # parser_help.completer = MultiCompleter([DXAppCompleter(),
+    #                                         DXPathCompleter(classes=['applet'])])
+    parser_map['help'] = parser_help # TODO: a special help completer
+    parser_map['help run'] = parser_help
+    for category in parser_categories:
+        parser_categories[category]['cmds'].append(('help', subparsers._choices_actions[-1].help))
 
 
 def main():
+    # Let the dx daemon run the command, if one was started for this shell
+    exit_code = dx_daemon.forward(args_list)
+    if exit_code is not None:
+        sys.exit(exit_code)
+
     # Bash argument completer hook
     if '_ARGCOMPLETE' in os.environ:
         from ..packages import argcomplete
@@ -5129,8 +5344,10 @@ def main():
         set_cli_colors(args)
         set_delim(args)
         set_env_from_args(args)
+        set_profiling_from_args(args)
         try:
-            args.func(args)
+            with profiling.span("dx " + str(getattr(args, 'command', '')), category="command"):
+                args.func(args)
             # Flush buffered data in stdout before interpreter shutdown to ignore broken pipes
             sys.stdout.flush()
         except:
@@ -0,0 +1,533 @@
+#!/usr/bin/env python
+#
+# Copyright (C) 2013-2016 DNAnexus, Inc.
+#
+# This file is part of dx-toolkit (DNAnexus platform client libraries).
+#
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may not
+#   use this file except in compliance with the License. You may obtain a copy
+#   of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+
+'''
+Keeps dxpy loaded, with its connections to the API server and its
+caches, for scripts that call dx many times (e.g. applets written in
+bash).
+
+The daemon listens on the Unix socket named by ``--socket`` or by the
+``DX_DAEMON_SOCKET`` environment variable. ``dx``,
+``dx-jobutil-add-output`` and ``dx-jobutil-new-job`` started with
+``DX_DAEMON_SOCKET`` set to that socket hand their command line,
+environment, working directory and standard streams to the daemon
+(see :func:`forward`), and exit with the exit code it reports.
+
+The daemon runs the commands one at a time, in its own process, so
+that they share dxpy's connection pool and its caches of project names
+and of the objects found in each project (which are cleared when the
+API server or the credentials change). For each command, it takes on
+the client's environment, working directory and standard streams, and
+reads the dx configuration again, as a new dx process would; it
+restores its own afterwards. Signals that the client receives are
+passed on to the command as a KeyboardInterrupt.
+
+The client runs the command itself instead if the daemon is busy with
+another command, if the command may prompt on the terminal or replace
+the process (``dx login``, ``dx sh``, ``dx upgrade``) or is profiled,
+if its environment differs from the daemon's in one of the variables
+that dxpy only reads once per process (:data:`FIXED_VARIABLES`), or if
+its standard streams are terminals where the daemon's aren't, or the
+other way round: dxpy decides whether to prompt, and how to print, when
+it is imported.
+'''
+
+from __future__ import print_function, unicode_literals, division, absolute_import
+
+import os, sys, io, json, time, errno, array, signal, socket, struct, argparse, threading, traceback
+from contextlib import contextmanager
+
+try:
+    import queue
+except ImportError:
+    import Queue as queue
+
+PROTOCOL_VERSION = 3
+
+# How long to wait for the daemon to accept a command before running
+# it in this process instead
+CONNECT_TIMEOUT = 1
+
+FORWARDED_SIGNALS = ("SIGINT", "SIGTERM", "SIGHUP", "SIGQUIT")
+
+# Arguments of dx commands that are always run by the client
+RUN_IN_CLIENT = {"login", "sh", "upgrade", "--profile", "--profile-trace"}
+
+# Environment variables that dxpy reads only when it is imported, or
+# when it first connects to the API server
+FIXED_VARIABLES = ["DX_CA_CERT", "HTTPS_PROXY", "DX_JSON_CODEC", "DX_HEDGE_DOWNLOADS", "DX_METRICS_FILE",
+                   "DX_PROFILE", "DX_CASSETTE_RECORD", "DX_CASSETTE_REPLAY", "DX_REPLAY_LATENCY",
+                   "DX_REPLAY_BANDWIDTH", "DX_REPLAY_ERROR_RATE"]
+
+# Modules imported by dx itself, or lazily by the commands that are run
+# most often
+PRELOAD_MODULES = ["dxpy.scripts.dx", "dxpy.bindings.dxfile_functions", "dxpy.bindings.search",
+                   "dxpy.bindings.dxdataobject_functions", "dxpy.utils.exec_utils", "dxpy.cli.download",
+                   "dxpy.cli.exec_io", "dateutil.parser"]
+
+parser = argparse.ArgumentParser(description='Runs dx commands on behalf of "dx" processes started with DX_DAEMON_SOCKET set to its socket, in a process that keeps dxpy loaded and connected.')
+parser.add_argument('--socket', help='Path of the socket to listen on (default: $DX_DAEMON_SOCKET)')
+parser.add_argument('--idle-timeout', type=float, help='Exit after this many seconds without commands (default: never)')
+
+# True in the daemon, so that the commands it runs don't forward
+# themselves back to it
+_serving = False
+
+
+def send_message(sock, message):
+    sock.sendall(json.dumps(message).encode("utf-8") + b"\n")
+
+def read_message(stream):
+    line = stream.readline()
+    if not line:
+        return None
+    return json.loads(line.decode("utf-8"))
+
+def send_fds(sock, fds):
+    sock.sendmsg([b"F"], [(socket.SOL_SOCKET, socket.SCM_RIGHTS, array.array(str("i"), fds))])
+
+def receive_fds(sock, num_fds):
+    fds = array.array(str("i"))
+    _data, ancdata, _flags, _addr = sock.recvmsg(1, socket.CMSG_LEN(num_fds * fds.itemsize))
+    for level, type_, data in ancdata:
+        if level == socket.SOL_SOCKET and type_ == socket.SCM_RIGHTS:
+            fds.frombytes(data[:len(data) - (len(data) % fds.itemsize)])
+    return list(fds)
+
+
+def _isatty():
+    # Which of the standard streams are terminals
+    return [os.isatty(fd) for fd in range(3)]
+
+def forward(argv, script=None):
+    '''
+    :param argv: Arguments of the command
+    :type argv: list of strings
+    :param script: Path of the Python script to run, if the command is not dx
+    :type script: string
+    :returns: Exit code of the command, or None if the daemon didn't run it (in which case it has not been run)
+
+    Runs "dx *argv*" (or the script) in the dx daemon listening on
+    ``DX_DAEMON_SOCKET``, if any.
+    '''
+    socket_path = os.environ.get("DX_DAEMON_SOCKET")
+    if _serving or not socket_path or not hasattr(socket.socket, "sendmsg"):
+        return None
+    if "_ARGCOMPLETE" in os.environ:
+        # Completion output goes to file descriptors other than stdout
+        return None
+    if script is None and any(arg.split("=")[0] in RUN_IN_CLIENT for arg in argv):
+        return None
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.settimeout(CONNECT_TIMEOUT)
+        sock.connect(socket_path)
+        stream = sock.makefile("rb")
+        greeting = read_message(stream)
+        if (greeting is None or greeting.get("version") != PROTOCOL_VERSION or greeting.get("busy") or
+                any(os.environ.get(name) != greeting["environment"].get(name) for name in FIXED_VARIABLES) or
+                greeting.get("isatty") != _isatty()):
+            sock.close()
+            return None
+        sock.settimeout(None)
+        send_fds(sock, [0, 1, 2])
+        send_message(sock, {"argv": argv, "script": script, "env": dict(os.environ), "cwd": os.getcwd(),
+                            "pid": os.getpid()})
+    except (socket.error, OSError, ValueError):
+        sock.close()
+        return None
+
+    # Pass on the signals that the terminal (or whoever is waiting for
+    # us) sends us
+    def forward_signal(signum, frame):
+        try:
+            send_message(sock, {"signal": signum})
+        except (socket.error, OSError):
+            pass
+
+    for name in FORWARDED_SIGNALS:
+        signal.signal(getattr(signal, name), forward_signal)
+
+    try:
+        result = read_message(stream)
+    except (socket.error, OSError, ValueError):
+        result = None
+    if result is None:
+        print("dx: lost connection to the dx daemon at " + socket_path, file=sys.stderr)
+        return 1
+    return result["exit_code"]
+
+def forward_script(script):
+    '''
+    :param script: Path of the running script
+    :type script: string
+
+    Runs the script (with the arguments of this process) in the dx
+    daemon, if one is listening on ``DX_DAEMON_SOCKET``, and exits with
+    its exit code. Returns if the daemon didn't run it.
+    '''
+    exit_code = forward(sys.argv[1:], script=os.path.abspath(script))
+    if exit_code is not None:
+        sys.exit(exit_code)
+
+
+def _peer_is_same_user(conn):
+    if not hasattr(socket, "SO_PEERCRED"):
+        # The socket is only accessible by its owner anyway
+        return True
+    creds = conn.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize(str("3i")))
+    _pid, uid, _gid = struct.unpack(str("3i"), creds)
+    return uid == os.getuid()
+
+
+def _is_listening(socket_path):
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(socket_path)
+        return True
+    except (socket.error, OSError):
+        return False
+    finally:
+        sock.close()
+
+
+def _reopen_stdio():
+    # Rebuild the standard streams around the client's file
+    # descriptors, with the buffering and encoding that a new process
+    # would give them
+    encoding, _, errors = os.environ.get("PYTHONIOENCODING", "").partition(":")
+    for fd, name in enumerate(["stdin", "stdout", "stderr"]):
+        old_stream = getattr(sys, name)
+        line_buffering = fd == 2 or (fd == 1 and os.isatty(fd))
+        stream = io.open(fd, "r" if fd == 0 else "w", buffering=1 if line_buffering else -1, closefd=False,
+                         encoding=encoding or old_stream.encoding, errors=errors or old_stream.errors)
+        setattr(sys, name, stream)
+        setattr(sys, "__{}__".format(name), stream)
+
+
+def _flush_stdio():
+    for stream in sys.stdout, sys.stderr:
+        try:
+            stream.flush()
+        except Exception:
+            pass
+
+
+def _exit_command(code):
+    # Stands in for os._exit while a command runs, which dxpy calls to
+    # give up on worker threads when interrupted
+    raise SystemExit(code)
+
+
+@contextmanager
+def _client_context(request, fds):
+    '''
+    Takes on the standard streams, environment, working directory and
+    arguments of the client for the duration of the context.
+    '''
+    _flush_stdio()
+    saved_fds = [os.dup(fd) for fd in range(3)]
+    saved_streams = [(name, getattr(sys, name), getattr(sys, "__{}__".format(name)))
+                     for name in ("stdin", "stdout", "stderr")]
+    saved_env, saved_cwd, saved_argv, saved_exit = dict(os.environ), os.getcwd(), sys.argv, os._exit
+    try:
+        for target_fd, fd in enumerate(fds):
+            os.dup2(fd, target_fd)
+        os.environ.clear()
+        os.environ.update(request["env"])
+        # Look up the session configuration (as written by "dx select",
+        # etc.) of the shell that the client was started from
+        os.environ.setdefault("_DX_SESSION_PID", str(request["pid"]))
+        os.chdir(request["cwd"])
+        _reopen_stdio()
+        os._exit = _exit_command
+        yield
+    finally:
+        _flush_stdio()
+        for name, stream, original_stream in saved_streams:
+            setattr(sys, name, stream)
+            setattr(sys, "__{}__".format(name), original_stream)
+        # Anything written to the daemon's own streams while the command
+        # ran (e.g. by logging handlers set up before it) goes to the client
+        _flush_stdio()
+        for target_fd, fd in enumerate(saved_fds):
+            os.dup2(fd, target_fd)
+            os.close(fd)
+        for fd in fds:
+            os.close(fd)
+        os.environ.clear()
+        os.environ.update(saved_env)
+        os.chdir(saved_cwd)
+        sys.argv, os._exit = saved_argv, saved_exit
+
+
+class _CommandState(object):
+    '''
+    Whether a command is running, and the signal forwarded to it, if
+    any. Forwarded signals interrupt the command with SIGINT (and so a
+    KeyboardInterrupt); one that arrives after the command has finished
+    is ignored.
+    '''
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.running = False
+        self.signal = None
+        self.command_id = 0
+
+    def start(self):
+        with self.lock:
+            self.running, self.signal = True, None
+            self.command_id += 1
+            return self.command_id
+
+    def finish(self):
+        with self.lock:
+            self.running = False
+
+    def interrupt(self, command_id, signum):
+        with self.lock:
+            if self.running and command_id == self.command_id:
+                self.signal = signum
+                os.kill(os.getpid(), signal.SIGINT)
+
+    def on_sigint(self, signum, frame):
+        if self.running or self.signal is None:
+            raise KeyboardInterrupt
+
+_command = _CommandState()
+
+
+def _watch_client(stream, command_id):
+    # Relays the signals forwarded by the client. If the client goes
+    # away, the command is hung up on, as it would be if its terminal
+    # went away.
+    try:
+        while True:
+            message = read_message(stream)
+            if message is None:
+                break
+            _command.interrupt(command_id, message["signal"])
+    except Exception:
+        pass
+    _command.interrupt(command_id, signal.SIGHUP)
+
+
+class _DaemonConfig(object):
+    '''
+    Reapplies the configuration for each command, and clears the caches
+    that depend on who is asking.
+    '''
+    def __init__(self):
+        import dxpy
+        self.user_agent = dxpy.USER_AGENT
+        self.identity = None
+
+    def apply(self):
+        import dxpy
+        from dxpy.utils import resolver
+        from dxpy.utils.config import DXConfig
+        dxpy.USER_AGENT = self.user_agent
+        dxpy.config = DXConfig()
+        identity = (dxpy.APISERVER, json.dumps(dxpy.SECURITY_CONTEXT, sort_keys=True))
+        if identity != self.identity:
+            resolver.cached_project_names.clear()
+            resolver._objects_in_projects.clear()
+            self.identity = identity
+
+
+def _run(request):
+    '''
+    Runs the command, and returns its exit code.
+    '''
+    try:
+        try:
+            if request["script"] is None:
+                from dxpy.scripts import dx
+                sys.argv = ["dx"] + request["argv"]
+                dx.args_list = request["argv"]
+                dx.upload_seen_paths.clear()
+                dx.main()
+            else:
+                import runpy
+                sys.argv = [request["script"]] + request["argv"]
+                runpy.run_path(request["script"], run_name="__main__")
+        finally:
+            _command.finish()
+        return 0
+    except SystemExit as e:
+        if e.code is None or isinstance(e.code, int):
+            return e.code or 0
+        print(e.code, file=sys.stderr)
+        return 1
+    except BaseException:
+        traceback.print_exc()
+        return 1
+
+
+def _run_command(conn, config):
+    '''
+    Runs the command sent over *conn*, and returns its exit code (or
+    None if the client went away before sending it).
+    '''
+    fds = receive_fds(conn, 3)
+    stream = conn.makefile("rb")
+    request = read_message(stream)
+    if request is None or len(fds) != 3:
+        for fd in fds:
+            os.close(fd)
+        return None
+
+    with _client_context(request, fds):
+        command_id = _command.start()
+        watcher = threading.Thread(target=_watch_client, args=(stream, command_id))
+        watcher.daemon = True
+        watcher.start()
+        try:
+            config.apply()
+            exit_code = _run(request)
+        finally:
+            _command.finish()
+    if _command.signal not in (None, signal.SIGINT):
+        exit_code = 128 + _command.signal
+    return exit_code
+
+
+def _accept(listener, greeting, busy, commands):
+    # Runs in a thread, so that clients are told right away when a
+    # command is already running
+    while True:
+        try:
+            conn, _addr = listener.accept()
+        except (socket.error, OSError) as e:
+            if e.errno == errno.EINTR:
+                continue
+            return
+        try:
+            if not _peer_is_same_user(conn):
+                conn.close()
+                continue
+            if not busy.acquire(False):
+                send_message(conn, {"version": PROTOCOL_VERSION, "busy": True})
+                conn.close()
+                continue
+        except (socket.error, OSError):
+            conn.close()
+            continue
+        try:
+            send_message(conn, greeting)
+        except (socket.error, OSError):
+            conn.close()
+            busy.release()
+            continue
+        commands.put(conn)
+
+
+def serve(socket_path, idle_timeout=None):
+    '''
+    :param socket_path: Path of the Unix socket to listen on
+    :type socket_path: string
+    :param idle_timeout: If given, return after this many seconds without running any commands
+    :type idle_timeout: float
+
+    Serves dx commands until interrupted (or idle for *idle_timeout*
+    seconds).
+    '''
+    global _serving
+    if os.path.exists(socket_path):
+        if _is_listening(socket_path):
+            raise RuntimeError("A dx daemon is already listening on " + socket_path)
+        os.remove(socket_path)
+    elif not os.path.isdir(os.path.dirname(os.path.abspath(socket_path))):
+        os.makedirs(os.path.dirname(os.path.abspath(socket_path)), 0o700)
+
+    import importlib
+    _serving = True
+    # dx names itself after sys.argv[0] when it is imported
+    saved_argv, sys.argv = sys.argv, ["dx"]
+    try:
+        for module in PRELOAD_MODULES:
+            importlib.import_module(module)
+    finally:
+        sys.argv = saved_argv
+    config = _DaemonConfig()
+    greeting = {"version": PROTOCOL_VERSION,
+                "environment": {name: os.environ.get(name) for name in FIXED_VARIABLES},
+                "isatty": _isatty()}
+
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    signal.signal(signal.SIGINT, _command.on_sigint)
+
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    old_umask = os.umask(0o177)
+    try:
+        listener.bind(socket_path)
+    finally:
+        os.umask(old_umask)
+    busy = threading.Lock()
+    commands = queue.Queue()
+    last_activity = time.time()
+    try:
+        listener.listen(64)
+        acceptor = threading.Thread(target=_accept, args=(listener, greeting, busy, commands))
+        acceptor.daemon = True
+        acceptor.start()
+        while True:
+            try:
+                conn = commands.get(timeout=1)
+            except queue.Empty:
+                # Any signal forwarded to the last command has been
+                # handled by now
+                _command.signal = None
+                if idle_timeout is not None and time.time() - last_activity > idle_timeout:
+                    break
+                continue
+            try:
+                exit_code = _run_command(conn, config)
+                if exit_code is not None:
+                    send_message(conn, {"exit_code": exit_code})
+            except (socket.error, OSError, ValueError):
+                pass
+            finally:
+                conn.close()
+                busy.release()
+                last_activity = time.time()
+    finally:
+        listener.close()
+        try:
+            os.remove(socket_path)
+        except OSError:
+            pass
+
+
+def main():
+    args = parser.parse_args()
+    if not hasattr(socket.socket, "sendmsg"):
+        parser.exit(3, "dx-daemon requires Python 3\n")
+    socket_path = args.socket or os.environ.get("DX_DAEMON_SOCKET")
+    if not socket_path:
+        parser.exit(3, "No socket given with --socket or DX_DAEMON_SOCKET\n")
+    try:
+        serve(socket_path, idle_timeout=args.idle_timeout)
+    except RuntimeError as e:
+        parser.exit(3, str(e) + "\n")
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == '__main__':
+    main()
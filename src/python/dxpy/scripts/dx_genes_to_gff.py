@@ -74,50 +74,57 @@ def main(**kwargs):
     else:
         parentColumn = "parent_id"
     
-    for row in table.iterate_rows(want_dict=True):
-        typ = row["type"]
+    reservedColumns = ["chr", "lo", "hi", "span_id", "type", "strand", "score", "is_coding", "parent_id", "frame", "source", "__id__", "ID", "Id", "id", "Parent", "PARENT", "parent"]
+
+    # Read rows as lists, and find the position of each column once
+    col = dict((name, i) for i, name in enumerate(['__id__'] + columns))
+    attributeColumns = [(name, col[name]) for name in columns if name not in reservedColumns]
+    typeIndex, idIndex, parentIndex = col["type"], col[idColumn], col[parentColumn]
+    scoreIndex, sourceIndex = col.get("score"), col.get("source")
+
+    for row in table.iterate_rows():
+        typ = row[typeIndex]
         if opts.only_genes_types == False or genesTypes.get(typ) != None:
             if translatedTypes.get(typ) != None:
                 typ = translatedTypes[typ]
 
-            reservedColumns = ["chr", "lo", "hi", "span_id", "type", "strand", "score", "is_coding", "parent_id", "frame", "source", "__id__", "ID", "Id", "id", "Parent", "PARENT", "parent"]
             attributes = ""
             
-            rowId = str(row[idColumn])
-            parentId = str(row[parentColumn])
+            rowId = str(row[idIndex])
+            parentId = str(row[parentIndex])
         
             attributes += "ID=\"" + rowId + "\";" 
             if not (parentColumn == "parent_id" and parentId == "-1"):
                 attributes += "Parent=\"" + parentId + "\";"
             
-            for k, v in row.iteritems():
-                if k not in reservedColumns and v != '':
-                    attributes += k + "=" + '"'+str(v)+'";'
+            for k, i in attributeColumns:
+                if row[i] != '':
+                    attributes += k + "=" + '"'+str(row[i])+'";'
 
-            chromosome = row["chr"]
-            lo = str(row["lo"] + 1)
-            hi = str(row["hi"])
+            chromosome = row[col["chr"]]
+            lo = str(row[col["lo"]] + 1)
+            hi = str(row[col["hi"]])
     
-            strand = row["strand"]
+            strand = row[col["strand"]]
             if strand == '':
                 strand = '.'
-            if row["frame"] == -1:
+            if row[col["frame"]] == -1:
                 frame = '.'
             else:
-                frame = str(row["frame"])
+                frame = str(row[col["frame"]])
             source = '.'
             
             # 2**31 and 2**31-1 are legacy null values that will be removed when possible
-            if row.get("score") == None:
+            if scoreIndex == None:
                 score = "."
-            if row["score"] == dxpy.NULL or row["score"] == 2**31-1 or row["score"] == float(2**31):
+            elif row[scoreIndex] == dxpy.NULL or row[scoreIndex] == 2**31-1 or row[scoreIndex] == float(2**31):
                 score = "."
             else:
-                score = str(row["score"])
+                score = str(row[scoreIndex])
             
-            if row.get("source") != None:
-                if row["source"] !=  '':
-                    source = row["source"]
+            if sourceIndex != None:
+                if row[sourceIndex] !=  '':
+                    source = row[sourceIndex]
             result = "\t".join([chromosome, source, typ, lo, hi, score, strand, frame, attributes.rstrip(";")])+"\n"
             if outputFile != None:
                 outputFile.write(result)
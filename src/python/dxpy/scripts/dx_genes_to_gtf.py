@@ -57,11 +57,16 @@ def main(**kwargs):
     
     acceptedTypes = {"CDS":"CDS", "start_codon": "start_codon", "stop_codon": "stop_codon", "5' UTR": "5UTR", "3' UTR": "3UTR", "intergenic":"inter", "intergenic_conserved":"inter_CNS", "exon":"exon"}
     
+    columnNames = table.get_col_names()
     biotypePresent = False
-    if "gene_biotype" in table.get_col_names():
+    if "gene_biotype" in columnNames:
         biotypePresent = True
-    
-    for row in table.iterate_rows(want_dict=True):
+
+    # The first pass only needs the names of genes and transcripts, so
+    # only read those columns (as lists rather than dicts)
+    idColumns = [name for name in ["span_id", "type", "parent_id", "gene_id", "transcript_id", "name"] if name in columnNames]
+    for values in table.iterate_rows(columns=idColumns):
+        row = dict(zip(idColumns, values))
         if row["type"] == "gene":
             if genes.get(row["span_id"]) == None:
                 genes[row["span_id"]] = str(row["span_id"])
@@ -89,77 +94,91 @@ def main(**kwargs):
             else:
                 raise dxpy.AppError("Error: span_id was not unique, in violation of the type spec for Genes. As a result, some transcript_id data may be overwritten")
     
-    for k, v in transcripts.iteritems():
+    for k, v in transcripts.items():
         if genes.get(v["parent"]) != None:
             transcripts[k]["gene"] = genes[v["parent"]]
         
     warnedGeneId = False
     warnedTranscriptId = False
         
-    for row in table.iterate_rows(want_dict=True):
-        if acceptedTypes.get(row["type"]) != None:
-            reservedColumns = ["chr", "lo", "hi", "span_id", "type", "strand", "score", "is_coding", "parent_id", "frame", "source", "gene_id", "transcript_id", "__id__"]
+    reservedColumns = ["chr", "lo", "hi", "span_id", "type", "strand", "score", "is_coding", "parent_id", "frame", "source", "gene_id", "transcript_id", "__id__"]
+
+    # Find the position of each column once
+    col = dict((name, i) for i, name in enumerate(['__id__'] + columnNames))
+    attributeColumns = [(name, col[name]) for name in columnNames if name not in reservedColumns]
+
+    chrIndex, loIndex, hiIndex = col["chr"], col["lo"], col["hi"]
+    strandIndex, frameIndex, parentIndex = col["strand"], col["frame"], col["parent_id"]
+    isCodingIndex = col.get("is_coding")
+    scoreIndex = col.get("score")
+    sourceIndex = col.get("source")
+    typeIndex = col["type"]
+
+    for row in table.iterate_rows():
+        typ = acceptedTypes.get(row[typeIndex])
+        if typ != None:
             attributes = ""
             
             transcriptId = ''
             geneId = ''
             try:
-                transcriptId = transcripts[row["parent_id"]]["name"]
+                transcriptId = transcripts[row[parentIndex]]["name"]
                 
             except:
                 if not warnedTranscriptId:
                     print("Warning, at least one position had a transcriptId that could not be determined. Future warnings of this type will not be printed")
-                    print("Offending position - Chr: " + row["chr"] + " lo: " + str(row["lo"]) + " hi: ")
+                    print("Offending position - Chr: " + row[chrIndex] + " lo: " + str(row[loIndex]) + " hi: ")
                     warnedTranscriptId = True
     
             try:
-                geneId = transcripts[row["parent_id"]]["gene"]
+                geneId = transcripts[row[parentIndex]]["gene"]
             except:
                 if not warnedGeneId:
                     print("Warning, at least one position had a geneId that could not be determined. Future warnings of this type will not be printed")
-                    print("Offending position - Chr: " + row["chr"] + " lo: " + str(row["lo"]) + " hi: ")
+                    print("Offending position - Chr: " + row[chrIndex] + " lo: " + str(row[loIndex]) + " hi: ")
                     warnedGeneId = True
     
             attributes += "gene_id " + '"' + geneId + '"' + ";"
             attributes += " transcript_id " + '"' + transcriptId + '"' +";"
     
-            for k, v in row.iteritems():
-                if k not in reservedColumns and v != '':
+            for k, i in attributeColumns:
+                v = row[i]
+                if v != '':
                     attributes += " " + k + " " + '"'+str(v)+'";'
                     
             if opts.add_gene_biotype and not biotypePresent:
-                if row["is_coding"]:
+                if row[isCodingIndex]:
                     entry = "protein_coding"
                 else:
                     entry = "non_protein_coding"
                 attributes += " gene_biotype " + '"' + entry + '"' + '";' 
                     
                     
-            chromosome = row["chr"]
-            lo = str(row["lo"] + 1)
-            hi = str(row["hi"])
-            typ = acceptedTypes[row["type"]]
-            strand = row["strand"]
+            chromosome = row[chrIndex]
+            lo = str(row[loIndex] + 1)
+            hi = str(row[hiIndex])
+            strand = row[strandIndex]
             if strand == '':
                 strand = '.'
-            if row["frame"] == -1:
+            if row[frameIndex] == -1:
                 frame = '.'
             else:
-                frame = str(row["frame"])
+                frame = str(row[frameIndex])
             
             #Null values 2**31 and 2**31-1 are legacy values and will be removed when possible
-            if row.get("score") == None:
+            score = None if scoreIndex is None else row[scoreIndex]
+            if score == None:
                 score = "."
-            elif row["score"] == dxpy.NULL or row["score"] == 2**31-1 or row["score"] == float(2**31):
+            elif score == dxpy.NULL or score == 2**31-1 or score == float(2**31):
                 score = "."
             else:
-                score = str(row["score"])
+                score = str(score)
             
-            if row.get("source") != None:
-                if row["source"] !=  '':
-                    source = row["source"]
+            if sourceIndex is not None and row[sourceIndex] != None:
+                if row[sourceIndex] !=  '':
+                    source = row[sourceIndex]
                 if opts.add_gene_biotype and not biotypePresent:
-                    if row["is_coding"]:
+                    if row[isCodingIndex]:
                         source = "protein_coding"
                     else:
                         source = "non_protein_coding"
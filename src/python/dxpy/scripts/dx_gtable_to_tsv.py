@@ -16,9 +16,10 @@
 #   License for the specific language governing permissions and limitations
 #   under the License.
 
-import os, sys, argparse, csv
+import os, sys, argparse, itertools
 import dxpy
 from ..utils.resolver import ResolutionError, resolve_existing_path
+from ..utils.genomic_utils import BGZFWriter, BGZF_EOF
 from ..utils.printing import fill
 from ..compat import str
 
@@ -36,6 +37,67 @@ parser.add_argument('--gri', nargs=3, metavar=('CHR', 'LO', 'HI'), help='Specify
 parser.add_argument('--gri-mode', help='Specify the mode of the GRI query (\'overlap\' or \'enclose\'; default \'overlap\')', default="overlap")
 parser.add_argument('--gri-name', help='Override the default name of the Genomic Range Index (default: "gri"))', default="gri")
 parser.add_argument('--csv', help='Use commas instead of tabs', action='store_true')
+parser.add_argument('--gzip', help='Compress the output (in BGZF format, which gzip and tabix can read); if -o is not provided, ".gz" is added to the filename', action='store_true')
+parser.add_argument('--threads', type=int, help='Number of pages of rows to request at once (default 4)', default=4)
+
+# Rows of a GTable are written as by a csv.writer (with the default
+# dialect but for the delimiter), but a whole page of rows at a time: the
+# fields of a page are formatted by one string formatting operation, and
+# only the fields of string columns that contain characters that need
+# quoting are quoted
+
+QUOTED_CHARS = ('"', '\r', '\n')
+
+def _needs_quoting(value, delimiter):
+    return delimiter in value or any(char in value for char in QUOTED_CHARS)
+
+def _quote(value, delimiter):
+    if _needs_quoting(value, delimiter):
+        return '"' + value.replace('"', '""') + '"'
+    return value
+
+def format_column(values, delimiter):
+    '''
+    :param values: Values of a string column
+    :type values: sequence
+    :param delimiter: Field delimiter
+    :type delimiter: string
+    :returns: The fields for the values, quoted if necessary
+    :rtype: sequence of strings
+    '''
+    try:
+        joined = "".join(values)
+    except TypeError:
+        values = [str(value) for value in values]
+        joined = "".join(values)
+    if _needs_quoting(joined, delimiter):
+        values = [_quote(value, delimiter) for value in values]
+    return values
+
+def format_rows(columns, col_types, delimiter, num_rows):
+    '''
+    :param columns: Values of each column of the rows
+    :type columns: list of sequences
+    :param col_types: Type of each column
+    :type col_types: list of strings
+    :param delimiter: Field delimiter
+    :type delimiter: string
+    :param num_rows: Number of rows
+    :type num_rows: integer
+    :returns: The lines for the rows, each terminated by "\\r\\n"
+    :rtype: string
+    '''
+    if len(columns) == 0:
+        return "\r\n" * num_rows
+    # Numbers and booleans never need quoting
+    columns = [format_column(values, delimiter) if col_type == 'string' else values
+               for values, col_type in zip(columns, col_types)]
+    if len(columns) == 1 and col_types[0] == 'string':
+        # An empty field alone on its line is quoted, so that the line
+        # isn't empty
+        columns = [['""' if field == "" else field for field in columns[0]]]
+    row_format = delimiter.join(["%s"] * len(columns)) + "\r\n"
+    return (row_format * num_rows) % tuple(itertools.chain.from_iterable(zip(*columns)))
 
 def main(**kwargs):
     if len(kwargs) == 0:
@@ -60,16 +122,30 @@ def main(**kwargs):
 
     delimiter = ',' if args.csv else '\t'
     if args.output == '-':
-        writer = csv.writer(sys.stdout, delimiter=delimiter)
+        output_file = getattr(sys.stdout, 'buffer', sys.stdout)
     else:
         if args.output is None and not args.no_ext:
             filename += '.csv' if args.csv else '.tsv'
+            if args.gzip:
+                filename += '.gz'
         if not args.overwrite and os.path.exists(filename):
             parser.exit(1, fill('Error: path \"' + filename + '\" already exists but -f/--overwrite was not set') + '\n')
-        writer = csv.writer(open(filename, 'wb'),
-                            delimiter=delimiter)
+        output_file = open(filename, 'wb')
+    output = BGZFWriter(output_file) if args.gzip else output_file
+
+    desc = entity_result['describe']
+    if 'columns' not in desc or 'length' not in desc:
+        desc = dxtable.describe()
+    columns = desc['columns']
+    col_names = ['__id__'] + [col['name'] for col in columns]
+    col_types = ['int'] + [col['type'] for col in columns]
+    first_col = 0 if args.rowid else 1
     if not args.no_header:
-        writer.writerow((['__id__:int'] if args.rowid else []) + [(col['name'] + ':' + col['type']) for col in dxtable.describe()['columns']])
+        header = (['__id__:int'] if args.rowid else []) + [(col['name'] + ':' + col['type']) for col in columns]
+        output.write(format_rows([[field] for field in header], ['string'] * len(header), delimiter, 1).encode('utf-8'))
+
+    # Fetch several pages at once
+    dxpy.DXGTable.set_http_threadpool_size(max(args.threads, 1))
 
     # Query stuff
     if args.gri is not None:
@@ -83,11 +159,33 @@ def main(**kwargs):
                                                       hi,
                                                       args.gri_mode,
                                                       args.gri_name)
-        iterator = dxtable.iterate_query_rows(query=gri_query, limit=args.limit)
+        batches = _iterate_query_batches(dxtable, gri_query, args.limit, col_names)
+    else:
+        end = desc['length'] if args.limit is None else min(args.starting + args.limit, desc['length'])
+        batches = dxtable.iterate_batches(start=args.starting, end=end, columns=col_names)
+    for batch in batches:
+        values = [batch[name] for name in col_names]
+        output.write(format_rows(values[first_col:], col_types[first_col:], delimiter, len(values[0])).encode('utf-8'))
+
+    if args.gzip:
+        output.flush()
+        output_file.write(BGZF_EOF)
+    if args.output == '-':
+        output_file.flush()
     else:
-        iterator = dxtable.iterate_rows(start=args.starting, end=(None if args.limit is None else args.starting + args.limit))
-    for row in iterator:
-        writer.writerow([str(item).encode('utf-8') for item in row[0 if args.rowid else 1:]])
+        output_file.close()
+
+def _iterate_query_batches(dxtable, query, limit, col_names, batch_size=10000):
+    # Groups the rows matching the query into batches of columns, as
+    # yielded by DXGTable.iterate_batches
+    rows = []
+    for row in dxtable.iterate_query_rows(query=query, limit=limit):
+        rows.append(row)
+        if len(rows) == batch_size:
+            yield dict(zip(col_names, zip(*rows)))
+            rows = []
+    if len(rows) > 0:
+        yield dict(zip(col_names, zip(*rows)))
 
 if __name__ == '__main__':
     main()
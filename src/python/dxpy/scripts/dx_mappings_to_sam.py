@@ -21,8 +21,12 @@ import math
 import argparse
 import re
 import sys
+import os
+import shutil
+import tempfile
+import multiprocessing
 
-from dxpy.utils.genomic_utils import reverse_complement as reverseComplement
+from dxpy.utils.genomic_utils import reverse_complement as reverseComplement, BGZFWriter, BGZF_EOF
 
 #Usage: sample input: dx_MappingsTableToSamBwa --table_id <gtable_id> --output <filename>
 #Example: dx_MappingsTableToSamBwa --table_id gtable-9yZvF200000PYKJyV4k00005 --output mappings.sam
@@ -43,6 +47,18 @@ parser.add_argument("--only_interchromosomal_mate", dest="only_interchromosomal"
 parser.add_argument("--assign_read_group", dest="assign_read_group", default="", help="If entered, this value will be used for the read group id of all exported mappings")
 parser.add_argument("--read_group_platform", dest="read_group_platform", default="", help="If entered, will print this as the platform used for the read group in the SAM header")
 parser.add_argument("--write_row_id", dest="write_row_id", default=False, action="store_true", help="If selected, the row of the mappings table will be written into optional sam tag ZD")
+parser.add_argument("--bgzf", dest="bgzf", default=False, action="store_true", help="If selected, the SAM is compressed in BGZF format (as by bgzip), which samtools and tabix can read directly")
+parser.add_argument("--processes", dest="processes", type=int, default=multiprocessing.cpu_count(), help="Number of processes that read and format the mappings at once (default: the number of CPUs)")
+parser.add_argument("--shard_rows", dest="shard_rows", type=int, default=100000, help="Number of rows of the table that each process reads and formats at a time, when not restricting by regions")
+
+# Settings of the export, as needed to export a shard in a worker process
+# (see exportShard)
+shardSettings = None
+
+def initShardWorker(settings):
+    global shardSettings
+    shardSettings = settings
+    dxpy.reset_after_fork()
 
 def main(**kwargs):
 
@@ -59,20 +75,24 @@ def main(**kwargs):
     idAsName = opts.id_as_name
     idPrepend = opts.id_prepend
     writeRowId = opts.write_row_id
-    
-    paired = "chr2" in mappingsTable.get_col_names()
+
+    # Describe the table once
+    desc = mappingsTable.describe()
+    details = mappingsTable.get_details()
+    column_descs = desc['columns']
+    names = [c['name'] for c in column_descs]
+
+    paired = "chr2" in names
 
     regions = []
     if opts.region_file != "":
         regions = re.findall("-L ([^:]*):(\d+)-(\d+)", open(opts.region_file, 'r').read())
     
-    name = mappingsTable.describe()['name']
-    
     if opts.reference != None:
         originalContig = opts.reference
     else:
         try:
-            originalContig = mappingsTable.get_details()['original_contigset']['$dnanexus_link']
+            originalContig = details['original_contigset']['$dnanexus_link']
         except:
             raise dxpy.AppError("The original reference genome must be attached to mappings table")
     
@@ -84,11 +104,6 @@ def main(**kwargs):
     contigNames = contigDetails['names']
     contigSizes = contigDetails['sizes']
     
-    if opts.file_name != None:
-        outputFile = open(opts.file_name, 'w')
-    else:
-        outputFile = None
-
     header = ""
 
     for i in range(len(contigNames)):
@@ -96,26 +111,18 @@ def main(**kwargs):
 
     assignReadGroup = opts.assign_read_group
     if assignReadGroup != "":
-        header += "@RG\tID:" + assignReadGroup + "\tSM:Sample_0"
+        header += "@RG\tID:" + assignReadGroup + "\tSM:Sample_0\n"
     else:
-        for i in range(len(mappingsTable.get_details()['read_groups'])):
+        for i in range(len(details['read_groups'])):
             header += "@RG\tID:"+str(i) + "\tSM:Sample_"+str(i)    
             if opts.read_group_platform != '':
                 header += "\tPL:"+opts.read_group_platform
             header += "\n"
 
-    if outputFile != None:
-        outputFile.write(header)
-    else:
-        sys.stdout.write(header)
-
     col = {}
-    names = mappingsTable.get_col_names()
     for i in range(len(names)):
         col[names[i]] = i+1
 
-    column_descs = mappingsTable.describe()['columns']
-
     sam_cols = []; sam_col_names = []; sam_col_types = {}
     for c in column_descs:
         if c['name'].startswith("sam_field_") or c['name'] == "sam_optional_fields":
@@ -146,52 +153,127 @@ def main(**kwargs):
 
     #unmappedFile = open("unmapped.txt", 'w')
         
+    # The scan is split into shards: ranges of rows, or the regions
+    # given. The shards are read and formatted by a pool of processes,
+    # and written to the output in order.
     if len(regions) == 0:
 
-        if opts.start_row > mappingsTable.describe()['length']:
+        if opts.start_row > desc['length']:
             raise dxpy.AppError("Starting row is larger than number of rows in table")
         elif opts.end_row < opts.start_row:
             raise dxpy.AppError("Ending row is before Start")
 
         if opts.end_row > 0:
-            generator = mappingsTable.iterate_rows(start=opts.start_row, end=opts.end_row, want_dict=True)
+            endRow = min(opts.end_row, desc['length'])
         else:
-            generator = mappingsTable.iterate_rows(start=opts.start_row, want_dict=True)
-
-        # write each row unless we're throwing out unmapped 
-        for row in generator:
-            if row["status"] != "UNMAPPED" or opts.discard_unmapped == False:
-                if not paired:
-                    writeRow(row, col, defaultCol, outputFile, idAsName, idPrepend, writeRowId, assignReadGroup, column_descs, sam_cols, sam_col_names, sam_col_types)
-                elif opts.no_interchromosomal and row["chr"] == row["chr2"]:
-                    writeRow(row, col, defaultCol, outputFile, idAsName, idPrepend, writeRowId, assignReadGroup, column_descs, sam_cols, sam_col_names, sam_col_types)
-                elif opts.only_interchromosomal and opts.no_interchromosomal == False and (row["chr"] != row["chr2"] or (row["chr"] == "" and row["chr2"] == "")):
-                    writeRow(row, col, defaultCol, outputFile, idAsName, idPrepend, writeRowId, assignReadGroup, column_descs, sam_cols, sam_col_names, sam_col_types)
-                elif opts.no_interchromosomal == False and opts.only_interchromosomal == False:
-                    writeRow(row, col, defaultCol, outputFile, idAsName, idPrepend, writeRowId, assignReadGroup, column_descs, sam_cols, sam_col_names, sam_col_types)
-                
+            endRow = desc['length']
+        shardRows = max(opts.shard_rows, 1)
+        shards = [("rows", start, min(start + shardRows, endRow)) for start in range(opts.start_row, endRow, shardRows)]
 
     else:
-        for x in regions:
-            # generate the query for this region
-            query = mappingsTable.genomic_range_query(x[0],int(x[1])+opts.region_index_offset,int(x[2])+opts.region_index_offset, index='gri')
-            for row in mappingsTable.get_rows(query=query, limit=1)['data']:
-                startRow =  row[0]
-                for row in mappingsTable.iterate_rows(start=startRow, want_dict=True):
-                    if row["chr"] != x[0] or row["lo"] > int(x[2])+opts.region_index_offset:
-                        break
-                    if row["status"] != "UNMAPPED" or opts.discard_unmapped == False:
-                        if not paired:
-                            writeRow(row, col, defaultCol, outputFile, idAsName, idPrepend, writeRowId, assignReadGroup, column_descs, sam_cols, sam_col_names, sam_col_types)
-                        elif opts.no_interchromosomal and row["chr"] == row["chr2"]:
-                            writeRow(row, col, defaultCol, outputFile, idAsName, idPrepend, writeRowId, assignReadGroup, column_descs, sam_cols, sam_col_names, sam_col_types)
-                        elif opts.only_interchromosomal and opts.no_interchromosomal == False and (row["chr"] != row["chr2"] or (row["chr"] == "" and row["chr2"] == "")):
-                            writeRow(row, col, defaultCol, outputFile, idAsName, idPrepend, writeRowId, assignReadGroup, column_descs, sam_cols, sam_col_names, sam_col_types)
-                        elif opts.no_interchromosomal == False and opts.only_interchromosomal == False:
-                            writeRow(row, col, defaultCol, outputFile, idAsName, idPrepend, writeRowId, assignReadGroup, column_descs, sam_cols, sam_col_names, sam_col_types)
+        shards = [("region", x[0], int(x[1])+opts.region_index_offset, int(x[2])+opts.region_index_offset)
+                  for x in regions]
 
-    if outputFile != None:
+    settings = {"mappings_id": mappingsTable.get_id(),
+                "paired": paired,
+                "discard_unmapped": opts.discard_unmapped,
+                "no_interchromosomal": opts.no_interchromosomal,
+                "only_interchromosomal": opts.only_interchromosomal,
+                "bgzf": opts.bgzf,
+                "row_args": (col, defaultCol, idAsName, idPrepend, writeRowId, assignReadGroup, column_descs, sam_cols, sam_col_names, sam_col_types)}
+
+    if opts.file_name != None:
+        outputFile = open(opts.file_name, 'wb')
+    else:
+        outputFile = getattr(sys.stdout, 'buffer', sys.stdout)
+
+    if opts.bgzf:
+        output = BGZFWriter(outputFile)
+    else:
+        output = outputFile
+
+    output.write(header.encode('utf-8'))
+
+    if opts.processes <= 1 or len(shards) <= 1:
+        for shard in shards:
+            exportShard(shard, output, settings)
+    else:
+        if opts.bgzf:
+            # Each shard is compressed in blocks of its own
+            output.flush()
+        tempDir = tempfile.mkdtemp()
+        settings["temp_dir"] = tempDir
+        pool = multiprocessing.Pool(min(opts.processes, len(shards)), initShardWorker, (settings,))
+        try:
+            for shardFileName in pool.imap(exportShardToFile, shards):
+                with open(shardFileName, 'rb') as shardFile:
+                    shutil.copyfileobj(shardFile, outputFile)
+                os.remove(shardFileName)
+            pool.close()
+        finally:
+            pool.terminate()
+            shutil.rmtree(tempDir, ignore_errors=True)
+
+    if opts.bgzf:
+        output.flush()
+        outputFile.write(BGZF_EOF)
+    if opts.file_name != None:
         outputFile.close()
+    else:
+        outputFile.flush()
+
+def rowIsExported(row, settings):
+    if row["status"] == "UNMAPPED" and settings["discard_unmapped"]:
+        return False
+    if not settings["paired"]:
+        return True
+    elif settings["no_interchromosomal"]:
+        return row["chr"] == row["chr2"]
+    elif settings["only_interchromosomal"]:
+        return row["chr"] != row["chr2"] or (row["chr"] == "" and row["chr2"] == "")
+    return True
+
+def iterateShardRows(mappingsTable, shard):
+    if shard[0] == "rows":
+        for row in mappingsTable.iterate_rows(start=shard[1], end=shard[2], want_dict=True):
+            yield row
+    else:
+        chromosome, lo, hi = shard[1:]
+        # Find the first row in the region, and read on from it until
+        # the end of the region
+        query = mappingsTable.genomic_range_query(chromosome, lo, hi, index='gri')
+        for row in mappingsTable.get_rows(query=query, limit=1)['data']:
+            startRow = row[0]
+            for row in mappingsTable.iterate_rows(start=startRow, want_dict=True):
+                if row["chr"] != chromosome or row["lo"] > hi:
+                    break
+                yield row
+
+def exportShard(shard, output, settings):
+    mappingsTable = dxpy.DXGTable(settings["mappings_id"])
+    lines = []
+    for row in iterateShardRows(mappingsTable, shard):
+        if rowIsExported(row, settings):
+            lines.append(formatRow(row, *settings["row_args"]))
+            if len(lines) >= 1000:
+                output.write("".join(lines).encode('utf-8'))
+                lines = []
+    if lines:
+        output.write("".join(lines).encode('utf-8'))
+
+def exportShardToFile(shard):
+    # Runs in a worker process: writes the SAM lines of the shard to a
+    # temporary file (compressed, if the output is), and returns its name
+    fd, shardFileName = tempfile.mkstemp(dir=shardSettings["temp_dir"])
+    shardFile = os.fdopen(fd, 'wb')
+    if shardSettings["bgzf"]:
+        output = BGZFWriter(shardFile)
+        exportShard(shard, output, shardSettings)
+        output.close(write_eof=False)
+    else:
+        with shardFile:
+            exportShard(shard, shardFile, shardSettings)
+    return shardFileName
 
 def tag_value_is_default(value):
     #2**31 is a legacy Null value and will be removed when possible
@@ -218,6 +300,14 @@ def format_tag_field(name, value, sam_col_types):
         return ":".join([col_name_to_field_name(name), col_type_to_field_type(sam_col_types[name]), str(value)])
 
 def writeRow(row, col, defaultCol, outputFile, idAsName, idPrepend, writeRowId, assignReadGroup, column_descs, sam_cols, sam_col_names, sam_col_types):
+    out_row = formatRow(row, col, defaultCol, idAsName, idPrepend, writeRowId, assignReadGroup, column_descs, sam_cols, sam_col_names, sam_col_types)
+
+    if outputFile != None:
+        outputFile.write(out_row)
+    else:
+        sys.stdout.write(out_row)
+
+def formatRow(row, col, defaultCol, idAsName, idPrepend, writeRowId, assignReadGroup, column_descs, sam_cols, sam_col_names, sam_col_types):
     out_row = ""
 
     values = dict(defaultCol)
@@ -270,8 +360,10 @@ def writeRow(row, col, defaultCol, outputFile, idAsName, idPrepend, writeRowId,
     if values["negative_strand"]:
         try:
             seq = reverseComplement(seq)
+            if not isinstance(seq, str):
+                seq = seq.decode('ascii')
         except ValueError as e:
-            raise dxpy.AppError("Error converting row %d: %s" % (row["__id__"], e.message))
+            raise dxpy.AppError("Error converting row %d: %s" % (row["__id__"], e))
         qual = qual[::-1]
     
     if values["mate_id"] == -1 or values["chr"] != values["chr2"] or values["chr"] == '' or values["chr"] == '*':
@@ -284,7 +376,7 @@ def writeRow(row, col, defaultCol, outputFile, idAsName, idPrepend, writeRowId,
     out_row = [readName.strip("@"), str(flag), chromosome, str(lo), str(values["error_probability"]), values["cigar"] , chromosome2, str(lo2), str(tlen), seq, qual]
     tag_values = {c: values[c] for c in sam_col_names if not tag_value_is_default(values[c])}
 
-    out_row.extend([format_tag_field(name, value, sam_col_types) for name, value in tag_values.iteritems()])
+    out_row.extend([format_tag_field(name, value, sam_col_types) for name, value in tag_values.items()])
 
     if assignReadGroup != "":
         out_row.append("RG:Z:" + assignReadGroup)
@@ -295,12 +387,7 @@ def writeRow(row, col, defaultCol, outputFile, idAsName, idPrepend, writeRowId,
         out_row.append("ZD:Z:"+str(row["__id__"]))
     
     
-    out_row = "\t".join(out_row) + "\n"
-
-    if outputFile != None:
-        outputFile.write(out_row)
-    else:
-        sys.stdout.write(out_row)
+    return "\t".join(out_row) + "\n"
 
 if __name__ == '__main__':
     main()
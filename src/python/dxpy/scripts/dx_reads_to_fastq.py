@@ -16,8 +16,9 @@
 #   License for the specific language governing permissions and limitations
 #   under the License.
 
-import sys, argparse
+import os, sys, shutil, argparse, tempfile, multiprocessing
 import dxpy
+from dxpy.utils.genomic_utils import BGZFWriter
 
 arg_parser = argparse.ArgumentParser(description="Download a reads table into a FASTQ file")
 arg_parser.add_argument("reads_table", help="ID of the reads GTable object")
@@ -27,6 +28,9 @@ arg_parser.add_argument("--discard_names", help="Discard read names", type=bool,
 arg_parser.add_argument("--output_FASTA", help="Output FASTA instead of FASTQ", type=bool, default=False)
 arg_parser.add_argument("-s", "--start_row", help="Start at this table row", type=int, default=0)
 arg_parser.add_argument("-e", "--end_row", help="End at this table row", type=int, default=None)
+arg_parser.add_argument("--bgzf", help="Compress the output in BGZF format (which gzip can read)", action="store_true", default=False)
+arg_parser.add_argument("--processes", help="Number of processes that read and format the reads at once (default: the number of CPUs)", type=int, default=multiprocessing.cpu_count())
+arg_parser.add_argument("--shard_rows", help="Number of rows that each process reads and formats at a time", type=int, default=100000)
 
 def main(**kwargs):
     if len(kwargs) == 0:
@@ -81,54 +85,104 @@ def main(**kwargs):
     if kwargs['output'] is None:
             raise dxpy.AppError("output parameter is required")
 
-    with open(kwargs['output'], 'wb') as out_fh:
-        exportToFile(columns=col, table=table, output_file=out_fh, hasName=hasName, hasQual=hasQual, FASTA=kwargs['output_FASTA'], start_row=kwargs['start_row'], end_row=kwargs['end_row'])
+    if isPaired == True and kwargs['output2'] is None:
+        raise dxpy.AppError("output2 parameter is required for paired reads")
+
+    # Split the rows into shards, which are formatted by a pool of
+    # processes and written out in order
+    start_row = kwargs['start_row']
+    end_row = kwargs['end_row']
+    if end_row is None:
+        end_row = table.describe()['length']
+    shard_rows = max(kwargs.get('shard_rows') or 100000, 1)
+    shards = [(start, min(start + shard_rows, end_row)) for start in range(start_row, end_row, shard_rows)]
+    processes = min(kwargs.get('processes') or 1, len(shards))
+
+    pool, temp_dir = None, None
+    if processes > 1:
+        temp_dir = tempfile.mkdtemp()
+        pool = multiprocessing.Pool(processes, dxpy.reset_after_fork)
+    try:
+        export_args = dict(table=table, hasName=hasName, hasQual=hasQual, FASTA=kwargs['output_FASTA'], shards=shards,
+                           bgzf=kwargs.get('bgzf', False), pool=pool, temp_dir=temp_dir)
+        exportInShards(columns=col, filename=kwargs['output'], **export_args)
+        if isPaired == True:
+            exportInShards(columns=col2, filename=kwargs['output2'], **export_args)
+        if pool is not None:
+            pool.close()
+    finally:
+        if pool is not None:
+            pool.terminate()
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def exportInShards(columns, table, filename, hasName, hasQual, FASTA, shards, bgzf=False, pool=None, temp_dir=None):
+    with open(filename, 'wb') as out_fh:
+        output = BGZFWriter(out_fh) if bgzf else out_fh
+        if pool is None:
+            for start_row, end_row in shards:
+                writeRecords(columns, table, output, hasName, hasQual, FASTA, start_row, end_row)
+        else:
+            tasks = [(table.get_id(), columns, start_row, end_row, hasName, hasQual, FASTA, bgzf, temp_dir)
+                     for start_row, end_row in shards]
+            for shard_filename in pool.imap(exportShardToFile, tasks):
+                with open(shard_filename, 'rb') as shard_fh:
+                    shutil.copyfileobj(shard_fh, out_fh)
+                os.remove(shard_filename)
+        if bgzf:
+            output.close()
+
+def exportShardToFile(args):
+    # Runs in a worker process: writes the records of the shard to a
+    # temporary file (compressed, if the output is), and returns its name
+    table_id, columns, start_row, end_row, hasName, hasQual, FASTA, bgzf, temp_dir = args
+    fd, shard_filename = tempfile.mkstemp(dir=temp_dir)
+    with os.fdopen(fd, 'wb') as shard_fh:
+        output = BGZFWriter(shard_fh) if bgzf else shard_fh
+        writeRecords(columns, dxpy.DXGTable(table_id), output, hasName, hasQual, FASTA, start_row, end_row)
+        if bgzf:
+            output.close(write_eof=False)
+    return shard_filename
+
+def writeRecords(columns, table, output_file, hasName = True, hasQual = True, FASTA = False, start_row = 0, end_row = None):
+    # Format a page of rows at a time, and write it at once
+    for batch in table.iterate_batches(start=start_row, end=end_row, columns=columns):
+        output_file.write(formatRecords([batch[c] for c in columns], hasName, hasQual, FASTA).encode('utf-8'))
+
+def formatRecords(values, hasName = True, hasQual = True, FASTA = False):
+    '''
+    Returns the FASTQ (or FASTA) records of the reads with the given
+    values of the columns (names, if hasName, sequences, and qualities,
+    if hasQual), as one string.
+    '''
+    if hasName == True:
+        names, sequences = values[0], values[1]
+    else:
+        names, sequences = None, values[0]
 
-    if isPaired == True:
-        if kwargs['output2'] is None:
-            raise dxpy.AppError("output2 parameter is required for paired reads")
-        with open(kwargs['output2'], 'wb') as out_fh2:
-            exportToFile(columns=col2, table=table, output_file=out_fh2, hasName=hasName, hasQual=hasQual, FASTA=kwargs['output_FASTA'], start_row=kwargs['start_row'], end_row=kwargs['end_row'])
-
-def exportToFile(columns, table, output_file, hasName = True, hasQual = True, FASTA = False, start_row = 0, end_row = None):
-    for row in table.iterate_rows(start=start_row, end=end_row, columns=columns):
-        if FASTA == True:
-            if hasName == True:
-                # change comment character for FASTA
-                if row[0][0] == '@':
-                    row[0] = u'>' + row[0][1:]
-                # if already has comment character (>)
-                if row[0][0] == ">":
-                    output_file.write('\n'.join([ row[0], row[1] ]))
-                # otherwise, add it
-                else:
-                    output_file.write('\n'.join([">" + row[0], row[1] ]))
-            else:
-                output_file.write('\n'.join([">", row[0]]))
-
-        #output FASTQ
+    if FASTA == True:
+        if names is None:
+            headers = [">"] * len(sequences)
         else:
-            if hasName == True:
-            # if alread has comment character (@)
-                if row[0][0] == "@":
-                    output_file.write('\n'.join([ row[0], row[1] ]))
-            # otherwise, add it
-                else:
-                    output_file.write('\n'.join(["@" + row[0], row[1] ]))
-            # add qualities if they exist
-                if hasQual == True:
-                    output_file.write('\n'.join(["\n+", row[2] ]))
-            # else add without name
-            else:
-                output_file.write('\n'.join(["@", row[0]]))
-                if hasQual == True:
-                    output_file.write('\n'.join(['', "+", row[1] ]))
-
-        # end of current record
-        output_file.write('\n')
-
-    output_file.close()
-    return output_file.name
+            # change comment character for FASTA, or add it
+            headers = [">" + name[1:] if name.startswith("@") else name if name.startswith(">") else ">" + name
+                       for name in names]
+        records = [header + "\n" + sequence + "\n" for header, sequence in zip(headers, sequences)]
+
+    #output FASTQ
+    else:
+        if names is None:
+            headers = ["@"] * len(sequences)
+        else:
+            headers = [name if name.startswith("@") else "@" + name for name in names]
+        if hasQual == True:
+            qualities = values[-1]
+            records = [header + "\n" + sequence + "\n+\n" + quality + "\n"
+                       for header, sequence, quality in zip(headers, sequences, qualities)]
+        else:
+            records = [header + "\n" + sequence + "\n" for header, sequence in zip(headers, sequences)]
+
+    return "".join(records)
 
 if __name__ == '__main__':
     main()
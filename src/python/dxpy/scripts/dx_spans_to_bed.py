@@ -16,7 +16,7 @@
 #   License for the specific language governing permissions and limitations
 #   under the License.
 
-import argparse, json, sys, os
+import argparse, json, sys, os, heapq
 import dxpy
 
 
@@ -40,49 +40,55 @@ bed_col = {"chr":0,
 
 default_bed_line = ["-", "0", "0", "-", "0", ".", "0", "0", "0,0,0", "0", "0", "0"]
 
+# Rows of a Genes object are read as lists; *col* maps the name of each
+# column read to its position in them
+
 class gene:
-    def __init__(self, founder):
-        self.parent_ids = [founder['span_id']]
+    def __init__(self, founder, col):
+        self.col = col
+        self.parent_ids = [founder[col['span_id']]]
         self.gene = None
         self.trans = []
         self.add_data(founder)
 
     def add_data(self, data ):
-        if data['type'] == 'gene':
+        col = self.col
+        if data[col['type']] == 'gene':
             self.gene = data
         # this clause handles transcripts (or other typed spans) that are their
         # own parents and also transcripts that are children of this gene
-        elif data['parent_id'] == -1 or (self.gene != None and data['parent_id'] == self.gene['span_id']):
-            self.trans.append(transcript(data))
-            self.parent_ids.append(data['span_id'])
+        elif data[col['parent_id']] == -1 or (self.gene != None and data[col['parent_id']] == self.gene[col['span_id']]):
+            self.trans.append(transcript(data, col))
+            self.parent_ids.append(data[col['span_id']])
         # this captures all children such as exons, CDS, UTRs, etc
         else:
             for t in self.trans:
-                if data['parent_id'] == t.data['span_id']:
+                if data[col['parent_id']] == t.data[col['span_id']]:
                     t.add_data(data)
 
     def check_and_write_data(self, current_lo, bed_file):
+        col = self.col
         if self.gene == None:
             return self.trans[0].check_and_write_data(current_lo, bed_file)
         # just write the gene if we're a lone gene and it's passed
-        elif len(self.trans) == 0 and current_lo > self.gene['hi']:
+        elif len(self.trans) == 0 and current_lo > self.gene[col['hi']]:
             output_row = default_bed_line[:]
-            output_row[bed_col['chr']] = self.gene['chr']
-            output_row[bed_col['chr']] = self.gene['lo']
-            output_row[bed_col['chr']] = self.gene['hi']
-            output_row[bed_col['chr']] = self.gene['name']
-            output_row[bed_col['chr']] = self.gene['strand']
-            if "thick_start" in self.gene:
-                if self.gene['thick_start'] != dxpy.NULL:
-                    output_row[bed_col['thick_start']] = str(self.gene['thick_start'])
-            if "thick_end" in self.gene:
-                if self.gene['thick_end'] != dxpy.NULL:
-                    output_row[bed_col['thick_end']] = str(self.gene['thick_end'])
-            if "score" in self.gene:
-                if self.gene['score'] != dxpy.NULL:
-                    output_row[bed_col['score']] = str(self.gene['score'])
+            output_row[bed_col['chr']] = self.gene[col['chr']]
+            output_row[bed_col['chr']] = self.gene[col['lo']]
+            output_row[bed_col['chr']] = self.gene[col['hi']]
+            output_row[bed_col['chr']] = self.gene[col['name']]
+            output_row[bed_col['chr']] = self.gene[col['strand']]
+            if "thick_start" in col:
+                if self.gene[col['thick_start']] != dxpy.NULL:
+                    output_row[bed_col['thick_start']] = str(self.gene[col['thick_start']])
+            if "thick_end" in col:
+                if self.gene[col['thick_end']] != dxpy.NULL:
+                    output_row[bed_col['thick_end']] = str(self.gene[col['thick_end']])
+            if "score" in col:
+                if self.gene[col['score']] != dxpy.NULL:
+                    output_row[bed_col['score']] = str(self.gene[col['score']])
             return True
-        elif current_lo > self.gene['hi']:
+        elif current_lo > self.gene[col['hi']]:
             for t in self.trans:
                 if t.check_and_write_data(current_lo, bed_file) != True:
                     raise dxpy.AppError("found end of gene but not end of transcript: " + str(self.gene))
@@ -91,7 +97,8 @@ class gene:
             return False
 
 class transcript:
-    def __init__(self, t):
+    def __init__(self, t, col):
+        self.col = col
         self.data = t
         self.exons = []
 
@@ -99,30 +106,32 @@ class transcript:
         self.exons.append(e)
 
     def check_and_write_data(self, current_lo, bed_file):
-        if self.data['hi'] >= current_lo:
+        col = self.col
+        if self.data[col['hi']] >= current_lo:
             return False
         else:
             output_row = default_bed_line[:]
-            output_row[bed_col['chr']] = self.data['chr']
-            output_row[bed_col['lo']] = str(self.data['lo'])
-            output_row[bed_col['hi']] = str(self.data['hi'])
-            output_row[bed_col['name']] = self.data['name']
-            output_row[bed_col['strand']] = self.data['strand']
-            if "score" in self.data:
-                if self.data['score'] != dxpy.NULL:
-                    output_row[bed_col['score']] = str(self.data['score'])
+            output_row[bed_col['chr']] = self.data[col['chr']]
+            output_row[bed_col['lo']] = str(self.data[col['lo']])
+            output_row[bed_col['hi']] = str(self.data[col['hi']])
+            output_row[bed_col['name']] = self.data[col['name']]
+            output_row[bed_col['strand']] = self.data[col['strand']]
+            if "score" in col:
+                if self.data[col['score']] != dxpy.NULL:
+                    output_row[bed_col['score']] = str(self.data[col['score']])
 
             # find and set thick_start and think_end
-            thick_start = self.data["lo"]
-            thick_end = self.data["hi"]
+            type_index, strand_index, lo_index, hi_index = col["type"], col["strand"], col["lo"], col["hi"]
+            thick_start = self.data[lo_index]
+            thick_end = self.data[hi_index]
             for e in self.exons:
-                if (e["type"] == "5' UTR" and e["strand"] == "+") or (e["type"] == "3' UTR" and e["strand"] == "-"):
-                    if e["hi"] > thick_start:
-                        thick_start = e["hi"]
+                if (e[type_index] == "5' UTR" and e[strand_index] == "+") or (e[type_index] == "3' UTR" and e[strand_index] == "-"):
+                    if e[hi_index] > thick_start:
+                        thick_start = e[hi_index]
 
-                if (e["type"] == "3' UTR" and e["strand"] == "+") or (e["type"] == "5' UTR" and e["strand"] == "-"):
-                    if e["lo"] < thick_end:
-                        thick_end = e["lo"]
+                if (e[type_index] == "3' UTR" and e[strand_index] == "+") or (e[type_index] == "5' UTR" and e[strand_index] == "-"):
+                    if e[lo_index] < thick_end:
+                        thick_end = e[lo_index]
 
             output_row[bed_col['thick_start']] = str(thick_start)
             output_row[bed_col['thick_end']] = str(thick_end)
@@ -132,8 +141,8 @@ class transcript:
 
             output_row[bed_col['block_count']] = str(len(self.exons))
             for i in range(len(self.exons)):
-                block_sizes.append(str(self.exons[i]['hi'] - self.exons[i]['lo']))
-                block_starts.append(str(self.exons[i]['lo'] - self.data['lo']))
+                block_sizes.append(str(self.exons[i][hi_index] - self.exons[i][lo_index]))
+                block_starts.append(str(self.exons[i][lo_index] - self.data[lo_index]))
 
             if output_row[bed_col['block_count']] != 0:
                 output_row[bed_col["block_sizes"]] = ",".join(block_sizes)
@@ -160,76 +169,124 @@ def main(**kwargs):
         export_generic_bed(spans, kwargs['output'])
 
     
+# Columns of a Genes object that gene models are written from
+genes_cols = ["chr", "lo", "hi", "name", "score", "strand", "thick_start", "thick_end", "type", "span_id", "parent_id"]
+
+class gene_model_assembler:
+    '''
+    Assembles the rows of a Genes object, read in order of position,
+    into gene models (a gene or another span without a parent, its
+    transcripts, and their exons, UTRs, etc.), and writes each model to
+    the BED file as soon as the position has moved past it.
+
+    The models not yet written are indexed by the span IDs that rows can
+    name as their parent, and rows whose parent hasn't been seen yet by
+    the ID of their parent, so each row is added to its model in
+    constant time; rows still without a parent once the position has
+    moved past them are dropped.
+    '''
+    def __init__(self, bed_file, col):
+        self.bed_file = bed_file
+        self.col = col
+        self.chr_index, self.lo_index, self.hi_index = col['chr'], col['lo'], col['hi']
+        self.parent_index = col['parent_id']
+        self.chr = None
+        self.seq = 0
+        # span ID -> gene model it belongs to
+        self.models = {}
+        # parent ID -> rows waiting for that parent
+        self.orphans = {}
+        # (hi, seq, model) of the models not written yet, and
+        # (hi, seq, row) of the orphans
+        self.pending_models = []
+        self.pending_orphans = []
+
+    def add_row(self, entry):
+        if entry[self.chr_index] != self.chr:
+            # Everything on the previous chromosome is complete
+            self.flush()
+            self.chr = entry[self.chr_index]
+
+        # take founding members (those with no parents) place in gene model
+        if entry[self.parent_index] == -1:
+            g = gene(entry, self.col)
+            self._register(g, g.parent_ids)
+            self.seq += 1
+            heapq.heappush(self.pending_models, (self._model_hi(g), self.seq, g))
+        else:
+            self._add_to_model(entry)
+
+        current_lo = entry[self.lo_index]
+        while self.pending_orphans and self.pending_orphans[0][0] < current_lo:
+            _hi, _seq, orphan = heapq.heappop(self.pending_orphans)
+            siblings = self.orphans.get(orphan[self.parent_index], [])
+            for i in range(len(siblings)):
+                if siblings[i] is orphan:
+                    del siblings[i]
+                    break
+            if len(siblings) == 0:
+                self.orphans.pop(orphan[self.parent_index], None)
+        self._write_models(current_lo)
+
+    def flush(self):
+        self._write_models(float("inf"))
+        self.orphans = {}
+        self.pending_orphans = []
+
+    def _add_to_model(self, entry):
+        g = self.models.get(entry[self.parent_index])
+        if g is None:
+            # otherwise it is to be added once its parent is found
+            self.orphans.setdefault(entry[self.parent_index], []).append(entry)
+            self.seq += 1
+            heapq.heappush(self.pending_orphans, (entry[self.hi_index], self.seq, entry))
+            return
+        num_parent_ids = len(g.parent_ids)
+        g.add_data(entry)
+        self._register(g, g.parent_ids[num_parent_ids:])
+
+    def _register(self, g, span_ids):
+        # Children of these spans can now be added to the model
+        for span_id in span_ids:
+            self.models[span_id] = g
+        for span_id in span_ids:
+            for orphan in self.orphans.pop(span_id, []):
+                self._add_to_model(orphan)
+
+    def _model_hi(self, g):
+        if g.gene == None:
+            return g.trans[0].data[self.hi_index]
+        return g.gene[self.hi_index]
+
+    def _write_models(self, current_lo):
+        if not self.pending_models or self.pending_models[0][0] >= current_lo:
+            return
+        passed = []
+        while self.pending_models and self.pending_models[0][0] < current_lo:
+            passed.append(heapq.heappop(self.pending_models))
+        # in the order the models were found
+        for hi, seq, g in sorted(passed, key=lambda item: item[1]):
+            if g.check_and_write_data(current_lo, self.bed_file):
+                for span_id in g.parent_ids:
+                    if self.models.get(span_id) is g:
+                        del self.models[span_id]
+            else:
+                heapq.heappush(self.pending_models, (self._model_hi(g), seq, g))
+
+
 # genes type objects are a special case
 def export_genes(spans, out_name):
-    global bed_col
-    # setup default 
-
+    # only read the columns that gene models are written from
     span_cols = spans.get_col_names()
+    columns = [col for col in genes_cols if col in span_cols]
+
+    col = dict((name, i) for i, name in enumerate(columns))
 
-    # figure out how many columns our BED needs to have
     with open(out_name, 'w') as bed_file:
-        # copy over default bed line
-        output_row = default_bed_line[:]
-
-        incomplete_buffer = []
-        gene_model = []
-
-        generator = spans.iterate_rows(want_dict=True)
-
-        while(True):
-
-            # loop through table, buffering incomplete lines
-            try:
-                entry = generator.next()
-            except StopIteration:
-                entry = None
-
-            if entry != None:
-                # take founding members (those with no parents) place in gene model
-                if entry['parent_id'] == -1:
-                    #if entry['type'] in ['gene','transcipt']:
-                    gene_model.append(gene(entry))
-                    # if it's a top level object other than these we don't handle it
-                    #else:
-                    #    continue
-                # otherwise they are to be added later
-                else:
-                    incomplete_buffer.append(entry)
-                current_chr = entry['chr']
-                current_lo = entry['lo']
-            else:
-                # switch these to different values to flush final genes out to file
-                current_chr = ""
-                current_lo = 0
-            parent_to_write = {}
-            buff_to_keep = []
-
-            to_keep_exons = []
-
-            # if we've found your parent, add you in the same model
-            for orphan in incomplete_buffer:
-                added = False
-                for g in gene_model:
-                    if orphan['parent_id'] in g.parent_ids:
-                        g.add_data(orphan)
-                        added = True
-                if not added:
-                    if not current_lo > orphan['hi']:
-                        to_keep_exons.append(orphan)
-
-            incomplete_buffer = to_keep_exons[:]
-
-            to_keep_genes = []
-
-            for g in gene_model:
-                if not g.check_and_write_data(current_lo, bed_file):
-                    to_keep_genes.append(g)
-                    
-            gene_model = to_keep_genes[:]
-
-            if entry == None:
-                return
+        assembler = gene_model_assembler(bed_file, col)
+        for row in spans.iterate_rows(columns=columns):
+            assembler.add_row(row)
+        assembler.flush()
 
 ##########################################
 
@@ -16,21 +16,22 @@
 #   License for the specific language governing permissions and limitations
 #   under the License.
 
-import os, sys, re, math, argparse, collections, tempfile
+import os, sys, re, math, argparse, collections
 
 import dxpy
 from ..utils.resolver import ResolutionError, resolve_existing_path
 from ..utils.printing import fill
+from ..utils.genomic_utils import FlatSequence
 from ..compat import str
 
-parser = argparse.ArgumentParser(description='Export a Variants gtable into a VCF file.  WARNING: This can take a while because it downloads the entire reference genome.  It is recommended that this script only be called from within an application running on the cloud.')
+parser = argparse.ArgumentParser(description='Export a Variants gtable into a VCF file.  The bases of the reference genome needed (to write indels) are read from the platform as they are needed; it is recommended that this script only be called from within an application running on the cloud.')
 parser.add_argument("path", help="Path to the Variants gtable")
 parser.add_argument('-o', "--output", help='Name of file to write VCF to ("-" indicates stdout output)')
 parser.add_argument("--export-ref-calls", action="store_true" , help="If selected, rows confidently called as non-variants will also be written")
 parser.add_argument("--export-no-calls", action="store_true" , help="If selected, rows in which no confident call could be made will also be written")
 parser.add_argument("--chr", action="append" , help="If any chr are provided, export will only write rows of the specified chromosomes; repeat to include additional chromosomes")
 parser.add_argument("--no-write-header", dest="write_header", action="store_false", help="If selected, do not write the header the VCF file (useful for concatenating files together with chr")
-parser.add_argument("--reference", help="If present, take reference from this file instead of trying to download it")
+parser.add_argument("--reference", help="If present, take reference from this local file (a flat sequence file) instead of reading it from the platform")
 
 def main(**kwargs):
 
@@ -69,9 +70,11 @@ def main(**kwargs):
         refFileName = kwargs['reference']
         if not os.path.isfile(refFileName):
             raise dxpy.AppError("The reference expected by the variants to vcf script was not a valid file")
-    else:    
-        refFileName = tempfile.NamedTemporaryFile(prefix='reference_', suffix='.txt', delete=False).name
-        dxpy.download_dxfile(contigDetails['flat_sequence_file']['$dnanexus_link'], refFileName)
+        contigSequence = FlatSequence(refFileName)
+    else:
+        # Read the reference bases as they are needed, rather than
+        # downloading the whole genome
+        contigSequence = FlatSequence(dxpy.DXFile(contigDetails['flat_sequence_file']['$dnanexus_link']))
  
     if kwargs['write_header']:
     
@@ -113,8 +116,6 @@ def main(**kwargs):
     for i in range(len(contigDetails['contigs']['names'])):
         chromosomeOffsets[contigDetails['contigs']['names'][i]] = contigDetails['contigs']['offsets'][i]
 
-    contigSequence = open(refFileName,'r').read()
-
     col = {}
     names = variantsTable.get_col_names()   
     for i in range(len(names)):
@@ -146,6 +147,8 @@ def main(**kwargs):
         writeBuffer(buff, col, outputFile, contigSequence, chromosomeOffsets, exportRef, exportNoCall)
         buff = []
 
+    contigSequence.close()
+
 def writeBuffer(buff, col, outputFile, contigSequence, chromosomeOffsets, exportRef, exportNoCall):
     for x in buff:
         printPreceedingCharacter = False
@@ -0,0 +1 @@
+version = 'UNKNOWN_VERSION'
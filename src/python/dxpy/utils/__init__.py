@@ -21,8 +21,6 @@ Utilities shared by dxpy modules.
 from __future__ import print_function, unicode_literals, division, absolute_import
 
 import os, json, collections, concurrent.futures, traceback, sys, time, gc
-from multiprocessing import cpu_count
-import dateutil.parser
 from .. import logger
 from ..compat import basestring, THREAD_TIMEOUT_MAX
 import numbers
@@ -111,6 +109,7 @@ def response_iterator(request_iterator, thread_pool, max_active_tasks=None, do_f
     """
     tasks_in_progress = collections.deque()
     if max_active_tasks is None:
+        from multiprocessing import cpu_count
         max_active_tasks = cpu_count()
 
     # The following two functions facilitate GC by not adding extra variables to the enclosing scope.
@@ -179,6 +178,7 @@ def normalize_time_input(t, future=False, default_unit='ms'):
         try:
             t = normalize_timedelta(t)
         except ValueError:
+            import dateutil.parser
             try:
                 t = int(time.mktime(dateutil.parser.parse(t).timetuple())*1000)
                 assert t > 0
@@ -319,5 +319,27 @@ class Nonce:
             input_cp['nonce'] = str(Nonce())
         return input_cp
 
-# Moved to the bottom due to circular imports
-from .exec_utils import run, convert_handlers_to_dxlinks, parse_args_as_job_input, entry_point, DXJSONEncoder
+_EXEC_UTILS_NAMES = ("run", "convert_handlers_to_dxlinks", "parse_args_as_job_input", "entry_point", "DXJSONEncoder")
+
+if sys.version_info >= (3, 7):
+    # Import exec_utils (and, through it, argparse and subprocess) only
+    # when one of its names is first used; see __getattr__ in dxpy
+    def __getattr__(name):
+        from importlib import import_module
+        if name in _EXEC_UTILS_NAMES:
+            exec_utils = import_module(".exec_utils", __name__)
+            for exec_utils_name in _EXEC_UTILS_NAMES:
+                globals()[exec_utils_name] = getattr(exec_utils, exec_utils_name)
+            return globals()[name]
+        if not name.startswith("_"):
+            # Submodules that used to be imported as a side effect of
+            # importing dxpy
+            try:
+                return import_module("." + name, __name__)
+            except ImportError as e:
+                if getattr(e, "name", None) != __name__ + "." + name:
+                    raise
+        raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+else:
+    # Moved to the bottom due to circular imports
+    from .exec_utils import run, convert_handlers_to_dxlinks, parse_args_as_job_input, entry_point, DXJSONEncoder
@@ -0,0 +1,222 @@
+# Copyright (C) 2013-2016 DNAnexus, Inc.
+#
+# This file is part of dx-toolkit (DNAnexus platform client libraries).
+#
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may not
+#   use this file except in compliance with the License. You may obtain a copy
+#   of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+
+'''
+Recording and replaying of the HTTP requests made by
+:func:`dxpy.DXHTTPRequest`, so that dx commands and the bindings can
+be run (and timed) without the platform, with the same responses every
+time.
+
+A cassette is a file with one JSON object per line, for each request
+made: its method, URL, Range header and body, and the status, headers
+and body of the response. :class:`Recorder` appends to a cassette the
+requests that are actually made, and :class:`Player` answers requests
+with the recorded responses instead of sending them. To make replays
+realistic, a :class:`Player` can also add latency to each response,
+limit the bandwidth at which bodies are transferred, and answer a
+fraction of requests with "503 Service Unavailable" (which dxpy
+retries).
+
+Either is installed with :func:`dxpy.set_transport`, or, when dxpy is
+imported, by setting the ``DX_CASSETTE_RECORD`` or
+``DX_CASSETTE_REPLAY`` environment variable to the name of the
+cassette. ``DX_REPLAY_LATENCY`` (seconds per request),
+``DX_REPLAY_BANDWIDTH`` (bytes per second) and
+``DX_REPLAY_ERROR_RATE`` (between 0 and 1) configure the replay.
+
+Requests are matched by method, URL path and query (so the cassette
+can be replayed against any API server host), Range header, and body,
+ignoring the "nonce" field of JSON bodies. When a request is made more
+times than it was recorded, the last recorded response is repeated
+(e.g. when polling a job's state).
+'''
+
+from __future__ import print_function, unicode_literals, division, absolute_import
+
+import io, json, time, base64, random, hashlib, threading, collections
+
+import dxpy
+from ..compat import environ, open, str
+from ..exceptions import DXError
+from requests.packages import urllib3
+
+try:
+    # Python 3
+    from urllib.parse import urlsplit
+except ImportError:
+    # Python 2.7
+    from urlparse import urlsplit
+
+
+class DXCassetteError(DXError):
+    '''Raised by :class:`Player` when a request was not recorded in its cassette.'''
+
+
+def _get_body_key(body):
+    if hasattr(body, 'read'):
+        position = body.tell()
+        content = body.read()
+        body.seek(position)
+        body = content
+    if not body:
+        return None
+    if not isinstance(body, bytes):
+        body = body.encode('utf-8')
+    try:
+        parsed = json.loads(body.decode('utf-8'))
+    except ValueError:
+        return 'md5:' + hashlib.md5(body).hexdigest()
+    if isinstance(parsed, dict):
+        parsed.pop('nonce', None)
+    return json.dumps(parsed, sort_keys=True)
+
+
+def get_request_key(method, url, headers, body):
+    '''
+    :returns: The fields by which a request is matched to a recorded one
+    :rtype: tuple
+    '''
+    parts = urlsplit(url)
+    path = parts.path + ('?' + parts.query if parts.query else '')
+    headers = {(k.decode('ascii') if isinstance(k, bytes) else k).lower(): v for k, v in headers.items()}
+    byte_range = headers.get('range')
+    if isinstance(byte_range, bytes):
+        byte_range = byte_range.decode('ascii')
+    return (method, path, byte_range, _get_body_key(body))
+
+
+def _body_size(body):
+    if body is None:
+        return 0
+    return len(body) if hasattr(body, '__len__') else 0
+
+
+class Recorder(object):
+    '''
+    :param filename: Cassette to append the requests to
+    :type filename: string
+
+    Sends requests, and appends them (with their responses) to the
+    cassette *filename*.
+    '''
+    def __init__(self, filename):
+        self.filename = filename
+        self._lock = threading.Lock()
+
+    def request(self, pool_manager, method, url, headers=None, body=None, **kwargs):
+        # The body may be a buffer that is consumed by sending it
+        method, path, byte_range, body_key = get_request_key(method, url, headers or {}, body)
+        started = time.time()
+        response = pool_manager.request(method, url, headers=headers, body=body, **kwargs)
+        data = response.data
+        try:
+            response_body, encoding = data.decode('utf-8'), None
+        except UnicodeDecodeError:
+            response_body, encoding = base64.b64encode(data).decode('ascii'), 'base64'
+        # The body is stored decoded, so the headers describing its
+        # encoding on the wire no longer apply
+        response_headers = {k: v for k, v in response.headers.items()
+                            if k.lower() not in ('content-encoding', 'transfer-encoding', 'content-length')}
+        entry = {"method": method, "path": path, "range": byte_range, "body": body_key,
+                 "request_size": _body_size(body), "elapsed": time.time() - started,
+                 "status": response.status, "headers": response_headers,
+                 "response": response_body, "encoding": encoding}
+        with self._lock:
+            with open(self.filename, 'ab') as fh:
+                fh.write((json.dumps(entry, sort_keys=True) + '\n').encode('utf-8'))
+        return response
+
+
+class Player(object):
+    '''
+    :param filename: Cassette to replay
+    :type filename: string
+    :param latency: Seconds added to the time taken by each request
+    :type latency: float
+    :param bandwidth: If given, bytes per second at which request and response bodies are transferred
+    :type bandwidth: float
+    :param error_rate: Fraction of requests answered with "503 Service Unavailable"
+    :type error_rate: float
+    :param seed: Seed of the random number generator that picks the requests to fail
+    :type seed: int
+
+    Answers requests with the responses recorded in *filename*,
+    without sending them. :attr:`num_requests` and
+    :attr:`num_errors` count the requests answered and the errors
+    injected.
+    '''
+    def __init__(self, filename, latency=0, bandwidth=None, error_rate=0, seed=None):
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.error_rate = error_rate
+        self.num_requests = 0
+        self.num_errors = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._entries = collections.defaultdict(collections.deque)
+        with open(filename, 'rb') as fh:
+            for line in fh:
+                if line.strip():
+                    entry = json.loads(line.decode('utf-8'))
+                    key = (entry["method"], entry["path"], entry["range"], entry["body"])
+                    self._entries[key].append(entry)
+
+    def _next_entry(self, key):
+        with self._lock:
+            self.num_requests += 1
+            entries = self._entries.get(key)
+            if not entries:
+                return None
+            if self.error_rate and self._random.random() < self.error_rate:
+                self.num_errors += 1
+                return {"status": 503, "headers": {"Content-Type": "application/json", "Retry-After": "0"},
+                        "response": json.dumps({"error": {"type": "ServiceUnavailable",
+                                                          "message": "Error injected by the cassette player"}}),
+                        "encoding": None}
+            return entries.popleft() if len(entries) > 1 else entries[0]
+
+    def request(self, pool_manager, method, url, headers=None, body=None, **kwargs):
+        key = get_request_key(method, url, headers or {}, body)
+        entry = self._next_entry(key)
+        if entry is None:
+            raise DXCassetteError("No response was recorded for {} {} (range {}, body {})".format(*key))
+        data = entry["response"].encode('utf-8')
+        if entry["encoding"] == 'base64':
+            data = base64.b64decode(data)
+        delay = self.latency
+        if self.bandwidth:
+            delay += (_body_size(body) + len(data)) / self.bandwidth
+        if delay > 0:
+            time.sleep(delay)
+        headers = dict(entry["headers"])
+        headers["Content-Length"] = str(len(data))
+        return urllib3.HTTPResponse(body=io.BytesIO(data), headers=headers, status=entry["status"],
+                                    preload_content=True, decode_content=False)
+
+
+def enable():
+    '''
+    Records requests to the file named by ``DX_CASSETTE_RECORD``, or
+    replays them from the file named by ``DX_CASSETTE_REPLAY``, if either
+    environment variable is set.
+    '''
+    if environ.get("DX_CASSETTE_RECORD"):
+        dxpy.set_transport(Recorder(environ["DX_CASSETTE_RECORD"]))
+    elif environ.get("DX_CASSETTE_REPLAY"):
+        dxpy.set_transport(Player(environ["DX_CASSETTE_REPLAY"],
+                                  latency=float(environ.get("DX_REPLAY_LATENCY", 0)),
+                                  bandwidth=float(environ["DX_REPLAY_BANDWIDTH"]) if environ.get("DX_REPLAY_BANDWIDTH") else None,
+                                  error_rate=float(environ.get("DX_REPLAY_ERROR_RATE", 0))))
@@ -21,7 +21,7 @@ dx for tab-completion, resolving naming conflicts, etc.
 
 from __future__ import print_function, unicode_literals, division, absolute_import
 
-import sys
+import sys, json
 
 from ..packages.argcomplete import warn
 from collections import namedtuple, OrderedDict
@@ -29,6 +29,7 @@ import dxpy
 from .resolver import (get_first_pos_of_char, get_last_pos_of_char, clean_folder_path, resolve_path,
                        split_unescaped, ResolutionError)
 from .printing import fill
+from . import completion_cache
 from ..compat import str
 
 def startswith(text):
@@ -101,11 +102,12 @@ def get_folder_matches(text, delim_pos, dxproj, folderpath):
     Members of the returned list are guaranteed to start with *text*
     and be in escaped form for consumption by the command-line.
     '''
+    def fetch():
+        return [folder_name[folder_name.rfind('/') + 1:]
+                for folder_name in dxproj.list_folder(folder=folderpath, only='folders')['folders']]
+
     try:
-        folder_names = map(lambda folder_name:
-                               folder_name[folder_name.rfind('/') + 1:],
-                           dxproj.list_folder(folder=folderpath,
-                                              only='folders')['folders'])
+        folder_names = list(completion_cache.get_cached(dxproj.get_id(), folderpath, 'folders', fetch))
         if text != '' and delim_pos != len(text) - 1:
             folder_names += ['.', '..']
         prefix = text[:delim_pos + 1]
@@ -144,19 +146,39 @@ def get_data_matches(text, delim_pos, dxproj, folderpath, classname=None,
         else:
             visibility = "visible"
 
+    limit = 100
+
+    def fetch():
+        results = dxpy.find_data_objects(project=dxproj.get_id(),
+                                         folder=folderpath,
+                                         name=unescaped_text + "*",
+                                         name_mode="glob",
+                                         recurse=False,
+                                         visibility=visibility,
+                                         classname=classname,
+                                         limit=limit,
+                                         describe=dict(fields=dict(name=True)),
+                                         typename=typespec)
+        names = [result['describe']['name'] for result in results]
+        return {"prefix": unescaped_text, "complete": len(names) < limit, "names": names}
+
+    def accept(cached):
+        # Results cached for a shorter prefix can be narrowed down
+        # locally, as long as they were not truncated by the limit and
+        # the prefix has no glob metacharacters.
+        if cached["prefix"] == unescaped_text:
+            return True
+        return (cached["complete"] and unescaped_text.startswith(cached["prefix"])
+                and not any(char in unescaped_text for char in '*?['))
+
     try:
-        results = list(dxpy.find_data_objects(project=dxproj.get_id(),
-                                              folder=folderpath,
-                                              name=unescaped_text + "*",
-                                              name_mode="glob",
-                                              recurse=False,
-                                              visibility=visibility,
-                                              classname=classname,
-                                              limit=100,
-                                              describe=dict(fields=dict(name=True)),
-                                              typename=typespec))
+        query = json.dumps(["data", classname, typespec, visibility])
+        cached = completion_cache.get_cached(dxproj.get_id(), folderpath, query, fetch, accept=accept)
+        names = cached["names"]
+        if cached["prefix"] != unescaped_text:
+            names = [name for name in names if name.startswith(unescaped_text)]
         prefix = '' if text == '' else text[:delim_pos + 1]
-        return [prefix + escape_name(result['describe']['name']) for result in results]
+        return [prefix + escape_name(name) for name in names]
     except:
         return []
 
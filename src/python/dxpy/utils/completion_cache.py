@@ -0,0 +1,153 @@
+# Copyright (C) 2013-2016 DNAnexus, Inc.
+#
+# This file is part of dx-toolkit (DNAnexus platform client libraries).
+#
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may not
+#   use this file except in compliance with the License. You may obtain a copy
+#   of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+
+'''
+On-disk cache for tab-completion results.
+
+Completing a path otherwise costs one or more API calls per keystroke.
+Results are stored in ~/.dnanexus_config/completion_cache, one file
+per (API server, login session, project, folder). An entry younger
+than the TTL is served as is. An older entry (up to
+:data:`MAX_STALE_AGE` seconds) is still served, and a detached child
+process refreshes it in the background for the next keystroke.
+
+The TTL defaults to :data:`DEFAULT_TTL` seconds and can be set with the
+``DX_COMPLETION_CACHE_TTL`` environment variable; a value of 0 disables
+the cache.
+'''
+
+from __future__ import print_function, unicode_literals, division, absolute_import
+
+import os, json, time, hashlib, threading
+
+import dxpy
+from ..compat import environ, open
+
+DEFAULT_TTL = 30
+MAX_STALE_AGE = 3600
+
+def get_ttl():
+    try:
+        return float(environ.get("DX_COMPLETION_CACHE_TTL", DEFAULT_TTL))
+    except ValueError:
+        return DEFAULT_TTL
+
+def get_cache_dir():
+    return os.path.join(dxpy.config.get_user_conf_dir(), "completion_cache")
+
+def _get_cache_filename(project, folder):
+    # The token is part of the key so that results are never shared
+    # across users or login sessions
+    token = (dxpy.SECURITY_CONTEXT or {}).get("auth_token", "")
+    key = "\0".join([dxpy.APISERVER, token, project, folder])
+    return os.path.join(get_cache_dir(), hashlib.sha1(key.encode("utf-8")).hexdigest() + ".json")
+
+def _read_entries(filename):
+    try:
+        with open(filename, "rb") as fd:
+            return json.loads(fd.read().decode("utf-8"))
+    except (IOError, OSError, ValueError):
+        return {}
+
+def _store(filename, query, value, timestamp=None):
+    entries = _read_entries(filename)
+    entries[query] = {"time": time.time() if timestamp is None else timestamp, "value": value}
+    # Write to a temporary file and rename it into place, so that
+    # concurrent completions never read a partially written file
+    tmp_filename = "{}.{}".format(filename, os.getpid())
+    try:
+        if not os.path.isdir(os.path.dirname(filename)):
+            os.makedirs(os.path.dirname(filename), 0o700)
+        with open(tmp_filename, "wb") as fd:
+            fd.write(json.dumps(entries).encode("utf-8"))
+        try:
+            os.rename(tmp_filename, filename)
+        except OSError:
+            # os.rename does not replace an existing file on Windows
+            os.remove(filename)
+            os.rename(tmp_filename, filename)
+    except (IOError, OSError):
+        pass
+
+def _refresh_in_background(filename, query, fetch):
+    def refresh():
+        try:
+            _store(filename, query, fetch())
+        except Exception:
+            pass
+
+    if not hasattr(os, "fork"):
+        threading.Thread(target=refresh).start()
+        return
+
+    # Double-fork so that the refresh outlives the completing process
+    # (argcomplete exits with os._exit as soon as it prints its
+    # results) and never leaves a zombie behind in a long-lived one
+    # (e.g. "dx sh").
+    try:
+        pid = os.fork()
+    except OSError:
+        return
+    if pid > 0:
+        os.waitpid(pid, 0)
+        return
+    try:
+        os.setsid()
+        if os.fork() == 0:
+            # Detach from the pipes that the shell is reading
+            # completions from, so it doesn't wait for us.
+            devnull = os.open(os.devnull, os.O_RDWR)
+            for fd in (0, 1, 2, 8, 9):
+                try:
+                    os.dup2(devnull, fd)
+                except OSError:
+                    pass
+            dxpy.reset_after_fork()
+            refresh()
+    finally:
+        os._exit(0)
+
+def get_cached(project, folder, query, fetch, accept=None):
+    '''
+    :param project: ID of the project being completed in
+    :type project: string
+    :param folder: Folder being completed in
+    :type folder: string
+    :param query: Key identifying the query within the folder
+    :type query: string
+    :param fetch: Function of no arguments that retrieves fresh results
+    :type fetch: callable
+    :param accept: If given, a cached value is only used if this function returns True for it
+    :type accept: callable
+    :returns: The (possibly cached) return value of *fetch*, which must be serializable to JSON
+
+    Returns the results for *query*, served from the cache when possible.
+    '''
+    ttl = get_ttl()
+    if ttl <= 0:
+        return fetch()
+    filename = _get_cache_filename(project, folder)
+    entry = _read_entries(filename).get(query)
+    if entry is not None and (accept is None or accept(entry["value"])):
+        age = time.time() - entry["time"]
+        if 0 <= age < ttl:
+            return entry["value"]
+        if 0 <= age < MAX_STALE_AGE:
+            _refresh_in_background(filename, query, fetch)
+            return entry["value"]
+    value = fetch()
+    _store(filename, query, value)
+    return value
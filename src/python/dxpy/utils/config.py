@@ -164,6 +164,9 @@ class DXConfig(MutableMapping):
         where <PID> is pid of the parent of this process, then its parent, and so on.
         If none of those exist, the path for the immediate parent is given, even if it doesn't exist.
 
+        If the environment variable _DX_SESSION_PID is set to the pid of a running process, the search starts
+        from that process instead of this one. (dx-daemon sets it to the pid of the dx client it is serving.)
+
         If *cleanup* is True, looks up and deletes all session configuration directories that belong to nonexistent
         processes.
         """
@@ -190,7 +193,10 @@ class DXConfig(MutableMapping):
                     if not pid_exists(session_pid):
                         rmtree(os.path.join(sessions_dir, session_dir), ignore_errors=True)
 
-            parent_process = Process(os.getpid()).parent()
+            session_pid = int(environ.get("_DX_SESSION_PID", os.getpid()))
+            if not pid_exists(session_pid):
+                session_pid = os.getpid()
+            parent_process = Process(session_pid).parent()
             default_session_dir = os.path.join(sessions_dir, str(parent_process.pid))
             while parent_process is not None and parent_process.pid != 0:
                 session_dir = os.path.join(sessions_dir, str(parent_process.pid))
@@ -14,7 +14,7 @@
 #   License for the specific language governing permissions and limitations
 #   under the License.
 
-import re
+import os, re, sys, mmap, struct, zlib, collections
 from ..compat import USING_PYTHON2, str
 
 if USING_PYTHON2:
@@ -35,3 +35,150 @@ def reverse_complement(seq):
     if not SEQ_PATTERN.match(bytes_seq):
         raise ValueError('Sequence %r must consist only of A, C, G, T, N' % (seq,))
     return bytes_seq.translate(COMPLEMENT)[::-1]
+
+# Amount of data compressed into each BGZF block (as by htslib, so that
+# the compressed block always fits in 64 KiB)
+BGZF_BLOCK_SIZE = 0xff00
+
+# Empty BGZF block that marks the end of a BGZF file
+BGZF_EOF = (b"\x1f\x8b\x08\x04\x00\x00\x00\x00\x00\xff\x06\x00\x42\x43\x02\x00\x1b\x00"
+            b"\x03\x00\x00\x00\x00\x00\x00\x00\x00\x00")
+
+def bgzf_block(data, level=6):
+    '''
+    :param data: Data to compress (at most :data:`BGZF_BLOCK_SIZE` bytes)
+    :type data: bytes
+    :returns: A BGZF block (a gzip member that records its own size) containing *data*
+
+    Returns *data* compressed as a block of a BGZF file, the blocked
+    gzip format of BAM files and of files indexed by tabix.
+    '''
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS)
+    deflated = compressor.compress(data) + compressor.flush()
+    # gzip header with an extra "BC" field holding the size of the
+    # block minus 1
+    header = struct.pack("<BBBBIBBHBBHH", 0x1f, 0x8b, 8, 4, 0, 0, 0xff, 6, 66, 67, 2, len(deflated) + 25)
+    return header + deflated + struct.pack("<II", zlib.crc32(data) & 0xffffffff, len(data))
+
+class BGZFWriter(object):
+    '''
+    Writes data to a file object, compressed in BGZF blocks.
+    '''
+    def __init__(self, fileobj, level=6):
+        self._fileobj = fileobj
+        self._level = level
+        self._buf = []
+        self._buf_len = 0
+
+    def write(self, data):
+        self._buf.append(data)
+        self._buf_len += len(data)
+        if self._buf_len >= BGZF_BLOCK_SIZE:
+            data = b"".join(self._buf)
+            end = len(data) - len(data) % BGZF_BLOCK_SIZE
+            for start in range(0, end, BGZF_BLOCK_SIZE):
+                self._fileobj.write(bgzf_block(data[start:start + BGZF_BLOCK_SIZE], self._level))
+            self._buf = [data[end:]]
+            self._buf_len = len(data) - end
+
+    def flush(self):
+        '''
+        Writes the data buffered so far in a block, even if it is smaller
+        than :data:`BGZF_BLOCK_SIZE`.
+        '''
+        if self._buf_len > 0:
+            self._fileobj.write(bgzf_block(b"".join(self._buf), self._level))
+            self._buf, self._buf_len = [], 0
+
+    def close(self, write_eof=True):
+        '''
+        :param write_eof: Whether to end the file with the end-of-file marker block
+        :type write_eof: boolean
+
+        Flushes the data buffered and closes the file object. Pass
+        *write_eof* False to write a part of a BGZF file (the blocks of
+        several parts can be concatenated, followed by
+        :data:`BGZF_EOF`).
+        '''
+        self.flush()
+        if write_eof:
+            self._fileobj.write(BGZF_EOF)
+        self._fileobj.close()
+
+class FlatSequence(object):
+    '''
+    :param source: Name of a local file, or a file object open for reading (such as a :class:`~dxpy.bindings.dxfile.DXFile`)
+    :param block_size: Size of the blocks read from a file object
+    :type block_size: integer
+    :param max_blocks: Number of blocks kept in memory
+    :type max_blocks: integer
+
+    Random access to the bases of a flat sequence file (the
+    concatenation of the contigs of a ContigSet, as in its
+    ``flat_sequence_file``) without reading all of it into memory. A
+    local file is memory-mapped; a file object is read a block at a
+    time, keeping the blocks most recently used, so that reading
+    positions in order streams through the file.
+
+    Index it with an offset, or slice it, to get a string of bases::
+
+        ref = FlatSequence(dxpy.DXFile(contigset_details['flat_sequence_file']))
+        base = ref[offsets[chromosome] + pos]
+
+    '''
+    def __init__(self, source, block_size=1024*1024, max_blocks=16):
+        self._mmap, self._fileobj = None, None
+        if isinstance(source, (str, bytes)):
+            with open(source, 'rb') as fd:
+                if os.fstat(fd.fileno()).st_size > 0:
+                    self._mmap = mmap.mmap(fd.fileno(), 0, access=mmap.ACCESS_READ)
+                else:
+                    self._mmap = b""
+        else:
+            self._fileobj = source
+        self._block_size = block_size
+        self._max_blocks = max_blocks
+        self._blocks = collections.OrderedDict()
+
+    def _get_block(self, index):
+        block = self._blocks.pop(index, None)
+        if block is None:
+            self._fileobj.seek(index * self._block_size)
+            block = self._fileobj.read(self._block_size)
+            if len(self._blocks) >= self._max_blocks:
+                self._blocks.popitem(last=False)
+        self._blocks[index] = block
+        return block
+
+    def _read(self, start, end):
+        if self._mmap is not None:
+            return self._mmap[start:end]
+        pieces = []
+        while start < end:
+            block = self._get_block(start // self._block_size)
+            block_start = start % self._block_size
+            piece = block[block_start:block_start + end - start]
+            if len(piece) == 0:
+                break
+            pieces.append(piece)
+            start += len(piece)
+        return b"".join(pieces)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            if key.step is not None or (key.start or 0) < 0 or (key.stop is not None and key.stop < 0):
+                raise ValueError("Only slices with non-negative bounds and no step are supported")
+            start = key.start or 0
+            end = key.stop if key.stop is not None else sys.maxsize
+            return self._read(start, end).decode('ascii')
+        if key < 0:
+            raise IndexError("Negative offsets are not supported")
+        base = self._read(key, key + 1)
+        if len(base) == 0:
+            raise IndexError("Offset %d is past the end of the sequence" % (key,))
+        return base.decode('ascii')
+
+    def close(self):
+        if isinstance(self._mmap, mmap.mmap):
+            self._mmap.close()
+        self._blocks.clear()
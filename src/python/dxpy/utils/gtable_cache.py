@@ -0,0 +1,445 @@
+# Copyright (C) 2013-2016 DNAnexus, Inc.
+#
+# This file is part of dx-toolkit (DNAnexus platform client libraries).
+#
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may not
+#   use this file except in compliance with the License. You may obtain a copy
+#   of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+
+'''
+On-disk cache for the columns of closed GTables.
+
+A closed GTable never changes, so once a scan has read all of its rows,
+the columns it read can be kept on disk, and later scans and genomic
+range queries of the table (see :class:`~dxpy.bindings.dxgtable.DXGTable`)
+read them from there instead of fetching them from the API server
+again as JSON.
+
+The cache is off by default. Set the ``DX_GTABLE_CACHE_SIZE``
+environment variable to the disk space it may use, in MiB, to turn it
+on (this requires NumPy). Tables are stored in
+~/.dnanexus_config/gtable_cache (or in ``DX_GTABLE_CACHE_DIR``), one
+directory per (API server, table), and the tables that were least
+recently read are removed when the cache grows larger than that.
+
+Each column is stored in its own file, as an array of fixed-size values
+(with the NumPy dtype in :data:`STORAGE_DTYPES`) that is memory-mapped
+when it is read. A string column is stored as its UTF-8 encoded values
+one after the other, along with an array of the int64 offsets at which
+each value starts (and the last one ends). The row IDs of a closed
+table are 0 to its length, so they are not stored.
+'''
+
+from __future__ import print_function, unicode_literals, division, absolute_import
+
+import os, json, hashlib, shutil
+
+import dxpy
+from ..compat import environ, open
+
+# NumPy dtype in which the values of each type of column are stored.
+# Floating-point values are stored as double, as they are returned by
+# the API server.
+STORAGE_DTYPES = {
+    "boolean": "bool",
+    "uint8": "uint8",
+    "int16": "int16",
+    "uint16": "uint16",
+    "int32": "int32",
+    "uint32": "uint32",
+    "int64": "int64",
+    "float": "float64",
+    "double": "float64"
+}
+
+def get_size_limit():
+    '''
+    :returns: Maximum size of the cache in bytes (0 if it is off)
+    :rtype: int
+    '''
+    try:
+        return max(int(float(environ.get("DX_GTABLE_CACHE_SIZE", 0)) * 1024 * 1024), 0)
+    except ValueError:
+        return 0
+
+def get_cache_dir():
+    return environ.get("DX_GTABLE_CACHE_DIR") or os.path.join(dxpy.config.get_user_conf_dir(), "gtable_cache")
+
+def is_enabled():
+    if get_size_limit() == 0:
+        return False
+    try:
+        import numpy
+    except ImportError:
+        return False
+    return numpy is not None
+
+def _get_table_dir(dxid):
+    key = "\0".join([dxpy.APISERVER, dxid])
+    return os.path.join(get_cache_dir(), hashlib.sha1(key.encode("utf-8")).hexdigest())
+
+def _read_meta(table_dir):
+    try:
+        with open(os.path.join(table_dir, "meta.json"), "rb") as fd:
+            return json.loads(fd.read().decode("utf-8"))
+    except (IOError, OSError, ValueError):
+        return None
+
+def _write_meta(table_dir, meta):
+    filename = os.path.join(table_dir, "meta.json")
+    # Write to a temporary file and rename it into place, so that
+    # concurrent readers never read a partially written file
+    tmp_filename = "{}.{}".format(filename, os.getpid())
+    with open(tmp_filename, "wb") as fd:
+        fd.write(json.dumps(meta).encode("utf-8"))
+    try:
+        os.rename(tmp_filename, filename)
+    except OSError:
+        # os.rename does not replace an existing file on Windows
+        os.remove(filename)
+        os.rename(tmp_filename, filename)
+
+def _get_table_size(meta):
+    return sum(column["size"] for column in meta["cached"].values())
+
+def _evict(size_limit, keep):
+    # Removes the tables that were least recently read (other than the
+    # one in directory *keep*) until the cache fits in *size_limit*
+    cache_dir = get_cache_dir()
+    tables, total_size = [], 0
+    for name in os.listdir(cache_dir):
+        table_dir = os.path.join(cache_dir, name)
+        meta = _read_meta(table_dir)
+        if meta is None:
+            continue
+        size = _get_table_size(meta)
+        total_size += size
+        if table_dir != keep:
+            try:
+                tables.append((os.path.getmtime(os.path.join(table_dir, "meta.json")), size, table_dir))
+            except OSError:
+                pass
+    for _mtime, size, table_dir in sorted(tables):
+        if total_size <= size_limit:
+            break
+        shutil.rmtree(table_dir, ignore_errors=True)
+        total_size -= size
+
+
+class CachedGTable(object):
+    '''
+    Reads the columns of a GTable that are in the cache. Use
+    :func:`open_cached` to get one.
+
+    .. py:attribute:: length
+
+       Number of rows in the table
+
+    .. py:attribute:: columns
+
+       List of the column descriptors of the table (as returned by
+       /gtable-xxxx/describe)
+    '''
+    def __init__(self, table_dir, meta):
+        import numpy
+        self._numpy = numpy
+        self._table_dir = table_dir
+        self._meta = meta
+        self._arrays = {}
+        self.length = meta["length"]
+        self.columns = meta["columns"]
+        self._types = dict((column["name"], column["type"]) for column in self.columns)
+
+    def get_col_names(self):
+        return [column["name"] for column in self.columns]
+
+    def has_columns(self, col_names):
+        '''
+        :returns: Whether all the columns named are in the cache (the row ID, ``__id__``, always is)
+        :rtype: boolean
+        '''
+        return all(name == "__id__" or name in self._meta["cached"] for name in col_names)
+
+    def get_index(self, name):
+        '''
+        :returns: The descriptor of the index named *name*, or None
+        :rtype: dict
+        '''
+        for index in self._meta.get("indices") or []:
+            if index["name"] == name:
+                return index
+        return None
+
+    def _map(self, filename, dtype, length):
+        if length == 0:
+            return self._numpy.empty(0, dtype=dtype)
+        return self._numpy.memmap(os.path.join(self._table_dir, filename), dtype=dtype, mode="r", shape=(length,))
+
+    def _get_arrays(self, name):
+        if name not in self._arrays:
+            cached = self._meta["cached"][name]
+            if self._types[name] == "string":
+                self._arrays[name] = (self._map(cached["file"] + ".offsets", "int64", self.length + 1),
+                                      self._map(cached["file"], "uint8", cached["size"] - 8 * (self.length + 1)))
+            else:
+                self._arrays[name] = self._map(cached["file"], STORAGE_DTYPES[self._types[name]], self.length)
+        return self._arrays[name]
+
+    def get_values(self, name, start=0, end=None, row_ids=None):
+        '''
+        :param name: Name of the column (or ``__id__``)
+        :type name: string
+        :param start: Row ID of the first row
+        :type start: int
+        :param end: Row ID after the last row (the length of the table if None)
+        :type end: int
+        :param row_ids: If given, the IDs of the rows, instead of *start* and *end*
+        :type row_ids: NumPy array of integers
+        :rtype: NumPy array
+
+        Returns the values of a column in a range of rows (as a view of
+        the file if possible) or in the rows given. The values of a
+        string column are returned in an array of objects.
+        '''
+        numpy = self._numpy
+        if end is None:
+            end = self.length
+        if name == "__id__":
+            return numpy.arange(start, end, dtype="int64") if row_ids is None else row_ids.astype("int64")
+        if self._types[name] != "string":
+            array = self._get_arrays(name)
+            return array[start:end] if row_ids is None else array[row_ids]
+        offsets, data = self._get_arrays(name)
+        if row_ids is None:
+            starts = offsets[start:end + 1] if end > start else offsets[:0]
+            blob = data[int(starts[0]):int(starts[-1])].tobytes() if len(starts) > 0 else b""
+            bounds = (starts - starts[0]).tolist() if len(starts) > 0 else []
+            values = [blob[lo:hi].decode("utf-8") for lo, hi in zip(bounds[:-1], bounds[1:])]
+        else:
+            values = [data[lo:hi].tobytes().decode("utf-8")
+                      for lo, hi in zip(offsets[row_ids].tolist(), offsets[row_ids + 1].tolist())]
+        array = numpy.empty(len(values), dtype="object")
+        array[:] = values
+        return array
+
+    def find_genomic_range(self, index, mode, chr, lo, hi):
+        '''
+        :param index: Descriptor of a genomic range index of the table
+        :type index: dict
+        :rtype: NumPy array
+
+        Returns the IDs of the rows that match a genomic range query
+        ("overlap" or "enclose"), in order of their lo coordinate (and
+        then of their row ID).
+        '''
+        numpy = self._numpy
+        lo_values = self.get_values(index["lo"])
+        hi_values = self.get_values(index["hi"])
+        if mode == "overlap":
+            match = (lo_values < hi) & (hi_values > lo)
+        else:
+            match = (lo_values >= lo) & (hi_values <= hi)
+        row_ids = numpy.flatnonzero(match)
+        row_ids = row_ids[self._string_equals(index["chr"], chr, row_ids)]
+        return row_ids[numpy.argsort(lo_values[row_ids], kind="mergesort")]
+
+    def _string_equals(self, name, value, row_ids):
+        # Whether the value of a string column is *value* in each of the
+        # rows given, comparing the encoded values without decoding them
+        numpy = self._numpy
+        offsets, data = self._get_arrays(name)
+        encoded = numpy.frombuffer(value.encode("utf-8"), dtype="uint8")
+        starts = offsets[row_ids]
+        equal = (offsets[row_ids + 1] - starts) == len(encoded)
+        if len(encoded) > 0 and equal.any():
+            candidates = numpy.flatnonzero(equal)
+            values = data[starts[candidates][:, None] + numpy.arange(len(encoded))]
+            equal[candidates] = (values == encoded).all(axis=1)
+        return equal
+
+
+def open_cached(dxid):
+    '''
+    :param dxid: ID of a GTable
+    :type dxid: string
+    :returns: The columns of the table that are in the cache, or None if it has none (or the cache is off)
+    :rtype: :class:`CachedGTable`
+    '''
+    if not is_enabled():
+        return None
+    table_dir = _get_table_dir(dxid)
+    meta = _read_meta(table_dir)
+    if meta is None or meta.get("id") != dxid:
+        return None
+    try:
+        # Marks the table as recently read
+        os.utime(os.path.join(table_dir, "meta.json"), None)
+    except OSError:
+        pass
+    return CachedGTable(table_dir, meta)
+
+
+class GTableCacheFill(object):
+    '''
+    Stores the columns of a table in the cache, as a scan of the whole
+    table reads them: pass each page of rows (or of columns) read to
+    :meth:`add_rows` (or :meth:`add_columns`), in order, and then call
+    :meth:`finish`. The columns are written to temporary files, which
+    are moved into the cache only if all the rows were added. Use
+    :func:`start_fill` to get one.
+    '''
+    def __init__(self, dxid, desc, col_names):
+        import numpy
+        self._numpy = numpy
+        self._dxid = dxid
+        self._desc = desc
+        self._table_dir = _get_table_dir(dxid)
+        self._size_limit = get_size_limit()
+        self._types = dict((column["name"], column["type"]) for column in desc["columns"])
+        positions = dict((column["name"], i) for i, column in enumerate(desc["columns"]))
+        self._col_names = col_names
+        self._num_rows = 0
+        self._size = 0
+        if not os.path.isdir(self._table_dir):
+            os.makedirs(self._table_dir, 0o700)
+        # Final and temporary name of each file being written, and the
+        # file, by column name; string columns have a second file, of
+        # their offsets
+        self._files = {}
+        self._string_ends = {}
+        for name in col_names:
+            filenames = [str(positions[name])]
+            if self._types[name] == "string":
+                filenames.append(filenames[0] + ".offsets")
+                self._string_ends[name] = 0
+            self._files[name] = []
+            for filename in filenames:
+                filename = os.path.join(self._table_dir, filename)
+                tmp_filename = "{}.{}.tmp".format(filename, os.getpid())
+                self._files[name].append((filename, tmp_filename, open(tmp_filename, "wb")))
+            if self._types[name] == "string":
+                self._write(self._files[name][1][2], self._numpy.zeros(1, dtype="int64"))
+
+    def _write(self, fd, array):
+        fd.write(array.tobytes())
+        self._size += array.nbytes
+
+    def add_columns(self, columns):
+        '''
+        :param columns: Values of each column of the page (at least those being stored), by name
+        :type columns: dict
+        '''
+        if self._files is None:
+            return
+        numpy = self._numpy
+        for name in self._col_names:
+            values = columns[name]
+            files = self._files[name]
+            if self._types[name] == "string":
+                encoded = [value.encode("utf-8") for value in values]
+                lengths = numpy.fromiter((len(value) for value in encoded), dtype="int64", count=len(encoded))
+                ends = numpy.cumsum(lengths) + self._string_ends[name]
+                if len(ends) > 0:
+                    self._string_ends[name] = int(ends[-1])
+                self._write(files[0][2], numpy.frombuffer(b"".join(encoded), dtype="uint8"))
+                self._write(files[1][2], ends)
+            else:
+                self._write(files[0][2], numpy.asarray(values, dtype=STORAGE_DTYPES[self._types[name]]))
+        self._num_rows += len(columns[self._col_names[0]])
+        if self._size > self._size_limit:
+            # The table doesn't fit in the cache
+            self.abort()
+
+    def add_rows(self, col_names, rows):
+        '''
+        :param col_names: Names of the columns of the rows
+        :type col_names: list of strings
+        :param rows: Rows of the page
+        :type rows: list of lists
+        '''
+        if self._files is None:
+            return
+        values = list(zip(*rows)) if len(rows) > 0 else [()] * len(col_names)
+        self.add_columns(dict(zip(col_names, values)))
+
+    def abort(self):
+        if self._files is None:
+            return
+        for files in self._files.values():
+            for _filename, tmp_filename, fd in files:
+                fd.close()
+                try:
+                    os.remove(tmp_filename)
+                except OSError:
+                    pass
+        self._files = None
+        try:
+            # Only if no other columns of the table are in the cache
+            os.rmdir(self._table_dir)
+        except OSError:
+            pass
+
+    def finish(self):
+        '''
+        Moves the columns into the cache, if all the rows of the table
+        were added.
+        '''
+        if self._files is None:
+            return
+        if self._num_rows != self._desc["length"]:
+            self.abort()
+            return
+        try:
+            cached = {}
+            for name in self._col_names:
+                size = 0
+                for filename, tmp_filename, fd in self._files[name]:
+                    fd.close()
+                    size += os.path.getsize(tmp_filename)
+                    if os.path.exists(filename):
+                        # Stored by another process in the meantime
+                        os.remove(filename)
+                    os.rename(tmp_filename, filename)
+                cached[name] = {"file": os.path.basename(self._files[name][0][0]), "size": size}
+            self._files = None
+            meta = _read_meta(self._table_dir)
+            if meta is None or meta.get("id") != self._dxid:
+                meta = {"id": self._dxid, "length": self._desc["length"], "columns": self._desc["columns"],
+                        "indices": self._desc.get("indices"), "cached": {}}
+            meta["cached"].update(cached)
+            _write_meta(self._table_dir, meta)
+            _evict(self._size_limit, keep=self._table_dir)
+        except (IOError, OSError):
+            self.abort()
+
+
+def start_fill(dxid, desc, col_names):
+    '''
+    :param dxid: ID of the table
+    :type dxid: string
+    :param desc: Description of the table (with its "state", "length", "columns" and "indices")
+    :type desc: dict
+    :param col_names: Names of the columns that the scan reads (``__id__`` is ignored)
+    :type col_names: list of strings
+    :returns: An object to pass the pages of the scan to, or None if there is nothing to store (because the cache is off, the table is not closed or its columns are already in the cache)
+    :rtype: :class:`GTableCacheFill`
+    '''
+    if not is_enabled() or desc.get("state") != "closed":
+        return None
+    cached = open_cached(dxid)
+    col_names = [name for name in col_names
+                 if name != "__id__" and (cached is None or not cached.has_columns([name]))]
+    if len(col_names) == 0:
+        return None
+    try:
+        return GTableCacheFill(dxid, desc, col_names)
+    except (IOError, OSError):
+        return None
@@ -0,0 +1,152 @@
+# Copyright (C) 2013-2016 DNAnexus, Inc.
+#
+# This file is part of dx-toolkit (DNAnexus platform client libraries).
+#
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may not
+#   use this file except in compliance with the License. You may obtain a copy
+#   of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+
+'''
+The rows of a closed GTable as TSV text that can be read at any byte
+offset, as dx-mount presents GTables.
+'''
+
+from __future__ import print_function, unicode_literals, division, absolute_import
+
+import bisect, threading, collections
+
+from .. import logger
+from ..compat import str
+
+class DXGTableText(object):
+    '''
+    :param handler: Handler of a closed GTable
+    :type handler: :class:`~dxpy.bindings.dxgtable.DXGTable`
+    :param block_rows: Number of rows rendered at a time
+    :type block_rows: int
+    :param max_blocks: Number of rendered blocks kept
+    :type max_blocks: int
+
+    The rows of a closed GTable as TSV text (each row preceded by its
+    row ID), which can be read at any byte offset.
+
+    The text is rendered *block_rows* rows at a time. The byte offset at
+    which each block starts is recorded the first time the block is
+    rendered, and the text of the *max_blocks* blocks read most recently
+    is kept, so a read only fetches the rows of the blocks that cover it
+    (and, the first time, of those between the last block indexed so far
+    and it). When a read continues where the previous one ended, the
+    next block is rendered in the background.
+
+    Blocks are fetched and rendered without holding the lock, so that a
+    read of a block that is already kept never waits for one that isn't;
+    a read of a block that another thread is rendering waits for it.
+    '''
+    def __init__(self, handler, block_rows=10000, max_blocks=16):
+        self.handler = handler
+        self.block_rows = block_rows
+        self.max_blocks = max_blocks
+        length = int(handler.describe()['length'])
+        self.num_blocks = (length + block_rows - 1) // block_rows
+        # block_offsets[i] is the offset of the text of block i; the last
+        # entry is where the text of the last block indexed ends
+        self.block_offsets = [0]
+        self.blocks = collections.OrderedDict()
+        # index -> threading.Event set when the block has been rendered
+        self.rendering = {}
+        self.lock = threading.Lock()
+        self.next_offset = None
+        self.read_ahead_thread = None
+
+    def _render_block(self, index):
+        start = index * self.block_rows
+        return b"".join(("\t".join(map(str, row)) + "\n").encode('utf-8')
+                        for row in self.handler.iterate_rows(start=start, end=start + self.block_rows))
+
+    def _get_block(self, index):
+        while True:
+            with self.lock:
+                if index in self.blocks:
+                    text = self.blocks.pop(index)
+                    self.blocks[index] = text
+                    return text
+                rendered = self.rendering.get(index)
+                if rendered is None:
+                    rendered = self.rendering[index] = threading.Event()
+                    break
+            # Another thread is rendering the block
+            rendered.wait()
+
+        try:
+            text = self._render_block(index)
+            with self.lock:
+                if index == len(self.block_offsets) - 1:
+                    self.block_offsets.append(self.block_offsets[-1] + len(text))
+                if len(self.blocks) >= self.max_blocks:
+                    self.blocks.popitem(last=False)
+                self.blocks[index] = text
+        finally:
+            with self.lock:
+                del self.rendering[index]
+            rendered.set()
+        return text
+
+    def _find_block(self, offset):
+        # Returns the index of the block containing *offset*, indexing
+        # the blocks up to it if necessary, or None if it is past the end
+        while True:
+            with self.lock:
+                if offset < self.block_offsets[-1]:
+                    return bisect.bisect_right(self.block_offsets, offset) - 1
+                if len(self.block_offsets) > self.num_blocks:
+                    return None
+                next_index = len(self.block_offsets) - 1
+            self._get_block(next_index)
+
+    def read(self, offset, length):
+        '''
+        :param offset: Byte offset in the text
+        :type offset: int
+        :param length: Maximum number of bytes to read
+        :type length: int
+        :returns: The text from *offset* on, up to *length* bytes of it
+        :rtype: bytes
+        '''
+        end = offset + length
+        data = []
+        index = self._find_block(offset)
+        last_index = index
+        while index is not None and index < self.num_blocks:
+            # The blocks are indexed in order, so the start of this one is
+            # known once the previous one has been rendered
+            with self.lock:
+                block_start = self.block_offsets[index]
+            if block_start >= end:
+                break
+            data.append(self._get_block(index)[max(offset - block_start, 0):end - block_start])
+            last_index = index
+            index += 1
+        with self.lock:
+            sequential = offset == self.next_offset
+            self.next_offset = end
+            if (sequential and last_index is not None and last_index + 1 < self.num_blocks
+                    and last_index + 1 not in self.blocks and last_index + 1 not in self.rendering
+                    and (self.read_ahead_thread is None or not self.read_ahead_thread.is_alive())):
+                self.read_ahead_thread = threading.Thread(target=self._read_ahead, args=(last_index + 1,))
+                self.read_ahead_thread.daemon = True
+                self.read_ahead_thread.start()
+        return b"".join(data)
+
+    def _read_ahead(self, index):
+        try:
+            self._get_block(index)
+        except Exception as e:
+            logger.debug("Read-ahead of block %d failed: %s", index, e)
@@ -0,0 +1,148 @@
+# Copyright (C) 2013-2016 DNAnexus, Inc.
+#
+# This file is part of dx-toolkit (DNAnexus platform client libraries).
+#
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may not
+#   use this file except in compliance with the License. You may obtain a copy
+#   of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+
+'''
+Hedged requests, to cut the tail latency of file downloads.
+
+Files are downloaded in chunks, by several threads at once, but the
+chunks are consumed in order, so a single chunk whose request takes
+much longer than the others holds back the whole download. A
+:class:`Hedger` runs such requests (which must be idempotent) and, if
+one of them hasn't finished after a given percentile of the latencies
+of recent requests of about the same size, sends a duplicate of it and
+uses whichever response arrives first. The duplicates are limited to a
+fraction of all requests, so that when the storage service is slow
+across the board, hedging doesn't make matters worse.
+'''
+
+from __future__ import print_function, unicode_literals, division, absolute_import
+
+import time, math, threading, collections
+import concurrent.futures
+
+class Hedger(object):
+    '''
+    :param percentile: Percentile of recent latencies after which a request is hedged
+    :type percentile: float
+    :param max_extra_load: Maximum number of hedges, as a fraction of the number of requests
+    :type max_extra_load: float
+    :param window: Number of recent latencies to keep (for each size class)
+    :type window: int
+    :param min_samples: Number of latencies that must be known (for a size class) before requests are hedged
+    :type min_samples: int
+    :param max_workers: Maximum number of requests (and hedges) in flight
+    :type max_workers: int
+
+    The counters :attr:`requests`, :attr:`hedges_issued` and
+    :attr:`hedges_won` tell how many requests have been run, how many
+    of them were hedged, and how many of those the duplicate won.
+    '''
+    def __init__(self, percentile=95, max_extra_load=0.05, window=100, min_samples=20, max_workers=32):
+        self.percentile = percentile
+        self.max_extra_load = max_extra_load
+        self.window = window
+        self.min_samples = min_samples
+        self.max_workers = max_workers
+        self.requests = 0
+        self.hedges_issued = 0
+        self.hedges_won = 0
+        self._latencies = collections.defaultdict(lambda: collections.deque(maxlen=self.window))
+        # Each request earns max_extra_load hedges, which may be spent
+        # later, up to a small burst
+        self._budget = 0.0
+        self._lock = threading.Lock()
+        self._executor = None
+
+    @staticmethod
+    def _size_class(size):
+        # Latencies of chunks within a factor of two in size are comparable
+        return int(math.log(max(size, 1), 2))
+
+    def get_hedge_delay(self, size):
+        '''
+        :param size: Size of the response, in bytes
+        :type size: int
+        :returns: Seconds after which a request for *size* bytes would be hedged, or None if it wouldn't be
+
+        '''
+        with self._lock:
+            latencies = sorted(self._latencies[self._size_class(size)])
+        if len(latencies) < self.min_samples:
+            return None
+        return latencies[min(int(len(latencies) * self.percentile / 100), len(latencies) - 1)]
+
+    def _record_latency(self, size, latency):
+        with self._lock:
+            self._latencies[self._size_class(size)].append(latency)
+
+    def _take_hedge(self):
+        with self._lock:
+            if self._budget < 1:
+                return False
+            self._budget -= 1
+            self.hedges_issued += 1
+            return True
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers)
+            return self._executor
+
+    def run(self, request, size):
+        '''
+        :param request: Function of no arguments that makes the request and returns its result; it may be called twice
+        :type request: callable
+        :param size: Size of the response, in bytes
+        :type size: int
+        :returns: Return value of *request*
+
+        Calls *request*, hedging it if it is slow, and returns the
+        first successful result (or raises the error of the original
+        request if neither succeeds).
+        '''
+        with self._lock:
+            self.requests += 1
+            self._budget = min(self._budget + self.max_extra_load, 1 + self.max_extra_load * self.window)
+        delay = self.get_hedge_delay(size)
+        if delay is None:
+            start = time.time()
+            result = request()
+            self._record_latency(size, time.time() - start)
+            return result
+
+        executor = self._get_executor()
+        start = time.time()
+        original = executor.submit(request)
+        # Record the latency of every original request, including those
+        # that lose to their hedges, so that the percentile isn't skewed
+        original.add_done_callback(lambda future: self._record_latency(size, time.time() - start))
+        done, _ = concurrent.futures.wait([original], timeout=delay)
+        if done or not self._take_hedge():
+            return original.result()
+
+        hedge = executor.submit(request)
+        pending = {original, hedge}
+        while True:
+            done, pending = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is hedge:
+                        with self._lock:
+                            self.hedges_won += 1
+                    return future.result()
+            if not pending:
+                return original.result()
@@ -0,0 +1,140 @@
+# Copyright (C) 2013-2016 DNAnexus, Inc.
+#
+# This file is part of dx-toolkit (DNAnexus platform client libraries).
+#
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may not
+#   use this file except in compliance with the License. You may obtain a copy
+#   of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+
+'''
+Serialization of API request bodies and deserialization of API responses.
+
+Responses from API calls such as /findDataObjects (with describe) or
+/job-xxxx/describe can be several megabytes of JSON, and parsing them
+with the standard library takes a noticeable share of the time of
+commands like "dx find data --json". If `ujson
+<https://pypi.org/project/ujson/>`_ is installed, it is used instead,
+unless it is a version that rounds floats (before 2) or wraps integers
+that don't fit in 64 bits.
+
+Any input that the faster backend rejects (e.g. objects that
+:func:`json.dumps` can't serialize either, or non-finite floats) is
+handed to the standard library, so the results and errors are those of
+:func:`json.loads` and :func:`json.dumps`.
+
+Set the ``DX_JSON_CODEC`` environment variable to the name of a backend
+to choose it, or to ``json`` to always use the standard library.
+`orjson <https://pypi.org/project/orjson/>`_ is faster still, but is
+only used when chosen this way: it parses integers that don't fit in 64
+bits as floats, which would corrupt such numbers stored in object
+details.
+'''
+
+from __future__ import print_function, unicode_literals, division, absolute_import
+
+import json, math
+
+from ..compat import environ
+
+# Backends tried, in order, when DX_JSON_CODEC is not set
+BACKENDS = ["ujson"]
+
+def _has_non_finite_float(obj):
+    if isinstance(obj, float):
+        return math.isinf(obj) or math.isnan(obj)
+    elif isinstance(obj, dict):
+        return any(_has_non_finite_float(item) for item in obj.items())
+    elif isinstance(obj, (list, tuple)):
+        return any(_has_non_finite_float(item) for item in obj)
+    return False
+
+def _load_orjson():
+    import orjson
+    # Leave the types that orjson (but not json) knows about to json, which rejects them
+    options = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+    def dumps(obj):
+        serialized = orjson.dumps(obj, option=options)
+        if b"null" in serialized and _has_non_finite_float(obj):
+            # orjson writes NaN and infinities as null; let json decide
+            raise ValueError("Out of range float values are not JSON compliant")
+        return serialized
+    return dumps, orjson.loads
+
+def _load_ujson():
+    import ujson
+    if int(ujson.__version__.split(".")[0]) < 2:
+        raise ImportError("ujson {} rounds floats".format(ujson.__version__))
+    try:
+        wraps = ujson.loads("-18446744073709551617") != -18446744073709551617
+    except ValueError:
+        # Rejected, and so left to json
+        wraps = False
+    if wraps:
+        raise ImportError("ujson {} wraps integers that don't fit in 64 bits".format(ujson.__version__))
+    def dumps(obj):
+        return ujson.dumps(obj).encode("utf-8")
+    return dumps, ujson.loads
+
+def _stdlib_dumps(obj):
+    return json.dumps(obj).encode("utf-8")
+
+def _load_backend(name):
+    '''
+    :returns: (name, dumps, loads) for the named backend, or for the standard library if it is unavailable
+    '''
+    try:
+        if name == "orjson":
+            return (name, ) + _load_orjson()
+        elif name == "ujson":
+            return (name, ) + _load_ujson()
+    except (ImportError, AttributeError):
+        # Not installed, or too old
+        pass
+    return "json", _stdlib_dumps, json.loads
+
+def _choose_backend():
+    requested = environ.get("DX_JSON_CODEC")
+    for name in ([requested] if requested else BACKENDS):
+        backend = _load_backend(name)
+        if backend[0] != "json":
+            return backend
+    return _load_backend("json")
+
+BACKEND, _fast_dumps, _fast_loads = _choose_backend()
+
+def dumps(obj):
+    '''
+    :param obj: Object to serialize
+    :returns: UTF-8 encoded JSON
+    :rtype: bytes
+    '''
+    if _fast_dumps is not _stdlib_dumps:
+        try:
+            return _fast_dumps(obj)
+        except (TypeError, ValueError, OverflowError):
+            pass
+    return _stdlib_dumps(obj)
+
+def loads(data):
+    '''
+    :param data: JSON document
+    :type data: bytes or string
+    :returns: Deserialized object
+    :raises: ValueError if *data* is not valid JSON
+    '''
+    if _fast_loads is not json.loads:
+        try:
+            return _fast_loads(data)
+        except (TypeError, ValueError, OverflowError):
+            pass
+    if isinstance(data, bytes):
+        data = data.decode("utf-8")
+    return json.loads(data)
@@ -0,0 +1,287 @@
+# Copyright (C) 2013-2016 DNAnexus, Inc.
+#
+# This file is part of dx-toolkit (DNAnexus platform client libraries).
+#
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may not
+#   use this file except in compliance with the License. You may obtain a copy
+#   of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+
+'''
+Metrics about the HTTP requests and file transfers made by dxpy, to
+tell whether a slow program is limited by the API server, by transfer
+speed, or by its own work.
+
+Metrics are only collected after :func:`enable` is called, or if the
+``DX_METRICS_FILE`` environment variable is set when dxpy is imported.
+In the latter case they are written to that file when the program
+exits, in the Prometheus text format if its name ends in ".prom", and
+as JSON otherwise.
+
+The registry keeps:
+
+* for each API route and method, the number of requests (by status),
+  retries, bytes sent and received, and a histogram of latencies;
+* for each file, the number of bytes uploaded and downloaded, and the
+  rate at which they were transferred;
+* for each connection pool, the number of requests made and the number
+  of connections opened (the remaining requests reused a connection);
+* if file chunk downloads are hedged (see
+  :func:`dxpy.set_download_hedging`), the number of chunk requests, of
+  hedges sent, and of hedges that answered first.
+'''
+
+from __future__ import print_function, unicode_literals, division, absolute_import
+
+import os, json, time, atexit, threading, collections
+
+import dxpy
+from ..compat import open, str
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+class Histogram(object):
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0
+
+    def observe(self, value):
+        index = 0
+        while index < len(self.buckets) and value > self.buckets[index]:
+            index += 1
+        self.counts[index] += 1
+        self.count += 1
+        self.sum += value
+
+    def to_dict(self):
+        cumulative, buckets = 0, collections.OrderedDict()
+        for bound, count in zip(list(self.buckets) + ["+Inf"], self.counts):
+            cumulative += count
+            buckets[str(bound)] = cumulative
+        return {"count": self.count, "sum": self.sum, "buckets": buckets}
+
+
+class _RouteStats(object):
+    def __init__(self):
+        self.statuses = collections.Counter()
+        self.retries = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.latency = Histogram()
+
+
+class _TransferStats(object):
+    def __init__(self):
+        self.bytes = 0
+        self.first_started = None
+        self.last_finished = None
+
+    def rate(self):
+        if self.bytes == 0 or self.last_finished <= self.first_started:
+            return None
+        return self.bytes / (self.last_finished - self.first_started)
+
+
+class MetricsRegistry(object):
+    '''
+    Collects metrics about requests (when passed to
+    :func:`dxpy.add_request_hook`) and file transfers.
+    '''
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes = collections.defaultdict(_RouteStats)
+        self._transfers = collections.defaultdict(_TransferStats)
+
+    def __call__(self, info):
+        '''
+        :param info: Completed request
+        :type info: :class:`dxpy.RequestInfo`
+        '''
+        with self._lock:
+            stats = self._routes[(info.route, info.method)]
+            stats.statuses[str(info.status) if info.error is None or info.status is not None else "error"] += 1
+            stats.retries += info.retries
+            stats.bytes_sent += info.bytes_sent
+            stats.bytes_received += info.bytes_received
+            stats.latency.observe(info.latency)
+
+    def record_transfer(self, dxid, direction, num_bytes, started, finished=None):
+        '''
+        :param dxid: ID of the file
+        :type dxid: string
+        :param direction: "upload" or "download"
+        :type direction: string
+        :param num_bytes: Number of bytes transferred
+        :type num_bytes: int
+        :param started: Time at which the transfer started
+        :type started: float
+        :param finished: Time at which the transfer finished (default: now)
+        :type finished: float
+        '''
+        if finished is None:
+            finished = time.time()
+        with self._lock:
+            stats = self._transfers[(dxid, direction)]
+            stats.bytes += num_bytes
+            stats.first_started = started if stats.first_started is None else min(stats.first_started, started)
+            stats.last_finished = finished if stats.last_finished is None else max(stats.last_finished, finished)
+
+    def get_pool_stats(self):
+        '''
+        :returns: For each connection pool (by host), the number of requests and of connections opened
+        :rtype: dict
+        '''
+        pool_stats = {}
+        pool_manager = dxpy._pool_manager
+        if pool_manager is None:
+            return pool_stats
+        for key in list(pool_manager.pools.keys()):
+            pool = pool_manager.pools.get(key)
+            if pool is None:
+                continue
+            host = "{}:{}".format(pool.host, pool.port) if pool.port else pool.host
+            stats = pool_stats.setdefault(host, {"requests": 0, "connections": 0})
+            stats["requests"] += pool.num_requests
+            stats["connections"] += pool.num_connections
+        return pool_stats
+
+    def get_hedging_stats(self):
+        '''
+        :returns: The counters of the hedger of file chunk downloads, or None if they aren't hedged
+        :rtype: dict
+        '''
+        hedger = dxpy._download_hedger
+        if hedger is None:
+            return None
+        return {"requests": hedger.requests, "hedges_issued": hedger.hedges_issued, "hedges_won": hedger.hedges_won}
+
+    def to_dict(self):
+        with self._lock:
+            requests = [dict(route=route, method=method, statuses=dict(stats.statuses), retries=stats.retries,
+                             bytes_sent=stats.bytes_sent, bytes_received=stats.bytes_received,
+                             latency=stats.latency.to_dict())
+                        for (route, method), stats in sorted(self._routes.items())]
+            transfers = [dict(file=dxid, direction=direction, bytes=stats.bytes,
+                              seconds=stats.last_finished - stats.first_started, bytes_per_second=stats.rate())
+                         for (dxid, direction), stats in sorted(self._transfers.items())]
+        pools = [dict(host=host, **stats) for host, stats in sorted(self.get_pool_stats().items())]
+        return {"requests": requests, "file_transfers": transfers, "connection_pools": pools,
+                "download_hedging": self.get_hedging_stats()}
+
+    def to_prometheus(self):
+        '''
+        :returns: The metrics in the Prometheus text exposition format
+        :rtype: string
+        '''
+        def labels(**kwargs):
+            return "{" + ",".join('{}="{}"'.format(name, str(value).replace("\\", "\\\\").replace('"', '\\"'))
+                                  for name, value in sorted(kwargs.items())) + "}"
+
+        metrics = self.to_dict()
+        lines = ["# TYPE dx_http_requests_total counter"]
+        for route in metrics["requests"]:
+            for status, count in sorted(route["statuses"].items()):
+                lines.append("dx_http_requests_total{} {}".format(
+                    labels(route=route["route"], method=route["method"], status=status), count))
+        for name, field in (("dx_http_retries_total", "retries"),
+                            ("dx_http_sent_bytes_total", "bytes_sent"),
+                            ("dx_http_received_bytes_total", "bytes_received")):
+            lines.append("# TYPE {} counter".format(name))
+            for route in metrics["requests"]:
+                lines.append("{}{} {}".format(name, labels(route=route["route"], method=route["method"]), route[field]))
+        lines.append("# TYPE dx_http_request_duration_seconds histogram")
+        for route in metrics["requests"]:
+            latency = route["latency"]
+            for bound, count in latency["buckets"].items():
+                lines.append("dx_http_request_duration_seconds_bucket{} {}".format(
+                    labels(route=route["route"], method=route["method"], le=bound), count))
+            for suffix in "sum", "count":
+                lines.append("dx_http_request_duration_seconds_{}{} {}".format(
+                    suffix, labels(route=route["route"], method=route["method"]), latency[suffix]))
+        lines.append("# TYPE dx_file_transfer_bytes_total counter")
+        for transfer in metrics["file_transfers"]:
+            lines.append("dx_file_transfer_bytes_total{} {}".format(
+                labels(file=transfer["file"], direction=transfer["direction"]), transfer["bytes"]))
+        lines.append("# TYPE dx_file_transfer_bytes_per_second gauge")
+        for transfer in metrics["file_transfers"]:
+            if transfer["bytes_per_second"] is not None:
+                lines.append("dx_file_transfer_bytes_per_second{} {}".format(
+                    labels(file=transfer["file"], direction=transfer["direction"]), transfer["bytes_per_second"]))
+        for name, field in (("dx_http_pool_requests_total", "requests"),
+                            ("dx_http_pool_connections_total", "connections")):
+            lines.append("# TYPE {} counter".format(name))
+            for pool in metrics["connection_pools"]:
+                lines.append("{}{} {}".format(name, labels(host=pool["host"]), pool[field]))
+        if metrics["download_hedging"] is not None:
+            for name, field in (("dx_download_hedging_requests_total", "requests"),
+                                ("dx_download_hedges_issued_total", "hedges_issued"),
+                                ("dx_download_hedges_won_total", "hedges_won")):
+                lines.append("# TYPE {} counter".format(name))
+                lines.append("{} {}".format(name, metrics["download_hedging"][field]))
+        return "\n".join(lines) + "\n"
+
+    def export(self, filename):
+        '''
+        :param filename: File to write the metrics to, in the Prometheus text format if its name ends in ".prom", and as JSON otherwise
+        :type filename: string
+        '''
+        if filename.endswith(".prom"):
+            content = self.to_prometheus()
+        else:
+            content = json.dumps(self.to_dict(), indent=2, sort_keys=True) + "\n"
+        # Write the file atomically, so that a scraper never sees it half-written
+        tmp_filename = "{}.{}".format(filename, os.getpid())
+        with open(tmp_filename, "wb") as fh:
+            fh.write(content.encode("utf-8"))
+        os.rename(tmp_filename, filename)
+
+
+_registry = None
+
+def get_registry():
+    '''
+    :returns: The registry that metrics are being collected in, or None if they aren't being collected
+    :rtype: :class:`MetricsRegistry`
+    '''
+    return _registry
+
+def enable(filename=None):
+    '''
+    :param filename: If given, the metrics are written to this file (see :meth:`MetricsRegistry.export`) when the program exits
+    :type filename: string
+    :returns: The registry that metrics are collected in
+    :rtype: :class:`MetricsRegistry`
+
+    Starts collecting metrics, if that hasn't been done yet.
+    '''
+    global _registry
+    if _registry is None:
+        _registry = MetricsRegistry()
+        dxpy.add_request_hook(_registry)
+    if filename is not None:
+        atexit.register(_registry.export, filename)
+    return _registry
+
+def reset_after_fork():
+    '''
+    Replaces the lock of the registry, which another thread may have
+    held when the process forked (see :func:`dxpy.reset_after_fork`).
+    '''
+    if _registry is not None:
+        _registry._lock = threading.Lock()
+
+def record_transfer(dxid, direction, num_bytes, started, finished=None):
+    '''
+    Records a file transfer (see :meth:`MetricsRegistry.record_transfer`), if metrics are being collected.
+    '''
+    if _registry is not None:
+        _registry.record_transfer(dxid, direction, num_bytes, started, finished)
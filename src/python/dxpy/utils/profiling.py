@@ -0,0 +1,218 @@
+# Copyright (C) 2013-2016 DNAnexus, Inc.
+#
+# This file is part of dx-toolkit (DNAnexus platform client libraries).
+#
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may not
+#   use this file except in compliance with the License. You may obtain a copy
+#   of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+
+'''
+Timing profile of a program (typically a dx command), broken down into
+phases such as path resolution, API calls, file transfers and local
+I/O.
+
+Phases are recorded as spans, with :func:`span` or :func:`timed`, in
+the code that implements them; every API call and file chunk transfer
+is recorded as a span too. Spans are only recorded after
+:func:`enable` is called (e.g. by ``dx --profile``), or if the
+``DX_PROFILE`` environment variable is set when dxpy is imported. When
+the program exits, either a breakdown of the time spent in each kind
+of span is printed to stderr, or (if a trace file was given, or
+``DX_PROFILE`` is set to anything but "1") the spans are written to a
+file in the Chrome trace event format, which can be opened in
+chrome://tracing or https://ui.perfetto.dev.
+'''
+
+from __future__ import print_function, unicode_literals, division, absolute_import
+
+import os, sys, json, time, atexit, functools, threading, collections
+
+import dxpy
+from ..compat import open
+
+_Event = collections.namedtuple('_Event', 'name category thread start duration args')
+
+_enabled = False
+_started = None
+_trace_file = None
+_events = []
+_thread_names = {}
+
+
+class _Span(object):
+    __slots__ = ('name', 'category', 'args', 'start')
+
+    def __init__(self, name, category, args):
+        self.name = name
+        self.category = category
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.time()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        _record(self.name, self.category, self.start, time.time() - self.start, self.args)
+
+
+class _NullSpan(object):
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        pass
+
+_NULL_SPAN = _NullSpan()
+
+
+def _record(name, category, start, duration, args):
+    thread = threading.current_thread()
+    if thread.ident not in _thread_names:
+        _thread_names[thread.ident] = thread.name
+    # list.append is atomic, so spans may be recorded from any thread
+    _events.append(_Event(name, category, thread.ident, start, duration, args))
+
+
+def _request_hook(info):
+    args = {"status": info.status, "retries": info.retries}
+    if info.request_id is not None:
+        args["request_id"] = info.request_id
+    category = "api" if info.route.startswith("/") else "transfer"
+    _record("{} {}".format(info.method, info.route), category, time.time() - info.latency, info.latency, args)
+
+
+def span(name, category="dx", **args):
+    '''
+    :param name: Name of the span, under which its time is reported
+    :type name: string
+    :param category: Kind of span (e.g. "resolve", "transfer" or "io")
+    :type category: string
+    :returns: Context manager that records the time spent in its body, if profiling is enabled
+
+    Any other keyword arguments are shown with the span in traces.
+    '''
+    if not _enabled:
+        return _NULL_SPAN
+    return _Span(name, category, args)
+
+
+def timed(name=None, category="dx"):
+    '''
+    :param name: Name of the span (default: the name of the function)
+    :type name: string
+    :param category: Kind of span
+    :type category: string
+
+    Decorator that records each call to the function as a span, if
+    profiling is enabled.
+    '''
+    def decorator(func):
+        span_name = name or func.__name__
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            with _Span(span_name, category, {}):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def get_summary():
+    '''
+    :returns: For each span name, in decreasing order of total time, a dict with its "name", "category", "count", "total" time, and "self" time (excluding the spans nested in it on the same thread)
+    :rtype: list of dicts
+    '''
+    events = list(_events)
+    self_times = {}
+    by_thread = collections.defaultdict(list)
+    for index, event in enumerate(events):
+        by_thread[event.thread].append(index)
+        self_times[index] = event.duration
+    for indices in by_thread.values():
+        indices.sort(key=lambda index: (events[index].start, -events[index].duration))
+        stack = []
+        for index in indices:
+            event = events[index]
+            while stack and events[stack[-1]].start + events[stack[-1]].duration <= event.start:
+                stack.pop()
+            if stack:
+                self_times[stack[-1]] -= event.duration
+            stack.append(index)
+
+    summary = collections.OrderedDict()
+    for index, event in enumerate(events):
+        entry = summary.setdefault(event.name, {"name": event.name, "category": event.category,
+                                                "count": 0, "total": 0, "self": 0})
+        entry["count"] += 1
+        entry["total"] += event.duration
+        entry["self"] += max(self_times[index], 0)
+    return sorted(summary.values(), key=lambda entry: -entry["total"])
+
+
+def format_summary():
+    '''
+    :returns: Table of the time spent in each kind of span
+    :rtype: string
+    '''
+    wall_time = time.time() - _started if _started is not None else 0
+    lines = ["Profile of {} (wall time {:.3f} s; spans on other threads overlap it)".format(
+                 " ".join(sys.argv) or "program", wall_time),
+             "{:>10} {:>10} {:>7}  {:<9} {}".format("total (s)", "self (s)", "count", "category", "span")]
+    for entry in get_summary():
+        lines.append("{total:10.3f} {self:10.3f} {count:7d}  {category:<9} {name}".format(**entry))
+    return "\n".join(lines) + "\n"
+
+
+def write_trace(filename):
+    '''
+    :param filename: File to write the spans to, in the Chrome trace event format
+    :type filename: string
+    '''
+    pid = os.getpid()
+    trace_events = [{"name": "thread_name", "ph": "M", "pid": pid, "tid": thread, "args": {"name": name}}
+                    for thread, name in _thread_names.items()]
+    for event in _events:
+        trace_events.append({"name": event.name, "cat": event.category, "ph": "X", "pid": pid,
+                             "tid": event.thread, "ts": int(event.start * 1e6), "dur": int(event.duration * 1e6),
+                             "args": event.args})
+    with open(filename, "wb") as fh:
+        fh.write(json.dumps({"traceEvents": trace_events, "displayTimeUnit": "ms"}).encode("utf-8"))
+
+
+def _finish():
+    if _trace_file is not None:
+        write_trace(_trace_file)
+        print("Wrote a trace of {} spans to {}".format(len(_events), _trace_file), file=sys.stderr)
+    else:
+        sys.stderr.write(format_summary())
+
+
+def enable(trace_file=None):
+    '''
+    :param trace_file: If given, the spans are written to this file (see :func:`write_trace`) when the program exits, instead of printing a summary
+    :type trace_file: string
+
+    Starts recording spans, if that hasn't been done yet.
+    '''
+    global _enabled, _started, _trace_file
+    if trace_file is not None:
+        _trace_file = trace_file
+    if _enabled:
+        return
+    _enabled = True
+    _started = time.time()
+    dxpy.add_request_hook(_request_hook)
+    atexit.register(_finish)
+
+
+def is_enabled():
+    return _enabled
@@ -28,6 +28,7 @@ from __future__ import print_function, unicode_literals, division, absolute_impo
 import os, sys, json, re
 
 import dxpy
+from . import profiling
 from .describe import get_ls_l_desc
 from ..exceptions import DXError
 from ..compat import str, input, basestring
@@ -193,6 +194,59 @@ def is_project_explicit(path):
     return not is_hashid(path)
 
 
+# Maximum number of objects described by each call to
+# /system/describeDataObjects
+DESCRIBE_DATA_OBJECTS_BATCH_SIZE = 1000
+
+# The objects found in each project, as {project ID: set of object IDs}.
+# Data objects are rarely moved out of a project while a program that
+# uses them is running, so these are kept for the lifetime of the
+# process. Objects that weren't found are checked again each time, as
+# they may have been copied into the project since.
+_objects_in_projects = {}
+
+
+def objects_exist_in_project(obj_ids, proj_id):
+    '''
+    :param obj_ids: object IDs
+    :type obj_ids: list of str
+    :param proj_id: project ID
+    :type proj_id: str
+    :returns: For each object ID, True if the data object can be found in the project
+    :rtype: dict
+
+    Checks whether many data objects can be found in the specified
+    project, with as few API calls as possible: the objects are
+    described together, up to 1000 per call to
+    /system/describeDataObjects. Objects that have been found in the
+    project before are not described again.
+    '''
+    if proj_id is None:
+        raise ValueError("Expected proj_id to be a string")
+    if not is_container_id(proj_id):
+        raise ValueError('Expected %r to be a container ID' % (proj_id,))
+    for obj_id in obj_ids:
+        if obj_id is None:
+            raise ValueError("Expected obj_id to be a string")
+
+    known = _objects_in_projects.setdefault(proj_id, set())
+    found = {obj_id: True for obj_id in obj_ids if obj_id in known}
+    unknown = sorted(set(obj_id for obj_id in obj_ids if obj_id not in known))
+    for i in range(0, len(unknown), DESCRIBE_DATA_OBJECTS_BATCH_SIZE):
+        batch = unknown[i:i + DESCRIBE_DATA_OBJECTS_BATCH_SIZE]
+        objects = [{"id": obj_id, "project": proj_id, "describe": {"fields": {"project": True}}}
+                   for obj_id in batch]
+        with profiling.span("objects_exist_in_project", "resolve", num_objects=len(batch)):
+            results = try_call(dxpy.api.system_describe_data_objects, {"objects": objects})["results"]
+        # Objects that can't be found, or that we can't see, have no
+        # description
+        for obj_id, result in zip(batch, results):
+            found[obj_id] = result.get("describe", {}).get("project") == proj_id
+            if found[obj_id]:
+                known.add(obj_id)
+    return found
+
+
 def object_exists_in_project(obj_id, proj_id):
     '''
     :param obj_id: object ID
@@ -201,15 +255,12 @@ def object_exists_in_project(obj_id, proj_id):
     :type proj_id: str
 
     Returns True if the specified data object can be found in the specified
-    project.
+    project. See :func:`objects_exist_in_project`, which this calls,
+    to check many objects at once.
     '''
     if obj_id is None:
         raise ValueError("Expected obj_id to be a string")
-    if proj_id is None:
-        raise ValueError("Expected proj_id to be a string")
-    if not is_container_id(proj_id):
-        raise ValueError('Expected %r to be a container ID' % (proj_id,))
-    return try_call(dxpy.DXHTTPRequest, '/' + obj_id + '/describe', {'project': proj_id})['project'] == proj_id
+    return objects_exist_in_project([obj_id], proj_id)[obj_id]
 
 
 # Special characters in bash to be escaped: #?*: ;&`"'/!$({[<>|~
@@ -355,6 +406,7 @@ def clean_folder_path(path, expected=None):
     return ('/' + '/'.join(sanitized_folders)), entity_name
 
 
+@profiling.timed(category="resolve")
 def resolve_container_id_or_name(raw_string, is_error=False, multi=False):
     '''
     :param raw_string: A potential project or container ID or name
@@ -418,6 +470,7 @@ def _maybe_convert_stringified_dxlink(path):
     return path
 
 
+@profiling.timed(category="resolve")
 def resolve_path(path, expected=None, multi_projects=False, allow_empty_string=True):
     '''
     :param path: A path to a data object to attempt to resolve
@@ -933,6 +986,7 @@ def _format_resolution_output(path, project, folderpath, entity_name, result):
         return {"project": None, "folder": None, "name": None}
 
 
+@profiling.timed(category="resolve")
 def resolve_multiple_existing_paths(paths):
     """
     :param paths: A list of paths to items that need to be resolved
@@ -1012,6 +1066,7 @@ def resolve_multiple_existing_paths(paths):
     return done_objects
 
 
+@profiling.timed(category="resolve")
 def resolve_existing_path(path, expected=None, ask_to_resolve=True, expected_classes=None, allow_mult=False,
                           describe=True, all_mult=False, allow_empty_string=True, visibility="either"):
     '''
@@ -1156,6 +1211,7 @@ def resolve_app(path):
     else:
         return desc
 
+@profiling.timed(category="resolve")
 def get_exec_handler(path, alias=None):
     handler = None
     def get_handler_from_desc(desc):
@@ -0,0 +1,184 @@
+# Copyright (C) 2013-2016 DNAnexus, Inc.
+#
+# This file is part of dx-toolkit (DNAnexus platform client libraries).
+#
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may not
+#   use this file except in compliance with the License. You may obtain a copy
+#   of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+
+'''
+Client-side throttling of API server requests, shared by all threads
+of a process.
+
+When the API server is overloaded, it answers with 503 and a
+Retry-After header. The request that gets such a response waits before
+retrying, but without coordination the other threads of the same
+process keep sending requests at full speed until each of them gets a
+503 of its own. :class:`Throttle` makes them back off together. It is
+
+* a circuit breaker: a 503 (or a run of consecutive server or
+  connection errors) opens the circuit, and all requests wait until the
+  Retry-After period is over. Then one request is let through, and the
+  others follow once it succeeds (or after a few seconds without an
+  answer, as if it had);
+* a token bucket with an adaptive rate: requests are not limited at
+  first. Each 503 halves the rate (starting from the rate that was
+  being sent when the first one arrived). Successful requests raise it
+  again, by about 10% (and at least one request per second) for every
+  second's worth of them, until it is twice the rate at which the
+  server first pushed back, at which point the limit is lifted.
+'''
+
+from __future__ import print_function, unicode_literals, division, absolute_import
+
+import time, threading, collections
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half-open"
+
+class Throttle(object):
+    '''
+    :param min_rate: Lowest rate (in requests per second) that requests are limited to
+    :type min_rate: float
+    :param failure_threshold: Number of consecutive errors after which the circuit is opened
+    :type failure_threshold: int
+    :param failure_cooldown: Number of seconds the circuit stays open after *failure_threshold* consecutive errors
+    :type failure_cooldown: float
+    :param default_retry_after: Number of seconds the circuit stays open after a 503 without a Retry-After header
+    :type default_retry_after: float
+    :param probe_timeout: Number of seconds to wait for the request that probes the server before letting the others through
+    :type probe_timeout: float
+
+    Call :meth:`acquire` before sending each request, and then exactly
+    one of :meth:`record_response` and :meth:`record_error`.
+    '''
+    def __init__(self, min_rate=1, failure_threshold=5, failure_cooldown=5, default_retry_after=1, probe_timeout=10):
+        self.min_rate = min_rate
+        self.failure_threshold = failure_threshold
+        self.failure_cooldown = failure_cooldown
+        self.default_retry_after = default_retry_after
+        self.probe_timeout = probe_timeout
+
+        self.state = CLOSED
+        # Current rate limit in requests per second, or None if unlimited
+        self.rate = None
+        self._unlimited_rate = None
+        self._tokens = 0
+        self._last_refill = 0
+        # Times at which requests were sent in the last second, while
+        # the rate is unlimited
+        self._recent = collections.deque()
+        self._open_until = 0
+        self._probe_in_flight = False
+        self._probe_deadline = 0
+        self._consecutive_errors = 0
+        self._cond = threading.Condition()
+
+    def acquire(self):
+        '''
+        Blocks until a request may be sent.
+        '''
+        with self._cond:
+            while True:
+                now = time.time()
+                if self.state == OPEN:
+                    if now < self._open_until:
+                        self._cond.wait(self._open_until - now)
+                        continue
+                    self.state = HALF_OPEN
+                    self._probe_in_flight = False
+                if self.state == HALF_OPEN:
+                    if self._probe_in_flight:
+                        if now < self._probe_deadline:
+                            self._cond.wait(self._probe_deadline - now)
+                            continue
+                        # The probe is taking too long (e.g. a slow
+                        # upload) to tell us anything; carry on as if
+                        # it had succeeded
+                        self.state = CLOSED
+                        self._probe_in_flight = False
+                        continue
+                    self._probe_in_flight = True
+                    self._probe_deadline = now + self.probe_timeout
+                    return
+                if self.rate is None:
+                    self._recent.append(now)
+                    while self._recent[0] < now - 1:
+                        self._recent.popleft()
+                    return
+                # Allow bursts of up to one second's worth of requests
+                self._tokens = min(max(self.rate, 1), self._tokens + (now - self._last_refill) * self.rate)
+                self._last_refill = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                self._cond.wait((1 - self._tokens) / self.rate)
+
+    def record_response(self, status, retry_after=None):
+        '''
+        :param status: HTTP status code of the response
+        :type status: int
+        :param retry_after: Value of the Retry-After header, in seconds, if the response had one
+        :type retry_after: float
+
+        Records the response to a request.
+        '''
+        with self._cond:
+            if status == 503:
+                self._throttled(self.default_retry_after if retry_after is None else retry_after)
+            elif 500 <= status < 600:
+                self._error()
+            else:
+                self._success()
+            self._cond.notify_all()
+
+    def record_error(self):
+        '''
+        Records that a request failed without a response.
+        '''
+        with self._cond:
+            self._error()
+            self._cond.notify_all()
+
+    def _open(self, duration):
+        self.state = OPEN
+        self._open_until = max(self._open_until, time.time() + duration)
+        self._probe_in_flight = False
+
+    def _throttled(self, retry_after):
+        # Requests that were already in flight when the circuit opened
+        # may get 503s of their own; only the first one lowers the rate.
+        if self.state != OPEN:
+            if self.rate is None:
+                current_rate = max(len(self._recent), self.min_rate)
+                self._unlimited_rate = 2 * current_rate
+            else:
+                current_rate = self.rate
+            self.rate = max(current_rate / 2, self.min_rate)
+            self._tokens = 0
+            self._last_refill = time.time()
+            self._recent.clear()
+        self._consecutive_errors = 0
+        self._open(retry_after)
+
+    def _error(self):
+        self._consecutive_errors += 1
+        if self.state == HALF_OPEN or self._consecutive_errors >= self.failure_threshold:
+            self._open(self.failure_cooldown)
+
+    def _success(self):
+        self._consecutive_errors = 0
+        if self.state == HALF_OPEN:
+            self.state = CLOSED
+            self._probe_in_flight = False
+        if self.rate is not None:
+            self.rate += max(0.1, 1 / self.rate)
+            if self.rate >= self._unlimited_rate:
+                self.rate = None
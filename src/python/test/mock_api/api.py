@@ -3,7 +3,7 @@
 
 from __future__ import print_function, unicode_literals
 
-import os, sys, random, hashlib, argparse, io, struct
+import os, sys, time, random, hashlib, argparse, io, struct, json
 from flask import Flask, request, jsonify
 
 parser = argparse.ArgumentParser(description=__doc__)
@@ -19,34 +19,106 @@ file_desc = {
     "id": "file-0123456789ABCDEF01234567",
     "class": "file",
     "name": "файл",
+    "folder": "/",
+    "created": 1451606400000,
+    "modified": 1451606400000,
     "state": "closed"
 }
 
+gtable_desc = {
+    "id": "gtable-0123456789ABCDEF01234567",
+    "class": "gtable",
+    "name": "table",
+    "state": "closed",
+    "columns": [{"name": "chr", "type": "string"}, {"name": "lo", "type": "int32"}, {"name": "hi", "type": "int32"},
+                {"name": "score", "type": "double"}],
+    "indices": [{"name": "gri", "type": "genomic", "chr": "chr", "lo": "lo", "hi": "hi"}],
+    "length": 0
+}
+
+file_upload_parameters = {
+    "minimumPartSize": 5 * 1024 * 1024,
+    "maximumPartSize": 5 * 1024 * 1024 * 1024,
+    "emptyLastPartAllowed": True,
+    "maximumNumParts": 10000,
+    "maximumFileSize": 5 * 1024 * 1024 * 1024 * 1024
+}
+
+# Files created with /file/new, by ID
+new_files = {}
+
+# GTables created with /gtable/new, by ID
+new_gtables = {}
+
+# Files listed by /system/findDataObjects instead of file_desc, by ID
+# (see setPayload)
+listed_files = {}
+
+app.latency = 0
+
+@app.before_request
+def add_latency():
+    if app.latency and request.path != "/system/setPayload":
+        time.sleep(app.latency)
+
 @app.route("/system/setPayload", methods=["POST"])
 def set_payload():
-    payload = io.BytesIO()
-    # NB: In Python 3, use random.getrandbits().to_bytes((x.bit_length() // 8) + 1, byteorder='little')
-    for i in range(1024):
-        payload.write(struct.pack(b"L", random.getrandbits(64))*64*1024)
-    app.payload = payload.getvalue()
-    file_desc["parts"] = {
-        "1": {
+    # Optionally, {"size": <bytes in the file>, "rows": <rows in the GTable>,
+    #              "files": <number of files, in 10 folders, all with the same content>,
+    #              "latency": <seconds added to each request>,
+    #              "parts": <number of parts of the file, of about the same size>}
+    params = request.get_json(silent=True) or {}
+    gtable_desc["length"] = params.get("rows", 0)
+    app.latency = params.get("latency", 0)
+    if "size" in params:
+        app.payload = os.urandom(params["size"])
+    else:
+        payload = io.BytesIO()
+        # NB: In Python 3, use random.getrandbits().to_bytes((x.bit_length() // 8) + 1, byteorder='little')
+        for i in range(1024):
+            payload.write(struct.pack(b"L", random.getrandbits(64))*64*1024)
+        app.payload = payload.getvalue()
+    file_desc["parts"] = {}
+    num_parts = params.get("parts", 1)
+    part_size = -(-len(app.payload) // num_parts)
+    for i in range(num_parts):
+        part = app.payload[i * part_size:(i + 1) * part_size]
+        file_desc["parts"][str(i + 1)] = {
             "state": "complete",
-            "md5": hashlib.md5(app.payload).hexdigest(),
-            "size": len(app.payload)
+            "md5": hashlib.md5(part).hexdigest(),
+            "size": len(part)
         }
-    }
     file_desc["size"] = len(app.payload)
+    listed_files.clear()
+    for i in range(params.get("files", 0)):
+        file_id = "file-{:024X}".format(i)
+        listed_files[file_id] = dict(file_desc, id=file_id, name="file_{}".format(i), folder="/dir{}".format(i % 10))
     return jsonify(dict())
 
 @app.route("/system/findDataObjects", methods=["POST"])
 def find_data_objects():
     results=[]
-    results.append(dict(project=request.json["scope"]["project"],
-                        id=file_desc["id"],
-                        describe=dict(file_desc, project=request.json["scope"]["project"])))
+    project = request.json["scope"]["project"]
+    for desc in sorted(listed_files.values(), key=lambda desc: desc["id"]) or [file_desc]:
+        if desc["folder"].startswith(request.json["scope"].get("folder", "/")):
+            results.append(dict(project=project, id=desc["id"], describe=dict(desc, project=project)))
     return jsonify(dict(results=results, next=None))
 
+@app.route("/system/describeDataObjects", methods=["POST"])
+def describe_data_objects():
+    # All objects are in every project
+    results=[]
+    for obj in request.json["objects"]:
+        if not isinstance(obj, dict):
+            obj = dict(id=obj)
+        desc = new_files.get(obj["id"]) or listed_files.get(obj["id"]) or dict(file_desc, id=obj["id"])
+        results.append(dict(describe=dict(desc, project=obj.get("project", "project-0123456789ABCDEF01234567"))))
+    return jsonify(dict(results=results))
+
+@app.route("/system/findExecutions", methods=["POST"])
+def find_executions():
+    return jsonify(dict(results=[], next=None))
+
 @app.route("/<resource>/listFolder", methods=["POST"])
 def list_folder(resource):
     folders=[]
@@ -56,9 +128,18 @@ def list_folder(resource):
 @app.route("/<resource>/describe", methods=["POST"])
 def describe(resource):
     if resource.startswith("project-") or resource.startswith("container-"):
-        return jsonify(dict(name="¶", folders=["/"]))
+        folders = ["/"] + sorted(set(desc["folder"] for desc in listed_files.values()))
+        return jsonify(dict(name="¶", folders=folders, fileUploadParameters=file_upload_parameters))
+    elif resource in new_files:
+        return jsonify(new_files[resource])
+    elif resource in new_gtables:
+        return jsonify(dict((k, v) for k, v in new_gtables[resource].items() if k != "parts"))
+    elif resource in listed_files:
+        return jsonify(dict(listed_files[resource], project="project-0123456789ABCDEF01234567"))
     elif resource.startswith("file-"):
         return jsonify(dict(file_desc, project="project-0123456789ABCDEF01234567"))
+    elif resource.startswith("gtable-"):
+        return jsonify(dict(gtable_desc, project="project-0123456789ABCDEF01234567"))
     elif resource.startswith("job-"):
         return jsonify(dict(app="app-0123456789ABCDEF01234567"))
     else:
@@ -71,8 +152,100 @@ def download(id):
 
 @app.route("/F/D", methods=["GET"])
 def serve_download():
+    if "range" not in request.headers:
+        return app.payload
     start, stop = (int(x) for x in request.headers["range"].split("=")[1].split("-"))
     return app.payload[start:stop+1]
 
+@app.route("/file/new", methods=["POST"])
+def file_new():
+    file_id = "file-{:024X}".format(random.getrandbits(96))
+    new_files[file_id] = dict(id=file_id, project=request.json["project"], name=request.json.get("name", file_id),
+                              state="open", parts={}, size=0)
+    return jsonify(dict(id=file_id))
+
+@app.route("/<file_id>/upload", methods=["POST"])
+def upload(file_id):
+    url = request.url_root + "F/U/{}/{}".format(file_id, request.json.get("index", 1))
+    return jsonify(dict(url=url, headers={}))
+
+@app.route("/F/U/<file_id>/<int:index>", methods=["PUT"])
+def serve_upload(file_id, index):
+    data = request.get_data()
+    new_files[file_id]["parts"][str(index)] = dict(state="complete", md5=hashlib.md5(data).hexdigest(),
+                                                   size=len(data))
+    return ""
+
+@app.route("/<file_id>/close", methods=["POST"])
+def close(file_id):
+    if file_id in new_gtables:
+        desc = new_gtables[file_id]
+        desc["length"] = sum(part["length"] for part in desc["parts"].values())
+        desc["state"] = "closed"
+        return jsonify(dict(id=file_id))
+    desc = new_files[file_id]
+    desc["size"] = sum(part["size"] for part in desc["parts"].values())
+    desc["state"] = "closed"
+    return jsonify(dict(id=file_id))
+
+@app.route("/gtable/new", methods=["POST"])
+def gtable_new():
+    gtable_id = "gtable-{:024X}".format(random.getrandbits(96))
+    new_gtables[gtable_id] = dict(id=gtable_id, project=request.json["project"], state="open", parts={}, length=0,
+                                  columns=request.json["columns"], indices=request.json.get("indices", []))
+    return jsonify(dict(id=gtable_id))
+
+@app.route("/<gtable_id>/nextPart", methods=["POST"])
+def gtable_next_part(gtable_id):
+    parts = new_gtables[gtable_id]["parts"]
+    part = 1
+    while str(part) in parts:
+        part += 1
+    parts[str(part)] = dict(length=0, rows=[])
+    return jsonify(dict(id=gtable_id, part=part))
+
+@app.route("/<gtable_id>/addRows", methods=["POST"])
+def gtable_add_rows(gtable_id):
+    desc = new_gtables[gtable_id]
+    data = request.json["data"]
+    num_columns = len(desc["columns"])
+    if any(len(row) != num_columns for row in data):
+        return jsonify(dict(error=dict(type="InvalidInput", message="Row has the wrong number of columns"))), 422
+    # Keep the first column of each row, to check the order of the rows
+    # (see /gtable-xxxx/getRowKeysMD5)
+    desc["parts"][str(request.json["part"])] = dict(length=len(data), rows=[row[0] for row in data])
+    return jsonify(dict(id=gtable_id))
+
+@app.route("/<gtable_id>/getRowKeysMD5", methods=["POST"])
+def gtable_get_row_keys_md5(gtable_id):
+    # Not an API method: returns the MD5 of the JSON list of the first
+    # column of the rows added to a GTable, in the order of their parts
+    parts = new_gtables[gtable_id]["parts"]
+    keys = [key for index in sorted(parts, key=int) for key in parts[index]["rows"]]
+    return jsonify(dict(md5=hashlib.md5(json.dumps(keys).encode("utf-8")).hexdigest()))
+
+def gtable_row(row_id):
+    return [row_id, "chr{}".format(row_id % 22 + 1), row_id * 100, row_id * 100 + 75, row_id / 7.0]
+
+@app.route("/<gtable_id>/get", methods=["POST"])
+def gtable_get(gtable_id):
+    starting = request.json.get("starting", 0)
+    limit = request.json.get("limit", 40000)
+    query = request.json.get("query")
+    if query is None:
+        end = min(starting + limit, gtable_desc["length"])
+        data = [gtable_row(row_id) for row_id in range(starting, end)]
+        return jsonify(dict(length=len(data), next=end if end < gtable_desc["length"] else None, data=data))
+    # "overlap" query of the genomic range index: the rows on the
+    # chromosome whose [lo, hi) interval overlaps the one given
+    chromosome, lo, hi = query["parameters"]["coords"]
+    residue = int(chromosome[3:]) - 1
+    first = max(starting, (lo - 75) // 100 + 1, 0)
+    first += (residue - first) % 22
+    end = min(-(-hi // 100), gtable_desc["length"])
+    row_ids = range(first, end, 22)
+    data = [gtable_row(row_id) for row_id in row_ids[:limit]]
+    return jsonify(dict(length=len(data), next=row_ids[limit] if len(row_ids) > limit else None, data=data))
+
 if __name__ == "__main__":
     app.run(debug=True, use_reloader=False, host=args.host, port=args.port)
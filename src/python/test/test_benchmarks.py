@@ -0,0 +1,894 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2013-2016 DNAnexus, Inc.
+#
+# This file is part of dx-toolkit (DNAnexus platform client libraries).
+#
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may not
+#   use this file except in compliance with the License. You may obtain a copy
+#   of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+
+'''
+Performance benchmarks. These are excluded from normal test runs; set
+DXTEST_BENCHMARKS to run them. If DXTEST_BENCHMARK_RESULTS is set to a
+filename, the measurements are also appended to it as JSON lines, so
+that results from different releases can be compared.
+'''
+
+from __future__ import print_function, unicode_literals, division, absolute_import
+
+import os, sys, gzip, importlib, unittest, json, time, random, shutil, socket, hashlib, tempfile, platform, subprocess
+
+import dxpy
+import dxpy_testutil as testutil
+from dxpy.utils import json_codec
+
+
+def record_benchmark(name, **measurements):
+    result = dict(measurements,
+                  benchmark=name,
+                  time=time.time(),
+                  toolkit_version=dxpy.TOOLKIT_VERSION,
+                  python=platform.python_version())
+    print(json.dumps(result, sort_keys=True), file=sys.stderr)
+    if 'DXTEST_BENCHMARK_RESULTS' in os.environ:
+        with open(os.environ['DXTEST_BENCHMARK_RESULTS'], 'a') as fh:
+            fh.write(json.dumps(result, sort_keys=True) + '\n')
+
+
+def time_calls(fn, repetitions):
+    latencies = []
+    for _i in range(repetitions):
+        start = time.time()
+        fn()
+        latencies.append(time.time() - start)
+    latencies.sort()
+    return {"median_ms": 1000 * latencies[len(latencies) // 2],
+            "max_ms": 1000 * latencies[-1],
+            "repetitions": repetitions}
+
+
+@unittest.skipUnless(testutil.TEST_BENCHMARKS, 'skipping benchmarks')
+class TestJSONCodecBenchmark(unittest.TestCase):
+    def make_id(self, object_class):
+        return object_class + "-" + "".join(random.choice("0123456789BFGJKPQVXYZ") for _i in range(24))
+
+    def find_data_objects_page(self, num_results=1000):
+        # A page of "dx find data --json" results
+        results = []
+        for i in range(num_results):
+            project, file_id = self.make_id("project"), self.make_id("file")
+            results.append({"project": project, "id": file_id,
+                            "describe": {"id": file_id, "project": project, "class": "file", "types": [],
+                                         "name": "sample_{}.bam".format(i), "folder": "/runs/{}".format(i % 50),
+                                         "size": random.randint(0, 2 ** 40), "state": "closed", "hidden": False,
+                                         "created": 1480000000000 + i, "modified": 1480000000000 + i,
+                                         "createdBy": {"user": "user-alice", "job": self.make_id("job")},
+                                         "tags": ["sequencing", "run{}".format(i % 50)], "links": [],
+                                         "properties": {"sample": "NA{:05d}".format(i), "lane": str(i % 8)},
+                                         "details": {}, "media": "application/octet-stream",
+                                         "sponsored": False}})
+        return {"results": results, "next": {"project": results[-1]["project"], "id": results[-1]["id"]}}
+
+    def job_describe(self, num_files=2000):
+        # Describe of a job with many file inputs and outputs
+        def file_links():
+            return [{"$dnanexus_link": {"project": self.make_id("project"), "id": self.make_id("file")}}
+                    for _i in range(num_files)]
+        return {"id": self.make_id("job"), "class": "job", "name": "align", "state": "done",
+                "input": {"reads": file_links(), "threshold": 0.05, "reference": file_links()[0]},
+                "output": {"bams": file_links(), "stats": {"mapped": 0.9731, "count": 123456789}},
+                "runInput": {"reads": file_links()}, "originalInput": {"reads": file_links()},
+                "created": 1480000000000, "modified": 1480000000000, "dependsOn": [], "tags": []}
+
+    def test_json_codec(self):
+        random.seed(1)
+        measurements = {"backend": json_codec.BACKEND}
+        for name, payload in ("find_data_objects", self.find_data_objects_page()), ("job_describe", self.job_describe()):
+            serialized = json.dumps(payload).encode("utf-8")
+            self.assertEqual(json_codec.loads(serialized), payload)
+            self.assertEqual(json.loads(json_codec.dumps(payload).decode("utf-8")), payload)
+            stdlib_loads = time_calls(lambda: json.loads(serialized.decode("utf-8")), 20)
+            codec_loads = time_calls(lambda: json_codec.loads(serialized), 20)
+            measurements[name] = {"size": len(serialized),
+                                  "json_loads": stdlib_loads,
+                                  "codec_loads": codec_loads,
+                                  "json_dumps": time_calls(lambda: json.dumps(payload).encode("utf-8"), 20),
+                                  "codec_dumps": time_calls(lambda: json_codec.dumps(payload), 20)}
+            if json_codec.BACKEND != "json":
+                self.assertLess(codec_loads["median_ms"], stdlib_loads["median_ms"])
+        record_benchmark("json_codec", **measurements)
+
+
+@unittest.skipUnless(testutil.TEST_BENCHMARKS, 'skipping benchmarks')
+class TestStartupBenchmark(unittest.TestCase):
+    # Fail the benchmark run if importing dxpy, or the dx client (i.e.
+    # the fixed cost of every job entry point or dx command), regresses
+    # past these
+    dxpy_import_budget_ms = 200
+    dx_import_budget_ms = 400
+
+    def python(self, *args):
+        return testutil.check_output([sys.executable] + list(args), also_return_stderr=True)
+
+    def get_import_times(self, module):
+        _output, err = self.python("-X", "importtime", "-c", "import " + module)
+        # Lines look like "import time:  self [us] | cumulative | imported package"
+        import_times = {}
+        for line in err.splitlines():
+            fields = line.split("|")
+            if line.startswith("import time:") and len(fields) == 3 and fields[1].strip().isdigit():
+                import_times[fields[2].strip()] = int(fields[1]) / 1000
+        return import_times
+
+    @unittest.skipIf(sys.version_info < (3, 7), "-X importtime requires Python 3.7 or later")
+    def test_dxpy_import_time(self):
+        import_times = self.get_import_times("dxpy")
+        record_benchmark("dxpy_import_time",
+                         total_ms=import_times["dxpy"],
+                         requests_ms=import_times.get("requests"),
+                         bindings_ms=import_times.get("dxpy.bindings"))
+        self.assertLess(import_times["dxpy"], self.dxpy_import_budget_ms)
+
+    @unittest.skipIf(sys.version_info < (3, 7), "-X importtime requires Python 3.7 or later")
+    def test_dx_import_time(self):
+        import_times = self.get_import_times("dxpy.scripts.dx")
+        record_benchmark("dx_import_time",
+                         total_ms=import_times["dxpy.scripts.dx"],
+                         dxpy_ms=import_times["dxpy"],
+                         requests_ms=import_times.get("requests"))
+        self.assertLess(import_times["dxpy.scripts.dx"], self.dx_import_budget_ms)
+
+    def test_dx_startup_time(self):
+        def start():
+            self.python("-c", "import sys; sys.argv[0] = 'dx'; from dxpy.scripts.dx import main; main()", "--version")
+        record_benchmark("dx_startup_time", **time_calls(start, 10))
+
+    def test_parsers_built_lazily(self):
+        output, _err = self.python("-c", "import dxpy.scripts.dx as dx; print(len(dx.parser_map))")
+        self.assertEqual(output.strip(), "0")
+
+
+RUN_DX = "import sys; sys.argv[0] = 'dx'; from dxpy.scripts.dx import main; main()"
+
+# Runs one transfer benchmark case (given as JSON) in a fresh process,
+# so that its peak RSS and CPU time can be measured on their own
+TRANSFER_CASE = """
+import os, sys, json, time, resource, threading
+import dxpy
+from dxpy.utils import metrics
+
+def get_max_rss_mb():
+    # ru_maxrss is in bytes on OS X, and in kilobytes elsewhere
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+case = json.loads(sys.argv[1])
+registry = metrics.enable()
+dxpy.DXFile._http_threadpool_size = case["threads"]
+dxpy.DXFile._http_threadpool = dxpy.utils.get_futures_threadpool(max_workers=case["threads"])
+dxpy.DXGTable.set_http_threadpool_size(case["threads"])
+
+peak_snapshot = []
+if case.get("trace_memory"):
+    import tracemalloc
+    transfer_done = threading.Event()
+
+    def watch_memory():
+        # Snapshot the allocations each time they reach a new peak (by
+        # at least 10%), to tell what the memory is used for at the peak
+        peak = 0
+        while not transfer_done.wait(0.05):
+            current = tracemalloc.get_traced_memory()[0]
+            if current > peak * 1.1:
+                peak = current
+                peak_snapshot[:] = [tracemalloc.take_snapshot()]
+
+    tracemalloc.start()
+    watcher = threading.Thread(target=watch_memory)
+    watcher.start()
+
+size = 0
+baseline_rss_mb = get_max_rss_mb()
+start = time.time()
+if case["operation"] == "DXFile.read":
+    dxfile = dxpy.DXFile(case["id"], read_buffer_size=case["chunk_size"])
+    while True:
+        data = dxfile.read(case["chunk_size"])
+        if not data:
+            break
+        size += len(data)
+elif case["operation"] == "download_dxfile":
+    dxpy.download_dxfile(case["id"], case["filename"], chunksize=case["chunk_size"])
+    size = os.path.getsize(case["filename"])
+elif case["operation"] == "upload_local_file":
+    dxpy.upload_local_file(case["filename"], write_buffer_size=case["chunk_size"])
+    size = os.path.getsize(case["filename"])
+elif case["operation"] == "dx cat":
+    os.dup2(os.open(case["filename"], os.O_WRONLY | os.O_CREAT | os.O_TRUNC), 1)
+    sys.argv = ["dx", "cat", case["id"]]
+    from dxpy.scripts.dx import main
+    main()
+    sys.stdout.flush()
+    size = os.path.getsize(case["filename"])
+elif case["operation"] == "DXGTable.iterate_rows":
+    for row in dxpy.DXGTable(case["id"]).iterate_rows():
+        size += 1
+elif case["operation"] == "DXGTable.iterate_batches":
+    for batch in dxpy.DXGTable(case["id"]).iterate_batches(as_numpy=True):
+        size += len(batch["__id__"])
+elapsed = time.time() - start
+
+usage = resource.getrusage(resource.RUSAGE_SELF)
+requests = {}
+for route in registry.to_dict()["requests"]:
+    requests[route["method"] + " " + route["route"]] = sum(route["statuses"].values())
+result = {"seconds": elapsed,
+          "size": size,
+          "cpu_user_s": usage.ru_utime,
+          "cpu_system_s": usage.ru_stime,
+          "max_rss_mb": get_max_rss_mb(),
+          "baseline_rss_mb": baseline_rss_mb,
+          "requests": requests}
+if case.get("trace_memory"):
+    transfer_done.set()
+    watcher.join()
+    result["traced_peak_mb"] = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+    if peak_snapshot:
+        result["peak_allocations"] = [{"line": str(stat.traceback[0]), "mb": stat.size / (1024 * 1024)}
+                                      for stat in peak_snapshot[0].statistics("lineno")[:10]]
+with open(case["result"], "w") as fh:
+    json.dump(result, fh)
+"""
+
+
+# Checks that DXGTable.iterate_batches returns the same rows as
+# DXGTable.iterate_rows, and prints the dtypes of the columns
+GTABLE_BATCHES = """
+import sys, json
+import dxpy
+
+dxgtable = dxpy.DXGTable(sys.argv[1])
+rows = dxgtable.iterate_rows()
+dtypes = {}
+for batch in dxgtable.iterate_batches(as_numpy=True):
+    for values in zip(*batch.values()):
+        assert list(values) == next(rows)
+    dtypes = {name: str(values.dtype) for name, values in batch.items()}
+assert next(rows, None) is None
+print(json.dumps(dtypes))
+"""
+
+
+class MockAPIServerTestCase(unittest.TestCase):
+    '''
+    Runs the mock API server in mock_api/, which needs no network access
+    (but requires Flask), for the duration of the test case.
+    '''
+    file_id = "file-0123456789ABCDEF01234567"
+    gtable_id = "gtable-0123456789ABCDEF01234567"
+
+    @classmethod
+    def setUpClass(cls):
+        try:
+            importlib.import_module("flask")
+        except ImportError:
+            raise unittest.SkipTest("the mock API server requires Flask")
+        sock = socket.socket()
+        sock.bind(("localhost", 0))
+        port = sock.getsockname()[1]
+        sock.close()
+        cls.env = dict(os.environ,
+                       DX_APISERVER_HOST="localhost",
+                       DX_APISERVER_PORT=str(port),
+                       DX_APISERVER_PROTOCOL="http",
+                       DX_SECURITY_CONTEXT=json.dumps({"auth_token": "x", "auth_token_type": "Bearer"}),
+                       DX_PROJECT_CONTEXT_ID="project-0123456789ABCDEF01234567",
+                       DX_CLI_WD="/")
+        for name in ("DX_JOB_ID", "DX_WORKSPACE_ID", "DX_METRICS_FILE", "DX_PROFILE", "DX_CASSETTE_RECORD",
+                     "DX_CASSETTE_REPLAY"):
+            cls.env.pop(name, None)
+        mock_api = os.path.join(os.path.dirname(os.path.abspath(__file__)), "mock_api", "api.py")
+        with open(os.devnull, "w") as devnull:
+            cls.server = subprocess.Popen([sys.executable, mock_api, "--port", str(port)], env=cls.env,
+                                          stdout=devnull, stderr=devnull)
+        for _i in range(100):
+            try:
+                socket.create_connection(("localhost", port)).close()
+                break
+            except socket.error:
+                time.sleep(0.1)
+        else:
+            cls.server.kill()
+            raise Exception("The mock API server did not start")
+        cls.tempdir = tempfile.mkdtemp()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.terminate()
+        cls.server.wait()
+        shutil.rmtree(cls.tempdir)
+
+    def set_payload(self, **params):
+        self.python("-c", "import sys, json, dxpy; dxpy.DXHTTPRequest('/system/setPayload', json.loads(sys.argv[1]))",
+                    json.dumps(params))
+
+    def python(self, *args):
+        return testutil.check_output([sys.executable] + list(args), env=self.env)
+
+    def run_transfer(self, operation, object_id, size, chunk_size, threads, trace_memory=False):
+        '''
+        Runs TRANSFER_CASE, and returns its measurements.
+        '''
+        case = {"operation": operation, "id": object_id, "chunk_size": chunk_size, "threads": threads,
+                "trace_memory": trace_memory, "filename": os.path.join(self.tempdir, "data"),
+                "result": os.path.join(self.tempdir, "result.json")}
+        if os.path.exists(case["filename"]):
+            # download_dxfile would resume from it
+            os.remove(case["filename"])
+        if operation == "upload_local_file":
+            with open(case["filename"], "wb") as fh:
+                for _i in range(0, size, 1024 * 1024):
+                    fh.write(os.urandom(min(size - fh.tell(), 1024 * 1024)))
+        self.python("-c", TRANSFER_CASE, json.dumps(case))
+        with open(case["result"]) as fh:
+            result = json.load(fh)
+        self.assertEqual(result.pop("size"), size)
+        return result
+
+
+# Completes a path (given as the first argument) repeatedly, and prints
+# the matches and the latencies of the completions
+COMPLETE_PATH = """
+import sys, json, time
+from dxpy.utils.completer import path_completer
+
+latencies = []
+for _i in range(int(sys.argv[2])):
+    start = time.time()
+    matches = path_completer(sys.argv[1])
+    latencies.append(time.time() - start)
+latencies.sort()
+print(json.dumps({"matches": matches,
+                  "median_ms": 1000 * latencies[len(latencies) // 2],
+                  "max_ms": 1000 * latencies[-1],
+                  "repetitions": len(latencies)}))
+"""
+
+
+@unittest.skipUnless(testutil.TEST_BENCHMARKS, 'skipping benchmarks')
+class TestCompletionBenchmark(MockAPIServerTestCase):
+    def complete(self, ttl, repetitions=10):
+        env = dict(self.env, DX_COMPLETION_CACHE_TTL=str(ttl), DX_USER_CONF_DIR=self.tempdir)
+        output = testutil.check_output([sys.executable, "-c", COMPLETE_PATH,
+                                        self.env["DX_PROJECT_CONTEXT_ID"] + ":/dir1/file_1", str(repetitions)],
+                                       env=env)
+        return json.loads(output)
+
+    def test_path_completion_latency(self):
+        self.set_payload(size=0, files=500, latency=0.02)
+        uncached = self.complete(0)
+        cached = self.complete(3600)
+        self.assertEqual(cached.pop("matches"), uncached.pop("matches"))
+        record_benchmark("path_completion", uncached=uncached, cached=cached)
+        self.assertLess(cached["median_ms"], uncached["median_ms"])
+
+
+@unittest.skipUnless(testutil.TEST_BENCHMARKS, 'skipping benchmarks')
+class TestTransferBenchmark(MockAPIServerTestCase):
+    '''
+    Measures the throughput of file and GTable transfers against the
+    mock API server. Each case is recorded separately, with its rate,
+    peak RSS, CPU time and number of requests by route.
+    '''
+    file_sizes = [16 * 1024 * 1024, 128 * 1024 * 1024]
+    chunk_sizes = [4 * 1024 * 1024, 16 * 1024 * 1024]
+    thread_counts = [1, 4, 8]
+    gtable_rows = 200000
+
+    def run_case(self, operation, object_id, size, chunk_size, threads):
+        result = self.run_transfer(operation, object_id, size, chunk_size, threads)
+        if operation.startswith("DXGTable"):
+            result["rows_per_s"] = size / result["seconds"]
+        else:
+            result["mb_per_s"] = size / (1024 * 1024) / result["seconds"]
+        record_benchmark("transfer", operation=operation, size=size, chunk_size=chunk_size, threads=threads, **result)
+
+    def test_file_transfers(self):
+        for size in self.file_sizes:
+            self.set_payload(size=size)
+            for threads in self.thread_counts:
+                for chunk_size in self.chunk_sizes:
+                    for operation in "DXFile.read", "download_dxfile", "upload_local_file":
+                        self.run_case(operation, self.file_id, size, chunk_size, threads)
+                # dx cat always reads 1 MB at a time
+                self.run_case("dx cat", self.file_id, size, None, threads)
+
+    def test_gtable_iterate_rows(self):
+        self.set_payload(size=0, rows=self.gtable_rows)
+        for threads in self.thread_counts:
+            for operation in "DXGTable.iterate_rows", "DXGTable.iterate_batches":
+                self.run_case(operation, self.gtable_id, self.gtable_rows, None, threads)
+
+        # The batches have the same values as the rows, with the types
+        # of the columns
+        output = self.python("-c", GTABLE_BATCHES, self.gtable_id)
+        self.assertEqual(json.loads(output), {"__id__": "int64", "chr": "object", "lo": "int32", "hi": "int32",
+                                              "score": "float64"})
+
+
+@unittest.skipUnless(testutil.TEST_BENCHMARKS, 'skipping benchmarks')
+class TestMemoryBenchmark(MockAPIServerTestCase):
+    '''
+    Measures how much memory large file transfers use, and checks it
+    against the bounds documented for DXFile, download_dxfile and
+    upload_local_file, which depend on the chunk size and number of
+    threads but not on the size of the file. On Python 3, the lines
+    that allocated the most memory at the peak (according to
+    tracemalloc) are recorded too.
+    '''
+    file_size = 512 * 1024 * 1024
+    chunk_size = 8 * 1024 * 1024
+    thread_counts = [1, 4]
+    # Documented bound on the memory used by each operation, in chunks,
+    # as a function of the number of threads (DXFile.read is called
+    # with a length of one chunk, which counts twice)
+    bounds = {"DXFile.read": lambda threads: threads + 4,
+              "download_dxfile": lambda threads: threads + 1,
+              "upload_local_file": lambda threads: threads + 2}
+
+    def get_bound_mb(self, operation, threads):
+        # The bounds leave out the buffers in which each request in
+        # flight reads its response (httplib briefly holds two copies)
+        return (self.bounds[operation](threads) + 2 * threads) * self.chunk_size / (1024 * 1024)
+
+    def test_bounded_memory(self):
+        self.set_payload(size=self.file_size)
+        for threads in self.thread_counts:
+            for operation in sorted(self.bounds):
+                result = self.run_transfer(operation, self.file_id, self.file_size, self.chunk_size, threads,
+                                           trace_memory=sys.version_info >= (3, 4))
+                rss_mb = result["max_rss_mb"] - result["baseline_rss_mb"]
+                bound_mb = self.get_bound_mb(operation, threads)
+                record_benchmark("transfer_memory", operation=operation, size=self.file_size,
+                                 chunk_size=self.chunk_size, threads=threads, rss_mb=rss_mb, bound_mb=bound_mb,
+                                 **result)
+                message = "{} with {} threads".format(operation, threads)
+                if "traced_peak_mb" in result:
+                    self.assertLessEqual(result["traced_peak_mb"], bound_mb, message)
+                # Allow for memory that the allocator keeps after it is
+                # freed (e.g. in per-thread arenas)
+                self.assertLessEqual(rss_mb, 2 * bound_mb, message)
+                self.assertLess(2 * bound_mb, self.file_size / (1024 * 1024))
+
+
+# Downloads the whole project (given as JSON) in a fresh process
+FOLDER_DOWNLOAD = """
+import sys, json, time
+import dxpy
+
+case = json.loads(sys.argv[1])
+files = dxpy.prepare_folder_download(case["project"], case["destdir"], overwrite=True)
+start = time.time()
+dxpy.download_dxfiles(files, project=case["project"], max_num_parallel_downloads=case["parallel"])
+print(json.dumps({"seconds": time.time() - start, "files": len(files)}))
+"""
+
+
+@unittest.skipUnless(testutil.TEST_BENCHMARKS, 'skipping benchmarks')
+class TestFolderDownloadBenchmark(MockAPIServerTestCase):
+    '''
+    Measures how long downloading a folder of many small files takes
+    when each request to the mock API server takes a while, downloading
+    one file at a time and several at once.
+    '''
+    num_files = 200
+    file_size = 4096
+    latency = 0.02
+    parallelism = [1, 4, 16]
+
+    def count_files(self, destdir):
+        return sum(len(filenames) for _dirpath, _dirnames, filenames in os.walk(destdir))
+
+    def test_download_folder(self):
+        self.set_payload(size=self.file_size, files=self.num_files, latency=self.latency)
+        seconds = {}
+        for parallel in self.parallelism:
+            destdir = os.path.join(self.tempdir, "folder_{}".format(parallel))
+            case = {"project": self.env["DX_PROJECT_CONTEXT_ID"], "destdir": destdir, "parallel": parallel}
+            result = json.loads(self.python("-c", FOLDER_DOWNLOAD, json.dumps(case)))
+            self.assertEqual(result["files"], self.num_files)
+            self.assertEqual(self.count_files(destdir), self.num_files)
+            seconds[parallel] = result["seconds"]
+            record_benchmark("download_folder", files=self.num_files, size=self.file_size, latency=self.latency,
+                             parallel=parallel, seconds=result["seconds"],
+                             files_per_s=self.num_files / result["seconds"])
+        self.assertLess(seconds[max(self.parallelism)], seconds[1] / 4)
+
+        destdir = os.path.join(self.tempdir, "dx_download")
+        os.mkdir(destdir)
+        start = time.time()
+        self.python("-c", RUN_DX, "download", "-r", "/", "-o", destdir, "--no-progress")
+        record_benchmark("download_folder", files=self.num_files, size=self.file_size, latency=self.latency,
+                         command="dx download -r", seconds=time.time() - start)
+        self.assertEqual(self.count_files(destdir), self.num_files)
+
+
+# Downloads the file (given as JSON) in a fresh process, stopping the
+# download once "stop_at" bytes have been written, if given
+RESUMED_DOWNLOAD = """
+import sys, json, time
+import dxpy
+
+class Interrupted(Exception):
+    pass
+
+case = json.loads(sys.argv[1])
+
+def report_progress(num_bytes):
+    if case.get("stop_at") is not None and num_bytes >= case["stop_at"]:
+        raise Interrupted()
+
+start = time.time()
+try:
+    dxpy.download_dxfile(case["id"], case["filename"], chunksize=case["chunk_size"], report_progress_fn=report_progress)
+except Interrupted:
+    pass
+print(json.dumps({"seconds": time.time() - start}))
+"""
+
+
+@unittest.skipUnless(testutil.TEST_BENCHMARKS, 'skipping benchmarks')
+class TestResumeBenchmark(MockAPIServerTestCase):
+    '''
+    Measures how long resuming a download that was interrupted near the
+    end takes, with the journal of the interrupted download, and without
+    it (when all the data downloaded so far is read back to verify it).
+    '''
+    file_size = 256 * 1024 * 1024
+    num_parts = 64
+    chunk_size = 4 * 1024 * 1024
+
+    def download(self, stop_at=None):
+        case = {"id": self.file_id, "filename": self.filename, "chunk_size": self.chunk_size, "stop_at": stop_at}
+        return json.loads(self.python("-c", RESUMED_DOWNLOAD, json.dumps(case)))["seconds"]
+
+    def get_md5(self):
+        with open(self.filename, "rb") as fh:
+            return hashlib.md5(fh.read()).hexdigest()
+
+    def test_resume_download(self):
+        self.set_payload(size=self.file_size, parts=self.num_parts)
+        self.filename = os.path.join(self.tempdir, "resumed")
+        journal = self.filename + ".dxjournal"
+        self.download()
+        expected_md5 = self.get_md5()
+        self.assertFalse(os.path.exists(journal))
+
+        seconds = {}
+        for how in "journal", "verify", "modified":
+            os.remove(self.filename)
+            self.download(stop_at=self.file_size * 9 // 10)
+            self.assertTrue(os.path.exists(journal))
+            if how == "verify":
+                os.remove(journal)
+            elif how == "modified":
+                # The journal is stale, and the damaged part is found and
+                # downloaded again
+                with open(self.filename, "rb+") as fh:
+                    fh.seek(self.file_size // 2)
+                    fh.write(b"\0" * 16)
+            seconds[how] = self.download()
+            self.assertEqual(self.get_md5(), expected_md5, how)
+            self.assertFalse(os.path.exists(journal))
+            record_benchmark("resume_download", size=self.file_size, parts=self.num_parts, how=how,
+                             seconds=seconds[how])
+        self.assertLess(seconds["journal"], seconds["verify"])
+
+
+# Runs a genomic range query (given as JSON) in a fresh process, either
+# with DXGTable.iterate_query_rows or one page after the other, and
+# prints the IDs of the rows returned
+GTABLE_QUERY = """
+import sys, json, time
+import dxpy
+
+case = json.loads(sys.argv[1])
+dxgtable = dxpy.DXGTable(case["id"])
+dxgtable._read_row_buffer_size = case["page_size"]
+query = dxgtable.genomic_range_query(case["chr"], case["lo"], case["hi"])
+start = time.time()
+if case["num_ranges"] is None:
+    rows, cursor = [], 0
+    while cursor is not None and len(rows) < case["limit"]:
+        resp = dxgtable.get_rows(query=query, starting=cursor, limit=min(case["page_size"], case["limit"] - len(rows)))
+        rows.extend(resp["data"])
+        cursor = resp["next"]
+else:
+    rows = list(dxgtable.iterate_query_rows(query, limit=case["limit"], num_ranges=case["num_ranges"]))
+print(json.dumps({"seconds": time.time() - start, "row_ids": [row[0] for row in rows]}))
+"""
+
+
+@unittest.skipUnless(testutil.TEST_BENCHMARKS, 'skipping benchmarks')
+class TestGTableQueryBenchmark(MockAPIServerTestCase):
+    '''
+    Measures how long a genomic range query of many pages takes when
+    each request to the mock API server takes a while, requesting one
+    page after the other, and with DXGTable.iterate_query_rows (which
+    prefetches pages, and splits the interval into parts queried in
+    parallel).
+    '''
+    gtable_rows = 220000
+    page_size = 500
+    latency = 0.05
+    num_ranges = [None, 1, 4]
+
+    def query(self, lo, hi, num_ranges, limit=10 ** 9):
+        case = {"id": self.gtable_id, "page_size": self.page_size, "chr": "chr1", "lo": lo, "hi": hi,
+                "num_ranges": num_ranges, "limit": limit}
+        return json.loads(self.python("-c", GTABLE_QUERY, json.dumps(case)))
+
+    def test_genomic_range_query(self):
+        self.set_payload(size=0, rows=self.gtable_rows, latency=self.latency)
+        # The mock table has row i on chr{i % 22 + 1}, at [100 * i, 100 * i + 75)
+        for lo, hi, limit in (0, 100 * self.gtable_rows, 10 ** 9), (123456, 15000017, 10 ** 9), (123456, 15000017, 777):
+            expected = [i for i in range(0, self.gtable_rows, 22) if 100 * i < hi and 100 * i + 75 > lo][:limit]
+            seconds = {}
+            for num_ranges in self.num_ranges:
+                result = self.query(lo, hi, num_ranges, limit=limit)
+                self.assertEqual(result["row_ids"], expected, num_ranges)
+                seconds[num_ranges] = result["seconds"]
+                record_benchmark("gtable_query", rows=len(expected), page_size=self.page_size, latency=self.latency,
+                                 num_ranges=num_ranges, seconds=result["seconds"])
+            if limit > len(expected):
+                # The parts are not all the same number of pages, so the
+                # last few pages of the longest part are fetched alone
+                self.assertLess(seconds[4], seconds[None] * 0.75)
+
+
+# Writes rows to a new GTable (with the parameters given as JSON) in a
+# fresh process, and prints how long it took: "serial" checks each value
+# and sends one part after the other, as a writer without DXGTable's
+# buffering would; "rows" adds lists with DXGTable.add_rows, and "numpy"
+# adds NumPy arrays with DXGTable.add_batch
+GTABLE_WRITE = """
+import sys, json, time, hashlib
+import numpy
+import dxpy
+
+case = json.loads(sys.argv[1])
+columns = [dxpy.DXGTable.make_column_desc("lo", "int32"), dxpy.DXGTable.make_column_desc("hi", "int32"),
+           dxpy.DXGTable.make_column_desc("chr", "string"), dxpy.DXGTable.make_column_desc("score", "double")]
+num_rows, part_size = case["rows"], case["part_size"]
+lo = numpy.arange(num_rows, dtype="int32") * 100
+batch = {"lo": lo, "hi": lo + 75, "chr": numpy.array(["chr{}".format(i % 22 + 1) for i in range(num_rows)]),
+         "score": numpy.arange(num_rows) / 7.0}
+rows = list(zip(*[batch[col["name"]].tolist() for col in columns]))
+dxgtable = dxpy.new_dxgtable(columns=columns)
+dxgtable._write_request_size = part_size
+start = time.time()
+if case["how"] == "serial":
+    for index, first in enumerate(range(0, num_rows, part_size)):
+        part = [list(row) for row in rows[first:first + part_size]]
+        for row in part:
+            dxgtable._check_row_is_valid(row)
+        dxpy.api.gtable_add_rows(dxgtable.get_id(), {"data": part, "part": index + 1})
+elif case["how"] == "rows":
+    for first in range(0, num_rows, 1000):
+        dxgtable.add_rows(rows[first:first + 1000])
+else:
+    for first in range(0, num_rows, 1000):
+        dxgtable.add_batch(dict((name, values[first:first + 1000]) for name, values in batch.items()))
+dxgtable.close()
+seconds = time.time() - start
+keys_md5 = dxpy.DXHTTPRequest("/" + dxgtable.get_id() + "/getRowKeysMD5", {})["md5"]
+in_order = keys_md5 == hashlib.md5(json.dumps(lo.tolist()).encode("utf-8")).hexdigest()
+print(json.dumps({"seconds": seconds, "in_order": in_order, "length": dxgtable.describe()["length"]}))
+"""
+
+
+@unittest.skipUnless(testutil.TEST_BENCHMARKS, 'skipping benchmarks')
+class TestGTableWriteBenchmark(MockAPIServerTestCase):
+    '''
+    Measures how long writing many rows to a GTable takes when each
+    request to the mock API server takes a while, sending one part after
+    the other, and with DXGTable.add_rows and DXGTable.add_batch (which
+    check the rows a column at a time, and send several parts at once).
+    '''
+    gtable_rows = 200000
+    part_size = 10000
+    latency = 0.1
+
+    def test_write_rows(self):
+        self.set_payload(size=0, latency=self.latency)
+        seconds = {}
+        for how in "serial", "rows", "numpy":
+            case = {"rows": self.gtable_rows, "part_size": self.part_size, "how": how}
+            result = json.loads(self.python("-c", GTABLE_WRITE, json.dumps(case)))
+            self.assertTrue(result["in_order"], how)
+            self.assertEqual(result["length"], self.gtable_rows, how)
+            seconds[how] = result["seconds"]
+            record_benchmark("gtable_write", rows=self.gtable_rows, part_size=self.part_size, latency=self.latency,
+                             how=how, seconds=seconds[how])
+        self.assertLess(seconds["rows"], seconds["serial"])
+        self.assertLess(seconds["numpy"], seconds["serial"])
+
+
+# Reads all the rows of a GTable, or those that match a genomic range
+# query (given as JSON), in a fresh process, and prints how long it took
+# and the MD5 of the rows
+GTABLE_SCAN = """
+import sys, json, time, hashlib
+import dxpy
+
+case = json.loads(sys.argv[1])
+dxgtable = dxpy.DXGTable(case["id"])
+start = time.time()
+if case["query"] is None:
+    rows = list(dxgtable.iterate_rows())
+else:
+    rows = list(dxgtable.iterate_query_rows(dxgtable.genomic_range_query(*case["query"])))
+seconds = time.time() - start
+print(json.dumps({"seconds": seconds, "rows": len(rows),
+                  "md5": hashlib.md5(json.dumps(rows).encode("utf-8")).hexdigest()}))
+"""
+
+
+@unittest.skipUnless(testutil.TEST_BENCHMARKS, 'skipping benchmarks')
+class TestGTableCacheBenchmark(MockAPIServerTestCase):
+    '''
+    Measures how long scans and genomic range queries of a GTable take
+    without the local GTable cache, when the first scan stores the table
+    in it, and when they read the table from it.
+    '''
+    gtable_rows = 200000
+    latency = 0.05
+
+    def scan(self, query=None, **env):
+        case = {"id": self.gtable_id, "query": query}
+        return json.loads(testutil.check_output([sys.executable, "-c", GTABLE_SCAN, json.dumps(case)],
+                                                env=dict(self.env, **env)))
+
+    def test_cached_scans(self):
+        self.set_payload(size=0, rows=self.gtable_rows, latency=self.latency)
+        cache_env = {"DX_GTABLE_CACHE_SIZE": "1024", "DX_GTABLE_CACHE_DIR": os.path.join(self.tempdir, "gtable_cache")}
+        for query in None, ["chr3", 123456, 15000017]:
+            results = [("none", self.scan(query))]
+            if query is None:
+                results.append(("fill", self.scan(query, **cache_env)))
+            results.append(("cached", self.scan(query, **cache_env)))
+            for how, result in results:
+                self.assertEqual((result["rows"], result["md5"]), (results[0][1]["rows"], results[0][1]["md5"]), how)
+                record_benchmark("gtable_cache", rows=self.gtable_rows, latency=self.latency, query=query is not None,
+                                 how=how, seconds=result["seconds"])
+            # Reading the cache includes importing NumPy, which takes a
+            # while compared to the few pages of a range query
+            self.assertLess(results[-1][1]["seconds"], results[0][1]["seconds"] / (2 if query is None else 1))
+
+
+# Writes all the rows of a GTable to a TSV file a row at a time with
+# csv.writer, as dx-gtable-to-tsv used to, in a fresh process
+GTABLE_TO_TSV_ROWS = """
+import sys, csv, io
+import dxpy
+
+dxgtable = dxpy.DXGTable(sys.argv[1])
+with io.open(sys.argv[2], "w", newline="") as fh:
+    writer = csv.writer(fh, delimiter="\\t")
+    writer.writerow([col["name"] + ":" + col["type"] for col in dxgtable.describe()["columns"]])
+    for row in dxgtable.iterate_rows():
+        writer.writerow([str(item) for item in row[1:]])
+"""
+
+RUN_GTABLE_TO_TSV = "import sys; sys.argv[0] = 'dx-gtable-to-tsv'; from dxpy.scripts.dx_gtable_to_tsv import main; main()"
+
+
+@unittest.skipUnless(testutil.TEST_BENCHMARKS, 'skipping benchmarks')
+class TestGTableExportBenchmark(MockAPIServerTestCase):
+    '''
+    Measures how long dx-gtable-to-tsv takes to export a GTable, with
+    one or several pages requested at once, and compressed, compared to
+    writing the rows a row at a time with csv.writer; and how long
+    formatting the rows takes by itself.
+    '''
+    gtable_rows = 200000
+    latency = 0.5
+
+    def test_export_tsv(self):
+        self.set_payload(size=0, rows=self.gtable_rows, latency=self.latency)
+        seconds, md5s = {}, {}
+        for how in "csv.writer", "threads=1", "threads=4", "gzip":
+            filename = os.path.join(self.tempdir, how + ".tsv")
+            start = time.time()
+            if how == "csv.writer":
+                self.python("-c", GTABLE_TO_TSV_ROWS, self.gtable_id, filename)
+            else:
+                args = ["--threads", "1" if how == "threads=1" else "4"] + (["--gzip"] if how == "gzip" else [])
+                self.python("-c", RUN_GTABLE_TO_TSV, self.gtable_id, "-o", filename, "-f", *args)
+            seconds[how] = time.time() - start
+            with (gzip.open if how == "gzip" else open)(filename, "rb") as fh:
+                md5s[how] = hashlib.md5(fh.read()).hexdigest()
+            record_benchmark("gtable_to_tsv", rows=self.gtable_rows, latency=self.latency, how=how,
+                             seconds=seconds[how])
+        self.assertEqual(set(md5s.values()), set([md5s["csv.writer"]]))
+        self.assertLess(seconds["threads=4"], seconds["threads=1"])
+        self.assertLess(seconds["threads=4"], seconds["csv.writer"])
+
+    def test_format_rows(self):
+        import csv, io
+        from dxpy.scripts.dx_gtable_to_tsv import format_rows
+        rows = [[i, "chr%d" % (i % 22 + 1), 100 * i, 100 * i + 75, i / 7.0] for i in range(self.gtable_rows)]
+        col_types = ["int", "string", "int32", "int32", "double"]
+        start = time.time()
+        fh = io.StringIO() if sys.version_info[0] >= 3 else io.BytesIO()
+        writer = csv.writer(fh, delimiter=str("\t"))
+        for row in rows:
+            writer.writerow([str(item) for item in row])
+        expected = fh.getvalue()
+        csv_seconds = time.time() - start
+        start = time.time()
+        columns = list(zip(*rows))
+        formatted = format_rows(columns, col_types, "\t", len(rows))
+        seconds = time.time() - start
+        self.assertEqual(formatted, expected)
+        record_benchmark("gtable_to_tsv_format", rows=self.gtable_rows, how="csv.writer", seconds=csv_seconds)
+        record_benchmark("gtable_to_tsv_format", rows=self.gtable_rows, how="format_rows", seconds=seconds)
+        self.assertLess(seconds, csv_seconds)
+
+
+@unittest.skipUnless(testutil.TEST_BENCHMARKS, 'skipping benchmarks')
+class TestReplayBenchmark(MockAPIServerTestCase):
+    '''
+    Records the requests made by dx commands against the mock API
+    server, and replays them with added latency per request (see
+    dxpy.utils.cassette), to measure how long the commands take when
+    the API server is far away. Fails if a command makes more API
+    calls than it used to.
+    '''
+    latencies = [0, 0.05]
+    # Maximum number of requests made by each command
+    max_requests = {"ls": 1, "tree": 2, "describe": 2, "find data": 1, "find executions": 1, "download": 5}
+
+    def run_dx(self, args, **env):
+        return testutil.check_output([sys.executable, "-c", RUN_DX] + args, env=dict(self.env, **env))
+
+    def test_replayed_commands(self):
+        self.set_payload(size=1024 * 1024)
+        download_path = os.path.join(self.tempdir, "data")
+        commands = [["ls"], ["tree"], ["describe", self.file_id, "--json"], ["find", "data"], ["find", "executions"],
+                    ["download", self.file_id, "-o", download_path, "-f"]]
+        for args in commands:
+            command = " ".join(arg for arg in args if not arg.startswith(("file-", "-", "/")))
+            cassette = os.path.join(self.tempdir, command.replace(" ", "_") + ".jsonl")
+            output = self.run_dx(args, DX_CASSETTE_RECORD=cassette)
+            with open(cassette) as fh:
+                num_requests = len(fh.readlines())
+            for latency in self.latencies:
+                # Otherwise dx download would find the file complete, and skip the transfer
+                if os.path.exists(download_path):
+                    os.remove(download_path)
+                metrics_file = os.path.join(self.tempdir, "metrics.json")
+                start = time.time()
+                self.assertEqual(self.run_dx(args, DX_CASSETTE_REPLAY=cassette, DX_REPLAY_LATENCY=str(latency),
+                                             DX_METRICS_FILE=metrics_file),
+                                 output)
+                elapsed = time.time() - start
+                with open(metrics_file) as fh:
+                    requests = {route["method"] + " " + route["route"]: sum(route["statuses"].values())
+                                for route in json.load(fh)["requests"]}
+                record_benchmark("replay", command=command, latency=latency, seconds=elapsed, requests=requests)
+                self.assertEqual(sum(requests.values()), num_requests)
+            self.assertLessEqual(num_requests, self.max_requests[command], "dx " + command)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,190 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2013-2016 DNAnexus, Inc.
+#
+# This file is part of dx-toolkit (DNAnexus platform client libraries).
+#
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may not
+#   use this file except in compliance with the License. You may obtain a copy
+#   of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+
+from __future__ import print_function, unicode_literals, division, absolute_import
+
+import os, sys, json, time, shutil, signal, socket, tempfile, unittest, subprocess
+
+import dxpy
+
+# Runs "dx ARGS...", printing (to stderr) whether the daemon ran it
+RUN_DX = """
+import os, sys
+from dxpy.scripts import dx_daemon
+exit_code = dx_daemon.forward(sys.argv[1:])
+sys.stderr.write("forwarded: %s\\n" % (exit_code is not None))
+if exit_code is None:
+    os.environ["DX_DAEMON_SOCKET"] = ""
+    sys.argv[0] = "dx"
+    from dxpy.scripts.dx import main
+    main()
+sys.exit(exit_code)
+"""
+
+# Runs the Python script SCRIPT with ARGS... in the daemon, as
+# dx-jobutil-add-output does
+RUN_SCRIPT = """
+import sys
+from dxpy.scripts import dx_daemon
+exit_code = dx_daemon.forward(sys.argv[2:], script=sys.argv[1])
+sys.stderr.write("forwarded: %s\\n" % (exit_code is not None))
+sys.exit(exit_code)
+"""
+
+
+@unittest.skipUnless(hasattr(socket.socket, "sendmsg"), "dx-daemon requires Python 3")
+class TestDXDaemon(unittest.TestCase):
+    def setUp(self):
+        self.tempdir = tempfile.mkdtemp()
+        self.socket_path = os.path.join(self.tempdir, "dx-daemon.sock")
+        self.env = dict(os.environ,
+                        PYTHONPATH=os.path.dirname(os.path.dirname(os.path.abspath(dxpy.__file__))),
+                        PYTHONIOENCODING="utf-8",
+                        DX_USER_CONF_DIR=os.path.join(self.tempdir, "conf"),
+                        DX_DAEMON_SOCKET=self.socket_path,
+                        DX_SECURITY_CONTEXT=json.dumps({"auth_token": "x", "auth_token_type": "Bearer"}),
+                        DX_APISERVER_HOST="localhost",
+                        DX_APISERVER_PORT="5000",
+                        DX_APISERVER_PROTOCOL="http")
+        self.env.pop("DX_PROJECT_CONTEXT_ID", None)
+        # Commands are only forwarded if the client's standard streams
+        # are terminals where the daemon's are; here neither's are
+        self.devnull = open(os.devnull, "r+")
+        self.daemon_log = open(os.path.join(self.tempdir, "dx-daemon.log"), "w")
+        self.daemon = subprocess.Popen([sys.executable, "-m", "dxpy.scripts.dx_daemon", "--idle-timeout", "60"],
+                                       env=self.env, stdin=self.devnull, stdout=self.devnull, stderr=self.daemon_log)
+        for _i in range(100):
+            if os.path.exists(self.socket_path):
+                break
+            time.sleep(0.1)
+        else:
+            self.fail("dx-daemon did not start")
+
+    def tearDown(self):
+        self.daemon.terminate()
+        self.daemon.wait()
+        self.devnull.close()
+        self.daemon_log.close()
+        shutil.rmtree(self.tempdir)
+
+    def start(self, args, script=None, stdin=None, **extra_env):
+        env = dict(self.env, **extra_env)
+        argv = [sys.executable, "-c", RUN_DX] if script is None else [sys.executable, "-c", RUN_SCRIPT, script]
+        return subprocess.Popen(argv + args, env=env, cwd=self.tempdir, stdin=stdin or self.devnull,
+                                stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+
+    def finish(self, proc, forwarded=True):
+        stdout, stderr = proc.communicate()
+        stderr = stderr.decode("utf-8")
+        self.assertIn("forwarded: {}".format(forwarded), stderr)
+        return proc.returncode, stdout.decode("utf-8"), stderr.replace("forwarded: {}\n".format(forwarded), "")
+
+    def run_dx(self, args, script=None, forwarded=True, stdin=None, **extra_env):
+        return self.finish(self.start(args, script=script, stdin=stdin, **extra_env), forwarded=forwarded)
+
+    def write_script(self, name, source):
+        path = os.path.join(self.tempdir, name)
+        with open(path, "w") as fd:
+            fd.write(source)
+        return path
+
+    def assert_same_as_in_process(self, args, **env):
+        result = self.run_dx(args, **env)
+        self.assertEqual(result, self.run_dx(args, forwarded=False, DX_DAEMON_SOCKET="", **env))
+        return result
+
+    def test_forwarded_commands(self):
+        exit_code, stdout, _stderr = self.assert_same_as_in_process(["--version"])
+        self.assertEqual(exit_code, 0)
+        self.assertTrue(stdout.startswith("dx "))
+        exit_code, _stdout, stderr = self.assert_same_as_in_process(["nonexistent"])
+        self.assertEqual(exit_code, 2)
+        self.assertIn("invalid choice", stderr)
+        self.assert_same_as_in_process(["help", "ls"])
+
+    def test_environment_is_per_command(self):
+        for project in "project-000000000000000000000001", "project-000000000000000000000002":
+            exit_code, stdout, _stderr = self.assert_same_as_in_process(["env"], DX_PROJECT_CONTEXT_ID=project)
+            self.assertEqual(exit_code, 0)
+            self.assertIn("Current workspace\t" + project, stdout)
+
+    def test_commands_run_in_daemon(self):
+        script = self.write_script("pid.py", "import os, sys\nprint(os.getpid(), os.getcwd(), sys.argv[1:])\n")
+        for args in ["a"], ["b", "c"]:
+            exit_code, stdout, _stderr = self.run_dx(args, script=script)
+            self.assertEqual(exit_code, 0)
+            self.assertEqual(stdout, "{} {} {}\n".format(self.daemon.pid, os.path.realpath(self.tempdir), args))
+
+    def test_exit_codes(self):
+        exit_code, _stdout, _stderr = self.run_dx([], script=self.write_script("exit.py", "import os\nos._exit(5)\n"))
+        self.assertEqual(exit_code, 5)
+        exit_code, _stdout, stderr = self.run_dx([], script=self.write_script("fail.py", "raise ValueError('x')\n"))
+        self.assertEqual(exit_code, 1)
+        self.assertIn("ValueError: x", stderr)
+        self.assertEqual(self.run_dx(["--version"])[0], 0)
+
+    def test_signals_are_forwarded(self):
+        started = os.path.join(self.tempdir, "started")
+        script = self.write_script("sleep.py", "import sys, time\nopen(sys.argv[1], 'w').close()\ntime.sleep(30)\n")
+        proc = self.start([started], script=script)
+        while not os.path.exists(started):
+            time.sleep(0.05)
+        proc.send_signal(signal.SIGTERM)
+        self.assertEqual(self.finish(proc)[0], 128 + signal.SIGTERM)
+        self.assertEqual(self.run_dx(["--version"])[0], 0)
+
+    def test_busy_daemon(self):
+        started = os.path.join(self.tempdir, "started")
+        script = self.write_script("sleep.py", "import sys, time\nopen(sys.argv[1], 'w').close()\ntime.sleep(3)\n")
+        proc = self.start([started], script=script)
+        while not os.path.exists(started):
+            time.sleep(0.05)
+        exit_code, stdout, _stderr = self.run_dx(["--version"], forwarded=False)
+        self.assertEqual(exit_code, 0)
+        self.assertTrue(stdout.startswith("dx "))
+        self.assertEqual(self.finish(proc)[0], 0)
+
+    def test_commands_run_in_client(self):
+        self.run_dx(["login", "--help"], forwarded=False)
+        self.run_dx(["--version"], forwarded=False, DX_CA_CERT="NOVERIFY")
+
+    def test_terminals_run_in_client(self):
+        # dxpy only prompts on a terminal if stdin was one when it was
+        # imported
+        master, slave = os.openpty()
+        try:
+            exit_code, stdout, _stderr = self.run_dx(["--version"], forwarded=False, stdin=slave)
+        finally:
+            os.close(slave)
+            os.close(master)
+        self.assertEqual(exit_code, 0)
+        self.assertTrue(stdout.startswith("dx "))
+        self.run_dx(["--version"])
+
+    def test_no_daemon(self):
+        self.daemon.terminate()
+        self.daemon.wait()
+        self.assertFalse(os.path.exists(self.socket_path))
+        exit_code, stdout, _stderr = self.run_dx(["--version"], forwarded=False)
+        self.assertEqual(exit_code, 0)
+        self.assertTrue(stdout.startswith("dx "))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -471,6 +471,30 @@ class TestDXFile(unittest.TestCase):
 
         self.assertTrue(filecmp.cmp(self.foo_file.name, self.new_file.name))
 
+    def test_resume_download_with_journal(self):
+        class Interrupted(Exception):
+            pass
+
+        def interrupt(num_bytes):
+            if num_bytes > 6 * 1024 * 1024:
+                raise Interrupted()
+
+        parts = [b"0123456789ABCDEF" * 1024 * 64 * 5, b"FEDCBA9876543210" * 1024 * 64 * 5, b"0"]
+        self.dxfile = dxpy.new_dxfile()
+        for index, part in enumerate(parts):
+            self.dxfile.upload_part(part, index=index + 1)
+        self.dxfile.close(block=True)
+
+        journal = self.new_file.name + ".dxjournal"
+        with self.assertRaises(Interrupted):
+            dxpy.download_dxfile(self.dxfile.get_id(), self.new_file.name, chunksize=1024 * 1024,
+                                 report_progress_fn=interrupt)
+        self.assertTrue(os.path.exists(journal))
+        dxpy.download_dxfile(self.dxfile.get_id(), self.new_file.name, chunksize=1024 * 1024)
+        with open(self.new_file.name, "rb") as fh:
+            self.assertEqual(fh.read(), b"".join(parts))
+        self.assertFalse(os.path.exists(journal))
+
     def test_upload_empty_dxfile(self):
         self.assertEqual(0, os.path.getsize(self.new_file.name))
         # Checking default backend
@@ -862,6 +886,27 @@ class TestFolder(unittest.TestCase):
         with self.assertRaises(DXFileError):
             dxpy.download_folder(self.proj_id, os.path.join(self.temp_dir, "foobar"), folder="a/b")
 
+    def test_download_dxfiles(self):
+        files = []
+        for i in range(10):
+            content = "{}-th file\n".format(i + 1) * (i + 1)
+            dxfile = dxpy.upload_string(content, name="file_{}.txt".format(i + 1), wait_on_close=True)
+            files.append((dxfile.get_id(), os.path.join(self.temp_dir, "file_{}.txt".format(i + 1)), len(content)))
+        # The size is only used for scheduling, and may be unknown
+        files[0] = (files[0][0], files[0][1], None)
+
+        dxpy.download_dxfiles(files, project=self.proj_id, max_num_parallel_downloads=4)
+        for i, (_dxid, filename, _size) in enumerate(files):
+            with open(filename) as fh:
+                self.assertEqual(fh.read(), "{}-th file\n".format(i + 1) * (i + 1))
+
+        # Files can't be downloaded to the same place
+        with self.assertRaises(DXFileError):
+            dxpy.download_dxfiles([files[0], (files[1][0], files[0][1], files[1][2])])
+
+        # Nothing to download
+        dxpy.download_dxfiles([])
+
 
 class TestDXRecord(unittest.TestCase):
     """
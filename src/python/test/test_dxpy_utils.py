@@ -19,15 +19,18 @@
 
 from __future__ import print_function, unicode_literals, division, absolute_import
 
-import unittest, time, json, re, os
+import unittest, time, datetime, csv, io, json, re, os, sys, random, shutil, tempfile, subprocess, threading
 import dateutil.parser
 import dxpy
 from dxpy import AppError, AppInternalError, DXError, DXFile, DXRecord
-from dxpy.utils import (exec_utils, genomic_utils, response_iterator, get_futures_threadpool, DXJSONEncoder,
+from dxpy.utils import (exec_utils, genomic_utils, completion_cache, gtable_cache, gtable_text, json_codec, throttle, hedging, metrics, profiling, cassette, resolver, response_iterator, get_futures_threadpool, DXJSONEncoder,
                         normalize_timedelta, normalize_time_input, config, Nonce)
+from dxpy.bindings import dxgtable
 from dxpy.utils.exec_utils import DXExecDependencyInstaller
 from dxpy.utils.pretty_print import flatten_json_array
+from dxpy.scripts import dx_reads_to_fastq, dx_gtable_to_tsv, dx_spans_to_bed
 from dxpy.compat import USING_PYTHON2
+from requests.packages import urllib3
 
 # TODO: unit tests for dxpy.utils.get_field_from_jbor, get_job_from_jbor, is_job_ref
 
@@ -63,6 +66,136 @@ class TestGenomicUtils(unittest.TestCase):
         with self.assertRaises(ValueError):
             genomic_utils.reverse_complement("oops")
 
+    def test_bgzf(self):
+        import gzip, struct
+        data = b"".join(b"line %d\tACGT\n" % i for i in range(20000))
+        fileobj = io.BytesIO()
+        fileobj.close = lambda: None
+        writer = genomic_utils.BGZFWriter(fileobj)
+        for start in range(0, len(data), 1000):
+            writer.write(data[start:start + 1000])
+        writer.close()
+        compressed = fileobj.getvalue()
+        self.assertTrue(compressed.endswith(genomic_utils.BGZF_EOF))
+        self.assertEqual(gzip.GzipFile(fileobj=io.BytesIO(compressed)).read(), data)
+        # Each block records its size, and holds at most BGZF_BLOCK_SIZE
+        # bytes of data
+        offset, num_blocks = 0, 0
+        while offset < len(compressed):
+            block_size = struct.unpack("<H", compressed[offset + 16:offset + 18])[0] + 1
+            block_data_size = struct.unpack("<I", compressed[offset + block_size - 4:offset + block_size])[0]
+            self.assertLessEqual(block_data_size, genomic_utils.BGZF_BLOCK_SIZE)
+            offset += block_size
+            num_blocks += 1
+        self.assertEqual(offset, len(compressed))
+        self.assertEqual(num_blocks, -(-len(data) // genomic_utils.BGZF_BLOCK_SIZE) + 1)
+
+    def test_flat_sequence(self):
+        data = b"".join(b"ACGTN"[(i * 7) % 5:(i * 7) % 5 + 1] for i in range(10000))
+        with tempfile.NamedTemporaryFile() as fd:
+            fd.write(data)
+            fd.flush()
+            for seq in (genomic_utils.FlatSequence(fd.name),
+                        genomic_utils.FlatSequence(io.BytesIO(data), block_size=64, max_blocks=3)):
+                for offset in (0, 63, 64, 65, 5000, 9999, 127, 3):
+                    self.assertEqual(seq[offset], data[offset:offset + 1].decode('ascii'))
+                self.assertEqual(seq[60:200], data[60:200].decode('ascii'))
+                self.assertEqual(seq[9990:20000], data[9990:].decode('ascii'))
+                with self.assertRaises(IndexError):
+                    seq[10000]
+                seq.close()
+
+class TestGenomicExportScripts(unittest.TestCase):
+    def test_format_fastq_records(self):
+        names, sequences, qualities = ("@r1", "r2"), ("ACGT", "GG"), ("IIII", "#I")
+        self.assertEqual(dx_reads_to_fastq.formatRecords([names, sequences, qualities]),
+                         "@r1\nACGT\n+\nIIII\n@r2\nGG\n+\n#I\n")
+        self.assertEqual(dx_reads_to_fastq.formatRecords([sequences, qualities], hasName=False),
+                         "@\nACGT\n+\nIIII\n@\nGG\n+\n#I\n")
+        self.assertEqual(dx_reads_to_fastq.formatRecords([names, sequences], hasQual=False),
+                         "@r1\nACGT\n@r2\nGG\n")
+        self.assertEqual(dx_reads_to_fastq.formatRecords([(), (), ()]), "")
+
+    def test_format_fasta_records(self):
+        names, sequences, qualities = ("@r1", ">r2", "r3"), ("ACGT", "GG", "T"), ("IIII", "#I", "I")
+        self.assertEqual(dx_reads_to_fastq.formatRecords([names, sequences, qualities], FASTA=True),
+                         ">r1\nACGT\n>r2\nGG\n>r3\nT\n")
+        self.assertEqual(dx_reads_to_fastq.formatRecords([names, sequences], hasQual=False, FASTA=True),
+                         ">r1\nACGT\n>r2\nGG\n>r3\nT\n")
+        self.assertEqual(dx_reads_to_fastq.formatRecords([sequences], hasName=False, hasQual=False, FASTA=True),
+                         ">\nACGT\n>\nGG\n>\nT\n")
+
+    def assemble_gene_models(self, rows):
+        # Rows are (chr, lo, hi, name, type, span_id, parent_id), in order of position
+        columns = ["chr", "lo", "hi", "name", "type", "span_id", "parent_id", "strand"]
+        bed_file = io.StringIO()
+        assembler = dx_spans_to_bed.gene_model_assembler(bed_file, dict((name, i) for i, name in enumerate(columns)))
+        written = []
+        for row in rows:
+            assembler.add_row(list(row) + ["+"])
+            written.append(bed_file.getvalue().count("\n"))
+        assembler.flush()
+        return bed_file.getvalue().splitlines(), written
+
+    def test_overlapping_gene_models(self):
+        lines, _written = self.assemble_gene_models([
+            ("chr1", 0, 1000, "g1", "gene", 1, -1),
+            ("chr1", 0, 1000, "t1", "transcript", 2, 1),
+            ("chr1", 0, 100, "e", "exon", 3, 2),
+            ("chr1", 500, 700, "g2", "gene", 4, -1),
+            ("chr1", 500, 700, "t2", "transcript", 5, 4),
+            ("chr1", 500, 700, "e", "exon", 6, 5),
+            ("chr1", 900, 1000, "e", "exon", 7, 2)])
+        # The model nested in the other one is written as soon as it is passed
+        self.assertEqual(lines, ["chr1\t500\t700\tt2\t0\t+\t500\t700\t0,0,0\t1\t200\t0",
+                                 "chr1\t0\t1000\tt1\t0\t+\t0\t1000\t0,0,0\t2\t100,100\t0,900"])
+
+    def test_child_before_parent(self):
+        lines, _written = self.assemble_gene_models([
+            ("chr1", 0, 1000, "t1", "transcript", 2, 1),
+            ("chr1", 0, 1000, "g1", "gene", 1, -1),
+            ("chr1", 200, 300, "e", "exon", 4, 99),
+            ("chr1", 400, 500, "e", "exon", 3, 2)])
+        # The exon whose parent never shows up is dropped
+        self.assertEqual(lines, ["chr1\t0\t1000\tt1\t0\t+\t0\t1000\t0,0,0\t1\t100\t400"])
+
+    def test_chromosome_switch(self):
+        lines, written = self.assemble_gene_models([
+            ("chr1", 0, 1000, "t1", "transcript", 1, -1),
+            ("chr2", 10, 20, "t2", "transcript", 2, -1),
+            ("chr2", 15, 20, "e", "exon", 3, 2)])
+        # The models of a chromosome are written when the next one starts
+        self.assertEqual(written, [0, 1, 1])
+        self.assertEqual(lines, ["chr1\t0\t1000\tt1\t0\t+\t0\t1000\t0,0,0\t0\t\t",
+                                 "chr2\t10\t20\tt2\t0\t+\t10\t20\t0,0,0\t1\t5\t5"])
+
+    def write_csv(self, rows, delimiter):
+        if USING_PYTHON2:
+            # The Python 2 csv module only writes bytes
+            output = io.BytesIO()
+            csv.writer(output, delimiter=delimiter.encode("ascii")).writerows(
+                [[field.encode("utf-8") if hasattr(field, "encode") else field for field in row] for row in rows])
+            return output.getvalue().decode("utf-8")
+        output = io.StringIO()
+        csv.writer(output, delimiter=delimiter).writerows(rows)
+        return output.getvalue()
+
+    def test_format_rows_like_csv(self):
+        strings = ["plain", "a,b", "a\tb", 'say "hi"', '"', "line\nbreak", "cr\rlf\r\n", "\u00fcber \u20ac \U0001F600", "", " "]
+        numbers = list(range(-3, len(strings) - 3))
+        booleans = [index % 2 == 0 for index in range(len(strings))]
+        for delimiter in "\t", ",":
+            columns = [strings, numbers, booleans, strings[::-1]]
+            col_types = ["string", "int32", "boolean", "string"]
+            self.assertEqual(dx_gtable_to_tsv.format_rows(columns, col_types, delimiter, len(strings)),
+                             self.write_csv(list(zip(*columns)), delimiter))
+            # A single empty string is quoted, so that its line isn't empty
+            self.assertEqual(dx_gtable_to_tsv.format_rows([strings], ["string"], delimiter, len(strings)),
+                             self.write_csv([[field] for field in strings], delimiter))
+            self.assertEqual(dx_gtable_to_tsv.format_rows([numbers], ["int32"], delimiter, len(strings)),
+                             self.write_csv([[field] for field in numbers], delimiter))
+            self.assertEqual(dx_gtable_to_tsv.format_column(("x", "y"), delimiter), ("x", "y"))
+
 class TestResponseIterator(unittest.TestCase):
     def test_basic_iteration(self):
         def task(i, sleep_for=1):
@@ -343,6 +476,1047 @@ class TestDXConfig(unittest.TestCase):
             os.environ.update(environ_backup)
             dxpy.config.__init__(suppress_warning=True)
 
+class TestCompletionCache(unittest.TestCase):
+    def setUp(self):
+        self.old_user_conf_dir = dxpy.config._user_conf_dir
+        self.old_ttl = os.environ.pop("DX_COMPLETION_CACHE_TTL", None)
+        self.temp_dir = tempfile.mkdtemp()
+        dxpy.config._user_conf_dir = self.temp_dir
+        self.num_fetches = 0
+
+    def tearDown(self):
+        dxpy.config._user_conf_dir = self.old_user_conf_dir
+        if self.old_ttl is not None:
+            os.environ["DX_COMPLETION_CACHE_TTL"] = self.old_ttl
+        else:
+            os.environ.pop("DX_COMPLETION_CACHE_TTL", None)
+        shutil.rmtree(self.temp_dir)
+
+    def fetch(self):
+        self.num_fetches += 1
+        return ["result", self.num_fetches]
+
+    def test_fresh_entries_are_reused(self):
+        self.assertEqual(completion_cache.get_cached("project-1", "/", "q", self.fetch), ["result", 1])
+        self.assertEqual(completion_cache.get_cached("project-1", "/", "q", self.fetch), ["result", 1])
+        self.assertEqual(self.num_fetches, 1)
+        # Entries are keyed by project, folder, and query
+        completion_cache.get_cached("project-2", "/", "q", self.fetch)
+        completion_cache.get_cached("project-1", "/foo", "q", self.fetch)
+        completion_cache.get_cached("project-1", "/", "other", self.fetch)
+        self.assertEqual(self.num_fetches, 4)
+        self.assertEqual(completion_cache.get_cached("project-1", "/", "q", self.fetch), ["result", 1])
+
+    def test_expired_entries_are_refetched(self):
+        filename = completion_cache._get_cache_filename("project-1", "/")
+        completion_cache._store(filename, "q", ["old"], timestamp=time.time() - completion_cache.MAX_STALE_AGE - 1)
+        self.assertEqual(completion_cache.get_cached("project-1", "/", "q", self.fetch), ["result", 1])
+        self.assertEqual(self.num_fetches, 1)
+
+    def test_stale_entries_are_served(self):
+        filename = completion_cache._get_cache_filename("project-1", "/")
+        completion_cache._store(filename, "q", ["stale"], timestamp=time.time() - completion_cache.DEFAULT_TTL - 1)
+        self.assertEqual(completion_cache.get_cached("project-1", "/", "q", lambda: ["fresh"]), ["stale"])
+        # Wait for the background refresh (which also keeps it from
+        # writing to the cache directory while it is being removed)
+        for _i in range(50):
+            if completion_cache._read_entries(filename)["q"]["value"] == ["fresh"]:
+                break
+            time.sleep(0.1)
+        self.assertEqual(completion_cache.get_cached("project-1", "/", "q", self.fetch), ["fresh"])
+
+    def test_accept(self):
+        completion_cache.get_cached("project-1", "/", "q", self.fetch)
+        self.assertEqual(completion_cache.get_cached("project-1", "/", "q", self.fetch, accept=lambda v: False),
+                         ["result", 2])
+
+    def test_disabled(self):
+        os.environ["DX_COMPLETION_CACHE_TTL"] = "0"
+        completion_cache.get_cached("project-1", "/", "q", self.fetch)
+        completion_cache.get_cached("project-1", "/", "q", self.fetch)
+        self.assertEqual(self.num_fetches, 2)
+        self.assertFalse(os.path.exists(completion_cache.get_cache_dir()))
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+@unittest.skipIf(numpy is None, "the GTable cache requires NumPy")
+class TestGTableCache(unittest.TestCase):
+    desc = {"state": "closed", "length": 5,
+            "columns": [{"name": "chr", "type": "string"}, {"name": "lo", "type": "int32"},
+                        {"name": "hi", "type": "int32"}, {"name": "score", "type": "float"}],
+            "indices": [{"name": "gri", "type": "genomic", "chr": "chr", "lo": "lo", "hi": "hi"}]}
+    rows = [[0, "chr1", 100, 200, 0.5], [1, "chr2", 50, 80, 1.25], [2, "chr1", 10, 150, -2.0],
+            [3, "chr1", 300, 400, 3.0], [4, "chr\u00e9", 0, 10, 0.0]]
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.old_env = dict((name, os.environ.pop(name, None)) for name in ("DX_GTABLE_CACHE_SIZE", "DX_GTABLE_CACHE_DIR"))
+        os.environ["DX_GTABLE_CACHE_DIR"] = self.temp_dir
+        os.environ["DX_GTABLE_CACHE_SIZE"] = "1"
+
+    def tearDown(self):
+        for name, value in self.old_env.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+        shutil.rmtree(self.temp_dir)
+
+    def fill(self, dxid, col_names=None, pages=(2, 3)):
+        col_names = col_names or ["__id__", "chr", "lo", "hi", "score"]
+        fill = gtable_cache.start_fill(dxid, self.desc, col_names)
+        start = 0
+        for page_size in pages:
+            page = self.rows[start:start + page_size]
+            fill.add_rows(col_names, [[row[["__id__", "chr", "lo", "hi", "score"].index(name)] for name in col_names]
+                                      for row in page])
+            start += page_size
+        fill.finish()
+        return fill
+
+    def test_scan(self):
+        self.assertIsNone(gtable_cache.open_cached("gtable-1"))
+        self.fill("gtable-1")
+        cached = gtable_cache.open_cached("gtable-1")
+        self.assertTrue(cached.has_columns(["__id__", "chr", "lo", "hi", "score"]))
+        self.assertEqual(cached.length, 5)
+        columns = [cached.get_values(name).tolist() for name in ["__id__", "chr", "lo", "hi", "score"]]
+        self.assertEqual([list(row) for row in zip(*columns)], self.rows)
+        self.assertEqual(cached.get_values("chr", 3, 5).tolist(), ["chr1", "chr\u00e9"])
+        self.assertEqual(cached.get_values("chr", row_ids=numpy.array([4, 0])).tolist(), ["chr\u00e9", "chr1"])
+        self.assertEqual(cached.get_values("lo", 2, 2).tolist(), [])
+        # Nothing left to store
+        self.assertIsNone(gtable_cache.start_fill("gtable-1", self.desc, ["chr", "lo"]))
+
+    def test_genomic_range(self):
+        self.fill("gtable-1")
+        cached = gtable_cache.open_cached("gtable-1")
+        index = cached.get_index("gri")
+        self.assertEqual(cached.find_genomic_range(index, "overlap", "chr1", 120, 350).tolist(), [2, 0, 3])
+        self.assertEqual(cached.find_genomic_range(index, "overlap", "chr1", 400, 500).tolist(), [])
+        self.assertEqual(cached.find_genomic_range(index, "enclose", "chr1", 0, 210).tolist(), [2, 0])
+
+    def test_incomplete_scans_are_not_stored(self):
+        self.fill("gtable-1", pages=(2,))
+        self.assertIsNone(gtable_cache.open_cached("gtable-1"))
+        self.assertEqual(os.listdir(self.temp_dir), [])
+        open_table = dict(self.desc, state="open")
+        self.assertIsNone(gtable_cache.start_fill("gtable-1", open_table, ["chr"]))
+
+    def test_columns_are_added(self):
+        self.fill("gtable-1", col_names=["lo", "hi"])
+        cached = gtable_cache.open_cached("gtable-1")
+        self.assertTrue(cached.has_columns(["__id__", "lo", "hi"]))
+        self.assertFalse(cached.has_columns(["chr"]))
+        self.fill("gtable-1", col_names=["chr"])
+        self.assertTrue(gtable_cache.open_cached("gtable-1").has_columns(["chr", "lo", "hi"]))
+
+    def test_least_recently_read_tables_are_evicted(self):
+        # Each table takes 149 bytes
+        os.environ["DX_GTABLE_CACHE_SIZE"] = str(300 / 1024 / 1024)
+        self.fill("gtable-1")
+        self.fill("gtable-2")
+        os.utime(os.path.join(gtable_cache._get_table_dir("gtable-1"), "meta.json"), (0, 0))
+        os.utime(os.path.join(gtable_cache._get_table_dir("gtable-2"), "meta.json"), (1, 1))
+        gtable_cache.open_cached("gtable-1")
+        self.fill("gtable-3")
+        self.assertIsNotNone(gtable_cache.open_cached("gtable-1"))
+        self.assertIsNone(gtable_cache.open_cached("gtable-2"))
+        self.assertIsNotNone(gtable_cache.open_cached("gtable-3"))
+        # A table larger than the cache is not stored
+        os.environ["DX_GTABLE_CACHE_SIZE"] = str(100 / 1024 / 1024)
+        self.fill("gtable-4")
+        self.assertIsNone(gtable_cache.open_cached("gtable-4"))
+
+    def test_disabled(self):
+        os.environ["DX_GTABLE_CACHE_SIZE"] = "0"
+        self.assertIsNone(gtable_cache.start_fill("gtable-1", self.desc, ["chr"]))
+        self.assertIsNone(gtable_cache.open_cached("gtable-1"))
+
+
+class FakeGTable(object):
+    def __init__(self, rows):
+        self.rows = rows
+        self.fetched = []
+        self.unblocked = threading.Event()
+        self.unblocked.set()
+
+    def describe(self):
+        return {"length": len(self.rows)}
+
+    def iterate_rows(self, start=0, end=None):
+        self.fetched.append(start)
+        self.unblocked.wait()
+        for row in self.rows[start:end]:
+            yield row
+
+
+class TestGTableText(unittest.TestCase):
+    rows = [[i, "r\u00e9ad" * (i % 4), i * 1.5] for i in range(23)]
+
+    def full_text(self, rows):
+        return b"".join(("\t".join("%s" % value for value in row) + "\n").encode("utf-8") for row in rows)
+
+    def test_read(self):
+        expected = self.full_text(self.rows)
+        text = gtable_text.DXGTableText(FakeGTable(self.rows), block_rows=5, max_blocks=2)
+        # Offsets past the end index every block first
+        self.assertEqual(text.read(len(expected), 10), b"")
+        self.assertEqual(text.read(len(expected) + 100, 10), b"")
+        self.assertEqual(text.block_offsets[-1], len(expected))
+        for offset, length in [(0, len(expected)), (0, 1), (3, 40), (len(expected) - 5, 100), (60, 0)]:
+            self.assertEqual(text.read(offset, length), expected[offset:offset + length])
+        # Reads across blocks, in any order
+        for offset in reversed(range(0, len(expected), 7)):
+            self.assertEqual(text.read(offset, 50), expected[offset:offset + 50])
+        self.assertLessEqual(len(text.blocks), 2)
+
+    def test_read_before_indexing(self):
+        expected = self.full_text(self.rows)
+        for offset, length in [(len(expected) - 3, 10), (150, 200), (0, 5000)]:
+            text = gtable_text.DXGTableText(FakeGTable(self.rows), block_rows=5)
+            self.assertEqual(text.read(offset, length), expected[offset:offset + length])
+
+    def test_end_of_table(self):
+        for num_rows in (0, 1, 10):
+            rows = self.rows[:num_rows]
+            expected = self.full_text(rows)
+            text = gtable_text.DXGTableText(FakeGTable(rows), block_rows=5)
+            self.assertEqual(text.read(0, 1000), expected)
+            self.assertEqual(text.read(len(expected), 1000), b"")
+            self.assertEqual(len(text.block_offsets), text.num_blocks + 1)
+
+    def test_sequential_reads(self):
+        expected = self.full_text(self.rows)
+        handler = FakeGTable(self.rows)
+        text = gtable_text.DXGTableText(handler, block_rows=5)
+        data = []
+        while True:
+            chunk = text.read(len(b"".join(data)), 16)
+            if not chunk:
+                break
+            data.append(chunk)
+            if text.read_ahead_thread is not None:
+                text.read_ahead_thread.join()
+        self.assertEqual(b"".join(data), expected)
+        # Each block is fetched once, whether read ahead or not
+        self.assertEqual(sorted(handler.fetched), [0, 5, 10, 15, 20])
+
+    def test_read_ahead_does_not_block_reads(self):
+        expected = self.full_text(self.rows)
+        handler = FakeGTable(self.rows)
+        text = gtable_text.DXGTableText(handler, block_rows=5)
+        first = text.read(0, 10)
+        handler.unblocked.clear()
+        # Continuing sequentially reads block 1 ahead, which is held up
+        self.assertEqual(text.read(10, 10), expected[10:20])
+        while 5 not in handler.fetched:
+            time.sleep(0.01)
+        self.assertTrue(text.read_ahead_thread.is_alive())
+        self.assertEqual(first + text.read(10, 20), expected[:30])
+        # A read of the block being read ahead waits for it
+        result = []
+        reader = threading.Thread(target=lambda: result.append(text.read(text.block_offsets[1], 10)))
+        reader.start()
+        reader.join(0.1)
+        self.assertTrue(reader.is_alive())
+        handler.unblocked.set()
+        reader.join()
+        text.read_ahead_thread.join()
+        self.assertEqual(result, [expected[text.block_offsets[1]:text.block_offsets[1] + 10]])
+        self.assertEqual(handler.fetched, [0, 5])
+
+
+class FakeQueryGTable(dxpy.DXGTable):
+    # Answers "overlap" genomic range queries of rows [__id__, chr, lo,
+    # hi] the way the API server does
+    def __init__(self, rows):
+        dxpy.DXGTable.__init__(self, "gtable-" + "0" * 24)
+        self.rows = rows
+        self.queries = []
+
+    def describe(self, **kwargs):
+        return {"length": len(self.rows),
+                "columns": [{"name": "chr", "type": "string"}, {"name": "lo", "type": "int32"},
+                            {"name": "hi", "type": "int32"}],
+                "indices": [{"name": "gri", "type": "genomic", "chr": "chr", "lo": "lo", "hi": "hi"}]}
+
+    def get_rows(self, query=None, columns=None, starting=None, limit=None, **kwargs):
+        chromosome, lo, hi = query["parameters"]["coords"]
+        self.queries.append((lo, hi))
+        col_names = ["__id__", "chr", "lo", "hi"]
+        matching = [row for row in self.rows
+                    if row[1] == chromosome and row[2] < hi and row[3] > lo and row[0] >= (starting or 0)]
+        data = [[row[col_names.index(name)] for name in columns or col_names] for row in matching[:limit]]
+        return {"data": data, "length": len(data), "next": matching[limit][0] if len(matching) > limit else None}
+
+
+class TestGTableQuery(unittest.TestCase):
+    def setUp(self):
+        random.seed(1)
+        intervals = [(random.randrange(1000), random.choice([0, 1, 5, 50, 500]), random.choice(["chr1", "chr2"]))
+                     for i in range(300)]
+        # Rows that span the whole query, rows of zero length at the
+        # points where it is split in 4, and rows that start there
+        intervals += [(lo, length, "chr1") for lo, length in [(50, 900), (300, 0), (500, 0), (700, 0), (300, 1),
+                                                              (500, 200), (899, 0), (100, 0)]]
+        intervals.sort()
+        self.rows = [[i, chromosome, lo, lo + length] for i, (lo, length, chromosome) in enumerate(intervals)]
+        self.gtable = FakeQueryGTable(self.rows)
+        self.gtable._read_row_buffer_size = 7
+        self.query = dxpy.DXGTable.genomic_range_query("chr1", 100, 900)
+
+    def get_row_ids(self, num_ranges, **kwargs):
+        del self.gtable.queries[:]
+        rows = self.gtable.iterate_query_rows(self.query, num_ranges=num_ranges, **kwargs)
+        return [row["__id__"] if kwargs.get("want_dict") else row[0] for row in rows]
+
+    def test_split_query(self):
+        expected = [row[0] for row in self.rows if row[1] == "chr1" and row[2] < 900 and row[3] > 100]
+        self.assertEqual(self.get_row_ids(1), expected)
+        self.assertEqual(set(self.gtable.queries), set([(100, 900)]))
+        # The rows of zero length where the query is split in 4 are
+        # returned by the query of the part that ends there
+        for lo in (300, 500, 700):
+            self.assertIn([lo, lo], [row[2:] for row in self.rows if row[0] in expected])
+        for num_ranges in (2, 4, 7):
+            self.assertEqual(self.get_row_ids(num_ranges), expected, num_ranges)
+            self.assertEqual(len(set(self.gtable.queries)), num_ranges)
+            if num_ranges == 4:
+                self.assertEqual(sorted(set(self.gtable.queries)), [(100, 301), (300, 501), (500, 701), (700, 900)])
+
+    def test_split_query_with_limit(self):
+        expected = self.get_row_ids(1)
+        for limit in (1, 10, 37, len(expected), len(expected) + 5):
+            self.assertEqual(self.get_row_ids(4, limit=limit), expected[:limit], limit)
+            self.assertEqual(self.get_row_ids(4, limit=limit, want_dict=True), expected[:limit], limit)
+
+    def test_not_split_without_coordinates(self):
+        expected = self.get_row_ids(1, columns=["__id__", "lo"])
+        self.assertEqual(self.get_row_ids(4, columns=["__id__", "lo"]), expected)
+        self.assertEqual(set(self.gtable.queries), set([(100, 900)]))
+        self.assertEqual(self.get_row_ids(4, columns=["__id__", "hi", "lo"]), expected)
+        self.assertEqual(len(set(self.gtable.queries)), 4)
+
+
+class FakeGTableTransport(object):
+    # Serves the API routes used to write a GTable, recording the rows
+    # of each part. addRows waits until unblocked is set, and fails for
+    # the parts in failing_parts
+    gtable_id = "gtable-" + "1" * 24
+
+    def __init__(self):
+        self.routes = []
+        self.parts = {}
+        self.next_part = 1
+        self.failing_parts = set()
+        self.unblocked = threading.Event()
+        self.unblocked.set()
+        self.lock = threading.Lock()
+
+    def request(self, pool_manager, method, url, headers=None, body=None, **kwargs):
+        params = json.loads(body.decode("utf-8")) if body else {}
+        route = url.split("/")[-1]
+        status, result = 200, {}
+        with self.lock:
+            self.routes.append(route)
+        if url.endswith("/gtable/new"):
+            result = {"id": self.gtable_id}
+        elif route == "nextPart":
+            with self.lock:
+                result = {"part": self.next_part}
+                self.next_part += 1
+        elif route == "addRows":
+            self.unblocked.wait()
+            if params["part"] in self.failing_parts:
+                status = 422
+                result = {"error": {"type": "InvalidInput", "message": "Part {} is invalid".format(params["part"])}}
+            else:
+                with self.lock:
+                    self.parts[params["part"]] = params["data"]
+        elif route == "describe":
+            result = {"id": self.gtable_id, "state": "open"}
+        data = json.dumps(result).encode("utf-8")
+        return urllib3.HTTPResponse(body=io.BytesIO(data), status=status, preload_content=True,
+                                    headers={"Content-Type": "application/json", "Content-Length": str(len(data))})
+
+
+class TestGTableWrite(unittest.TestCase):
+    columns = [dxpy.DXGTable.make_column_desc("name", "string"), dxpy.DXGTable.make_column_desc("count", "int32"),
+               dxpy.DXGTable.make_column_desc("score", "double"), dxpy.DXGTable.make_column_desc("ok", "boolean")]
+    rows = [["r\u00e9ad {}".format(i), i, i / 4, i % 3 == 0] for i in range(60)]
+
+    def setUp(self):
+        self.transport = FakeGTableTransport()
+        dxpy.set_transport(self.transport)
+
+    def tearDown(self):
+        self.transport.unblocked.set()
+        dxpy.set_transport(None)
+
+    def new_table(self, request_size=10):
+        gtable = dxpy.new_dxgtable(columns=self.columns, project=PROJECT_1, mode="w")
+        gtable._write_request_size = request_size
+        return gtable
+
+    def test_check_column_is_valid(self):
+        valid = [(["a", "\u00e9"], "string"), ([1, 2.5], "double"), ([True, False], "boolean"), ([1, -2], "int32")]
+        invalid = [(["a", 1], "string"), ([1, "2"], "float"), ([1, 2.5], "int32"), ([True, 1], "int64"),
+                   ([True, None], "boolean")]
+        if numpy is not None:
+            valid += [(numpy.arange(3), "double"), (numpy.arange(3, dtype="uint8"), "int64"),
+                      (numpy.array([1.5]), "float"), (numpy.array([True]), "boolean"), (numpy.array(["a"]), "string"),
+                      (numpy.array(["a", "b"], dtype=object), "string"), (numpy.array([0, 1]), "boolean")]
+            invalid += [(numpy.array([1.5]), "int32"), (numpy.array([1.0, 2.0]), "uint16"),
+                        (numpy.array([1, 2]), "boolean"), (numpy.array([1]), "string")]
+        for values, column_type in valid:
+            dxgtable._check_column_is_valid(0, values, column_type)
+        for values, column_type in invalid:
+            with self.assertRaises(ValueError):
+                dxgtable._check_column_is_valid(0, values, column_type)
+
+        gtable = self.new_table()
+        with self.assertRaises(ValueError):
+            gtable.add_rows([self.rows[0], ["a", 1.5, 1, True]])
+        with self.assertRaises(ValueError):
+            gtable.add_rows([self.rows[0][:3]])
+        with self.assertRaises(ValueError):
+            gtable.add_batch({"name": ["a"], "count": [1], "score": [1.5]})
+        self.assertEqual(gtable._row_buf_len, 0)
+
+    def test_parts(self):
+        gtable = self.new_table()
+        col_names = [column["name"] for column in self.columns]
+        gtable.add_rows(self.rows[:7])
+        self.assertEqual(gtable._row_buf_len, 7)
+        gtable.add_rows([dict(zip(col_names, row)) for row in self.rows[7:32]])
+        gtable.add_batch(dict((name, [row[i] for row in self.rows[32:40]]) for i, name in enumerate(col_names)))
+        gtable.add_rows(self.rows[40:43])
+        gtable.flush()
+        self.assertEqual(sorted(self.transport.parts), [1, 2, 3, 4, 5])
+        self.assertEqual([len(self.transport.parts[part]) for part in range(1, 6)], [10, 10, 10, 10, 3])
+        self.assertEqual(sum((self.transport.parts[part] for part in range(1, 6)), []), self.rows[:43])
+        self.assertNotIn("nextPart", self.transport.routes)
+        # A part given explicitly is sent right away
+        gtable.add_rows(self.rows[43:45], part=100)
+        self.assertEqual(self.transport.parts[100], self.rows[43:45])
+
+        # Parts of a table that this handler didn't create are numbered
+        # by the API server
+        self.transport.parts = {}
+        gtable = dxpy.DXGTable(FakeGTableTransport.gtable_id, mode="a", request_size=10)
+        gtable.add_rows(self.rows[:25])
+        gtable.flush()
+        self.assertEqual(sorted(self.transport.parts), [1, 2, 3])
+        self.assertEqual(sorted(sum(self.transport.parts.values(), [])), sorted(self.rows[:25]))
+
+    def test_backpressure(self):
+        gtable = self.new_table()
+        self.transport.unblocked.clear()
+        gtable.add_rows(self.rows[:10 * dxgtable.DXGTABLE_WRITE_THREADS])
+        # Another part waits until one of those has been sent
+        adding = threading.Thread(target=gtable.add_rows, args=(self.rows[40:50], ))
+        adding.start()
+        adding.join(0.2)
+        self.assertTrue(adding.is_alive())
+        self.transport.unblocked.set()
+        adding.join()
+        gtable.flush()
+        self.assertEqual(sum((self.transport.parts[part] for part in sorted(self.transport.parts)), []),
+                         self.rows[:50])
+
+    def test_errors_reach_flush(self):
+        self.transport.failing_parts.add(2)
+        gtable = self.new_table()
+        gtable.add_rows(self.rows[:25])
+        with self.assertRaises(dxpy.exceptions.InvalidInput):
+            gtable.flush()
+        self.assertEqual(sorted(self.transport.parts), [1, 3])
+        gtable.flush()
+
+    def test_context_manager(self):
+        with self.new_table() as gtable:
+            gtable.add_rows(self.rows[:15])
+        self.assertEqual(sorted(self.transport.parts), [1, 2])
+        self.assertEqual(self.transport.routes[-1], "close")
+        # Tables opened for appending are not closed
+        del self.transport.routes[:]
+        with dxpy.DXGTable(FakeGTableTransport.gtable_id, mode="a") as gtable:
+            gtable.add_rows(self.rows[:3])
+        self.assertEqual(self.transport.routes, ["nextPart", "addRows"])
+
+
+class TestJSONCodec(unittest.TestCase):
+    payload = {"results": [{"id": "file-" + "0" * 24,
+                            "describe": {"name": "ф\u00e9 \U0001F600", "size": 2 ** 40, "sponsored": False,
+                                         "tags": [], "properties": {"a/b": "\"c\"\n"},
+                                         "fraction": 0.1 + 0.2, "created": 1480000000000}}],
+               "next": {"id": "file-" + "1" * 24}}
+
+    def get_backends(self):
+        backends = [json_codec._load_backend(name) for name in ["orjson", "ujson", "json"]]
+        return [backend for backend in backends if backend[0] != "json"] + [backends[-1]]
+
+    def test_backends(self):
+        for name, dumps, loads in self.get_backends():
+            serialized = dumps(self.payload)
+            self.assertIsInstance(serialized, bytes, name)
+            self.assertEqual(json.loads(serialized.decode("utf-8")), self.payload, name)
+            self.assertEqual(loads(serialized), self.payload, name)
+            self.assertEqual(loads(json.dumps(self.payload)), self.payload, name)
+
+    def test_matches_stdlib(self):
+        for value in (2 ** 70, -2 ** 64, float("inf"), [1e400, None], {1: "a"}, ["\ud800"], ["null", None, 1.5]):
+            self.assertEqual(json.dumps(json.loads(json_codec.dumps(value).decode("utf-8"))), json.dumps(value))
+        documents = ["NaN", "[1e400, null]", "[2.5, -0.0]", "-" + str(2 ** 63), str(2 ** 70)]
+        for document in documents:
+            expected = json.dumps(json.loads(document))
+            self.assertEqual(json.dumps(json_codec.loads(document)), expected)
+            self.assertEqual(json.dumps(json_codec.loads(document.encode("utf-8"))), expected)
+        for document in ("", "{", "[1,]", b"\xff"):
+            with self.assertRaises(ValueError):
+                json_codec.loads(document)
+        with self.assertRaises(TypeError):
+            json_codec.dumps({"created": datetime.datetime.now()})
+
+    def test_big_integers(self):
+        # Integers that don't fit in 64 bits survive the default backend
+        self.assertNotEqual(json_codec._choose_backend()[0], "orjson")
+        for value in ({"a": 2 ** 70}, {"a": -2 ** 64 - 1}, [2 ** 64, 2 ** 63 - 1]):
+            self.assertEqual(json_codec.loads(json_codec.dumps(value)), value)
+            self.assertEqual(json_codec.loads(json.dumps(value).encode("utf-8")), value)
+
+    def test_has_non_finite_float(self):
+        self.assertFalse(json_codec._has_non_finite_float({"a": [None, "null", 1.5, 2 ** 70], "b": (0.0, )}))
+        for value in ({"a": [1, {"b": float("nan")}]}, (float("-inf"), ), {1e400: None}):
+            self.assertTrue(json_codec._has_non_finite_float(value))
+
+    def test_choose_backend(self):
+        old_codec = os.environ.get("DX_JSON_CODEC")
+        try:
+            os.environ["DX_JSON_CODEC"] = "json"
+            self.assertEqual(json_codec._choose_backend()[0], "json")
+            os.environ["DX_JSON_CODEC"] = "nonexistent"
+            self.assertEqual(json_codec._choose_backend()[0], "json")
+            del os.environ["DX_JSON_CODEC"]
+            self.assertEqual(json_codec._choose_backend()[0], json_codec._load_backend("ujson")[0])
+            # orjson is only used when asked for
+            os.environ["DX_JSON_CODEC"] = "orjson"
+            self.assertEqual(json_codec._choose_backend()[0], json_codec._load_backend("orjson")[0])
+        finally:
+            if old_codec is not None:
+                os.environ["DX_JSON_CODEC"] = old_codec
+            else:
+                os.environ.pop("DX_JSON_CODEC", None)
+
+class TestThrottle(unittest.TestCase):
+    def time_acquire(self, api_throttle):
+        start = time.time()
+        api_throttle.acquire()
+        return time.time() - start
+
+    def test_unlimited_until_throttled(self):
+        api_throttle = throttle.Throttle()
+        for _i in range(100):
+            self.assertLess(self.time_acquire(api_throttle), 0.1)
+            api_throttle.record_response(200)
+        self.assertIsNone(api_throttle.rate)
+        self.assertEqual(api_throttle.state, throttle.CLOSED)
+
+    def test_retry_after_is_shared(self):
+        api_throttle = throttle.Throttle(min_rate=10)
+        for _i in range(40):
+            api_throttle.acquire()
+        api_throttle.record_response(503, retry_after=0.3)
+        self.assertEqual(api_throttle.state, throttle.OPEN)
+        # Requests that were in flight when the server pushed back don't lower the rate any further
+        api_throttle.record_response(503, retry_after=0.2)
+        self.assertEqual(api_throttle.rate, 20)
+
+        # All threads wait for the Retry-After period, then one of them
+        # probes the server, and the others wait for it to succeed
+        waited = []
+        def request():
+            api_throttle.acquire()
+            waited.append(time.time() - start)
+            api_throttle.record_response(200)
+        start = time.time()
+        self.assertGreater(self.time_acquire(api_throttle), 0.25)
+        self.assertEqual(api_throttle.state, throttle.HALF_OPEN)
+        threads = [threading.Thread(target=request) for _i in range(3)]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.2)
+        self.assertEqual(waited, [])
+        api_throttle.record_response(200)
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(waited), 3)
+        self.assertEqual(api_throttle.state, throttle.CLOSED)
+
+    def test_rate_limit(self):
+        api_throttle = throttle.Throttle(min_rate=20)
+        api_throttle.record_response(503, retry_after=0)
+        self.assertEqual(api_throttle.rate, 20)
+        api_throttle.acquire()
+        api_throttle.record_response(200)
+        self.assertEqual(api_throttle.state, throttle.CLOSED)
+        start = time.time()
+        for _i in range(10):
+            api_throttle.acquire()
+        self.assertGreater(time.time() - start, 0.4)
+
+        # Successes raise the rate, and eventually lift the limit
+        for _i in range(100):
+            api_throttle.record_response(200)
+        self.assertGreater(api_throttle.rate, 25)
+        while api_throttle.rate is not None:
+            api_throttle.record_response(200)
+
+    def test_consecutive_errors(self):
+        api_throttle = throttle.Throttle(failure_threshold=3, failure_cooldown=0.2)
+        api_throttle.record_error()
+        api_throttle.record_response(500)
+        api_throttle.record_response(404)
+        api_throttle.record_error()
+        api_throttle.record_response(502)
+        self.assertEqual(api_throttle.state, throttle.CLOSED)
+        api_throttle.record_error()
+        self.assertEqual(api_throttle.state, throttle.OPEN)
+        self.assertGreater(self.time_acquire(api_throttle), 0.15)
+        # The probe failing reopens the circuit at once
+        api_throttle.record_error()
+        self.assertEqual(api_throttle.state, throttle.OPEN)
+        self.assertIsNone(api_throttle.rate)
+
+    def test_probe_timeout(self):
+        api_throttle = throttle.Throttle(min_rate=100, probe_timeout=0.2)
+        api_throttle.record_response(503, retry_after=0)
+        api_throttle.acquire()
+        self.assertEqual(api_throttle.state, throttle.HALF_OPEN)
+        # The probe never answers; the next request goes ahead after the probe timeout
+        waited = self.time_acquire(api_throttle)
+        self.assertGreater(waited, 0.15)
+        self.assertLess(waited, 1)
+        self.assertEqual(api_throttle.state, throttle.CLOSED)
+
+class TestHedging(unittest.TestCase):
+    def make_request(self, delays):
+        # Returns a request whose successive calls take the given times
+        # (or raise the given exceptions), and return their call number
+        calls = []
+        lock = threading.Lock()
+        def request():
+            with lock:
+                calls.append(len(calls))
+                call = calls[-1]
+            delay = delays[call] if call < len(delays) else 0
+            if isinstance(delay, Exception):
+                raise delay
+            time.sleep(delay)
+            return call
+        return request, calls
+
+    def warm_up(self, hedger, size=1000):
+        for _i in range(hedger.min_samples):
+            hedger.run(lambda: time.sleep(0.01), size)
+
+    def test_slow_request_is_hedged(self):
+        hedger = hedging.Hedger(max_extra_load=0.5, min_samples=10)
+        self.assertIsNone(hedger.get_hedge_delay(1000))
+        self.warm_up(hedger)
+        self.assertLess(hedger.get_hedge_delay(1000), 0.1)
+        # Delays are tracked separately for requests of very different sizes
+        self.assertIsNone(hedger.get_hedge_delay(100000))
+
+        request, calls = self.make_request([1, 0])
+        start = time.time()
+        self.assertEqual(hedger.run(request, 1000), 1)
+        self.assertLess(time.time() - start, 0.5)
+        self.assertEqual(len(calls), 2)
+        self.assertEqual((hedger.requests, hedger.hedges_issued, hedger.hedges_won), (11, 1, 1))
+
+        # The original request wins if it finishes first
+        request, calls = self.make_request([0.1, 1])
+        self.assertEqual(hedger.run(request, 1000), 0)
+        self.assertEqual((hedger.hedges_issued, hedger.hedges_won), (2, 1))
+
+    def test_errors(self):
+        hedger = hedging.Hedger(max_extra_load=1, min_samples=10)
+        self.warm_up(hedger)
+        request, calls = self.make_request([ValueError("original"), 0])
+        with self.assertRaisesRegexp(ValueError, "original"):
+            hedger.run(request, 1000)
+        # A failed hedge doesn't affect the original request
+        request, calls = self.make_request([0.2, ValueError("hedge")])
+        self.assertEqual(hedger.run(request, 1000), 0)
+        self.assertEqual(len(calls), 2)
+
+    def test_extra_load_is_limited(self):
+        hedger = hedging.Hedger(max_extra_load=0.1, min_samples=10, window=10)
+        self.warm_up(hedger)
+        for _i in range(20):
+            request, calls = self.make_request([0.05])
+            hedger.run(request, 1000)
+        self.assertLessEqual(hedger.hedges_issued, 0.1 * hedger.requests + 1)
+        self.assertGreater(hedger.hedges_issued, 0)
+
+    def test_reset_after_fork(self):
+        old_hedger, old_throttle = dxpy._download_hedger, dxpy._api_throttle
+        try:
+            hedger = dxpy.set_download_hedging(90, max_extra_load=0.1)
+            hedger._lock.acquire()
+            dxpy._api_throttle._cond.acquire()
+            dxpy.reset_after_fork()
+            self.assertIsNone(dxpy._pool_manager)
+            self.assertIsNot(dxpy._api_throttle, old_throttle)
+            self.assertIsNot(dxpy._download_hedger, hedger)
+            self.assertEqual((dxpy._download_hedger.percentile, dxpy._download_hedger.max_extra_load), (90, 0.1))
+            self.assertEqual(dxpy._download_hedger.get_hedge_delay(1000), None)
+        finally:
+            old_throttle._cond.release()
+            dxpy._download_hedger, dxpy._api_throttle = old_hedger, old_throttle
+
+    def test_enabled_from_environment(self):
+        script = "import logging; logging.basicConfig(); import dxpy; print(getattr(dxpy._download_hedger, 'percentile', None))"
+        for value, percentile in ("90", "90.0"), ("abc", "None"), ("0", "None"), ("150", "None"):
+            proc = subprocess.Popen([sys.executable, "-c", script], env=dict(os.environ, DX_HEDGE_DOWNLOADS=value),
+                                    stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+            stdout, stderr = proc.communicate()
+            self.assertEqual(proc.returncode, 0)
+            self.assertEqual(stdout.decode("utf-8").strip(), percentile)
+            self.assertEqual("Ignoring DX_HEDGE_DOWNLOADS" in stderr.decode("utf-8"), percentile == "None")
+
+class TestMetrics(unittest.TestCase):
+    class FakeResponse(object):
+        def __init__(self, status, data=b"{}"):
+            self.status = status
+            self.data = data
+            self.headers = {"x-request-id": "abc"}
+
+    def test_get_route(self):
+        self.assertEqual(dxpy._get_route("https://api.dnanexus.com/file-B0123456789ABCDEF0123456/describe", True),
+                         "/file-xxxx/describe")
+        self.assertEqual(dxpy._get_route("https://api.dnanexus.com/system/findDataObjects", True),
+                         "/system/findDataObjects")
+        self.assertEqual(dxpy._get_route("https://s3.amazonaws.com/bucket/key?X-Amz-Signature=x", False),
+                         "s3.amazonaws.com")
+
+    def test_request_hooks(self):
+        infos = []
+        def failing_hook(info):
+            raise ValueError()
+        dxpy.add_request_hook(failing_hook)
+        dxpy.add_request_hook(infos.append)
+        try:
+            dxpy._report_request("POST", "https://api.dnanexus.com/record-B0123456789ABCDEF0123456/describe", True,
+                                 b"{}", time.time(), 1, self.FakeResponse(200, b'{"id": "x"}'))
+        finally:
+            dxpy.remove_request_hook(failing_hook)
+            dxpy.remove_request_hook(infos.append)
+        self.assertEqual(len(infos), 1)
+        self.assertEqual((infos[0].route, infos[0].status, infos[0].request_id), ("/record-xxxx/describe", 200, "abc"))
+        self.assertEqual((infos[0].bytes_sent, infos[0].bytes_received, infos[0].retries), (2, 11, 1))
+        self.assertNotIn(infos.append, dxpy._request_hooks)
+
+    def make_info(self, route, status, latency, error=None):
+        return dxpy.RequestInfo(method="POST", url="https://api.dnanexus.com" + route, route=route, status=status,
+                                request_id=None, bytes_sent=10, bytes_received=100, latency=latency, retries=0,
+                                error=error)
+
+    def test_histogram(self):
+        histogram = metrics.Histogram(buckets=(0.1, 1))
+        for value in 0.05, 0.1, 0.5, 5:
+            histogram.observe(value)
+        self.assertEqual(histogram.to_dict(), {"count": 4, "sum": 5.65, "buckets": {"0.1": 2, "1": 3, "+Inf": 4}})
+
+    def test_registry(self):
+        registry = metrics.MetricsRegistry()
+        registry(self.make_info("/system/whoami", 200, 0.02))
+        registry(self.make_info("/system/whoami", 200, 0.2))
+        registry(self.make_info("/system/whoami", None, 5, error=IOError()))
+        registry.record_transfer("file-xxxx", "download", 1000, started=10, finished=11)
+        registry.record_transfer("file-xxxx", "download", 3000, started=10.5, finished=12)
+        result = registry.to_dict()
+        self.assertEqual(len(result["requests"]), 1)
+        self.assertEqual(result["requests"][0]["statuses"], {"200": 2, "error": 1})
+        self.assertEqual(result["requests"][0]["bytes_received"], 300)
+        self.assertEqual(result["requests"][0]["latency"]["count"], 3)
+        self.assertEqual(result["file_transfers"], [{"file": "file-xxxx", "direction": "download", "bytes": 4000,
+                                                     "seconds": 2, "bytes_per_second": 2000}])
+
+        prometheus = registry.to_prometheus()
+        self.assertIn('dx_http_requests_total{method="POST",route="/system/whoami",status="200"} 2\n', prometheus)
+        self.assertIn('dx_http_request_duration_seconds_bucket{le="0.025",method="POST",route="/system/whoami"} 1\n',
+                      prometheus)
+        self.assertIn('dx_file_transfer_bytes_per_second{direction="download",file="file-xxxx"} 2000', prometheus)
+
+        tempdir = tempfile.mkdtemp()
+        try:
+            registry.export(os.path.join(tempdir, "metrics.json"))
+            with open(os.path.join(tempdir, "metrics.json")) as fh:
+                self.assertEqual(json.load(fh)["file_transfers"][0]["bytes"], 4000)
+            registry.export(os.path.join(tempdir, "metrics.prom"))
+            with open(os.path.join(tempdir, "metrics.prom")) as fh:
+                self.assertIn("# TYPE dx_http_requests_total counter\n", fh.read())
+            self.assertEqual(sorted(os.listdir(tempdir)), ["metrics.json", "metrics.prom"])
+        finally:
+            shutil.rmtree(tempdir)
+
+    def test_hedging_stats(self):
+        registry = metrics.MetricsRegistry()
+        old_hedger = dxpy._download_hedger
+        try:
+            dxpy.set_download_hedging(None)
+            self.assertIsNone(registry.to_dict()["download_hedging"])
+            self.assertNotIn("hedg", registry.to_prometheus())
+            hedger = dxpy.set_download_hedging(90)
+            hedger.requests, hedger.hedges_issued, hedger.hedges_won = 100, 5, 3
+            self.assertEqual(registry.to_dict()["download_hedging"], {"requests": 100, "hedges_issued": 5, "hedges_won": 3})
+            self.assertIn("dx_download_hedges_won_total 3\n", registry.to_prometheus())
+        finally:
+            dxpy._download_hedger = old_hedger
+
+    def test_enabled_from_environment(self):
+        tempdir = tempfile.mkdtemp()
+        try:
+            filename = os.path.join(tempdir, "metrics.json")
+            subprocess.check_call([sys.executable, "-c", "import dxpy; dxpy._report_request('GET', 'https://x/y', False, None, 0, 0, None, error=IOError())"],
+                                  env=dict(os.environ, DX_METRICS_FILE=filename))
+            with open(filename) as fh:
+                self.assertEqual(json.load(fh)["requests"][0]["statuses"], {"error": 1})
+        finally:
+            shutil.rmtree(tempdir)
+
+class TestProfiling(unittest.TestCase):
+    def setUp(self):
+        # Record spans without registering the exit handler
+        profiling._enabled = True
+        del profiling._events[:]
+
+    def tearDown(self):
+        profiling._enabled = False
+        del profiling._events[:]
+
+    def test_disabled(self):
+        profiling._enabled = False
+        with profiling.span("nothing"):
+            pass
+        self.assertEqual(profiling.get_summary(), [])
+
+    def test_summary(self):
+        @profiling.timed(category="resolve")
+        def resolve():
+            time.sleep(0.05)
+
+        with profiling.span("command", category="command"):
+            for _i in range(2):
+                resolve()
+            with profiling.span("write", category="io", filename="x"):
+                time.sleep(0.02)
+            thread = threading.Thread(target=resolve)
+            thread.start()
+            thread.join()
+        profiling._request_hook(dxpy.RequestInfo(method="POST", url="https://api.dnanexus.com/system/whoami",
+                                                 route="/system/whoami", status=200, request_id="abc", bytes_sent=2,
+                                                 bytes_received=2, latency=0.01, retries=0, error=None))
+
+        summary = {entry["name"]: entry for entry in profiling.get_summary()}
+        self.assertEqual(sorted(summary), ["POST /system/whoami", "command", "resolve", "write"])
+        self.assertEqual(summary["resolve"]["count"], 3)
+        self.assertEqual(summary["POST /system/whoami"]["category"], "api")
+        # Only the spans nested in it on the same thread are excluded from its self time
+        command = summary["command"]
+        self.assertGreaterEqual(command["total"], 0.17)
+        self.assertAlmostEqual(command["self"], command["total"] - 0.12, delta=0.02)
+        self.assertIn(" resolve\n", profiling.format_summary())
+
+        tempdir = tempfile.mkdtemp()
+        try:
+            profiling.write_trace(os.path.join(tempdir, "trace.json"))
+            with open(os.path.join(tempdir, "trace.json")) as fh:
+                trace = json.load(fh)["traceEvents"]
+        finally:
+            shutil.rmtree(tempdir)
+        spans = [event for event in trace if event["ph"] == "X"]
+        self.assertEqual(len(spans), 6)
+        self.assertEqual(len(set(event["tid"] for event in spans)), 2)
+        write = [event for event in spans if event["name"] == "write"][0]
+        self.assertEqual((write["cat"], write["args"]), ("io", {"filename": "x"}))
+        self.assertGreaterEqual(write["dur"], 20000)
+        self.assertIn("MainThread", [event["args"]["name"] for event in trace if event["ph"] == "M"])
+
+class TestCassette(unittest.TestCase):
+    class FakePoolManager(object):
+        def __init__(self):
+            self.requests = []
+
+        def request(self, method, url, headers=None, body=None, **kwargs):
+            self.requests.append((method, url))
+            if url.endswith("/F/D"):
+                data, content_type = b"\x00\xff" * 10, "application/octet-stream"
+            else:
+                data, content_type = json.dumps({"id": "user-alice", "n": len(self.requests)}).encode("utf-8"), \
+                    "application/json"
+            return urllib3.HTTPResponse(body=io.BytesIO(data), status=200, preload_content=True,
+                                        headers={"Content-Type": content_type, "Content-Length": str(len(data))})
+
+    def setUp(self):
+        self.tempdir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.tempdir, "cassette.jsonl")
+        pool_manager = self.FakePoolManager()
+        recorder = cassette.Recorder(self.filename)
+        for nonce in "a", "b":
+            recorder.request(pool_manager, "POST", "https://api.dnanexus.com/system/whoami",
+                             headers={b"Content-Type": b"application/json"},
+                             body=json.dumps({"nonce": nonce, "fields": [1, 2]}).encode("utf-8"))
+        recorder.request(pool_manager, "GET", "https://s3.amazonaws.com/F/D", headers={"Range": "bytes=0-19"})
+        self.assertEqual(len(pool_manager.requests), 3)
+
+    def tearDown(self):
+        dxpy.set_transport(None)
+        dxpy._api_throttle = dxpy._Throttle()
+        shutil.rmtree(self.tempdir)
+
+    def test_replay(self):
+        player = cassette.Player(self.filename)
+        self.assertIsNone(dxpy.set_transport(player))
+        # Requests are matched regardless of the host and of nonces, and
+        # the last response is repeated
+        for expected in 1, 2, 2:
+            self.assertEqual(dxpy.DXHTTPRequest("/system/whoami", {"fields": [1, 2], "nonce": "c"}, auth=False),
+                             {"id": "user-alice", "n": expected})
+        self.assertEqual(dxpy.DXHTTPRequest("http://localhost/F/D", b"", method="GET", prepend_srv=False, auth=False,
+                                            headers={"Range": "bytes=0-19"}, jsonify_data=False,
+                                            decode_response_body=False),
+                         b"\x00\xff" * 10)
+        self.assertEqual(player.num_requests, 4)
+        with self.assertRaises(cassette.DXCassetteError):
+            dxpy.DXHTTPRequest("/system/whoami", {"fields": [3]}, auth=False)
+        self.assertIs(dxpy.set_transport(None), player)
+
+    def test_latency_and_errors(self):
+        player = cassette.Player(self.filename, latency=0.05, error_rate=0.5, seed=1)
+        dxpy.set_transport(player)
+        start = time.time()
+        for _i in range(4):
+            self.assertEqual(dxpy.DXHTTPRequest("/system/whoami", {"fields": [1, 2]}, auth=False)["id"],
+                             "user-alice")
+        # Injected errors are retried
+        self.assertGreater(player.num_errors, 0)
+        self.assertEqual(player.num_requests, 4 + player.num_errors)
+        self.assertGreaterEqual(time.time() - start, 0.05 * player.num_requests)
+
+PROJECT_1, PROJECT_2 = "project-" + "1" * 24, "project-" + "2" * 24
+
+def file_id(i):
+    return "file-{:024d}".format(i)
+
+class TestObjectsExistInProject(unittest.TestCase):
+    class FakeTransport(object):
+        # Files with an even number are in PROJECT_1, the others are in
+        # PROJECT_2, and file-missing can't be found. Files in copied
+        # are in both projects
+        def __init__(self):
+            self.batches = []
+            self.copied = set()
+
+        def request(self, pool_manager, method, url, headers=None, body=None, **kwargs):
+            assert url.endswith("/system/describeDataObjects")
+            objects = json.loads(body.decode("utf-8"))["objects"]
+            self.batches.append([obj["id"] for obj in objects])
+            results = []
+            for obj in objects:
+                if obj["id"] == "file-missing":
+                    results.append({})
+                else:
+                    project = PROJECT_1 if int(obj["id"].split("-")[1]) % 2 == 0 else PROJECT_2
+                    if obj["id"] in self.copied:
+                        project = obj["project"]
+                    results.append({"describe": {"id": obj["id"], "project": project}})
+            data = json.dumps({"results": results}).encode("utf-8")
+            return urllib3.HTTPResponse(body=io.BytesIO(data), status=200, preload_content=True,
+                                        headers={"Content-Type": "application/json", "Content-Length": str(len(data))})
+
+    def setUp(self):
+        self.transport = self.FakeTransport()
+        dxpy.set_transport(self.transport)
+        resolver._objects_in_projects.clear()
+
+    def tearDown(self):
+        dxpy.set_transport(None)
+        resolver._objects_in_projects.clear()
+
+    def test_batches_and_cache(self):
+        obj_ids = [file_id(i) for i in range(2500)]
+        found = resolver.objects_exist_in_project(obj_ids + ["file-missing"], PROJECT_1)
+        self.assertEqual(sorted(obj_id for obj_id, exists in found.items() if exists),
+                         sorted(file_id(i) for i in range(0, 2500, 2)))
+        self.assertFalse(found["file-missing"])
+        self.assertEqual([len(batch) for batch in self.transport.batches], [1000, 1000, 501])
+
+        # Objects found before are not described again
+        self.assertTrue(resolver.object_exists_in_project(file_id(4), PROJECT_1))
+        self.assertEqual(len(self.transport.batches), 3)
+        self.assertEqual(resolver.objects_exist_in_project([file_id(3), file_id(5000), file_id(6)], PROJECT_1),
+                         {file_id(3): False, file_id(5000): True, file_id(6): True})
+        self.assertEqual(sorted(self.transport.batches[3]), sorted([file_id(3), file_id(5000)]))
+        # Objects that weren't found are, once they have been copied there
+        self.transport.copied.add(file_id(3))
+        self.assertTrue(resolver.object_exists_in_project(file_id(3), PROJECT_1))
+        self.assertFalse(resolver.object_exists_in_project("file-missing", PROJECT_1))
+        self.assertEqual(len(self.transport.batches), 6)
+        # Objects found are kept separately for each project
+        self.assertTrue(resolver.object_exists_in_project(file_id(5), PROJECT_2))
+        self.assertEqual(len(self.transport.batches), 7)
+
+        with self.assertRaises(ValueError):
+            resolver.objects_exist_in_project([file_id(1)], file_id(2))
+        with self.assertRaises(ValueError):
+            resolver.object_exists_in_project(None, PROJECT_1)
+
+@unittest.skipIf(sys.version_info < (3, 7), "module __getattr__ requires Python 3.7 or later")
+class TestLazyImports(unittest.TestCase):
+    def get_imported_modules(self, statements):
+        output = subprocess.check_output([sys.executable, "-c",
+                                          statements + "; import sys, json; print(json.dumps(sorted(sys.modules)))"])
+        return json.loads(output.decode("utf-8"))
+
+    def test_import_dxpy_is_lazy(self):
+        modules = self.get_imported_modules("import dxpy")
+        self.assertIn("dxpy.api", modules)
+        for module in ("dxpy.bindings.dxfile", "dxpy.bindings.search", "dxpy.utils.exec_utils", "dateutil.parser"):
+            self.assertNotIn(module, modules)
+
+    def test_names_are_imported_on_first_use(self):
+        modules = self.get_imported_modules("import dxpy; dxpy.find_one_project")
+        self.assertIn("dxpy.bindings.search", modules)
+        self.assertNotIn("dxpy.bindings.dxgtable", modules)
+
+        self.assertIs(dxpy.DXFile, dxpy.bindings.dxfile.DXFile)
+        self.assertIs(dxpy.search, dxpy.bindings.search)
+        self.assertIs(dxpy.entry_point, exec_utils.entry_point)
+        self.assertIs(dxpy.utils.DXJSONEncoder, exec_utils.DXJSONEncoder)
+        self.assertIn("DXGTable", dir(dxpy))
+        with self.assertRaises(AttributeError):
+            dxpy.nonexistent_name
+
+    def test_star_imports(self):
+        for module, names in (("dxpy", ("DXFile", "dxlink", "download_dxfile", "find_data_objects", "DXGTable",
+                                        "DXHTTPRequest", "DXError", "api", "bindings", "run", "entry_point")),
+                              ("dxpy.bindings", ("DXFile", "dxlink", "download_dxfile", "find_data_objects",
+                                                 "DXDataObject", "DXError", "dxfile", "search"))):
+            namespace = {}
+            exec("from {} import *".format(module), namespace)
+            for name in names:
+                self.assertIn(name, namespace, "{} not exported by {}".format(name, module))
+            self.assertIs(namespace["DXFile"], dxpy.bindings.dxfile.DXFile)
+            self.assertNotIn("_SUBMODULE_EXPORTS", namespace)
+
+
 class TestPrettyPrint(unittest.TestCase):
     def test_flatten_json_array(self):
         json_string = (